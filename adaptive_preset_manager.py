@@ -1,18 +1,21 @@
 # adaptive_preset_manager.py - 자동 프리셋 전환 시스템
 
-import pyupbit
+import market_data
 import numpy as np
 from datetime import datetime, timedelta
 import logging
 from collections import deque
 
+from config import TRADE_STATS_CONFIG
+
 logger = logging.getLogger(__name__)
 
 class AdaptivePresetManager:
     """시장 상황에 따라 자동으로 프리셋 전환"""
     
-    def __init__(self, config):
+    def __init__(self, config, store=None, trade_stats=None):
         self.config = config
+        self.trade_stats = trade_stats  # 롤링 거래 통계 (있으면 최근 승률을 기간 창으로)
         self.current_preset = 'balanced'  # 기본값
         self.last_switch_time = datetime.now()
         self.min_switch_interval = 3600 * 6  # 최소 6시간 간격
@@ -20,6 +23,8 @@ class AdaptivePresetManager:
         # 히스토리 추적
         self.volatility_history = deque(maxlen=24)  # 24시간
         self.trade_history = deque(maxlen=50)  # 최근 50개 거래
+        if store:
+            self._load_recent_trades(store)
         
         # 임계값 설정
         self.thresholds = {
@@ -69,7 +74,7 @@ class AdaptivePresetManager:
         for symbol in trading_pairs[:5]:  # 상위 5개
             ticker = f"KRW-{symbol}"
             try:
-                df = pyupbit.get_ohlcv(ticker, interval="minute60", count=24)
+                df = market_data.get_ohlcv(ticker, interval="minute60", count=24)
                 if df is not None and len(df) >= 24:
                     # ATR 기반 변동성
                     high_low = df['high'] - df['low']
@@ -108,7 +113,7 @@ class AdaptivePresetManager:
         for symbol in trading_pairs[:5]:
             ticker = f"KRW-{symbol}"
             try:
-                df = pyupbit.get_ohlcv(ticker, interval="day", count=7)
+                df = market_data.get_ohlcv(ticker, interval="day", count=7)
                 if df is not None and len(df) >= 7:
                     # 최근 7일 방향성
                     price_changes = df['close'].diff().dropna()
@@ -136,7 +141,7 @@ class AdaptivePresetManager:
         for symbol in trading_pairs[:5]:
             ticker = f"KRW-{symbol}"
             try:
-                df = pyupbit.get_ohlcv(ticker, interval="day", count=3)
+                df = market_data.get_ohlcv(ticker, interval="day", count=3)
                 if df is not None and len(df) >= 3:
                     total_checked += 1
                     
@@ -155,6 +160,10 @@ class AdaptivePresetManager:
     
     def _calculate_recent_win_rate(self):
         """최근 승률 계산"""
+        if self.trade_stats is not None:
+            count, wins, _, _ = self.trade_stats.counts(TRADE_STATS_CONFIG['preset_window_days'])
+            return wins / count if count >= 5 else 0.5  # 데이터 부족
+        
         if len(self.trade_history) < 5:
             return 0.5  # 데이터 부족
         
@@ -297,6 +306,21 @@ class AdaptivePresetManager:
         
         return False
     
+    def _load_recent_trades(self, store):
+        """재시작 시 저장소의 최근 청산 거래로 승률 기록 복원"""
+        try:
+            trades = store.recent_trades(self.trade_history.maxlen)
+        except Exception as e:
+            logger.error(f"최근 거래 로드 실패: {e}")
+            return
+        for trade in reversed(trades):
+            self.trade_history.append({
+                'timestamp': datetime.fromisoformat(trade['timestamp']),
+                'symbol': trade.get('symbol'),
+                'pnl': trade.get('pnl', 0),
+                'pnl_rate': trade.get('pnl_rate', 0)
+            })
+    
     def record_trade(self, trade_data):
         """거래 기록 (승률 계산용)"""
         self.trade_history.append({
@@ -2,14 +2,31 @@
 import logging
 from datetime import datetime
 
+from clock import SYSTEM_CLOCK
+
 logger = logging.getLogger(__name__)
 
+
+def _to_datetime(value):
+    """저널에서 읽은 ISO 문자열 → datetime"""
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
 class AveragingDownManager:
     """물타기 관리 시스템 - 하락장 대응 버전"""
     
-    def __init__(self, config):
+    def __init__(self, config, clock=None, store=None, journal=None):
         self.config = config
+        self.clock = clock or SYSTEM_CLOCK
+        self.store = store  # 있으면 기록을 저장소(position_events)에도 남김
+        self.journal = journal  # 있으면 포지션 저널에 기록/복원
         self.averaging_history = {}  # {symbol: [매수1, 매수2, ...]}
+        if self.journal:
+            self.averaging_history = {
+                symbol: [{**record, 'timestamp': _to_datetime(record.get('timestamp'))}
+                         for record in history]
+                for symbol, history in self.journal.get('averaging').items()
+            }
     
     def should_average_down(self, symbol, position, current_price, market_condition=None):
         """물타기 실행 여부 판단 - ✅ 하락장 체크 추가"""
@@ -90,10 +107,17 @@ class AveragingDownManager:
             'price': price,
             'quantity': quantity,
             'amount': amount,
-            'timestamp': datetime.now()
+            'timestamp': self.clock.now()
         }
         
+        if self.journal:
+            self.journal.append('averaging', symbol, record)
         self.averaging_history[symbol].append(record)
+        if self.store:
+            try:
+                self.store.add_position_event(symbol, 'averaging', record)
+            except Exception as e:
+                logger.error(f"물타기 기록 저장 실패: {e}")
         
         count = len(self.averaging_history[symbol])
         logger.info(f"📊 {symbol} 물타기 기록 추가:")
@@ -144,8 +168,15 @@ class AveragingDownManager:
         """청산 시 기록 삭제"""
         if symbol in self.averaging_history:
             count = len(self.averaging_history[symbol])
+            if self.journal:
+                self.journal.delete('averaging', symbol)
             del self.averaging_history[symbol]
             logger.info(f"🧹 {symbol} 물타기 기록 삭제 ({count}회)")
+            if self.store:
+                try:
+                    self.store.close_position_events(symbol, 'averaging')
+                except Exception as e:
+                    logger.error(f"물타기 기록 저장 실패: {e}")
     
     def get_all_stats(self):
         """전체 물타기 통계"""
@@ -0,0 +1,760 @@
+# backtest.py - 실전 전략 스택 백테스트 (과거 1시간봉 재생)
+#
+# - 실거래와 같은 클래스를 그대로 사용: ImprovedStrategy, RiskManager, PartialExitManager,
+#   AveragingDownManager (시계만 SimulatedClock으로 주입)
+# - pyupbit 대신 exchange_client.SimulatedExchange: 시장가 주문은 재생 중인 캔들 종가(+슬리피지)로 즉시 체결
+# - 지표/상위 타임프레임(4시간봉·일봉)/ML 예측은 재생 전에 전 구간을 한 번에 계산하고
+#   재생 중에는 (종목, 캔들) 위치로 읽기만 함 → 1년치 전 종목이 몇 초
+# - 캔들 마감마다 봇과 같은 순서: 청산 → 물타기 → 신규 진입 (봇이 실행하지 않는 추매는 재생하지 않음)
+#
+# 실거래와 다른 점
+# - 청산 점검은 1초마다가 아니라 1시간봉 종가마다 (캔들 중간의 고가/저가 무시)
+# - 4시간봉/일봉과 시장 상황은 재생 시각 기준 마지막으로 마감된 캔들 사용 (미래 데이터 없음)
+# - 지표는 100개 창이 아니라 전 구간으로 계산 (EMA 초기값 차이만 있음)
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import candle_archive
+import indicator_engine
+from averaging_down_manager import AveragingDownManager
+from clock import SimulatedClock
+from exchange_client import SimulatedExchange
+from improved_strategy import ImprovedStrategy
+from market_condition_check import MarketAnalyzer
+from market_data import KST_OFFSET, interval_seconds
+from multi_timeframe_analyzer import MultiTimeframeAnalyzer
+from partial_exit_manager import PartialExitManager
+from risk_manager import RiskManager
+
+from config import (
+    TRADING_PAIRS,
+    STABLE_PAIRS,
+    UPBIT_CONFIG,
+    ML_CONFIG,
+    AVERAGING_DOWN_CONFIG,
+    BACKTEST_CONFIG,
+)
+
+logger = logging.getLogger(__name__)
+
+BASE_INTERVAL = 'minute60'
+TIMEFRAMES = ('minute60', 'minute240', 'day')  # MultiTimeframeAnalyzer와 같은 주기
+MIN_BARS = 50                                 # 실거래도 캔들 50개 미만이면 분석하지 않음
+
+# KST 인덱스 기준 업비트 캔들 경계 (4시간봉 01/05/09..시, 일봉 09시 시작)
+_RESAMPLE_RULES = {'minute240': ('4h', '1h'), 'day': ('24h', '9h')}
+
+
+def resample_ohlcv(df, interval):
+    """1시간봉 DataFrame → 4시간봉/일봉 (업비트 캔들 경계)"""
+    rule, offset = _RESAMPLE_RULES[interval]
+    out = df.resample(rule, offset=offset).agg({
+        'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
+    })
+    return out.dropna(subset=['close'])
+
+
+def _epochs(index):
+    """KST 인덱스 → 캔들 시작 시각 (UTC epoch 초)"""
+    return index.values.astype('datetime64[s]').astype(np.int64) - KST_OFFSET
+
+
+def _kst(epoch):
+    """UTC epoch 초 → KST Timestamp (pyupbit 인덱스와 같은 형식)"""
+    return pd.Timestamp((int(epoch) + KST_OFFSET) * 10**9)
+
+
+# ======================================================================
+# 재생 데이터 (재생 전에 한 번 계산)
+# ======================================================================
+
+class Timeframe:
+    """한 주기의 (종목 × 시간) 캔들 + 지표 배열"""
+
+    def __init__(self, open_times, seconds, values, bars):
+        self.open_times = open_times
+        self.seconds = seconds
+        self.close_times = open_times + seconds
+        self.values = values  # {이름: (종목 × 시간) 배열} - OHLCV + compute_panel 지표
+        self.bars = bars      # 종목별 누적 캔들 수 (상장 전 0)
+
+    @classmethod
+    def from_panel(cls, panel, interval, adjust=False):
+        values = indicator_engine.compute_panel(panel, adjust=adjust)
+        values.update(open=panel.open, high=panel.high, low=panel.low,
+                      close=panel.close, volume=panel.volume)
+        bars = np.cumsum(~np.isnan(panel.close), axis=1)
+        return cls(_epochs(panel.index), interval_seconds(interval), values, bars)
+
+    def position(self, epoch):
+        """epoch 시각에 마지막으로 마감된 캔들 위치 (없으면 -1)"""
+        return int(np.searchsorted(self.close_times, epoch, 'right')) - 1
+
+    def snapshot(self, row, position):
+        """(종목, 캔들) 지표 스냅샷 - indicator_engine 스냅샷과 같은 키"""
+        return {name: array[row, position] for name, array in self.values.items()}
+
+    def save(self, directory, prefix):
+        """배열마다 .npy 파일 하나 → 메타 정보 {seconds, values}"""
+        np.save(os.path.join(directory, f"{prefix}.open_times.npy"), self.open_times)
+        np.save(os.path.join(directory, f"{prefix}.bars.npy"), self.bars)
+        for name, array in self.values.items():
+            np.save(os.path.join(directory, f"{prefix}.{name}.npy"), array)
+        return {'seconds': self.seconds, 'values': list(self.values)}
+
+    @classmethod
+    def load(cls, directory, prefix, meta, mmap_mode='r'):
+        def load(name):
+            return np.load(os.path.join(directory, f"{prefix}.{name}.npy"), mmap_mode=mmap_mode)
+        values = {name: load(name) for name in meta['values']}
+        return cls(np.asarray(load('open_times')), meta['seconds'], values, load('bars'))
+
+
+class ReplayData:
+    """백테스트 입력 - 종목별 1시간봉 + 재생 전에 계산한 지표/상위 타임프레임/ML 예측
+
+    - base: 전략용 1시간봉 지표 (실거래 calculate_indicators와 같은 EMA 방식)
+    - timeframes: MTF 분석용 1시간봉/4시간봉/일봉 지표 (adjust=True)
+    - ml: 캔들별 ML 예측 {buy_probability, confidence, prediction} 또는 None
+    """
+
+    def __init__(self, symbols, index, base, timeframes, ml=None):
+        self.symbols = list(symbols)
+        self.rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+        self.index = index
+        self.base = base
+        self.timeframes = timeframes
+        self.ml = ml
+
+    def __len__(self):
+        return len(self.index)
+
+    @classmethod
+    def from_frames(cls, frames, ml_generator=None):
+        """{symbol: 1시간봉 DataFrame (pyupbit 형식)} → ReplayData"""
+        frames = {s: df for s, df in frames.items() if df is not None and len(df) > 0}
+        panel = indicator_engine.build_panel(frames)
+        base = Timeframe.from_panel(panel, BASE_INTERVAL)
+
+        timeframes = {BASE_INTERVAL: Timeframe.from_panel(panel, BASE_INTERVAL, adjust=True)}
+        for interval in TIMEFRAMES[1:]:
+            resampled = {s: resample_ohlcv(df, interval) for s, df in frames.items()}
+            timeframes[interval] = Timeframe.from_panel(
+                indicator_engine.build_panel(resampled), interval, adjust=True
+            )
+
+        ml = None
+        if ml_generator is not None and ml_generator.is_trained:
+            ml = {name: np.full(panel.close.shape, np.nan)
+                  for name in ('buy_probability', 'confidence', 'prediction')}
+            for row, symbol in enumerate(panel.symbols):
+                predicted = ml_generator.predict_frame(frames[symbol]).reindex(panel.index)
+                for name in ml:
+                    ml[name][row] = predicted[name].to_numpy(dtype=float)
+
+        return cls(panel.symbols, panel.index, base, timeframes, ml)
+
+    @classmethod
+    def from_archive(cls, symbols, days=None, end=None, warmup=None, archive=None,
+                     ml_generator=None, sync=False):
+        """캔들 아카이브에서 최근 days일 (+ 지표 준비용 warmup개) 1시간봉 읽기
+
+        sync=True면 부족한 구간을 거래소에서 받아 아카이브에 채운 뒤 읽음
+        """
+        days = days or BACKTEST_CONFIG['days']
+        warmup = BACKTEST_CONFIG['warmup_candles'] if warmup is None else warmup
+        archive = archive or candle_archive.get_archive()
+        count = days * 24 + warmup
+
+        frames = {}
+        for symbol in symbols:
+            market = f"KRW-{symbol}"
+            if sync:
+                archive.ensure(market, BASE_INTERVAL, count, end=end)
+            df = archive.read(market, BASE_INTERVAL, end=end, count=count)
+            if len(df) >= MIN_BARS:
+                frames[symbol] = df
+            else:
+                logger.warning(f"{symbol}: 아카이브 캔들 부족 ({len(df)}개) - 제외")
+        return cls.from_frames(frames, ml_generator=ml_generator)
+
+    def save(self, directory):
+        """전 배열을 directory에 .npy로 저장 - load(mmap_mode='r')로 여러 프로세스가 복사 없이 공유"""
+        os.makedirs(directory, exist_ok=True)
+        meta = {
+            'symbols': self.symbols,
+            'base': self.base.save(directory, 'base'),
+            'timeframes': {interval: frame.save(directory, interval)
+                           for interval, frame in self.timeframes.items()},
+            'ml': None,
+        }
+        np.save(os.path.join(directory, 'index.npy'), self.index.values.astype('datetime64[ns]'))
+        if self.ml is not None:
+            meta['ml'] = list(self.ml)
+            for name, array in self.ml.items():
+                np.save(os.path.join(directory, f"ml.{name}.npy"), array)
+        # 메타 파일은 마지막에 (있으면 저장 완료)
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """save()한 디렉터리 → ReplayData (기본은 읽기 전용 메모리 맵)"""
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        index = pd.DatetimeIndex(np.load(os.path.join(directory, 'index.npy')))
+        base = Timeframe.load(directory, 'base', meta['base'], mmap_mode)
+        timeframes = {interval: Timeframe.load(directory, interval, frame, mmap_mode)
+                      for interval, frame in meta['timeframes'].items()}
+        ml = None
+        if meta['ml'] is not None:
+            ml = {name: np.load(os.path.join(directory, f"ml.{name}.npy"), mmap_mode=mmap_mode)
+                  for name in meta['ml']}
+        return cls(meta['symbols'], index, base, timeframes, ml)
+
+    def fingerprint(self):
+        """데이터 식별값 - 종목/시각/가격/ML 예측이 같으면 같은 값 (결과 캐시 키)"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(self.symbols).encode())
+        digest.update(np.ascontiguousarray(self.base.open_times).tobytes())
+        digest.update(np.ascontiguousarray(self.base.values['close']).tobytes())
+        if self.ml is not None:
+            digest.update(np.ascontiguousarray(self.ml['buy_probability']).tobytes())
+        return digest.hexdigest()
+
+    def indicators(self, symbol, position):
+        """전략용 지표 dict (실거래 calculate_indicators와 같은 키) - 캔들 부족 시 None"""
+        row = self.rows[symbol]
+        if self.base.bars[row, position] < MIN_BARS:
+            return None
+        return indicator_engine.strategy_indicators(self.base.snapshot(row, position))
+
+    def timeframe_snapshot(self, symbol, interval, epoch):
+        """epoch 시각 기준 마지막 마감 캔들 지표 스냅샷 - 캔들 부족 시 None"""
+        row = self.rows.get(symbol)
+        frame = self.timeframes.get(interval)
+        if row is None or frame is None:
+            return None
+        position = frame.position(epoch)
+        if position < 0 or frame.bars[row, position] < MIN_BARS:
+            return None
+        return frame.snapshot(row, position)
+
+    def closed_closes(self, symbol, interval, epoch, count):
+        """epoch 시각 기준 마지막 마감 캔들까지 최근 count개 종가 (오래된 순)"""
+        row = self.rows.get(symbol)
+        frame = self.timeframes.get(interval)
+        if row is None or frame is None:
+            return None
+        position = frame.position(epoch)
+        if position < 0:
+            return None
+        close = frame.values['close'][row, max(0, position - count + 1):position + 1]
+        return close[~np.isnan(close)]
+
+    def prediction(self, symbol, epoch):
+        """epoch 시각 기준 마지막 마감 캔들 ML 예측 (predict()와 같은 형식의 일부) 또는 None"""
+        row = self.rows.get(symbol)
+        if self.ml is None or row is None:
+            return None
+        position = self.base.position(epoch)
+        if position < 0:
+            return None
+        probability = self.ml['buy_probability'][row, position]
+        if np.isnan(probability):
+            return None
+        return {
+            'symbol': symbol,
+            'prediction': bool(self.ml['prediction'][row, position]),
+            'buy_probability': float(probability),
+            'confidence': float(self.ml['confidence'][row, position]),
+        }
+
+
+# ======================================================================
+# 재생용 분석기 (실거래 클래스의 데이터 조회만 교체)
+# ======================================================================
+
+class ReplayMarketAnalyzer(MarketAnalyzer):
+    """재생 시각 기준 마감된 4시간봉으로 시장 상황 판단 (판단 공식/캐시는 MarketAnalyzer 그대로)"""
+
+    def __init__(self, data, clock, cache_duration=300):
+        super().__init__(cache_duration=cache_duration, clock=clock)
+        self.data = data
+
+    def _load_closes(self, coin):
+        close = self.data.closed_closes(coin, 'minute240', self.clock.time(), count=7)
+        if close is None or len(close) < 6:
+            return None
+        return close
+
+
+class ReplayMTFAnalyzer(MultiTimeframeAnalyzer):
+    """재생 시각 기준 마감된 캔들 스냅샷으로 MTF 분석 (점수/합의 공식은 그대로)"""
+
+    def __init__(self, data, clock):
+        super().__init__()
+        self.data = data
+        self.clock = clock
+
+    def _load_snapshot(self, ticker, interval, count):
+        return self.data.timeframe_snapshot(ticker[len("KRW-"):], interval, self.clock.time())
+
+
+class ReplayMLSignals:
+    """ImprovedStrategy.ml_generator 자리 - 미리 계산한 캔들별 예측을 재생 시각에 맞춰 반환"""
+
+    def __init__(self, data, clock):
+        self.data = data
+        self.clock = clock
+        self.is_trained = data.ml is not None
+
+    def predict(self, symbol):
+        result = self.data.prediction(symbol, self.clock.time())
+        if result is not None:
+            result['timestamp'] = self.clock.now()
+        return result
+
+    def predict_batch(self, symbols):
+        return {symbol: self.predict(symbol) for symbol in symbols}
+
+
+# ======================================================================
+# 백테스트 엔진
+# ======================================================================
+
+class BacktestResult:
+    """equity: 캔들 종가 시각별 총자산 Series, trades: 체결 단위 거래 기록 DataFrame"""
+
+    def __init__(self, equity, trades, initial_balance, open_positions=0, elapsed=0.0):
+        self.equity = equity
+        self.trades = trades
+        self.initial_balance = initial_balance
+        self.open_positions = open_positions
+        self.elapsed = elapsed
+
+    def summary(self):
+        """{final_equity, total_return, max_drawdown, trades, win_rate, fees, ...}"""
+        equity = self.equity
+        final = float(equity.iloc[-1]) if len(equity) else self.initial_balance
+        drawdown = float((equity / equity.cummax() - 1).min()) if len(equity) else 0.0
+
+        trades = self.trades
+        round_trips = 0
+        win_rate = None
+        if len(trades):
+            # 진입 1회 = 거래 1건 (부분 매도/물타기 포함 포지션 단위 손익)
+            pnl = trades.groupby('position')['pnl'].sum()
+            closed = trades[trades['closed']]['position'].unique()
+            round_trips = len(closed)
+            if round_trips:
+                win_rate = float((pnl.loc[closed] > 0).mean())
+
+        def count(action):
+            return int((trades['action'] == action).sum()) if len(trades) else 0
+
+        return {
+            'initial_balance': self.initial_balance,
+            'final_equity': final,
+            'total_return': final / self.initial_balance - 1,
+            'max_drawdown': drawdown,
+            'trades': round_trips,
+            'win_rate': win_rate,
+            'partial_exits': count('partial_exit'),
+            'averaging': count('averaging'),
+            'fees': float(trades['fee'].sum()) if len(trades) else 0.0,
+            'open_positions': self.open_positions,
+            'candles': len(equity),
+            'elapsed': self.elapsed,
+        }
+
+
+class Backtester:
+    """ReplayData를 캔들 마감마다 실전 전략 스택에 통과시키는 엔진
+
+    run()마다 새 시계/거래소/전략/관리자를 만들어 같은 데이터로 여러 번 실행 가능
+    """
+
+    def __init__(self, data, initial_balance=None, fee_rate=None, slippage=None, quiet=True):
+        self.data = data
+        self.initial_balance = (BACKTEST_CONFIG['initial_balance']
+                                if initial_balance is None else initial_balance)
+        self.fee_rate = fee_rate
+        self.slippage = BACKTEST_CONFIG['slippage'] if slippage is None else slippage
+        self.quiet = quiet
+
+    def _setup(self, start_epoch):
+        self.clock = SimulatedClock(start_epoch)
+        self.exchange = SimulatedExchange(self.initial_balance, self.fee_rate, self.slippage,
+                                          clock=self.clock)
+        self.market_analyzer = ReplayMarketAnalyzer(self.data, self.clock)
+        self.strategy = ImprovedStrategy(
+            market_analyzer=self.market_analyzer,
+            clock=self.clock,
+            mtf_analyzer=ReplayMTFAnalyzer(self.data, self.clock),
+            ml_generator=ReplayMLSignals(self.data, self.clock),
+        )
+        # 재생은 한 스레드에서 순서대로 (신호 스레드 풀 대기 시간이 더 큼)
+        if self.strategy.signal_executor is not None:
+            self.strategy.signal_executor.shutdown(wait=False)
+            self.strategy.signal_executor = None
+        self.risk_manager = RiskManager(self.initial_balance, self.market_analyzer,
+                                        clock=self.clock, balance_file=None)
+        self.partial_exit_manager = PartialExitManager(clock=self.clock)
+        self.averaging_manager = AveragingDownManager(AVERAGING_DOWN_CONFIG, clock=self.clock)
+
+        self.trades = []
+        self.position_ids = {}  # {symbol: 진입 번호}
+        self.entries = 0
+        self.day = None
+
+    def run(self, start=None, end=None):
+        """start~end (KST 시각/epoch) 구간 재생 → BacktestResult
+
+        start 이전 캔들은 지표 준비에만 쓰임 (생략 시 데이터 처음부터)
+        """
+        index = self.data.base.open_times
+        first = 0 if start is None else int(np.searchsorted(index, candle_archive.to_epoch(start)))
+        last = len(index) if end is None else int(np.searchsorted(index, candle_archive.to_epoch(end)))
+        step = interval_seconds(BASE_INTERVAL)
+
+        started = time.perf_counter()
+        previous_disable = logging.root.manager.disable
+        if self.quiet:
+            logging.disable(logging.WARNING)
+        try:
+            self._setup(index[first] + step if first < last else 0)
+            equity = np.empty(max(0, last - first))
+            for n, position in enumerate(range(first, last)):
+                self._step(position, index[position] + step)
+                equity[n] = self.exchange.total_equity()
+        finally:
+            logging.disable(previous_disable)
+
+        times = [_kst(t + step) for t in index[first:last]]
+        trades = pd.DataFrame(self.trades, columns=[
+            'time', 'symbol', 'action', 'side', 'price', 'quantity', 'amount', 'fee',
+            'pnl', 'pnl_rate', 'position', 'closed'
+        ])
+        return BacktestResult(pd.Series(equity, index=pd.DatetimeIndex(times), name='equity'),
+                              trades, self.initial_balance,
+                              open_positions=len(self.risk_manager.positions),
+                              elapsed=time.perf_counter() - started)
+
+    def _step(self, position, close_time):
+        """캔들 하나 마감 - 봇과 같은 순서로 청산 → 물타기 → 진입"""
+        self.clock.set(close_time)
+        close = self.data.base.values['close'][:, position]
+        self.prices = {
+            symbol: float(close[row])
+            for symbol, row in self.data.rows.items() if not np.isnan(close[row])
+        }
+        self.exchange.set_prices({f"KRW-{s}": p for s, p in self.prices.items()})
+
+        # 자정 - 일일 통계 리셋 (봇 daily_reset)
+        day = self.clock.now().date()
+        if self.day is not None and day != self.day:
+            self.risk_manager.reset_daily_stats()
+        self.day = day
+
+        self._check_exits()
+        self._check_averaging_down()
+        self._entry_cycle(position)
+
+    # ------------------------------------------------------------------
+    # 청산 (TradingBot._evaluate_exit와 같은 순서)
+    # ------------------------------------------------------------------
+    def _check_exits(self):
+        for symbol in list(self.risk_manager.positions.keys()):
+            price = self.prices.get(symbol)
+            if price:
+                self._evaluate_exit(symbol, price)
+
+    def _evaluate_exit(self, symbol, current_price):
+        ticker = f"KRW-{symbol}"
+        position = self.risk_manager.positions[symbol]
+        entry_price = position['entry_price']
+        current_quantity = self.exchange.get_balance(ticker)
+
+        # 소액 포지션은 매도 불가 - 가격 상승 대기
+        if current_price * current_quantity < UPBIT_CONFIG['min_order_value']:
+            return
+
+        # 1. 부분 매도
+        fills = len(self.exchange.fills)
+        partial_exit, sold_quantity = self.partial_exit_manager.check_partial_exit(
+            symbol, entry_price, position['entry_time'], current_price, current_quantity,
+            self.exchange
+        )
+        if partial_exit:
+            self._record_fills(symbol, 'partial_exit', fills, entry_price)
+            remaining = current_quantity - sold_quantity
+            if remaining < 0.0001:
+                self.partial_exit_manager.reset_position(symbol)
+                self.risk_manager.update_position(symbol, current_price, current_quantity, 'sell')
+                self._position_closed(symbol)
+            else:
+                self.risk_manager.positions[symbol]['quantity'] = remaining
+            return
+
+        # 2. 손절 (보유시간 무시)
+        if self.risk_manager.check_stop_loss(symbol, current_price, self.averaging_manager):
+            self._sell(symbol, 'stop_loss', force=True)
+            self.partial_exit_manager.reset_position(symbol)
+            return
+
+        # 3. 추적 손절 (물타기를 다 쓴 뒤에만 실행)
+        if self.risk_manager.check_trailing_stop(symbol, current_price):
+            if self._averaging_completed(symbol):
+                if self._sell(symbol, 'trailing_stop'):
+                    self.partial_exit_manager.reset_position(symbol)
+                    self.averaging_manager.clear_history(symbol)
+                    return
+
+        # 4. 목표 수익 (남은 수량 전량)
+        if self.strategy.check_profit_target(entry_price, current_price):
+            if self.strategy.can_exit_position(symbol):
+                self._sell(symbol, 'take_profit')
+                self.partial_exit_manager.reset_position(symbol)
+
+    def _averaging_completed(self, symbol):
+        if not AVERAGING_DOWN_CONFIG['enabled']:
+            return True
+        count = self.averaging_manager.get_averaging_info(symbol)['count']
+        return count >= AVERAGING_DOWN_CONFIG['max_averaging_count']
+
+    def _sell(self, symbol, reason, force=False):
+        """전량 매도 (TradingBot.execute_trade 'sell')"""
+        if not force and not self.strategy.can_exit_position(symbol):
+            return False
+
+        ticker = f"KRW-{symbol}"
+        quantity = self.exchange.get_balance(ticker)
+        position = self.risk_manager.positions.get(symbol)
+        if quantity == 0 or position is None:
+            return False
+
+        fills = len(self.exchange.fills)
+        order = self.exchange.sell_market_order(ticker, quantity)
+        if not order:
+            return False
+
+        fill = self._record_fills(symbol, reason, fills, position['entry_price'], closed=True)
+        self.strategy.record_trade(symbol, 'sell')
+        self.risk_manager.update_position(symbol, fill['price'], fill['volume'], 'sell')
+        self.averaging_manager.clear_history(symbol)
+        self._position_closed(symbol)
+        return True
+
+    def _position_closed(self, symbol):
+        if self.trades and self.trades[-1]['symbol'] == symbol:
+            self.trades[-1]['closed'] = True
+
+    # ------------------------------------------------------------------
+    # 물타기 (TradingBot.check_averaging_down_opportunity / execute_averaging_down)
+    # ------------------------------------------------------------------
+    def _check_averaging_down(self):
+        if not AVERAGING_DOWN_CONFIG['enabled'] or not self.risk_manager.positions:
+            return
+
+        market_condition = self.market_analyzer.analyze_market(TRADING_PAIRS)
+        if AVERAGING_DOWN_CONFIG.get('disable_on_bear_market', True) and market_condition == 'bearish':
+            return
+
+        for symbol, position in self.risk_manager.positions.items():
+            if AVERAGING_DOWN_CONFIG['only_stable_coins'] and symbol not in STABLE_PAIRS:
+                continue
+            price = self.prices.get(symbol)
+            if not price:
+                continue
+            should_avg, _ = self.averaging_manager.should_average_down(
+                symbol, position, price, market_condition
+            )
+            if should_avg:
+                self._average_down(symbol, position)
+
+    def _average_down(self, symbol, position):
+        original_entry = position['entry_price']
+        original_qty = position['quantity']
+        avg_amount = self.averaging_manager.calculate_averaging_size(
+            symbol, original_entry * original_qty
+        )
+        if avg_amount < UPBIT_CONFIG['min_order_amount']:
+            return False
+
+        balance = self.exchange.get_balance("KRW")
+        if avg_amount > balance * (1 - AVERAGING_DOWN_CONFIG.get('min_balance_ratio', 0.3)):
+            return False
+
+        fill = self._buy(symbol, avg_amount, 'averaging', original_entry)
+        if fill is None:
+            return False
+
+        self.averaging_manager.record_averaging(symbol, fill['price'], fill['volume'], avg_amount)
+        # 새 평단가 (봇 execute_averaging_down과 같은 계산)
+        new_avg_price = self.averaging_manager.calculate_average_price(
+            symbol, original_entry, original_qty
+        )
+        new_total_quantity = original_qty + fill['volume']
+        self.risk_manager.positions[symbol].update({
+            'entry_price': new_avg_price,
+            'quantity': new_total_quantity,
+            'value': new_avg_price * new_total_quantity
+        })
+        return True
+
+    # ------------------------------------------------------------------
+    # 신규 진입 (TradingBot.entry_cycle / analyze_and_trade / open_position)
+    # ------------------------------------------------------------------
+    def _entry_cycle(self, position_index):
+        if self.risk_manager.check_daily_loss_limit():
+            return
+        if not self.strategy.can_trade_today():
+            return
+
+        all_indicators = {}
+        for symbol in self.data.symbols:
+            if symbol in self.risk_manager.positions or symbol not in self.prices:
+                continue
+            indicators = self.data.indicators(symbol, position_index)
+            if indicators is not None:
+                all_indicators[symbol] = indicators
+
+        self.strategy.prefetch_signals(list(all_indicators))
+
+        candidates = []
+        for symbol, indicators in all_indicators.items():
+            can_enter, _, score = self.strategy.evaluate_entry(symbol, indicators)
+            if can_enter:
+                candidates.append((score, symbol, indicators))
+
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        for _, symbol, indicators in candidates:
+            self._open_position(symbol, indicators)
+
+    def _open_position(self, symbol, indicators):
+        if symbol in self.risk_manager.positions:
+            return False
+        can_trade, _ = self.risk_manager.can_open_new_position()
+        if not can_trade:
+            return False
+
+        price = indicators['price']
+        balance = self.exchange.get_balance("KRW")
+        self.risk_manager.current_balance = balance
+        quantity = self.risk_manager.calculate_position_size(
+            balance, symbol, price,
+            volatility=indicators.get('volatility'),
+            indicators=indicators
+        )
+        if quantity == 0:
+            return False
+
+        self.entries += 1
+        self.position_ids[symbol] = self.entries
+        fill = self._buy(symbol, min(price * quantity, balance * 0.95), 'entry')
+        if fill is None:
+            return False
+
+        self.strategy.record_trade(symbol, 'buy')
+        self.risk_manager.update_position(symbol, fill['price'], fill['volume'], 'buy')
+        return True
+
+    # ------------------------------------------------------------------
+    # 주문/기록
+    # ------------------------------------------------------------------
+    def _buy(self, symbol, amount, action, entry_price=None):
+        fills = len(self.exchange.fills)
+        if not self.exchange.buy_market_order(f"KRW-{symbol}", amount):
+            return None
+        return self._record_fills(symbol, action, fills, entry_price)
+
+    def _record_fills(self, symbol, action, since, entry_price=None, closed=False):
+        """since 이후 체결을 거래 기록에 추가 → 마지막 체결"""
+        fill = None
+        for fill in self.exchange.fills[since:]:
+            pnl = pnl_rate = None
+            if fill['side'] == 'ask' and entry_price:
+                cost = entry_price * fill['volume']
+                pnl = fill['funds'] - fill['fee'] - cost
+                pnl_rate = pnl / cost
+            self.trades.append({
+                'time': _kst(fill['time']),
+                'symbol': symbol,
+                'action': action,
+                'side': 'buy' if fill['side'] == 'bid' else 'sell',
+                'price': fill['price'],
+                'quantity': fill['volume'],
+                'amount': fill['funds'],
+                'fee': fill['fee'],
+                'pnl': pnl if pnl is not None else -fill['fee'] if fill['side'] == 'bid' else 0.0,
+                'pnl_rate': pnl_rate,
+                'position': self.position_ids.get(symbol),
+                'closed': closed,
+            })
+        return fill
+
+
+def load_replay_data(symbols=None, days=None, end=None, sync=False, use_ml=None):
+    """아카이브 1시간봉으로 최근 days일 재생 데이터 → (ReplayData, 재생 시작 epoch)"""
+    symbols = symbols or TRADING_PAIRS
+    days = days or BACKTEST_CONFIG['days']
+    use_ml = BACKTEST_CONFIG['use_ml'] if use_ml is None else use_ml
+
+    ml_generator = None
+    if use_ml and ML_CONFIG['enabled']:
+        from ml_signal_generator import MLSignalGenerator
+        ml_generator = MLSignalGenerator(model_type=ML_CONFIG['model_type'])
+
+    data = ReplayData.from_archive(symbols, days=days, end=end, ml_generator=ml_generator, sync=sync)
+    start = int(data.base.open_times[-min(len(data), days * 24)]) if len(data) else None
+    return data, start
+
+
+def run_backtest(symbols=None, days=None, end=None, initial_balance=None, sync=False, use_ml=None):
+    """아카이브 1시간봉으로 최근 days일 백테스트 → BacktestResult"""
+    data, start = load_replay_data(symbols, days, end, sync, use_ml)
+    return Backtester(data, initial_balance=initial_balance).run(start=start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="실전 전략 스택 백테스트 (캔들 아카이브 1시간봉)")
+    parser.add_argument('--symbols', nargs='*', default=None, help="종목 (기본: TRADING_PAIRS)")
+    parser.add_argument('--days', type=int, default=None, help="재생 기간 (일)")
+    parser.add_argument('--balance', type=float, default=None, help="시작 원화 잔고")
+    parser.add_argument('--sync', action='store_true', help="부족한 캔들을 거래소에서 받아 아카이브에 채움")
+    parser.add_argument('--no-ml', action='store_true', help="ML 예측 없이 (ML 중립)")
+    parser.add_argument('--trades', default=None, help="거래 기록 CSV 저장 경로")
+    parser.add_argument('--equity', default=None, help="자산 곡선 CSV 저장 경로")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    result = run_backtest(args.symbols, args.days, initial_balance=args.balance,
+                          sync=args.sync, use_ml=not args.no_ml)
+    summary = result.summary()
+
+    print("\n" + "=" * 60)
+    print("📊 백테스트 결과")
+    print("=" * 60)
+    print(f"기간: {result.equity.index[0]} ~ {result.equity.index[-1]} ({summary['candles']}개 캔들)")
+    print(f"시작 자산: {summary['initial_balance']:,.0f}원 → 최종 자산: {summary['final_equity']:,.0f}원")
+    print(f"수익률: {summary['total_return']:+.2%} | 최대 낙폭: {summary['max_drawdown']:.2%}")
+    win_rate = f"{summary['win_rate']:.1%}" if summary['win_rate'] is not None else "-"
+    print(f"거래: {summary['trades']}건 | 승률: {win_rate} | 부분 매도: {summary['partial_exits']}회 | "
+          f"물타기: {summary['averaging']}회")
+    print(f"수수료: {summary['fees']:,.0f}원 | 미청산 포지션: {summary['open_positions']}개")
+    print(f"소요 시간: {summary['elapsed']:.2f}초")
+
+    if args.trades:
+        result.trades.to_csv(args.trades, index=False)
+    if args.equity:
+        result.equity.to_csv(args.equity)
@@ -0,0 +1,482 @@
+# candle_archive.py - 로컬 캔들 아카이브 (종목/주기별 메모리 맵 NumPy 파일)
+#
+# 저장 형식 (root/<interval>/<market>.*):
+#   .candles - 캔들 1개 = 레코드 1개 (int64 시작 시각 UTC epoch 초 + float64 × 6
+#              open/high/low/close/volume/value), 시각 오름차순
+#   .meta    - JSON {'listing_start': epoch} - 상장 시점까지 받았으면 기록 (더 과거는 보강 안 함)
+# - 마감된 캔들만 저장 (진행 중인 캔들은 market_data 캐시 담당)
+# - 새 캔들은 파일 끝에 추가 (증분 동기화), 과거 보강/공백 복구는 임시 파일 → 교체
+#   시각과 OHLCV가 한 파일이라 교체 1번으로 바뀜 (읽는 쪽이 새 OHLCV + 옛 시각을 볼 수 없음)
+# - 읽기는 np.memmap + 이진 탐색으로 구간만 복사
+# - 쓰기는 .candles.lock 파일 잠금 (flock - 프로세스가 죽으면 OS가 해제)
+#
+# 학습/평가/백테스트/분석기는 load_history()로 읽는다 (offline이면 네트워크 없이)
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+import pandas as pd
+
+import market_data
+from market_data import (
+    KST_OFFSET, OHLCV_COLUMNS, candle_open_time, interval_seconds, normalize_interval
+)
+from config import CANDLE_ARCHIVE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIX = '.candles'
+META_SUFFIX = '.meta'
+N_COLUMNS = len(OHLCV_COLUMNS)
+RECORD_DTYPE = np.dtype([('time', '<i8'), ('bars', '<f8', (N_COLUMNS,))])
+
+
+def to_epoch(value):
+    """시각 → UTC epoch 초
+
+    - 숫자: epoch 초 그대로
+    - 시간대 없는 datetime/문자열/Timestamp: pyupbit 인덱스와 같은 KST로 간주
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        return int(ts.value // 10**9) - KST_OFFSET
+    return int(ts.tz_convert('UTC').value // 10**9)
+
+
+def to_frame(times, bars):
+    """(epoch 배열, OHLCV 배열) → pyupbit와 같은 DataFrame (KST 인덱스)"""
+    index = pd.to_datetime((np.asarray(times, dtype=np.int64) + KST_OFFSET) * 10**9)
+    return pd.DataFrame(np.asarray(bars, dtype=float).reshape(-1, N_COLUMNS),
+                        index=index, columns=OHLCV_COLUMNS)
+
+
+def from_frame(df):
+    """pyupbit DataFrame → (epoch 배열, OHLCV 배열)"""
+    times = df.index.values.astype('datetime64[s]').astype(np.int64) - KST_OFFSET
+    bars = df.reindex(columns=OHLCV_COLUMNS).to_numpy(dtype=float)
+    return times, bars
+
+
+class CandleArchive:
+    """(market, interval) 단위 캔들 아카이브"""
+
+    def __init__(self, root=None, fetcher=None, clock=None, initial_candles=None, lock_timeout=None):
+        self.root = root or CANDLE_ARCHIVE_CONFIG.get('root', 'candle_archive')
+        self._fetch = fetcher or market_data.fetch_ohlcv
+        self.clock = clock or time.time
+        self.initial_candles = initial_candles or CANDLE_ARCHIVE_CONFIG.get('initial_candles', 2000)
+        self.lock_timeout = lock_timeout or CANDLE_ARCHIVE_CONFIG.get('lock_timeout', 30)
+        self._locks = {}  # {(market, interval): RLock}
+        self._locks_guard = threading.Lock()
+
+        # 통계
+        self.syncs = 0
+        self.rows_fetched = 0
+
+    # ------------------------------------------------------------------
+    # 파일
+    # ------------------------------------------------------------------
+    def _base(self, market, interval):
+        return os.path.join(self.root, normalize_interval(interval), market)
+
+    def _path(self, market, interval):
+        return self._base(market, interval) + ARCHIVE_SUFFIX
+
+    def _key_lock(self, market, interval):
+        """종목/주기별 잠금 (다른 종목 동기화가 서로 막지 않도록)"""
+        key = (market, normalize_interval(interval))
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.RLock()
+            return lock
+
+    @staticmethod
+    def _try_lock(f):
+        """파일 잠금 시도 (기다리지 않음) - 성공하면 True"""
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    @contextmanager
+    def _file_lock(self, market, interval):
+        """쓰기 잠금 - 같은 프로세스(스레드) + 다른 프로세스(학습/스윕)까지
+
+        잠금은 열린 파일에 걸림 → 잡은 프로세스가 죽으면 OS가 해제 (잠금 파일은 지우지 않음)
+        lock_timeout 안에 못 잡으면 TimeoutError (다른 프로세스가 아직 쓰는 중)
+        """
+        path = self._path(market, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lock_path = path + '.lock'
+
+        with self._key_lock(market, interval), open(lock_path, 'a+b') as f:
+            deadline = time.monotonic() + self.lock_timeout
+            while not self._try_lock(f):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"캔들 아카이브 잠금 대기 시간 초과: {lock_path}")
+                time.sleep(0.05)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _load(self, market, interval):
+        """(times, bars) 메모리 맵 - 비어 있으면 길이 0 배열
+
+        추가 도중 중단된 마지막 레코드(일부만 쓰인)는 무시
+        """
+        path = self._path(market, interval)
+        try:
+            n = os.path.getsize(path) // RECORD_DTYPE.itemsize
+        except FileNotFoundError:
+            n = 0
+
+        if n == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, N_COLUMNS))
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(n,))
+        return records['time'], records['bars']
+
+    @staticmethod
+    def _records(times, bars):
+        records = np.empty(len(times), dtype=RECORD_DTYPE)
+        records['time'] = times
+        records['bars'] = np.asarray(bars, dtype=np.float64).reshape(-1, N_COLUMNS)
+        return records
+
+    def _append(self, market, interval, times, bars):
+        """파일 끝에 추가"""
+        path = self._path(market, interval)
+        size = len(self._load(market, interval)[0]) * RECORD_DTYPE.itemsize
+
+        # 이전 추가가 중간에 끊겼으면 잘라서 맞춤
+        if os.path.exists(path) and os.path.getsize(path) != size:
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+
+        with open(path, 'ab') as f:
+            f.write(self._records(times, bars).tobytes())
+
+    def _rewrite(self, market, interval, times, bars):
+        """전체 다시 쓰기 (임시 파일 → 교체 1번)"""
+        path = self._path(market, interval)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self._records(times, bars).tobytes())
+        os.replace(tmp_path, path)
+
+    def listing_start(self, market, interval):
+        """상장 시점까지 받았으면 첫 캔들 시작 시각 (UTC epoch), 아니면 None"""
+        try:
+            with open(self._base(market, interval) + META_SUFFIX, 'r', encoding='utf-8') as f:
+                return json.load(f).get('listing_start')
+        except FileNotFoundError:
+            return None
+        except (ValueError, OSError) as e:
+            logger.warning(f"캔들 아카이브 메타 무시: {market} {interval} ({e})")
+            return None
+
+    def _mark_listing_start(self, market, interval):
+        """저장된 첫 캔들이 상장 시점 - 더 과거는 없음 (쓰기 잠금 안에서 호출)"""
+        first, _ = self.bounds(market, interval)
+        if first is None:
+            return
+        meta_path = self._base(market, interval) + META_SUFFIX
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'listing_start': first}, f)
+        os.replace(tmp_path, meta_path)
+
+    def _merge(self, market, interval, df):
+        """받은 캔들 병합 → 추가된 캔들 수 (마감된 캔들만, 중복은 기존 유지)"""
+        if df is None or len(df) == 0:
+            return 0
+
+        seconds = interval_seconds(interval)
+        times, bars = from_frame(df)
+        closed = times + seconds <= self.clock()
+        times, bars = times[closed], bars[closed]
+        if len(times) == 0:
+            return 0
+
+        order = np.argsort(times, kind='stable')
+        times, bars = times[order], bars[order]
+        times, first = np.unique(times, return_index=True)
+        bars = bars[first]
+
+        current_times, current_bars = self._load(market, interval)
+        if len(current_times) == 0 or times[0] > current_times[-1]:
+            self._append(market, interval, times, bars)
+            return len(times)
+
+        # 과거 구간 포함 - 합쳐서 다시 쓰기
+        new = ~np.isin(times, current_times)
+        if not new.any():
+            return 0
+        merged_times = np.concatenate([current_times, times[new]])
+        merged_bars = np.concatenate([current_bars, bars[new]])
+        order = np.argsort(merged_times, kind='stable')
+        merged_times, merged_bars = merged_times[order], merged_bars[order]
+        del current_times, current_bars
+        self._rewrite(market, interval, merged_times, merged_bars)
+        return int(new.sum())
+
+    def _fetch_before(self, market, interval, count, before=None):
+        """before(UTC epoch) 이전 캔들 count개 조회 (None이면 현재까지)"""
+        kwargs = {}
+        if before is not None:
+            # 업비트 to 파라미터는 시간대 없으면 UTC
+            kwargs['to'] = datetime.fromtimestamp(before, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        df = self._fetch(market, interval=interval, count=count, **kwargs)
+        if df is not None:
+            self.rows_fetched += len(df)
+        return df
+
+    # ------------------------------------------------------------------
+    # 동기화
+    # ------------------------------------------------------------------
+    def _check_interval(self, interval):
+        interval = normalize_interval(interval)
+        if interval_seconds(interval) is None:
+            raise ValueError(f"아카이브를 지원하지 않는 주기: {interval}")
+        return interval
+
+    def sync(self, market, interval, count=None):
+        """마지막 저장 캔들 이후 마감된 캔들 추가 → 추가된 캔들 수
+
+        비어 있으면 최근 count(기본 initial_candles)개로 시작
+        """
+        interval = self._check_interval(interval)
+        seconds = interval_seconds(interval)
+
+        with self._file_lock(market, interval):
+            times, _ = self._load(market, interval)
+            current_open = candle_open_time(interval, self.clock())
+
+            if len(times) == 0:
+                fetch_count = max(count or 0, self.initial_candles)
+            else:
+                # 마지막 저장 캔들 ~ 진행 중인 캔들 사이 마감된 캔들 수 (+ 진행 중 1개)
+                missing = int((current_open - int(times[-1])) // seconds) - 1
+                if missing <= 0:
+                    return 0
+                fetch_count = missing + 1
+            empty = len(times) == 0
+            del times
+
+            df = self._fetch_before(market, interval, fetch_count)
+            added = self._merge(market, interval, df)
+            if empty and df is not None and len(df) < fetch_count:
+                self._mark_listing_start(market, interval)
+            self.syncs += 1
+            return added
+
+    def backfill(self, market, interval, count):
+        """가장 오래된 저장 캔들 이전으로 count개 보강 → 추가된 캔들 수
+
+        요청보다 적게 오면 상장 시점까지 받은 것 → 기록 (ensure가 다시 조회하지 않음)
+        """
+        interval = self._check_interval(interval)
+        with self._file_lock(market, interval):
+            times, _ = self._load(market, interval)
+            first = int(times[0]) if len(times) else None
+            del times
+            df = self._fetch_before(market, interval, count, first)
+            added = self._merge(market, interval, df)
+            if df is not None and len(df) < count:
+                self._mark_listing_start(market, interval)
+            return added
+
+    def gaps(self, market, interval):
+        """빠진 구간 [(앞 캔들 시작, 뒤 캔들 시작, 빠진 개수)]
+
+        업비트는 거래가 없는 분봉을 만들지 않으므로 공백이 곧 데이터 손실은 아니다
+        """
+        interval = self._check_interval(interval)
+        seconds = interval_seconds(interval)
+        with self._key_lock(market, interval):
+            times, _ = self._load(market, interval)
+            if len(times) < 2:
+                return []
+            diffs = np.diff(times)
+            idx = np.nonzero(diffs > seconds)[0]
+            return [(int(times[i]), int(times[i + 1]), int(diffs[i] // seconds) - 1) for i in idx]
+
+    def repair_gaps(self, market, interval, max_gaps=None):
+        """공백 구간 다시 조회 → 채운 캔들 수 (거래가 없던 구간은 그대로 남음)"""
+        interval = self._check_interval(interval)
+        filled = 0
+        for start, end, missing in self.gaps(market, interval)[:max_gaps]:
+            with self._file_lock(market, interval):
+                df = self._fetch_before(market, interval, missing, end)
+                if df is not None and len(df):
+                    epochs, _ = from_frame(df)
+                    df = df[(epochs > start) & (epochs < end)]
+                filled += self._merge(market, interval, df)
+        return filled
+
+    # ------------------------------------------------------------------
+    # 읽기
+    # ------------------------------------------------------------------
+    def read_arrays(self, market, interval, start=None, end=None, count=None):
+        """[start, end) 구간 (times, bars) 복사본 - count면 end 직전 count개
+
+        시각은 epoch 초 또는 KST datetime/문자열
+        """
+        interval = normalize_interval(interval)
+        with self._key_lock(market, interval):
+            times, bars = self._load(market, interval)
+            lo = 0 if start is None else int(np.searchsorted(times, to_epoch(start), 'left'))
+            hi = len(times) if end is None else int(np.searchsorted(times, to_epoch(end), 'left'))
+            if count is not None:
+                lo = max(lo, hi - count)
+            lo = min(lo, hi)
+            return np.array(times[lo:hi]), np.array(bars[lo:hi])
+
+    def read(self, market, interval, start=None, end=None, count=None):
+        """read_arrays와 같은 구간을 pyupbit 형식 DataFrame으로"""
+        return to_frame(*self.read_arrays(market, interval, start, end, count))
+
+    def count(self, market, interval, end=None):
+        """end 이전 저장 캔들 수"""
+        with self._key_lock(market, interval):
+            times, _ = self._load(market, interval)
+            if end is None:
+                return len(times)
+            return int(np.searchsorted(times, to_epoch(end), 'left'))
+
+    def markets(self, interval):
+        """아카이브에 있는 종목 목록"""
+        directory = os.path.join(self.root, normalize_interval(interval))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(ARCHIVE_SUFFIX)] for name in os.listdir(directory)
+                      if name.endswith(ARCHIVE_SUFFIX))
+
+    def bounds(self, market, interval):
+        """(첫 캔들, 마지막 캔들) 시작 시각 (UTC epoch), 비어 있으면 (None, None)"""
+        with self._key_lock(market, interval):
+            times, _ = self._load(market, interval)
+            if len(times) == 0:
+                return None, None
+            return int(times[0]), int(times[-1])
+
+    def info(self, market, interval):
+        """{rows, first, last (KST), gaps, missing}"""
+        first, last = self.bounds(market, interval)
+        gaps = self.gaps(market, interval) if first is not None else []
+
+        def kst(epoch):
+            return None if epoch is None else pd.Timestamp((epoch + KST_OFFSET) * 10**9)
+
+        return {
+            'rows': self.count(market, interval),
+            'first': kst(first),
+            'last': kst(last),
+            'gaps': len(gaps),
+            'missing': sum(g[2] for g in gaps),
+        }
+
+    def ensure(self, market, interval, count, end=None):
+        """end 이전 캔들이 count개 이상 되도록 동기화/보강"""
+        interval = self._check_interval(interval)
+        self.sync(market, interval, count)
+
+        available = self.count(market, interval, end)
+        if available >= count:
+            return
+
+        needed = count - available
+        first, _ = self.bounds(market, interval)
+        listing_start = self.listing_start(market, interval)
+        if first is not None and listing_start is not None and first <= listing_start:
+            return  # 상장 시점까지 이미 받음 (상장 기간이 count보다 짧은 종목)
+        if end is not None and first is not None and to_epoch(end) < first:
+            # 요청 구간이 저장 구간보다 앞 - 그 사이도 받아야 함
+            needed += int((first - to_epoch(end)) // interval_seconds(interval))
+        self.backfill(market, interval, needed)
+
+
+# 프로세스 공용 인스턴스
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    """공용 아카이브 인스턴스"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = CandleArchive()
+        return _archive
+
+
+def load_history(ticker, interval="minute60", count=200, end=None):
+    """과거 캔들 (마감된 캔들만) - 아카이브 동기화 후 로컬에서 읽기
+
+    - CANDLE_ARCHIVE_CONFIG['offline']이면 네트워크 없이 아카이브만 사용
+    - 아카이브를 끄면 예전처럼 거래소에서 바로 조회
+    - 반환: pyupbit 형식 DataFrame 또는 None
+    """
+    if not CANDLE_ARCHIVE_CONFIG.get('enabled', True):
+        if end is None:
+            return market_data.get_ohlcv(ticker, interval=interval, count=count)
+        to = datetime.fromtimestamp(to_epoch(end), tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        return market_data.fetch_ohlcv(ticker, interval=interval, count=count, to=to)
+
+    archive = get_archive()
+    if not CANDLE_ARCHIVE_CONFIG.get('offline', False):
+        try:
+            archive.ensure(ticker, interval, count, end)
+        except Exception as e:
+            logger.warning(f"캔들 아카이브 동기화 실패 {ticker} {interval}: {e}")
+
+    df = archive.read(ticker, interval, end=end, count=count)
+    return df if len(df) else None
+
+
+if __name__ == '__main__':
+    import sys
+    from config import TRADING_PAIRS
+
+    # python candle_archive.py [주기 ...]  - 거래 종목 아카이브 동기화 + 공백 복구 + 현황
+    intervals = sys.argv[1:] or ['minute60', 'minute240', 'day']
+    archive = get_archive()
+
+    print("=" * 60)
+    print(f"🗄️ 캔들 아카이브 동기화 ({archive.root})")
+    print("=" * 60)
+    for interval in intervals:
+        for symbol in TRADING_PAIRS:
+            ticker = f"KRW-{symbol}"
+            added = archive.sync(ticker, interval)
+            filled = archive.repair_gaps(ticker, interval)
+            info = archive.info(ticker, interval)
+            print(f"{interval:10s} {ticker:12s} +{added:5d} (공백 복구 {filled}) | "
+                  f"{info['rows']:6d}개 {info['first']} ~ {info['last']} | "
+                  f"공백 {info['gaps']}곳 ({info['missing']}개)")
@@ -0,0 +1,53 @@
+# clock.py - 시계 추상화 (실시간 / 재생용 시뮬레이션 시계)
+#
+# - 전략/리스크/청산 관리자는 time.time()/datetime.now() 대신 주입받은 시계를 사용
+# - 실거래는 SYSTEM_CLOCK, 백테스트/재생은 SimulatedClock (재생 시각을 직접 옮김)
+
+import time
+from datetime import datetime
+
+
+class SystemClock:
+    """실제 시계"""
+
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.now()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class SimulatedClock:
+    """재생용 시계 - set()/advance()로만 움직이고 sleep()은 즉시 반환"""
+
+    def __init__(self, start=0.0):
+        self._now = float(start)
+
+    def time(self):
+        return self._now
+
+    def now(self):
+        return datetime.fromtimestamp(self._now)
+
+    def monotonic(self):
+        return self._now
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def set(self, epoch):
+        """재생 시각 이동 (UTC epoch 초) - 과거로는 움직이지 않음"""
+        self._now = max(self._now, float(epoch))
+
+    def advance(self, seconds):
+        if seconds > 0:
+            self._now += seconds
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -0,0 +1,238 @@
+# compiled_forest.py - 랜덤 포레스트를 NumPy 배열로 펼친 추론기 (sklearn 없이 예측)
+#
+# - 모든 트리의 노드를 하나의 연속 배열(feature/threshold/children/value)로 합침
+# - 리프는 자기 자신을 가리키게 만들어 max_depth번 내려가면 모든 트리가 리프에 도착
+# - StandardScaler(평균/표준편차)도 함께 저장해서 원본 특성을 바로 넣을 수 있음
+# - sklearn과 같은 규칙: 입력은 float32로 바꾼 뒤 x <= threshold 이면 왼쪽
+#
+# 사용:
+#   python compiled_forest.py            # ml_model_*.pkl → .npz 내보내기 + sklearn 대비 벤치마크
+
+import logging
+import os
+import pickle
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledForest:
+    """평탄화된 트리 앙상블 - predict_proba / classes_ 로 sklearn 모델 대신 사용"""
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, classes,
+                 mean=None, scale=None, feature_names=None, model_type='random_forest'):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.children = np.ascontiguousarray(children, dtype=np.intp)   # [왼쪽, 오른쪽] 교차 배치
+        self.value = np.ascontiguousarray(value, dtype=np.float64)      # (노드, 클래스) 확률
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+        self.feature_names = list(feature_names or [])
+        self.model_type = model_type
+
+    # ------------------------------------------------------------------
+    # 변환 / 저장
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_sklearn(cls, model, scaler=None, feature_names=None, model_type='random_forest'):
+        """학습된 RandomForestClassifier (+ StandardScaler) → CompiledForest"""
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            leaf = tree.children_left < 0
+            ids = np.arange(n) + offset
+
+            left = np.where(leaf, ids, tree.children_left + offset)
+            right = np.where(leaf, ids, tree.children_right + offset)
+            children.append(np.column_stack([left, right]).ravel())
+
+            # 리프: 0번 특성 <= +inf → 항상 왼쪽(자기 자신)
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+
+            # 노드 값 → 트리별 클래스 확률 (버전에 따라 개수/비율로 저장됨)
+            value = tree.value[:, 0, :].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            values.append(np.divide(value, totals, out=np.zeros_like(value), where=totals > 0))
+
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        mean = scale = None
+        if scaler is not None:
+            mean = scaler.mean_ if getattr(scaler, 'with_mean', True) else np.zeros(scaler.n_features_in_)
+            scale = scaler.scale_ if getattr(scaler, 'with_std', True) else np.ones(scaler.n_features_in_)
+
+        return cls(np.concatenate(features), np.concatenate(thresholds), np.concatenate(children),
+                   np.concatenate(values), np.array(roots), max_depth, model.classes_,
+                   mean=mean, scale=scale, feature_names=feature_names, model_type=model_type)
+
+    def save(self, path):
+        """npz 파일로 저장 (파일 교체는 원자적으로)"""
+        arrays = {
+            'feature': self.feature, 'threshold': self.threshold, 'children': self.children,
+            'value': self.value, 'roots': self.roots, 'classes': self.classes_,
+            'max_depth': np.array(self.max_depth),
+            'feature_names': np.array(self.feature_names, dtype=str),
+            'model_type': np.array(self.model_type),
+        }
+        if self.mean is not None:
+            arrays['mean'] = self.mean
+            arrays['scale'] = self.scale
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data['feature'], data['threshold'], data['children'], data['value'],
+                data['roots'], int(data['max_depth']), data['classes'],
+                mean=data['mean'] if 'mean' in data else None,
+                scale=data['scale'] if 'scale' in data else None,
+                feature_names=[str(n) for n in data['feature_names']],
+                model_type=str(data['model_type']),
+            )
+
+    @property
+    def nbytes(self):
+        """추론에 필요한 배열 메모리 (바이트)"""
+        arrays = [self.feature, self.threshold, self.children, self.value, self.roots]
+        if self.mean is not None:
+            arrays += [self.mean, self.scale]
+        return sum(a.nbytes for a in arrays)
+
+    # ------------------------------------------------------------------
+    # 추론
+    # ------------------------------------------------------------------
+    def transform(self, X):
+        """StandardScaler와 같은 변환 (스케일러가 없으면 그대로)"""
+        X = np.asarray(X, dtype=np.float64)
+        if self.mean is None:
+            return X
+        return (X - self.mean) / self.scale
+
+    def apply(self, X):
+        """(이미 스케일된) X → 행별 트리별 리프 노드 번호 (행 × 트리)"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        row_offset = (np.arange(n_rows) * n_features)[:, None]
+
+        for _ in range(self.max_depth):
+            values = flat.take(row_offset + self.feature.take(nodes))
+            nodes = self.children.take(2 * nodes + (values > self.threshold.take(nodes)))
+        return nodes
+
+    def predict_proba(self, X):
+        """(이미 스케일된) X의 클래스 확률 - sklearn predict_proba와 동일"""
+        return self.value.take(self.apply(X), axis=0).sum(axis=1) / len(self.roots)
+
+    def predict_proba_raw(self, X):
+        """원본 특성 → 스케일링 + 확률"""
+        return self.predict_proba(self.transform(X))
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+# ======================================================================
+# 벤치마크
+# ======================================================================
+
+def reference_proba(model, X):
+    """sklearn 기준 확률 - 트리별 확률을 정규화한 뒤 평균
+
+    예전 버전에서 저장된 모델은 tree_.value에 샘플 개수가 들어 있어서
+    최신 sklearn의 predict_proba가 정규화되지 않은 값을 돌려준다
+    """
+    probas = []
+    for estimator in model.estimators_:
+        proba = estimator.predict_proba(X)
+        probas.append(proba / proba.sum(axis=1, keepdims=True))
+    return np.mean(probas, axis=0)
+
+
+def benchmark(model, compiled, X, repeat=200):
+    """sklearn vs CompiledForest 지연/결과 비교 (X는 스케일된 특성)
+
+    반환: {'sklearn_single_us', 'compiled_single_us', 'sklearn_batch_ms',
+           'compiled_batch_ms', 'max_abs_diff', 'same_predictions'}
+    """
+    X = np.asarray(X, dtype=np.float64)
+    row = X[:1]
+
+    def timed(func, arg, n):
+        func(arg)  # 준비 실행
+        start = time.perf_counter()
+        for _ in range(n):
+            func(arg)
+        return (time.perf_counter() - start) / n
+
+    expected = reference_proba(model, X)
+    actual = compiled.predict_proba(X)
+
+    return {
+        'sklearn_single_us': timed(model.predict_proba, row, max(repeat // 10, 5)) * 1e6,
+        'compiled_single_us': timed(compiled.predict_proba, row, repeat) * 1e6,
+        'sklearn_batch_ms': timed(model.predict_proba, X, 5) * 1e3,
+        'compiled_batch_ms': timed(compiled.predict_proba, X, 5) * 1e3,
+        'max_abs_diff': float(np.max(np.abs(expected - actual))),
+        'same_predictions': bool(np.array_equal(model.predict(X), compiled.predict(X))),
+    }
+
+
+def export_model(model_file, scaler_file, output_file=None):
+    """pickle 모델/스케일러 → npz 내보내기, CompiledForest 반환"""
+    with open(model_file, 'rb') as f:
+        data = pickle.load(f)
+    with open(scaler_file, 'rb') as f:
+        scaler = pickle.load(f)
+
+    compiled = CompiledForest.from_sklearn(
+        data['model'], scaler, data['feature_names'], data.get('model_type', 'random_forest')
+    )
+    output_file = output_file or os.path.splitext(model_file)[0] + '.npz'
+    compiled.save(output_file)
+    return data['model'], scaler, compiled, output_file
+
+
+if __name__ == '__main__':
+    from config import ML_CONFIG
+
+    model, scaler, compiled, output_file = export_model(ML_CONFIG['model_file'], ML_CONFIG['scaler_file'])
+
+    print("=" * 60)
+    print("🌲 랜덤 포레스트 컴파일")
+    print("=" * 60)
+    print(f"트리 {len(compiled.roots)}개 | 노드 {len(compiled.threshold):,}개 | 깊이 {compiled.max_depth}")
+    print(f"저장: {output_file} ({os.path.getsize(output_file) / 1024:.0f} KB, "
+          f"원본 {os.path.getsize(ML_CONFIG['model_file']) / 1024:.0f} KB)")
+    print(f"추론 배열 메모리: {compiled.nbytes / 1024:.0f} KB")
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, len(compiled.feature_names)))
+    result = benchmark(model, compiled, X)
+
+    print(f"\n단일 행: sklearn {result['sklearn_single_us']:,.0f}µs → "
+          f"compiled {result['compiled_single_us']:,.0f}µs")
+    print(f"1000행:  sklearn {result['sklearn_batch_ms']:,.1f}ms → "
+          f"compiled {result['compiled_batch_ms']:,.1f}ms")
+    print(f"확률 최대 차이: {result['max_abs_diff']:.2e} | 예측 일치: {result['same_predictions']}")
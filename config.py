@@ -12,6 +12,113 @@ UPBIT_CONFIG = {
     'api_rate_limit': 10,            # 초당 API 호출 제한
 }
 
+# 시장 데이터(OHLCV) 공용 캐시 설정
+MARKET_DATA_CONFIG = {
+    'enabled': True,
+    'forming_bar_ttl': 10,           # 진행 중인 마지막 캔들의 최대 캐시 시간 (초)
+    'max_bars': 2000,                # 종목/주기별 링 버퍼 크기 (캔들 수)
+}
+
+# 로컬 캔들 아카이브 (학습/평가/백테스트/분석용 과거 데이터)
+CANDLE_ARCHIVE_CONFIG = {
+    'enabled': True,
+    'root': 'candle_archive',        # root/<주기>/<종목>.candles, .meta
+    'offline': False,                # True면 거래소 조회 없이 아카이브만 사용 (재현용)
+    'initial_candles': 2000,         # 처음 동기화할 때 받을 캔들 수
+    'lock_timeout': 30,              # 다른 프로세스가 쓰는 중일 때 최대 대기 (초)
+}
+
+# 백테스트 설정 (backtest.py)
+BACKTEST_CONFIG = {
+    'initial_balance': 1_000_000,    # 시작 원화 잔고
+    'days': 365,                     # 재생 기간 (1시간봉)
+    'warmup_candles': 200,           # 재생 시작 전 지표 준비용 캔들
+    'slippage': 0.0005,              # 시장가 체결 슬리피지 (종가 대비)
+    'use_ml': True,                  # 저장된 ML 모델로 캔들별 예측 (없으면 ML 중립)
+}
+
+# 프리셋/파라미터 스윕 설정 (sweep.py)
+SWEEP_CONFIG = {
+    'workers': None,                 # 프로세스 수 (None이면 CPU 수)
+    'data_dir': 'sweep_data',        # 재생 데이터 메모리 맵 파일 (워커 공유)
+    'cache_dir': 'sweep_cache',      # 설정 해시별 결과 캐시
+    'rank_by': 'total_return',       # 순위 기준 (summary 키)
+}
+
+# 거래 기록 저널 설정 (trade_journal.py - 오늘 거래)
+JOURNAL_CONFIG = {
+    'compact_every': 500,            # 저널 기록 N건마다 스냅샷으로 압축
+    'fsync': True,                   # 기록마다 디스크 동기화 (강제 종료에도 유실 없음)
+}
+
+# 거래/포지션/일일 요약 저장소 (trade_store.py - SQLite WAL, 봇/대시보드 공유)
+TRADE_STORE_CONFIG = {
+    'path': 'trading.db',            # 기존 JSON 파일은 처음 열 때 가져옴
+    'synchronous': 'FULL',           # 커밋마다 fsync (NORMAL: 더 빠르지만 정전 시 마지막 커밋 유실 가능)
+    'busy_timeout': 10.0,            # 다른 프로세스가 쓰는 중일 때 최대 대기 (초)
+}
+
+# 포지션 관리 상태 저널 (position_journal.py - 포지션/최고가/부분 매도/물타기/추매, 재시작 복구)
+POSITION_JOURNAL_CONFIG = {
+    'path': 'position_state.json',   # 스냅샷 (저널은 position_state.jsonl)
+    'compact_every': 1000,           # 저널 기록 N건마다 스냅샷으로 압축
+    'fsync_highest_price': False,    # 최고가 갱신도 fsync (False: 프로세스 종료엔 안전, 정전 시 직전 최고가 유실 가능)
+}
+
+# trading.log 분석기 공용 읽기 (log_reader.py - entry_score_analyzer, utils/trading_log_analyzer)
+LOG_READER_CONFIG = {
+    'chunk_size': 1 << 20,           # 한 번에 읽을 바이트 (1MB)
+    'checkpoint': True,              # 읽은 위치 + 분석 결과 저장 → 다음 실행은 새 줄만 파싱
+}
+
+# 롤링 거래 통계 (trade_stats.py - 대시보드 기간 통계, 켈리 비율, 자동 프리셋 승률)
+TRADE_STATS_CONFIG = {
+    'windows': (1, 7, 30),           # 유지할 기간 창 (일)
+    'bucket_seconds': 300,           # 만료 단위 (창 경계 오차 최대 5분)
+    'kelly_window_days': 30,         # 켈리 비율에 쓸 창
+    'kelly_min_trades': 10,          # 창 안 거래가 이보다 적으면 세션 누적 통계 사용
+    'preset_window_days': 7,         # 자동 프리셋 최근 승률 창
+}
+
+# 실시간 시세(웹소켓) 설정
+WEBSOCKET_CONFIG = {
+    'enabled': True,
+    'url': 'wss://api.upbit.com/websocket/v1',
+    'stream_type': 'ticker',         # ticker 또는 trade
+    'max_price_age': 5,              # 이보다 오래된 가격은 REST로 다시 조회 (초)
+    'heartbeat_timeout': 30,         # 이 시간 동안 메시지가 없으면 끊긴 것으로 간주 (초)
+    'max_reconnect_delay': 60,       # 재접속 대기 최대 시간 (초)
+    'quantity_refresh_interval': 30, # 실시간 청산 판단용 보유 수량 재조회 간격 (초)
+}
+
+# API 요청 스케줄러 설정 (업비트 Remaining-Req 그룹별 초당 한도)
+REQUEST_SCHEDULER_CONFIG = {
+    'enabled': True,
+    'group_rates': {
+        'order': 8,                  # 주문 생성/취소
+        'default': 30,               # 계좌/주문 조회 등 나머지 Exchange API
+        'market': 10,                # 종목 목록
+        'candles': 10,               # 캔들
+        'ticker': 10,                # 현재가
+        'orderbook': 10,             # 호가
+        'trades': 10,                # 체결
+    },
+    'default_rate': 10,              # 목록에 없는 그룹
+    'reserve_for_exit': 1,           # 청산/주문 외 요청이 남겨둘 토큰 수
+    'max_retries': 2,                # 429 응답 시 재시도 횟수
+    'throttle_penalty': 1.0,         # 429 응답 후 해당 그룹 요청 중단 시간 (초)
+}
+
+# 이벤트 루프 설정 (청산은 시세 이벤트, 진입은 캔들 마감 기준)
+EVENT_LOOP_CONFIG = {
+    'entry_intervals': ['minute60', 'minute240', 'day'],  # 마감 시 진입 분석할 캔들 주기
+    'candle_close_delay': 3,         # 마감 후 거래소 캔들 반영 대기 (초)
+    'exit_check_interval': 1,        # 청산 점검 최대 간격 (초, 진입 분석과 별도 스레드)
+    'averaging_check_interval': 10,  # 물타기 기회 점검 주기 (초)
+    'pair_refresh_interval': 60,     # 동적 코인/시세 구독 갱신 점검 주기 (초)
+    'daily_reset_time': (0, 0),      # 일일 통계 리셋 시각 (시, 분)
+}
+
 # 전략 기본 설정
 STRATEGY_CONFIG = {
     'min_profit_target': 0.015,      # 목표 수익률 1.5%
@@ -59,6 +166,7 @@ ADVANCED_CONFIG = {
     'aggressive_mode': False,        
     'use_consecutive_loss_check': True,
     'max_consecutive_losses': 3,
+    'analysis_workers': 8,           # 진입 분석 동시 실행 종목 수
 }
 
 # 동적 코인 스캔 설정
@@ -104,6 +212,11 @@ ML_CONFIG = {
         'min_profit_threshold': 0.015,
         'auto_retrain_days': 7,
         'min_samples': 200,
+        'history_candles': 2000,       # 학습에 쓸 1시간봉 수 (캔들 아카이브에서 읽음)
+        'background': True,            # 별도 프로세스에서 학습 (봇 시작/매매 루프를 막지 않음)
+        'holdout_ratio': 0.2,          # 종목별 시간순 마지막 20%로 검증
+        'max_accuracy_drop': 0.02,     # 현재 모델보다 홀드아웃 정확도가 이만큼 낮으면 교체 안 함
+        'background_candle_rate': 3,   # 학습 프로세스 캔들 요청 속도 (초당)
     },
     
     'prediction': {
@@ -116,6 +229,7 @@ ML_CONFIG = {
         'min_accuracy': 0.55,
         'retrain_threshold': 0.50,
         'evaluation_days': 7,
+        'evaluate_after_retrain': True,  # 새 모델 적용 후 최근 구간 신호 성공률 평가 (백그라운드)
     },
 }
 
@@ -153,7 +267,17 @@ SIGNAL_INTEGRATION_CONFIG = {
         'on_consecutive_losses': 2,
         'on_daily_loss_exceed': 0.015,
         'ignore_weak_signals': True,
-    }
+    },
+    
+    # 신호 병렬 평가 (MTF/ML 동시 실행, 시간 초과 시 중립 0.5 - 기술 신호는 바로 계산)
+    'parallel': {
+        'enabled': True,
+        'max_workers': None,   # None이면 진입 분석 워커(analysis_workers) × 2 (MTF/ML)
+        'timeouts': {          # 초 (실행 시작 기준, 풀 대기열에서도 최대 같은 시간)
+            'mtf': 10,
+            'ml': 5,
+        },
+    },
 }
 
 # ==========================================
@@ -320,7 +444,17 @@ def apply_preset(preset_name='balanced'):
         return
     
     preset = STRATEGY_PRESETS[preset_name]
+    apply_preset_values(preset)
     
+    print(f"✅ '{preset_name}' 프리셋 적용 완료")
+    print(f"   진입 점수: {preset['entry_score_threshold']}점 이상")
+    print(f"   손절 기준: {preset['stop_loss']:.1%}")
+    print(f"   가중치: Tech {preset['signal_weights']['technical']:.0%}, "
+          f"MTF {preset['signal_weights']['mtf']:.0%}, "
+          f"ML {preset['signal_weights']['ml']:.0%}")
+
+def apply_preset_values(preset):
+    """프리셋 값(STRATEGY_PRESETS 항목과 같은 키)을 현재 설정에 덮어쓰기 - 출력 없음 (스윕용)"""
     # 1. 전략 설정 덮어쓰기
     ADVANCED_CONFIG['entry_score_threshold'] = preset['entry_score_threshold']
     
@@ -338,13 +472,6 @@ def apply_preset(preset_name='balanced'):
     RISK_CONFIG['max_positions'] = preset['max_positions']
     RISK_CONFIG['max_position_size'] = preset['max_position_size']
     RISK_CONFIG['stop_loss'] = preset['stop_loss']
-    
-    print(f"✅ '{preset_name}' 프리셋 적용 완료")
-    print(f"   진입 점수: {preset['entry_score_threshold']}점 이상")
-    print(f"   손절 기준: {preset['stop_loss']:.1%}")
-    print(f"   가중치: Tech {preset['signal_weights']['technical']:.0%}, "
-          f"MTF {preset['signal_weights']['mtf']:.0%}, "
-          f"ML {preset['signal_weights']['ml']:.0%}")
 
 # 파일 로드 시 자동으로 프리셋 적용
 if __name__ != "__main__":
@@ -1,35 +1,44 @@
 # daily_summary.py
-import json
 import os
 from datetime import datetime, timedelta
 from collections import defaultdict
 import logging
 
+from trade_journal import TradeJournal
+from trade_store import get_store
+
 logger = logging.getLogger(__name__)
 
 class DailySummary:
-    """일일 거래 요약 관리"""
+    """일일 거래 요약 관리
+
+    일일 요약은 SQLite 저장소(daily_summaries 테이블), 오늘 거래는 추가 전용 저널
+    """
     
-    def __init__(self):
-        self.summary_file = "daily_summaries.json"
-        self.current_day_file = "today_trades.json"
+    def __init__(self, store=None, directory=''):
+        """directory: 기존 요약 JSON과 오늘 거래 저널이 있는 디렉터리 (기본: 현재 디렉터리)"""
+        self.summary_file = os.path.join(directory, "daily_summaries.json")
+        self.current_day_file = os.path.join(directory, "today_trades.json")
+        self.store = store or get_store()
+        self.store.migrate('daily_summaries', self.summary_file)
         self.summaries = self.load_summaries()
-        self.today_trades = []
+        # 오늘 거래: 추가 전용 저널 (재시작해도 복구)
+        self.today_journal = TradeJournal(self.current_day_file)
+        self.today_trades = self.today_journal.load()
         
     def load_summaries(self):
         """기존 요약 데이터 로드"""
-        if os.path.exists(self.summary_file):
-            try:
-                with open(self.summary_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+        try:
+            return self.store.daily_summaries()
+        except Exception as e:
+            logger.error(f"일일 요약 로드 실패: {e}")
+            return {}
     
     def save_summaries(self):
         """요약 데이터 저장"""
-        with open(self.summary_file, 'w', encoding='utf-8') as f:
-            json.dump(self.summaries, f, indent=2, ensure_ascii=False)
+        with self.store.transaction():
+            for date, summary in self.summaries.items():
+                self.store.save_daily_summary(date, summary)
     
     def record_trade(self, trade_data):
         """거래 기록"""
@@ -45,9 +54,8 @@ class DailySummary:
         
         self.today_trades.append(trade)
         
-        # 실시간 저장
-        with open(self.current_day_file, 'w', encoding='utf-8') as f:
-            json.dump(self.today_trades, f, indent=2)
+        # 실시간 저장 (저널에 한 줄 추가)
+        self.today_journal.append(trade)
     
     def finalize_day(self, date=None):
         """일일 요약 생성"""
@@ -81,14 +89,13 @@ class DailySummary:
             'traded_symbols': list(set([t['symbol'] for t in self.today_trades]))
         }
         
-        # 저장
+        # 저장 (그날 한 행만)
         self.summaries[date] = summary
-        self.save_summaries()
+        self.store.save_daily_summary(date, summary)
         
         # 오늘 거래 초기화
         self.today_trades = []
-        if os.path.exists(self.current_day_file):
-            os.remove(self.current_day_file)
+        self.today_journal.reset()
         
         logger.info(f"일일 요약 저장 완료: {date}")
         return summary
@@ -113,7 +120,11 @@ class DailySummary:
         daily_pnls = []
         win_rates = []
         
-        for date_str, summary in self.summaries.items():
+        # 기간 내 요약만 날짜 키 범위로 조회
+        period = self.store.daily_summaries(start_date.strftime('%Y-%m-%d'),
+                                            end_date.strftime('%Y-%m-%d'))
+        
+        for date_str, summary in period.items():
             date = datetime.strptime(date_str, '%Y-%m-%d')
             if start_date <= date <= end_date:
                 pnl = summary['total_pnl']
@@ -129,9 +140,9 @@ class DailySummary:
                     stats['losing_days'] += 1
                 
                 # 최고/최악 일
-                if stats['best_day'] is None or pnl > self.summaries[stats['best_day']]['total_pnl']:
+                if stats['best_day'] is None or pnl > period[stats['best_day']]['total_pnl']:
                     stats['best_day'] = date_str
-                if stats['worst_day'] is None or pnl < self.summaries[stats['worst_day']]['total_pnl']:
+                if stats['worst_day'] is None or pnl < period[stats['worst_day']]['total_pnl']:
                     stats['worst_day'] = date_str
         
         # 평균 계산
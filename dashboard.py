@@ -3,6 +3,9 @@
 import os
 import time
 import pyupbit
+import market_data
+import indicator_engine
+import request_scheduler
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -15,7 +18,7 @@ from rich.panel import Panel
 from dotenv import load_dotenv
 from trade_history_manager import TradeHistoryManager
 from config import TRADING_PAIRS, RISK_CONFIG, apply_preset, ACTIVE_PRESET
-from market_condition_check import MarketAnalyzer
+from market_condition_check import get_market_analyzer
 
 # 분석 도구 임포트 (파일이 없을 경우 대비 예외처리)
 try:
@@ -37,7 +40,7 @@ class MarketDataCache:
         self.last_update = {}
         self.top_movers = {'gainers': [], 'losers': []}
         self.last_movers_update = datetime.now() - timedelta(minutes=10)
-        self.market_analyzer = MarketAnalyzer()
+        self.market_analyzer = get_market_analyzer()
         
         # 분석기 인스턴스 재사용 (속도 향상)
         self.mtf_analyzer = MultiTimeframeAnalyzer() if MultiTimeframeAnalyzer else None
@@ -47,7 +50,7 @@ class MarketDataCache:
         """여러 코인 가격 한 번에 조회"""
         try:
             full_tickers = [f"KRW-{t}" for t in tickers]
-            prices = pyupbit.get_current_price(full_tickers)
+            prices = request_scheduler.get_current_price(full_tickers)
             if isinstance(prices, dict): return prices
             elif isinstance(prices, float): return {f"KRW-{tickers[0]}": prices}
             return {}
@@ -59,12 +62,9 @@ class MarketDataCache:
         if cache_key in self.last_update and (now - self.last_update[cache_key]).total_seconds() < 60:
             return self.cache.get(cache_key, 50)
         try:
-            df = pyupbit.get_ohlcv(ticker, interval="minute60", count=100)
+            df = market_data.get_ohlcv(ticker, interval="minute60", count=100)
             if df is not None:
-                delta = df['close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-                rsi = 100 - (100 / (1 + (gain / loss))).iloc[-1]
+                rsi = indicator_engine.snapshot(ticker, "minute60", df)['rsi']
                 self.cache[cache_key] = rsi; self.last_update[cache_key] = now
                 return rsi
         except: pass
@@ -76,9 +76,9 @@ class MarketDataCache:
         if self.top_movers['gainers'] and (now - self.last_movers_update).total_seconds() < 120:
             return self.top_movers
         try:
-            all_tickers = pyupbit.get_tickers(fiat="KRW")
+            all_tickers = request_scheduler.call(pyupbit.get_tickers, fiat="KRW", group='market')
             target_tickers = all_tickers[:15]
-            tickers_data = pyupbit.get_ticker(target_tickers)
+            tickers_data = request_scheduler.call(pyupbit.get_ticker, target_tickers, group='ticker')
             market_data = []
             for data in tickers_data:
                 change = data.get('signed_change_rate', 0) or 0
@@ -97,7 +97,7 @@ class TradingDashboard:
         
         # API 초기화
         access = os.getenv("UPBIT_ACCESS_KEY"); secret = os.getenv("UPBIT_SECRET_KEY")
-        self.upbit = pyupbit.Upbit(access, secret) if access and secret else None
+        self.upbit = request_scheduler.ScheduledUpbit(pyupbit.Upbit(access, secret)) if access and secret else None
             
         self.total_assets = 0
         self.last_asset_update = datetime.now() - timedelta(minutes=1)
@@ -120,7 +120,7 @@ class TradingDashboard:
             now = datetime.now()
             if self.upbit and (now - self.last_asset_update).total_seconds() > 60:
                 balances = self.upbit.get_balances()
-                self.total_assets = sum(float(b['balance']) if b['currency'] == 'KRW' else float(b['balance']) * (pyupbit.get_current_price(f"KRW-{b['currency']}") or 0) for b in balances)
+                self.total_assets = sum(float(b['balance']) if b['currency'] == 'KRW' else float(b['balance']) * (request_scheduler.get_current_price(f"KRW-{b['currency']}") or 0) for b in balances)
                 self.last_asset_update = now
 
             return Panel(f"[bold cyan]🚀 Trading Bot V2[/bold cyan] | Market: [{color}]{emoji} {market.upper()}[/{color}] | Assets: [bold gold1]{self.total_assets:,.0f} KRW[/bold gold1] | [dim]{now.strftime('%H:%M:%S')}[/dim]", style="bold on dark_blue")
@@ -129,14 +129,7 @@ class TradingDashboard:
     def get_active_positions(self):
         """✅ 복구 완료: 보유 종목의 실시간 수익률 및 수익금 표시"""
         try:
-            import json
-            if not os.path.exists('active_positions.json'):
-                return Panel("보유 포지션 없음", title="📦 Positions", border_style="green")
-            
-            with open('active_positions.json', 'r') as f:
-                data = json.load(f)
-            
-            positions = data.get('positions', {})
+            positions = self.trade_history.store.load_positions()
             if not positions:
                 return Panel("보유 포지션 없음", title="📦 Positions", border_style="green")
             
@@ -253,11 +246,13 @@ class TradingDashboard:
         return self.layout
 
 def main():
-    db = TradingDashboard()
-    with Live(db.update(), refresh_per_second=1, console=console) as live:
-        while True:
-            live.update(db.update())
-            time.sleep(1)
+    # 대시보드 요청은 가장 낮은 우선순위
+    with request_scheduler.context('dashboard', request_scheduler.PRIORITY_DASHBOARD):
+        db = TradingDashboard()
+        with Live(db.update(), refresh_per_second=1, console=console) as live:
+            while True:
+                live.update(db.update())
+                time.sleep(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,11 +4,55 @@ trading.log에서 진입 점수를 추출하고 통계를 분석합니다.
 """
 
 import re
-import json
 from datetime import datetime, timedelta
 from collections import defaultdict
 import pandas as pd
 
+from config import LOG_READER_CONFIG
+from log_reader import LogReader, TIMESTAMP_RE, checkpoint_path_for
+from trade_history_manager import TradeHistoryManager
+
+# 파싱 방식이 바뀌면 올림 (저장된 체크포인트를 버리고 처음부터 다시 파싱)
+_PARSER_VERSION = 1
+
+_ANALYSIS_RE = re.compile(r'📊 ([A-Z]+) 종합 분석')
+_SCORE_RE = re.compile(r'최종 점수:\s*([0-9.]+)/10')
+_THRESHOLD_RE = re.compile(r'진입 기준:\s*([0-9.]+)\s*\(시장:\s*(\w+)\)')
+_BUY_RE = re.compile(r'매수 완료[:\s]+([A-Z]+)\s*@\s*([0-9,]+)')
+_SKIP_RE = re.compile(r'([A-Z]+).*점수:\s*([0-9.]+)/([0-9.]+)')
+
+_TIME_KEYS = ('timestamp', 'buy_timestamp')
+
+
+def _restore_times(record):
+    return {key: datetime.fromisoformat(value) if key in _TIME_KEYS and isinstance(value, str) else value
+            for key, value in record.items()}
+
+
+def _dump_parse_state(entry_scores, current_analysis, recent_analyses, timestamp):
+    """체크포인트에 저장할 파싱 상태
+
+    최근 분석 중 entry_scores에 들어 있는 객체는 위치로 저장
+    (매수 매칭이 그 기록을 직접 바꾸므로 복원 후에도 같은 객체여야 함)
+    """
+    index = {id(record): i for i, record in enumerate(entry_scores)}
+    recent = [{'ref': index[id(a)]} if id(a) in index else {'record': a} for a in recent_analyses]
+    return {'entry_scores': entry_scores, 'current_analysis': current_analysis,
+            'recent_analyses': recent, 'timestamp': timestamp}
+
+
+def _load_parse_state(state):
+    if not state:
+        return {'entry_scores': [], 'current_analysis': {}, 'recent_analyses': [], 'timestamp': None}
+    entry_scores = [_restore_times(record) for record in state['entry_scores']]
+    recent = [entry_scores[a['ref']] if 'ref' in a else _restore_times(a['record'])
+              for a in state['recent_analyses']]
+    timestamp = state.get('timestamp')
+    return {'entry_scores': entry_scores,
+            'current_analysis': _restore_times(state['current_analysis']),
+            'recent_analyses': recent,
+            'timestamp': datetime.fromisoformat(timestamp) if timestamp else None}
+
 
 class EntryScoreAnalyzer:
     def __init__(self, log_file="trading.log", history_file="trade_history.json"):
@@ -18,25 +62,30 @@ class EntryScoreAnalyzer:
         self.trade_history = []
         
     def parse_log_for_scores(self):
-        """로그 파일에서 진입 점수 추출"""
+        """로그 파일에서 진입 점수 추출 (회전/gzip 조각 포함, 체크포인트 이후 새 줄만)"""
         print("📄 로그 파일에서 진입 점수 추출 중...")
         
-        with open(self.log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        current_analysis = {}
-        recent_analyses = []  # 최근 분석 저장 (매수 발생 시 매칭용)
-        
-        for i, line in enumerate(lines):
+        reader = LogReader(self.log_file, version=_PARSER_VERSION,
+                           checkpoint=checkpoint_path_for(self.log_file, 'scores')
+                           if LOG_READER_CONFIG['checkpoint'] else None)
+        state = _load_parse_state(reader.load_state())
+        self.entry_scores = state['entry_scores']
+        current_analysis = state['current_analysis']
+        recent_analyses = state['recent_analyses']  # 최근 분석 저장 (매수 발생 시 매칭용)
+        timestamp = state['timestamp']
+        timestamp_text = None
+        
+        for line in reader.lines():
             try:
-                # 타임스탬프 추출
-                timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
-                if timestamp_match:
-                    timestamp = datetime.strptime(timestamp_match.group(1), '%Y-%m-%d %H:%M:%S')
+                # 타임스탬프 추출 (같은 초의 줄은 다시 변환하지 않음)
+                timestamp_match = TIMESTAMP_RE.match(line)
+                if timestamp_match and timestamp_match.group(1) != timestamp_text:
+                    timestamp_text = timestamp_match.group(1)
+                    timestamp = datetime.fromisoformat(timestamp_text)
                 
                 # 코인 종합 분석 시작
                 if "종합 분석" in line:
-                    symbol_match = re.search(r'📊 ([A-Z]+) 종합 분석', line)
+                    symbol_match = _ANALYSIS_RE.search(line)
                     if symbol_match:
                         current_analysis = {
                             'timestamp': timestamp,
@@ -45,13 +94,13 @@ class EntryScoreAnalyzer:
                 
                 # 최종 점수 추출
                 if "최종 점수:" in line and current_analysis:
-                    score_match = re.search(r'최종 점수:\s*([0-9.]+)/10', line)
+                    score_match = _SCORE_RE.search(line)
                     if score_match:
                         current_analysis['score'] = float(score_match.group(1))
                 
                 # 진입 기준 추출
                 if "진입 기준:" in line and current_analysis:
-                    threshold_match = re.search(r'진입 기준:\s*([0-9.]+)\s*\(시장:\s*(\w+)\)', line)
+                    threshold_match = _THRESHOLD_RE.search(line)
                     if threshold_match:
                         current_analysis['threshold'] = float(threshold_match.group(1))
                         current_analysis['market'] = threshold_match.group(2)
@@ -59,7 +108,7 @@ class EntryScoreAnalyzer:
                 # ✅ 매수 완료 패턴 (실제 매수 발생)
                 if "✅ 매수 완료" in line or "매수 완료:" in line:
                     # ✅ 매수 완료: XLM @ 418 KRW
-                    buy_match = re.search(r'매수 완료[:\s]+([A-Z]+)\s*@\s*([0-9,]+)', line)
+                    buy_match = _BUY_RE.search(line)
                     if buy_match:
                         symbol = buy_match.group(1)
                         price = float(buy_match.group(2).replace(',', ''))
@@ -79,7 +128,7 @@ class EntryScoreAnalyzer:
                 # 진입 조건 미충족 (점수 포함)
                 if "진입 조건 미충족" in line:
                     # ❌ 진입 조건 미충족 (점수: 3.76/5.50)
-                    skip_match = re.search(r'([A-Z]+).*점수:\s*([0-9.]+)/([0-9.]+)', line)
+                    skip_match = _SKIP_RE.search(line)
                     if skip_match:
                         symbol = skip_match.group(1)
                         score = float(skip_match.group(2))
@@ -133,14 +182,14 @@ class EntryScoreAnalyzer:
                 unique_scores.append(score)
         
         self.entry_scores = unique_scores
+        reader.save(_dump_parse_state(self.entry_scores, current_analysis, recent_analyses, timestamp))
         
         return self.entry_scores
     
     def load_trade_history(self):
         """거래 기록 로드"""
         try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                self.trade_history = json.load(f)
+            self.trade_history = TradeHistoryManager(self.history_file).get_all_trades()
             print(f"✅ 거래 기록 {len(self.trade_history)}개 로드 완료")
             return True
         except Exception as e:
@@ -0,0 +1,204 @@
+# event_loop.py - 이벤트 기반 작업 스케줄러 (타이머 / 캔들 마감 / 매일 정시 / 외부 이벤트)
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from market_data import candle_open_time, interval_seconds, normalize_interval
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """예약 작업 - next_time(now)가 다음 실행 시각을 정한다"""
+
+    def __init__(self, name, func, next_time):
+        self.name = name
+        self.func = func
+        self.next_time = next_time
+        self.due = None
+        self.cancelled = False
+
+        # 통계
+        self.runs = 0
+        self.errors = 0
+        self.last_run = None
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.max_interval = 0.0   # 연속 실행 시작 간격의 최댓값
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class EventScheduler:
+    """단일 스레드 작업 루프
+
+    - every(): 고정 간격 타이머
+    - on_candle_close(): 캔들 마감 시각마다 (여러 주기가 동시에 마감되면 한 번만)
+    - daily(): 매일 정해진 시각 (로컬 시간)
+    - post(): 다른 스레드에서 즉시 실행할 작업 전달 (시세 이벤트 등)
+
+    할 일이 없으면 다음 예약 시각까지 잠들어 CPU/API를 쓰지 않는다
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or time.time
+        self._heap = []
+        self._seq = itertools.count()
+        self._events = deque()
+        self._cond = threading.Condition()
+        self._running = True   # 시작 전에 stop()이 불려도 run()이 바로 끝나도록
+        self.jobs = {}
+
+    # ------------------------------------------------------------------
+    # 작업 등록
+    # ------------------------------------------------------------------
+    def every(self, interval, func, name=None, run_now=False):
+        """interval초마다 실행"""
+        def next_time(now):
+            return now + interval
+
+        first = self.clock() if run_now else None
+        return self._add(name or func.__name__, func, next_time, first)
+
+    def on_candle_close(self, intervals, func, name=None, delay=0, run_now=False):
+        """intervals 중 하나라도 캔들이 마감될 때마다 실행 (delay초 뒤)"""
+        if isinstance(intervals, str):
+            intervals = [intervals]
+        intervals = [normalize_interval(i) for i in intervals]
+        for interval in intervals:
+            if interval_seconds(interval) is None:
+                raise ValueError(f"캔들 마감 예약을 지원하지 않는 주기: {interval}")
+
+        def next_time(now):
+            # now - delay 기준 다음 캔들 시작 = 지금 진행 중인 캔들의 마감
+            base = now - delay
+            return min(
+                candle_open_time(i, base) + interval_seconds(i) for i in intervals
+            ) + delay
+
+        first = self.clock() if run_now else None
+        return self._add(name or func.__name__, func, next_time, first)
+
+    def daily(self, hour, minute, func, name=None):
+        """매일 hour:minute (로컬 시간)에 실행"""
+        def next_time(now):
+            current = datetime.fromtimestamp(now)
+            target = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if target <= current:
+                target += timedelta(days=1)
+            return target.timestamp()
+
+        return self._add(name or func.__name__, func, next_time)
+
+    def post(self, func, *args, **kwargs):
+        """다음 루프에서 바로 실행할 작업 (스레드 안전)"""
+        with self._cond:
+            self._events.append((func, args, kwargs))
+            self._cond.notify()
+
+    def _add(self, name, func, next_time, first=None):
+        job = Job(name, func, next_time)
+        with self._cond:
+            self.jobs[name] = job
+            self._schedule(job, first if first is not None else next_time(self.clock()))
+            self._cond.notify()
+        return job
+
+    def _schedule(self, job, due):
+        job.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), job))
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+    def run_pending(self):
+        """실행 시각이 된 작업과 대기 중인 이벤트 처리 → 다음 작업까지 남은 시간 (초)"""
+        while True:
+            with self._cond:
+                if self._events:
+                    func, args, kwargs = self._events.popleft()
+                    job = None
+                elif self._heap and self._heap[0][0] <= self.clock():
+                    _, _, job = heapq.heappop(self._heap)
+                    if job.cancelled:
+                        continue
+                    func, args, kwargs = job.func, (), {}
+                else:
+                    return self._idle_time()
+
+            self._execute(job, func, args, kwargs)
+
+            if job is not None and not job.cancelled:
+                with self._cond:
+                    # 오래 걸린 작업은 밀린 횟수를 몰아서 실행하지 않고 다음 시각부터
+                    self._schedule(job, job.next_time(self.clock()))
+
+    def next_due(self):
+        """가장 이른 예약 시각 (없으면 None) - 시뮬레이션 시계로 재생할 때 다음 시각"""
+        with self._cond:
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def _idle_time(self):
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self.clock())
+
+    def _execute(self, job, func, args, kwargs):
+        name = job.name if job else getattr(func, '__name__', 'event')
+        start = time.monotonic()
+        if job and job.last_run is not None:
+            job.max_interval = max(job.max_interval, self.clock() - job.last_run)
+        if job:
+            job.last_run = self.clock()
+        try:
+            func(*args, **kwargs)
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            logger.error(f"작업 실패 ({name}): {e}")
+            if job:
+                job.errors += 1
+        finally:
+            if job:
+                elapsed = time.monotonic() - start
+                job.runs += 1
+                job.last_duration = elapsed
+                job.max_duration = max(job.max_duration, elapsed)
+
+    def run(self, max_wait=60):
+        """stop()까지 작업 루프 실행"""
+        while self._running:
+            wait = self.run_pending()
+            with self._cond:
+                if not self._running or self._events:
+                    continue
+                self._cond.wait(max_wait if wait is None else min(wait, max_wait))
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def get_status(self):
+        """작업별 {runs, errors, next_in, last_duration, max_duration, max_interval}"""
+        now = self.clock()
+        with self._cond:
+            return {
+                name: {
+                    'runs': job.runs,
+                    'errors': job.errors,
+                    'next_in': None if job.due is None else job.due - now,
+                    'last_duration': job.last_duration,
+                    'max_duration': job.max_duration,
+                    'max_interval': job.max_interval,
+                }
+                for name, job in self.jobs.items() if not job.cancelled
+            }
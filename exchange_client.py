@@ -0,0 +1,288 @@
+# exchange_client.py - 거래소 클라이언트 인터페이스 (실거래 / 모의 / 기록 재생)
+#
+# TradingBot이 거래소에 묻는 것은 모두 이 인터페이스를 거친다
+#   계좌/주문: get_balance, get_balances, buy_market_order, sell_market_order, get_order
+#   시세:      get_current_price, get_ohlcv, get_tickers
+#
+# - UpbitExchange: pyupbit (요청 스케줄러 + 공용 캔들 캐시 경유) - 실거래
+# - SimulatedExchange: 넣어 준 현재가로 즉시 체결되는 모의 계좌 - 백테스트
+# - ReplayExchange: 캔들 아카이브에 기록된 시세를 시계에 맞춰 재생 - 봇 전체 가속 재생
+
+import logging
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyupbit
+
+import candle_archive
+import market_data
+import request_scheduler
+from clock import SimulatedClock
+from market_data import candle_open_time, candle_bucket, normalize_interval
+from request_scheduler import ScheduledUpbit
+from config import UPBIT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class ExchangeClient:
+    """거래소 클라이언트 인터페이스 - 반환 형식은 pyupbit와 같음
+
+    - 주문 실패는 None 반환 (pyupbit 시장가 주문과 동일)
+    - get_current_price: 티커 하나면 float, 리스트면 {ticker: price}
+    """
+
+    def get_balance(self, ticker="KRW"):
+        raise NotImplementedError
+
+    def get_balances(self):
+        raise NotImplementedError
+
+    def buy_market_order(self, ticker, price):
+        raise NotImplementedError
+
+    def sell_market_order(self, ticker, volume):
+        raise NotImplementedError
+
+    def get_order(self, order_uuid):
+        raise NotImplementedError
+
+    def get_current_price(self, ticker):
+        raise NotImplementedError
+
+    def get_ohlcv(self, ticker, interval="day", count=200):
+        raise NotImplementedError
+
+    def get_tickers(self, fiat="KRW"):
+        raise NotImplementedError
+
+
+class UpbitExchange(ExchangeClient):
+    """실거래 - 계좌/주문은 ScheduledUpbit, 시세는 요청 스케줄러/공용 캔들 캐시 경유
+
+    키 없이 만들면 시세 조회만 가능
+    """
+
+    def __init__(self, access_key=None, secret_key=None, scheduler=None):
+        self.upbit = ScheduledUpbit(pyupbit.Upbit(access_key, secret_key), scheduler)
+
+    def get_balance(self, ticker="KRW"):
+        return self.upbit.get_balance(ticker)
+
+    def get_balances(self):
+        return self.upbit.get_balances()
+
+    def buy_market_order(self, ticker, price):
+        return self.upbit.buy_market_order(ticker, price)
+
+    def sell_market_order(self, ticker, volume):
+        return self.upbit.sell_market_order(ticker, volume)
+
+    def get_order(self, order_uuid):
+        return self.upbit.get_order(order_uuid)
+
+    def get_current_price(self, ticker):
+        return request_scheduler.get_current_price(ticker)
+
+    def get_ohlcv(self, ticker, interval="day", count=200):
+        return market_data.get_cached_ohlcv(ticker, interval=interval, count=count)
+
+    def get_tickers(self, fiat="KRW"):
+        return request_scheduler.call(pyupbit.get_tickers, fiat=fiat, group='market')
+
+    def __getattr__(self, name):
+        # 인터페이스 밖의 pyupbit.Upbit 메서드 (cancel_order 등)
+        return getattr(self.upbit, name)
+
+
+class SimulatedExchange(ExchangeClient):
+    """모의 거래소 - 시장가 주문이 현재가 ± 슬리피지로 즉시 전량 체결
+
+    - 현재가는 set_prices()로 넣어 줌 (ReplayExchange는 기록된 캔들에서 읽음)
+    - 수수료는 업비트와 같이 체결 금액 × fee_rate (매수는 원화에서 추가 차감)
+    - 최소 주문 금액 미달/잔고 부족은 pyupbit처럼 None 반환
+    """
+
+    def __init__(self, balance, fee_rate=None, slippage=0.0, clock=None, min_order=5000):
+        self.cash = float(balance)
+        self.fee_rate = UPBIT_CONFIG['fee_rate'] if fee_rate is None else fee_rate
+        self.slippage = slippage
+        self.clock = clock or SimulatedClock()
+        self.min_order = min_order
+
+        self.holdings = {}   # {currency: 수량}
+        self.cost = {}       # {currency: 매수 원가 합계} - 평균 매수가 계산용
+        self.prices = {}     # {ticker: 현재가}
+        self.orders = {}     # {uuid: 주문 상세}
+        self.fills = []      # 체결 기록 (시간순)
+        self.rejected = 0
+
+    def set_prices(self, prices):
+        self.prices.update(prices)
+
+    def _price(self, ticker):
+        return self.prices.get(ticker)
+
+    def get_current_price(self, ticker):
+        if isinstance(ticker, (list, tuple)):
+            prices = {t: self._price(t) for t in ticker}
+            return {t: p for t, p in prices.items() if p is not None}
+        return self._price(ticker)
+
+    def get_tickers(self, fiat="KRW"):
+        return sorted(t for t in self.prices if t.startswith(f"{fiat}-"))
+
+    def get_balance(self, ticker="KRW"):
+        if ticker == "KRW":
+            return self.cash
+        return self.holdings.get(ticker.split('-')[-1], 0.0)
+
+    def get_balances(self):
+        balances = [{'currency': 'KRW', 'balance': str(self.cash), 'locked': '0',
+                     'avg_buy_price': '0', 'unit_currency': 'KRW'}]
+        for currency, volume in self.holdings.items():
+            balances.append({
+                'currency': currency,
+                'balance': str(volume),
+                'locked': '0',
+                'avg_buy_price': str(self.cost[currency] / volume if volume > 0 else 0),
+                'unit_currency': 'KRW',
+            })
+        return balances
+
+    def get_order(self, order_uuid):
+        return self.orders.get(order_uuid)
+
+    def buy_market_order(self, ticker, price):
+        """시장가 매수 - price: 주문 원화 금액"""
+        amount = float(price)
+        market_price = self._price(ticker)
+        fee = amount * self.fee_rate
+        if not market_price or amount < self.min_order or amount + fee > self.cash + 1e-6:
+            self.rejected += 1
+            return None
+
+        fill_price = market_price * (1 + self.slippage)
+        volume = amount / fill_price
+        currency = ticker.split('-')[-1]
+        self.cash -= amount + fee
+        self.holdings[currency] = self.holdings.get(currency, 0.0) + volume
+        self.cost[currency] = self.cost.get(currency, 0.0) + amount
+        return self._fill(ticker, 'bid', fill_price, volume, fee)
+
+    def sell_market_order(self, ticker, volume):
+        """시장가 매도 - volume: 코인 수량 (보유량 초과분은 보유량까지만)"""
+        currency = ticker.split('-')[-1]
+        held = self.holdings.get(currency, 0.0)
+        volume = min(float(volume), held)
+        market_price = self._price(ticker)
+        if not market_price or volume <= 0:
+            self.rejected += 1
+            return None
+
+        fill_price = market_price * (1 - self.slippage)
+        funds = volume * fill_price
+        if funds < self.min_order:
+            self.rejected += 1
+            return None
+
+        fee = funds * self.fee_rate
+        self.cash += funds - fee
+        remaining = held - volume
+        if remaining <= 1e-12:
+            self.holdings.pop(currency, None)
+            self.cost.pop(currency, None)
+        else:
+            self.cost[currency] *= remaining / held
+            self.holdings[currency] = remaining
+        return self._fill(ticker, 'ask', fill_price, volume, fee)
+
+    def _fill(self, ticker, side, price, volume, fee):
+        order_uuid = str(uuid.uuid4())
+        funds = price * volume
+        order = {
+            'uuid': order_uuid,
+            'side': side,
+            'ord_type': 'price' if side == 'bid' else 'market',
+            'market': ticker,
+            'state': 'done',
+            'created_at': self.clock.now().isoformat(),
+            'executed_volume': str(volume),
+            'paid_fee': str(fee),
+            'trades_count': 1,
+            'trades': [{'price': str(price), 'volume': str(volume), 'funds': str(funds)}],
+        }
+        self.orders[order_uuid] = order
+        self.fills.append({'time': self.clock.time(), 'market': ticker, 'side': side,
+                           'price': price, 'volume': volume, 'funds': funds, 'fee': fee})
+        return {'uuid': order_uuid, 'side': side, 'market': ticker, 'state': 'done'}
+
+    def total_equity(self):
+        """원화 + 보유 코인 현재가 평가"""
+        total = self.cash
+        for currency, volume in self.holdings.items():
+            price = self._price(f"KRW-{currency}")
+            if price:
+                total += price * volume
+        return total
+
+
+class ReplayExchange(SimulatedExchange):
+    """기록된 시세 재생 - 캔들 아카이브를 시계(clock) 시각까지만 보여 주는 모의 거래소
+
+    - 현재가: price_interval(기본 1분봉) 중 마지막으로 마감된 캔들의 종가
+    - get_ohlcv: 마감된 캔들 + price_interval 캔들로 합성한 진행 중인 캔들 (실거래처럼 마지막 행이 진행 중)
+    - 시계 이후의 캔들은 반환하지 않음 → 봇이 미래 데이터를 볼 수 없음
+    - 봇이 읽는 주기(1분봉/1시간봉/4시간봉/일봉)가 아카이브에 있어야 함
+    """
+
+    def __init__(self, balance, clock, archive=None, price_interval='minute1', markets=None,
+                 fee_rate=None, slippage=0.0):
+        super().__init__(balance, fee_rate=fee_rate, slippage=slippage, clock=clock)
+        self.archive = archive or candle_archive.get_archive()
+        self.price_interval = normalize_interval(price_interval)
+        self.markets = markets
+        self._price_cache = {}  # {ticker: (price_interval 캔들 번호, 가격)}
+
+    def _price(self, ticker):
+        now = self.clock.time()
+        bucket = candle_bucket(self.price_interval, now)
+        cached = self._price_cache.get(ticker)
+        if cached and cached[0] == bucket:
+            return cached[1]
+
+        _, bars = self.archive.read_arrays(
+            ticker, self.price_interval, end=candle_open_time(self.price_interval, now), count=1
+        )
+        price = float(bars[-1, 3]) if len(bars) else None
+        self._price_cache[ticker] = (bucket, price)
+        return price
+
+    def get_tickers(self, fiat="KRW"):
+        markets = self.markets or self.archive.markets(self.price_interval)
+        return [m for m in markets if m.startswith(f"{fiat}-")]
+
+    def get_ohlcv(self, ticker, interval="day", count=200):
+        interval = normalize_interval(interval)
+        now = self.clock.time()
+        opened = candle_open_time(interval, now)
+
+        df = self.archive.read(ticker, interval, end=opened, count=count)
+        forming = self._forming_candle(ticker, interval, opened, now)
+        if forming is not None:
+            df = pd.concat([df.iloc[1:] if len(df) >= count else df, forming])
+        return df if len(df) else None
+
+    def _forming_candle(self, ticker, interval, opened, now):
+        """opened에 시작해 아직 진행 중인 캔들 - 그 사이 마감된 price_interval 캔들로 합성"""
+        if interval == self.price_interval:
+            return None
+        _, bars = self.archive.read_arrays(
+            ticker, self.price_interval, start=opened, end=candle_open_time(self.price_interval, now)
+        )
+        if not len(bars):
+            return None
+        candle = np.array([[bars[0, 0], bars[:, 1].max(), bars[:, 2].min(), bars[-1, 3],
+                            bars[:, 4].sum(), bars[:, 5].sum()]])
+        return candle_archive.to_frame(np.array([opened]), candle)
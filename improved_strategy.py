@@ -1,16 +1,20 @@
 # improved_strategy.py (수정 버전)
 
+import threading
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import pyupbit
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import logging
 
 from multi_timeframe_analyzer import MultiTimeframeAnalyzer
 from ml_signal_generator import MLSignalGenerator
-from market_condition_check import MarketAnalyzer
+from model_trainer import ModelTrainer
+from market_condition_check import get_market_analyzer
+from request_scheduler import bind_context
+from clock import SYSTEM_CLOCK
 
 from config import (
     TRADING_PAIRS, 
@@ -24,8 +28,15 @@ from config import (
 
 logger = logging.getLogger(__name__)
 
+SIGNAL_SOURCES = ('technical', 'mtf', 'ml')
+POOLED_SIGNALS = ('mtf', 'ml')  # 네트워크/모델 대기 - 스레드 풀에서 실행 (기술 신호는 바로 계산)
+
 class ImprovedStrategy:
-    def __init__(self):
+    def __init__(self, market_analyzer=None, clock=None, mtf_analyzer=None, ml_generator=None):
+        """market_analyzer / mtf_analyzer / ml_generator를 넘기면 그대로 사용 (백테스트 재생용),
+        생략하면 설정에 따라 실거래용으로 생성"""
+        self.clock = clock or SYSTEM_CLOCK
+        
         self.min_profit_target = STRATEGY_CONFIG['min_profit_target']
         self.max_trades_per_day = STRATEGY_CONFIG['max_trades_per_day']
         self.min_hold_time = STRATEGY_CONFIG['min_hold_time']
@@ -40,7 +51,7 @@ class ImprovedStrategy:
         self.loss_cooldown = 3600    # 손실 후 1시간
         self.win_cooldown = 300      # 수익 후 5분
         
-        self.market_analyzer = MarketAnalyzer()
+        self.market_analyzer = market_analyzer or get_market_analyzer()
         
         self.daily_trades = defaultdict(int)
         self.position_entry_time = {}
@@ -58,28 +69,54 @@ class ImprovedStrategy:
             }
         
         if MTF_CONFIG['enabled']:
-            self.mtf_analyzer = MultiTimeframeAnalyzer()
+            self.mtf_analyzer = mtf_analyzer or MultiTimeframeAnalyzer()
             self.mtf_min_score = MTF_CONFIG['min_score']
             self.mtf_min_consensus = MTF_CONFIG['min_consensus']
         else:
             self.mtf_analyzer = None
         
         if ML_CONFIG['enabled']:
-            self.ml_generator = MLSignalGenerator(
+            self.ml_generator = ml_generator or MLSignalGenerator(
                 model_type=ML_CONFIG['model_type']
             )
             self.ml_min_probability = ML_CONFIG['prediction']['min_buy_probability']
             self.ml_min_confidence = ML_CONFIG['prediction']['min_confidence']
             
-            if not self.ml_generator.is_trained:
-                logger.info("🤖 ML 모델 초기 학습을 시작합니다...")
-                self.ml_generator.train_model(TRADING_PAIRS)
+            self.model_trainer = None
+            if ml_generator is None and ML_CONFIG['training'].get('background', True):
+                self.model_trainer = ModelTrainer(self.ml_generator, TRADING_PAIRS)
+            
+            # 외부에서 넘긴 예측기는 학습하지 않음
+            if ml_generator is None and not self.ml_generator.is_trained:
+                if self.model_trainer:
+                    # 첫 모델이 준비될 때까지 ML 신호는 중립(0.5)
+                    logger.info("🤖 ML 모델이 없습니다 - 백그라운드 학습 시작, 준비될 때까지 ML 중립 모드")
+                    self.model_trainer.start()
+                else:
+                    logger.info("🤖 ML 모델 초기 학습을 시작합니다...")
+                    self.ml_generator.train_model(TRADING_PAIRS)
         else:
             self.ml_generator = None
+            self.model_trainer = None
+        
+        # 신호 병렬 평가용 스레드 풀 + 신호별 지연 통계
+        parallel = SIGNAL_INTEGRATION_CONFIG.get('parallel', {})
+        self.signal_executor = None
+        if parallel.get('enabled', True):
+            # 진입 분석 워커가 모두 동시에 제출해도 대기열이 생기지 않는 크기
+            max_workers = parallel.get('max_workers') or \
+                ADVANCED_CONFIG.get('analysis_workers', 8) * len(POOLED_SIGNALS)
+            self.signal_executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix='signal'
+            )
+        self.signal_timeouts = parallel.get('timeouts', {})
+        self.signal_latency = {}
+        self._latency_lock = threading.Lock()
         
     def can_trade_today(self):
         """오늘 거래 가능한지 확인"""
-        today = datetime.now().strftime('%Y-%m-%d')
+        today = self.clock.now().strftime('%Y-%m-%d')
         return self.daily_trades[today] < self.max_trades_per_day
     
     def can_exit_position(self, symbol, exit_type='normal', current_price=None, entry_price=None):
@@ -88,7 +125,7 @@ class ImprovedStrategy:
         if symbol not in self.position_entry_time:
             return True
         
-        elapsed_time = time.time() - self.position_entry_time[symbol]
+        elapsed_time = self.clock.time() - self.position_entry_time[symbol]
         
         # 🎯 손절은 즉시 허용!
         if exit_type == 'stop_loss':
@@ -115,7 +152,7 @@ class ImprovedStrategy:
             return False
         
         cooldown_time = 180  # 3분
-        elapsed = time.time() - self.trade_cooldown[symbol]
+        elapsed = self.clock.time() - self.trade_cooldown[symbol]
         return elapsed < cooldown_time
     
     def calculate_entry_score(self, indicators):
@@ -199,77 +236,193 @@ class ImprovedStrategy:
         
         return score, details
     
+    # ------------------------------------------------------------------
+    # 신호 소스 (각각 (0~1 점수, 상세 목록) 반환)
+    # ------------------------------------------------------------------
+    def _technical_signal(self, symbol, indicators):
+        tech_score, tech_details = self.calculate_entry_score(indicators)
+        return tech_score / 12.0, tech_details  # 정규화 (0~1)
+    
+    def _mtf_signal(self, symbol, indicators):
+        if not (MTF_CONFIG['enabled'] and self.mtf_analyzer):
+            return 0.5, ["MTF 비활성화"]
+        
+        try:
+            mtf_result = self.mtf_analyzer.analyze(symbol)
+            if not mtf_result:
+                return 0.5, ["MTF 분석 불가"]
+            return mtf_result['final_score'] / 10.0, [
+                f"MTF 점수: {mtf_result['final_score']:.1f}/10",
+                f"합의: {mtf_result['consensus_level']:.1%}",
+                f"추세: {mtf_result['dominant_trend']}"
+            ]
+        except Exception as e:
+            logger.warning(f"MTF 분석 실패: {e}")
+            return 0.5, ["MTF 오류"]
+    
+    def _ml_signal(self, symbol, indicators):
+        if not (ML_CONFIG['enabled'] and self.ml_generator):
+            return 0.5, ["ML 비활성화"]
+        
+        try:
+            if not self.ml_generator.is_trained:
+                return 0.5, ["ML 중립 (모델 준비 중)"]
+            ml_prediction = self.ml_generator.predict(symbol)
+            if not ml_prediction:
+                return 0.5, ["ML 예측 불가"]
+            return ml_prediction['buy_probability'], [
+                f"ML 매수 확률: {ml_prediction['buy_probability']:.1%}",
+                f"신뢰도: {ml_prediction['confidence']:.1%}"
+            ]
+        except Exception as e:
+            logger.warning(f"ML 예측 실패: {e}")
+            return 0.5, ["ML 오류"]
+    
+    def prefetch_signals(self, symbols):
+        """여러 종목 ML 예측을 한 번에 계산해 캐시 채우기 (종목별 평가 전에 호출)"""
+        if not (ML_CONFIG['enabled'] and self.ml_generator):
+            return
+        try:
+            self.ml_generator.predict_batch(symbols)
+        except Exception as e:
+            logger.warning(f"ML 배치 예측 실패: {e}")
+    
+    def _timed_signal(self, func, symbol, indicators, started=None):
+        """신호 계산 + 소요 시간 (초) - started에 실행 시작 시각 기록"""
+        start = time.monotonic()
+        if started is not None:
+            started.append(start)
+        result = func(symbol, indicators)
+        return result, time.monotonic() - start
+    
+    def _wait_signal(self, future, started, submitted, limit):
+        """실행 시작 후 limit초까지 결과 대기
+        
+        풀 대기열에서 기다린 시간은 제한 시간에 넣지 않음 (대기열도 최대 limit초)
+        """
+        while not started:
+            if time.monotonic() - submitted >= limit:
+                raise FutureTimeoutError
+            try:
+                return future.result(timeout=0.05)
+            except FutureTimeoutError:
+                pass
+        return future.result(timeout=max(0.0, started[0] + limit - time.monotonic()))
+    
+    def evaluate_signals(self, symbol, indicators):
+        """세 신호를 평가 → (signal_scores, signal_details, latency)
+        
+        - 기술 신호는 이미 계산된 지표로 바로 계산, MTF/ML은 스레드 풀에서 동시에 실행
+        - MTF/ML이 실행 시작 후 제한 시간을 넘기면 중립 0.5로 대체 (작업은 취소)
+        - latency: 이번 호출의 신호별 지연 시간 (누적 통계는 get_signal_latency())
+          여러 종목을 동시에 평가하므로 공유 상태가 아닌 반환값으로 전달
+        """
+        sources = {
+            'mtf': self._mtf_signal,
+            'ml': self._ml_signal,
+        }
+        signal_scores = {}
+        signal_details = {}
+        latency = {}
+        timed_out = set()
+        
+        futures = {}
+        submitted = time.monotonic()
+        if self.signal_executor is not None:
+            for source, func in sources.items():
+                started = []
+                future = self.signal_executor.submit(
+                    bind_context(self._timed_signal), func, symbol, indicators, started
+                )
+                futures[source] = (future, started)
+        
+        (score, details), elapsed = self._timed_signal(self._technical_signal, symbol, indicators)
+        signal_scores['technical'], signal_details['technical'] = score, details
+        latency['technical'] = elapsed
+        
+        if self.signal_executor is None:
+            for source, func in sources.items():
+                (score, details), elapsed = self._timed_signal(func, symbol, indicators)
+                signal_scores[source], signal_details[source] = score, details
+                latency[source] = elapsed
+        else:
+            for source, (future, started) in futures.items():
+                limit = self.signal_timeouts.get(source, 10)
+                try:
+                    (score, details), elapsed = self._wait_signal(future, started, submitted, limit)
+                    signal_scores[source], signal_details[source] = score, details
+                    latency[source] = elapsed
+                except FutureTimeoutError:
+                    future.cancel()  # 아직 대기열에 있으면 실행하지 않음
+                    logger.warning(f"{symbol} {source} 신호 시간 초과 ({limit}초) - 중립 처리")
+                    signal_scores[source] = 0.5
+                    signal_details[source] = [f"{source} 시간 초과"]
+                    latency[source] = time.monotonic() - submitted
+                    timed_out.add(source)
+                except Exception as e:
+                    logger.warning(f"{symbol} {source} 신호 오류: {e}")
+                    signal_scores[source] = 0.5
+                    signal_details[source] = [f"{source} 오류"]
+                    latency[source] = time.monotonic() - submitted
+        
+        self._record_latency(latency, timed_out)
+        return signal_scores, signal_details, latency
+    
+    def _record_latency(self, latency, timed_out):
+        with self._latency_lock:
+            for source, elapsed in latency.items():
+                stats = self.signal_latency.setdefault(source, {
+                    'calls': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0
+                })
+                stats['calls'] += 1
+                stats['total'] += elapsed
+                stats['max'] = max(stats['max'], elapsed)
+                if source in timed_out:
+                    stats['timeouts'] += 1
+    
+    def get_signal_latency(self):
+        """신호별 지연 통계 {source: {calls, avg, max, timeouts}}"""
+        with self._latency_lock:
+            return {
+                source: {
+                    'calls': stats['calls'],
+                    'avg': stats['total'] / stats['calls'] if stats['calls'] else 0.0,
+                    'max': stats['max'],
+                    'timeouts': stats['timeouts'],
+                }
+                for source, stats in self.signal_latency.items()
+            }
+    
     def should_enter_position(self, symbol, indicators):
         """향상된 진입 판단 - 3가지 신호 통합"""
+        can_enter, reason, _ = self.evaluate_entry(symbol, indicators)
+        return can_enter, reason
+    
+    def evaluate_entry(self, symbol, indicators):
+        """진입 판단 + 최종 점수 → (진입 여부, 사유, 최종 점수 또는 None)
+        
+        여러 종목 후보를 점수순으로 정렬할 때 사용
+        """
         
         # 1. 거래 빈도 체크
         if not self.can_trade_today():
-            return False, "일일 거래 한도 초과"
+            return False, "일일 거래 한도 초과", None
         
         # 2. 쿨다운 체크
         if self.is_in_cooldown(symbol):
-            return False, "쿨다운 중 (30분 대기)"
+            return False, "쿨다운 중 (30분 대기)", None
         
         # 3. 연속 손실 체크
         if hasattr(self, 'consecutive_losses') and self.consecutive_losses >= 2:
-            return False, f"연속 손실 {self.consecutive_losses}회 - 거래 일시 중단"
+            return False, f"연속 손실 {self.consecutive_losses}회 - 거래 일시 중단", None
         
         # ✅ 4. 과매수 필터 (RSI 70 이상이면 진입 금지)
         rsi = indicators.get('rsi', 50)
         if rsi >= 75:
-            return False, f"RSI 과매수 ({rsi:.1f}) - 조정 대기"
-        
-        # 5. 멀티 신호 분석
-        signal_scores = {}
-        signal_details = {}
-        
-        # 5-1. 기존 기술적 분석
-        tech_score, tech_details = self.calculate_entry_score(indicators)
-        signal_scores['technical'] = tech_score / 12.0  # 정규화 (0~1)
-        signal_details['technical'] = tech_details
+            return False, f"RSI 과매수 ({rsi:.1f}) - 조정 대기", None
         
-        # 5-2. 멀티 타임프레임 분석
-        if MTF_CONFIG['enabled'] and self.mtf_analyzer:
-            try:
-                mtf_result = self.mtf_analyzer.analyze(symbol)
-                if mtf_result:
-                    signal_scores['mtf'] = mtf_result['final_score'] / 10.0
-                    signal_details['mtf'] = [
-                        f"MTF 점수: {mtf_result['final_score']:.1f}/10",
-                        f"합의: {mtf_result['consensus_level']:.1%}",
-                        f"추세: {mtf_result['dominant_trend']}"
-                    ]
-                else:
-                    signal_scores['mtf'] = 0.5
-                    signal_details['mtf'] = ["MTF 분석 불가"]
-            except Exception as e:
-                logger.warning(f"MTF 분석 실패: {e}")
-                signal_scores['mtf'] = 0.5
-                signal_details['mtf'] = ["MTF 오류"]
-        else:
-            signal_scores['mtf'] = 0.5
-            signal_details['mtf'] = ["MTF 비활성화"]
-        
-        # 5-3. 머신러닝 예측
-        if ML_CONFIG['enabled'] and self.ml_generator:
-            try:
-                ml_prediction = self.ml_generator.predict(symbol)
-                if ml_prediction:
-                    signal_scores['ml'] = ml_prediction['buy_probability']
-                    signal_details['ml'] = [
-                        f"ML 매수 확률: {ml_prediction['buy_probability']:.1%}",
-                        f"신뢰도: {ml_prediction['confidence']:.1%}"
-                    ]
-                else:
-                    signal_scores['ml'] = 0.5
-                    signal_details['ml'] = ["ML 예측 불가"]
-            except Exception as e:
-                logger.warning(f"ML 예측 실패: {e}")
-                signal_scores['ml'] = 0.5
-                signal_details['ml'] = ["ML 오류"]
-        else:
-            signal_scores['ml'] = 0.5
-            signal_details['ml'] = ["ML 비활성화"]
+        # 5. 멀티 신호 분석 (기술/MTF/ML 병렬 평가)
+        signal_scores, signal_details, latency = self.evaluate_signals(symbol, indicators)
         
         # 6. 가중 평균 최종 점수 계산
         final_score = sum(
@@ -318,6 +471,10 @@ class ImprovedStrategy:
         for detail in signal_details['ml']:
             logger.info(f"   - {detail}")
         
+        logger.info("⏱️ 신호 지연: " + ", ".join(
+            f"{source} {latency[source]:.2f}s" for source in SIGNAL_SOURCES if source in latency
+        ))
+        
         logger.info(f"\n최종 점수: {final_score:.2f}/10")
         logger.info(f"진입 기준: {adjusted_threshold:.2f} (시장: {market_condition})")
         logger.info(f"{'='*60}\n")
@@ -325,21 +482,21 @@ class ImprovedStrategy:
         # 9. 최종 판단
         if final_score >= adjusted_threshold:
             return True, (f"✅ 진입 조건 충족 (점수: {final_score:.2f}/{adjusted_threshold:.2f}, "
-                         f"시장: {market_condition})")
+                         f"시장: {market_condition})"), final_score
         
-        return False, (f"❌ 진입 조건 미충족 (점수: {final_score:.2f}/{adjusted_threshold:.2f})")
+        return False, (f"❌ 진입 조건 미충족 (점수: {final_score:.2f}/{adjusted_threshold:.2f})"), final_score
     
     def record_trade(self, symbol, trade_type):
         """거래 기록"""
-        today = datetime.now().strftime('%Y-%m-%d')
+        today = self.clock.now().strftime('%Y-%m-%d')
         self.daily_trades[today] += 1
         
         if trade_type == 'buy':
-            self.position_entry_time[symbol] = time.time()
+            self.position_entry_time[symbol] = self.clock.time()
         elif trade_type == 'sell':
             if symbol in self.position_entry_time:
                 del self.position_entry_time[symbol]
-            self.trade_cooldown[symbol] = time.time()
+            self.trade_cooldown[symbol] = self.clock.time()
     
     def check_profit_target(self, entry_price, current_price):
         """최소 수익률 달성 여부 확인"""
@@ -348,7 +505,7 @@ class ImprovedStrategy:
     
     def get_trade_statistics(self):
         """거래 통계 반환"""
-        today = datetime.now().strftime('%Y-%m-%d')
+        today = self.clock.now().strftime('%Y-%m-%d')
         return {
             'trades_today': self.daily_trades[today],
             'trades_remaining': self.max_trades_per_day - self.daily_trades[today],
@@ -357,7 +514,12 @@ class ImprovedStrategy:
         }
     
     def retrain_ml_model(self):
-        """ML 모델 재학습"""
+        """ML 모델 재학습 - 백그라운드 학습이 켜져 있으면 시작만 하고 바로 반환"""
+        if not self.ml_generator:
+            return False
+        if self.model_trainer:
+            return self.model_trainer.start()
+        
         logger.info("🔄 ML 모델 재학습 시작...")
         success = self.ml_generator.train_model(TRADING_PAIRS, retrain=True)
         if success:
@@ -366,4 +528,4 @@ class ImprovedStrategy:
     
     def evaluate_ml_performance(self, days=7):
         """ML 모델 성능 평가"""
-        self.ml_generator.evaluate_recent_performance(TRADING_PAIRS, days=days)
\ No newline at end of file
+        return self.ml_generator.evaluate_recent_performance(TRADING_PAIRS, days=days)
\ No newline at end of file
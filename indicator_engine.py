@@ -0,0 +1,656 @@
+# indicator_engine.py - 스트리밍 기술적 지표 엔진 (SMA/EMA/RSI/MACD/ATR/볼린저)
+#
+# - 스트리밍: (종목, 주기)별 상태를 유지하고 새 캔들/갱신된 캔들마다 O(1)로 계산
+# - 배치: 과거 구간 전체를 pandas로 한 번에 계산 (학습/백테스트용)
+# - 패널: 여러 종목을 (종목 × 시간) 배열로 묶어 전 종목 지표를 한 번에 계산 (진입 분석/스캐너용)
+#
+# 세 모드 모두 기존 pandas 공식과 같은 값을 낸다
+#   SMA: rolling(n).mean()       EMA: ewm(span, adjust)
+#   RSI: 상승/하락폭의 rolling(14).mean() (첫 캔들의 변화량은 0으로 취급)
+#   ATR: max(고-저, |고-전종가|, |저-전종가|)의 rolling(14).mean()
+#   볼린저: rolling(20).mean() ± 2 * rolling(20).std()
+
+import math
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from market_data import normalize_interval
+
+COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+SMA_PERIODS = (10, 20, 50)
+CHANGE_PERIODS = (1, 4, 10, 19, 20, 24)   # close / close.shift(k) - 1
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+BB_PERIOD = 20
+BB_STD = 2
+VOLUME_PERIOD = 20
+VOLATILITY_PERIOD = 20
+TREND_PERIOD = 20                         # 최근 20개 캔들의 방향 일관성
+
+
+# ======================================================================
+# 스트리밍 기본 요소
+#   after(x)  : x를 추가했을 때의 상태 (상태는 바뀌지 않음)
+#   apply(st) : after()가 돌려준 상태를 확정
+# ======================================================================
+
+class RollingStats:
+    """고정 길이 이동 평균/표준편차 - 슬라이딩 Welford 방식"""
+
+    def __init__(self, window):
+        self.window = window
+        self._values = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._updates = 0
+
+    def after(self, x):
+        n = len(self._values)
+        if n < self.window:
+            count = n + 1
+            delta = x - self._mean
+            mean = self._mean + delta / count
+            m2 = self._m2 + delta * (x - mean)
+            dropped = False
+        else:
+            old = self._values[0]
+            count = n
+            mean = self._mean + (x - old) / n
+            m2 = self._m2 + (x - old) * (x - mean + old - self._mean)
+            dropped = True
+        return (x, count, mean, max(m2, 0.0), dropped)
+
+    def apply(self, state):
+        x, _, mean, m2, dropped = state
+        if dropped:
+            self._values.popleft()
+        self._values.append(x)
+        self._mean, self._m2 = mean, m2
+
+        # 누적 오차 방지 - window번마다 정확히 다시 계산 (분할 상환 O(1))
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._mean = math.fsum(self._values) / len(self._values)
+            self._m2 = math.fsum((v - self._mean) ** 2 for v in self._values)
+
+    def mean_of(self, state):
+        _, count, mean, _, _ = state
+        return mean if count >= self.window else np.nan
+
+    def std_of(self, state):
+        _, count, _, m2, _ = state
+        if count < self.window or count < 2:
+            return np.nan
+        return math.sqrt(m2 / (count - 1))
+
+    def reset(self):
+        self.__init__(self.window)
+
+
+class EMA:
+    """지수 이동 평균 - pandas ewm(span=span, adjust=adjust).mean()과 동일"""
+
+    def __init__(self, span, adjust=False):
+        self.span = span
+        self.adjust = adjust
+        self.alpha = 2 / (span + 1)
+        self._num = 0.0
+        self._den = 0.0
+        self._value = None
+
+    def after(self, x):
+        decay = 1 - self.alpha
+        if self.adjust:
+            num = x + decay * self._num
+            den = 1 + decay * self._den
+            return (num, den, num / den)
+
+        if self._value is None:
+            return (0.0, 0.0, x)
+        return (0.0, 0.0, self.alpha * x + decay * self._value)
+
+    def apply(self, state):
+        self._num, self._den, self._value = state
+
+    @staticmethod
+    def value_of(state):
+        return state[2]
+
+    def reset(self):
+        self.__init__(self.span, self.adjust)
+
+
+class DirectionCount:
+    """최근 n개 변화량 중 상승/하락 개수"""
+
+    def __init__(self, window):
+        self.window = window
+        self._signs = deque()
+        self._up = 0
+        self._down = 0
+
+    def after(self, change):
+        sign = 1 if change > 0 else (-1 if change < 0 else 0)
+        up = self._up + (sign > 0)
+        down = self._down + (sign < 0)
+        count = len(self._signs) + 1
+        if count > self.window:
+            old = self._signs[0]
+            up -= old > 0
+            down -= old < 0
+            count = self.window
+        return (sign, up, down, count)
+
+    def apply(self, state):
+        sign, up, down, count = state
+        if len(self._signs) == self.window:
+            self._signs.popleft()
+        self._signs.append(sign)
+        self._up, self._down = up, down
+
+    def consistency_of(self, state):
+        _, up, down, count = state
+        if count < self.window:
+            return np.nan
+        return max(up, down) / count
+
+    def reset(self):
+        self.__init__(self.window)
+
+
+# ======================================================================
+# (종목, 주기)별 지표 상태
+# ======================================================================
+
+class IndicatorEngine:
+    """캔들을 순서대로 받아 지표 스냅샷을 만드는 스트리밍 엔진
+
+    - update(bar): 마감된 캔들을 상태에 반영
+    - peek(bar): 진행 중인 캔들로 계산한 스냅샷 (상태는 그대로)
+    - sync(df): pyupbit DataFrame에서 새로 마감된 캔들만 반영하고 마지막 캔들 스냅샷 반환
+    """
+
+    def __init__(self, adjust=False):
+        self.adjust = adjust
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.sma = {p: RollingStats(p) for p in SMA_PERIODS}
+        self.ema_12 = EMA(12, self.adjust)
+        self.ema_26 = EMA(26, self.adjust)
+        self.macd_signal = EMA(9, self.adjust)
+        self.gain = RollingStats(RSI_PERIOD)
+        self.loss = RollingStats(RSI_PERIOD)
+        self.true_range = RollingStats(ATR_PERIOD)
+        self.volume = RollingStats(VOLUME_PERIOD)
+        self.returns = RollingStats(VOLATILITY_PERIOD)
+        self.direction = DirectionCount(TREND_PERIOD - 1)
+        self.closes = deque(maxlen=max(CHANGE_PERIODS))
+        self.prev_volume = None
+        self.last_time = None
+        self.count = 0
+
+    # ------------------------------------------------------------------
+    def update(self, bar, time=None):
+        """마감된 캔들 반영 → 스냅샷"""
+        return self._step(bar, time, commit=True)
+
+    def peek(self, bar, time=None):
+        """진행 중인 캔들 스냅샷 (상태 변경 없음)"""
+        return self._step(bar, time, commit=False)
+
+    def sync(self, df):
+        """DataFrame의 새 마감 캔들 반영 후 마지막(진행 중) 캔들 스냅샷 반환"""
+        index = df.index
+        last = len(df) - 1
+
+        # 마지막으로 반영한 캔들 다음부터 이어서 반영
+        start = 0
+        if self.last_time is not None:
+            pos = index.searchsorted(self.last_time)
+            if pos < last and index[pos] == self.last_time:
+                start = pos + 1
+
+        # 이어지는 구간이 아니면 (첫 호출/공백/재시작) 현재 창으로 다시 시작
+        if start == 0:
+            self.reset()
+
+        opens = df['open'].to_numpy(dtype=float)
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        closes = df['close'].to_numpy(dtype=float)
+        volumes = df['volume'].to_numpy(dtype=float)
+
+        for i in range(start, last):
+            self.update((opens[i], highs[i], lows[i], closes[i], volumes[i]), index[i])
+
+        return self.peek((opens[last], highs[last], lows[last], closes[last], volumes[last]), index[last])
+
+    # ------------------------------------------------------------------
+    def _step(self, bar, time, commit):
+        o, h, l, c, v = (np.float64(x) for x in bar)
+        prev_close = self.closes[-1] if self.closes else None
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 이동평균 / 볼린저
+            sma_states = {p: s.after(c) for p, s in self.sma.items()}
+
+            # EMA / MACD
+            e12 = self.ema_12.after(c)
+            e26 = self.ema_26.after(c)
+            macd = EMA.value_of(e12) - EMA.value_of(e26)
+            sig = self.macd_signal.after(macd)
+            macd_signal = EMA.value_of(sig)
+
+            # RSI (첫 캔들은 변화량 0)
+            delta = 0.0 if prev_close is None else c - prev_close
+            g = self.gain.after(max(delta, 0.0))
+            lo = self.loss.after(max(-delta, 0.0))
+            rsi = 100 - 100 / (1 + np.float64(self.gain.mean_of(g)) / np.float64(self.loss.mean_of(lo)))
+
+            # ATR (첫 캔들은 고-저)
+            if prev_close is None:
+                tr_value = h - l
+            else:
+                tr_value = max(h - l, abs(h - prev_close), abs(l - prev_close))
+            tr = self.true_range.after(tr_value)
+            atr = self.true_range.mean_of(tr)
+
+            # 거래량
+            vol = self.volume.after(v)
+            volume_sma = self.volume.mean_of(vol)
+            volume_change = np.nan if self.prev_volume is None else v / np.float64(self.prev_volume) - 1
+
+            # 수익률 변동성 / 추세 일관성
+            if prev_close is None:
+                ret = dir_state = None
+                volatility = trend_consistency = np.nan
+            else:
+                ret = self.returns.after(c / prev_close - 1)
+                volatility = self.returns.std_of(ret)
+                dir_state = self.direction.after(delta)
+                trend_consistency = self.direction.consistency_of(dir_state)
+
+            # 가격 변화율
+            changes = {}
+            for k in CHANGE_PERIODS:
+                if len(self.closes) >= k:
+                    changes[f'change_{k}'] = c / self.closes[-k] - 1
+                else:
+                    changes[f'change_{k}'] = np.nan
+
+            sma_20 = self.sma[20].mean_of(sma_states[20])
+            std_20 = self.sma[20].std_of(sma_states[20])
+
+            snapshot = {
+                'time': time,
+                'open': o, 'high': h, 'low': l, 'close': c, 'volume': v,
+                'ema_12': EMA.value_of(e12),
+                'ema_26': EMA.value_of(e26),
+                'macd': macd,
+                'macd_signal': macd_signal,
+                'macd_histogram': macd - macd_signal,
+                'rsi': rsi,
+                'atr': atr,
+                'bb_mid': sma_20,
+                'bb_std': std_20,
+                'bb_upper': sma_20 + std_20 * BB_STD,
+                'bb_lower': sma_20 - std_20 * BB_STD,
+                'volume_sma': volume_sma,
+                'volume_change': volume_change,
+                'volatility': volatility,
+                'trend_consistency': trend_consistency,
+                'bars': self.count + 1,
+            }
+            for p, st in sma_states.items():
+                snapshot[f'sma_{p}'] = self.sma[p].mean_of(st)
+            snapshot.update(changes)
+
+        if commit:
+            for p, st in sma_states.items():
+                self.sma[p].apply(st)
+            self.ema_12.apply(e12)
+            self.ema_26.apply(e26)
+            self.macd_signal.apply(sig)
+            self.gain.apply(g)
+            self.loss.apply(lo)
+            self.true_range.apply(tr)
+            self.volume.apply(vol)
+            if ret is not None:
+                self.returns.apply(ret)
+                self.direction.apply(dir_state)
+            self.closes.append(c)
+            self.prev_volume = v
+            self.last_time = time
+            self.count += 1
+
+        return snapshot
+
+
+# ======================================================================
+# 배치 모드 (과거 구간 전체)
+# ======================================================================
+
+def compute_frame(df, adjust=False):
+    """과거 구간 전체 지표를 DataFrame으로 계산 - 스냅샷과 같은 컬럼명"""
+    close = df['close']
+    out = pd.DataFrame(index=df.index)
+
+    for p in SMA_PERIODS:
+        out[f'sma_{p}'] = close.rolling(p).mean()
+
+    out['ema_12'] = close.ewm(span=12, adjust=adjust).mean()
+    out['ema_26'] = close.ewm(span=26, adjust=adjust).mean()
+    out['macd'] = out['ema_12'] - out['ema_26']
+    out['macd_signal'] = out['macd'].ewm(span=9, adjust=adjust).mean()
+    out['macd_histogram'] = out['macd'] - out['macd_signal']
+
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(RSI_PERIOD).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(RSI_PERIOD).mean()
+    out['rsi'] = 100 - (100 / (1 + gain / loss))
+
+    high_low = df['high'] - df['low']
+    high_close = (df['high'] - close.shift()).abs()
+    low_close = (df['low'] - close.shift()).abs()
+    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    out['atr'] = true_range.rolling(ATR_PERIOD).mean()
+
+    out['bb_mid'] = close.rolling(BB_PERIOD).mean()
+    out['bb_std'] = close.rolling(BB_PERIOD).std()
+    out['bb_upper'] = out['bb_mid'] + out['bb_std'] * BB_STD
+    out['bb_lower'] = out['bb_mid'] - out['bb_std'] * BB_STD
+
+    out['volume_sma'] = df['volume'].rolling(VOLUME_PERIOD).mean()
+    out['volume_change'] = df['volume'] / df['volume'].shift(1) - 1
+    out['volatility'] = (close / close.shift(1) - 1).rolling(VOLATILITY_PERIOD).std()
+
+    diff = close.diff()
+    window = TREND_PERIOD - 1
+    up = (diff > 0).astype(float).where(diff.notna()).rolling(window).sum()
+    down = (diff < 0).astype(float).where(diff.notna()).rolling(window).sum()
+    out['trend_consistency'] = np.maximum(up, down) / window
+
+    for k in CHANGE_PERIODS:
+        out[f'change_{k}'] = close / close.shift(k) - 1
+
+    return out
+
+
+# ======================================================================
+# 공용 엔진 저장소
+# ======================================================================
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(ticker, interval, adjust=False):
+    """(종목, 주기, EMA 방식)별 공용 엔진"""
+    key = (ticker, normalize_interval(interval), adjust)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = IndicatorEngine(adjust=adjust)
+            _engines[key] = engine
+        return engine
+
+
+def snapshot(ticker, interval, df, adjust=False):
+    """공용 엔진에 df를 반영하고 마지막 캔들 지표 스냅샷 반환"""
+    engine = get_engine(ticker, interval, adjust)
+    with engine.lock:
+        return engine.sync(df)
+
+
+# ======================================================================
+# 패널 모드 (여러 종목 × 시간 2차원 배열, 한 번에 계산)
+# ======================================================================
+
+class Panel:
+    """종목 × 시간으로 정렬된 OHLCV 배열
+
+    - 시각은 모든 종목의 합집합, 상장 전 구간은 NaN
+    - 체결이 없어 빠진 캔들은 직전 종가로 채운 거래량 0 캔들로 간주
+    """
+
+    def __init__(self, symbols, index, open_, high, low, close, volume):
+        self.symbols = list(symbols)
+        self.index = index
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def __len__(self):
+        return len(self.symbols)
+
+
+def build_panel(frames, length=None):
+    """{symbol: DataFrame} → Panel (최근 length개 시각)"""
+    frames = {s: df for s, df in frames.items() if df is not None and len(df) > 0}
+    symbols = list(frames.keys())
+    if not symbols:
+        return Panel([], pd.DatetimeIndex([]), *(np.empty((0, 0)) for _ in range(5)))
+
+    index = frames[symbols[0]].index
+    for s in symbols[1:]:
+        if not frames[s].index.equals(index):
+            index = index.union(frames[s].index)
+    if length is not None:
+        index = index[-length:]
+
+    shape = (len(symbols), len(index))
+    arrays = {col: np.full(shape, np.nan) for col in COLUMNS}
+
+    for row, s in enumerate(symbols):
+        df = frames[s]
+        if not df.index.equals(index):
+            df = df.reindex(index)
+            # 빠진 캔들: 직전 종가로 평평한 캔들, 거래량 0 (상장 전 구간은 NaN 유지)
+            close = df['close'].ffill()
+            listed = close.notna()
+            for col in ('open', 'high', 'low'):
+                df[col] = df[col].fillna(close)
+            df['close'] = close
+            df['volume'] = df['volume'].where(~listed | df['volume'].notna(), 0.0)
+        for col in COLUMNS:
+            arrays[col][row] = df[col].to_numpy(dtype=float)
+
+    return Panel(symbols, index, arrays['open'], arrays['high'], arrays['low'],
+                 arrays['close'], arrays['volume'])
+
+
+def _shift(x, k):
+    """시간축으로 k칸 뒤로 밀기 (앞은 NaN)"""
+    out = np.full_like(x, np.nan)
+    if k < x.shape[1]:
+        out[:, k:] = x[:, :x.shape[1] - k]
+    return out
+
+
+def _rolling_sum(x, n):
+    """시간축 이동 합 - 창 안에 NaN이 있으면 NaN (pandas rolling과 동일)"""
+    valid = ~np.isnan(x)
+    filled = np.where(valid, x, 0.0)
+    zeros = np.zeros((x.shape[0], 1))
+    cs = np.concatenate([zeros, np.cumsum(filled, axis=1)], axis=1)
+    cnt = np.concatenate([zeros, np.cumsum(valid, axis=1)], axis=1)
+
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= n:
+        total = cs[:, n:] - cs[:, :-n]
+        count = cnt[:, n:] - cnt[:, :-n]
+        out[:, n - 1:] = np.where(count == n, total, np.nan)
+    return out
+
+
+def _rolling_mean(x, n):
+    # 종목별 기준값을 빼고 누적합 (큰 가격에서 자릿수 손실 방지)
+    base = _row_base(x)
+    return _rolling_sum(x - base, n) / n + base
+
+
+def _rolling_std(x, n):
+    base = _row_base(x)
+    centered = x - base
+    s1 = _rolling_sum(centered, n)
+    s2 = _rolling_sum(centered * centered, n)
+    var = (s2 - s1 * s1 / n) / (n - 1)
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def _row_base(x):
+    with np.errstate(all='ignore'):
+        base = np.nanmean(x, axis=1, keepdims=True) if x.size else np.zeros((x.shape[0], 1))
+    return np.nan_to_num(base)
+
+
+def _ewm(x, span, adjust):
+    """시간축 EMA - 종목마다 첫 유효값부터 시작 (pandas ewm과 동일)"""
+    alpha = 2 / (span + 1)
+    decay = 1 - alpha
+    out = np.full_like(x, np.nan)
+    num = np.zeros(x.shape[0])
+    den = np.zeros(x.shape[0])
+    value = np.full(x.shape[0], np.nan)
+
+    for t in range(x.shape[1]):
+        xt = x[:, t]
+        valid = ~np.isnan(xt)
+        if adjust:
+            num = np.where(valid, xt + decay * num, num)
+            den = np.where(valid, 1 + decay * den, den)
+            value = np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+        else:
+            started = ~np.isnan(value)
+            value = np.where(valid & started, alpha * xt + decay * value,
+                             np.where(valid, xt, value))
+        out[:, t] = value
+    return out
+
+
+def compute_panel(panel, adjust=False):
+    """Panel 전체 지표를 한 번에 계산 → {지표명: (종목 × 시간) 배열}
+
+    지표명과 공식은 compute_frame / 스트리밍 스냅샷과 동일
+    """
+    c, h, l, v = panel.close, panel.high, panel.low, panel.volume
+    listed = ~np.isnan(c)
+    prev_c = _shift(c, 1)
+    out = {}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p in SMA_PERIODS:
+            out[f'sma_{p}'] = _rolling_mean(c, p)
+
+        out['ema_12'] = _ewm(c, 12, adjust)
+        out['ema_26'] = _ewm(c, 26, adjust)
+        out['macd'] = out['ema_12'] - out['ema_26']
+        out['macd_signal'] = _ewm(out['macd'], 9, adjust)
+        out['macd_histogram'] = out['macd'] - out['macd_signal']
+
+        # RSI - 종목별 첫 캔들의 변화량은 0
+        delta = np.where(listed, np.nan_to_num(c - prev_c), np.nan)
+        gain = np.where(listed, np.maximum(delta, 0.0), np.nan)
+        loss = np.where(listed, np.maximum(-delta, 0.0), np.nan)
+        out['rsi'] = 100 - 100 / (1 + _rolling_mean(gain, RSI_PERIOD) / _rolling_mean(loss, RSI_PERIOD))
+
+        # ATR - 첫 캔들은 고-저
+        true_range = np.fmax(h - l, np.fmax(np.abs(h - prev_c), np.abs(l - prev_c)))
+        true_range = np.where(listed, true_range, np.nan)
+        out['atr'] = _rolling_mean(true_range, ATR_PERIOD)
+
+        out['bb_mid'] = _rolling_mean(c, BB_PERIOD)
+        out['bb_std'] = _rolling_std(c, BB_PERIOD)
+        out['bb_upper'] = out['bb_mid'] + out['bb_std'] * BB_STD
+        out['bb_lower'] = out['bb_mid'] - out['bb_std'] * BB_STD
+
+        out['volume_sma'] = _rolling_mean(v, VOLUME_PERIOD)
+        out['volume_change'] = v / _shift(v, 1) - 1
+        out['volatility'] = _rolling_std(c / prev_c - 1, VOLATILITY_PERIOD)
+
+        diff = c - prev_c
+        known = ~np.isnan(diff)
+        window = TREND_PERIOD - 1
+        up = _rolling_sum(np.where(known, (diff > 0).astype(float), np.nan), window)
+        down = _rolling_sum(np.where(known, (diff < 0).astype(float), np.nan), window)
+        out['trend_consistency'] = np.maximum(up, down) / window
+
+        for k in CHANGE_PERIODS:
+            out[f'change_{k}'] = c / _shift(c, k) - 1
+
+    return out
+
+
+def panel_snapshots(panel, values, position=-1):
+    """compute_panel 결과 → {symbol: 스냅샷 dict} (스트리밍 스냅샷과 같은 키)"""
+    snapshots = {}
+    if not len(panel.index):
+        return snapshots
+
+    time = panel.index[position]
+    bars = np.cumsum(~np.isnan(panel.close), axis=1)[:, position]
+    for row, symbol in enumerate(panel.symbols):
+        if np.isnan(panel.close[row, position]):
+            continue
+        snap = {
+            'time': time,
+            'open': panel.open[row, position],
+            'high': panel.high[row, position],
+            'low': panel.low[row, position],
+            'close': panel.close[row, position],
+            'volume': panel.volume[row, position],
+            'bars': int(bars[row]),
+        }
+        for name, array in values.items():
+            snap[name] = array[row, position]
+        snapshots[symbol] = snap
+    return snapshots
+
+
+def strategy_indicators(snap):
+    """지표 스냅샷 → 전략(ImprovedStrategy/RiskManager)용 지표 dict - 실거래/백테스트 공용"""
+    current_price = snap['close']
+    sma_20 = snap['sma_20']
+    sma_50 = snap['sma_50']
+
+    # 볼륨 비율
+    avg_volume = snap['volume_sma']
+    volume_ratio = snap['volume'] / avg_volume if avg_volume > 0 else 1
+
+    # 변동성 (ATR)
+    volatility = snap['atr'] / current_price
+
+    # 예상 수익률 계산 (단순 모멘텀 기반)
+    expected_return = snap['change_19'] * 0.3  # 보수적 추정
+
+    # 추세 판단
+    if sma_20 > sma_50 and current_price > sma_20:
+        trend = 'strong_up'
+    elif sma_20 > sma_50:
+        trend = 'up'
+    elif sma_20 < sma_50:
+        trend = 'down'
+    else:
+        trend = 'sideways'
+
+    return {
+        'price': current_price,
+        'sma_20': sma_20,
+        'sma_50': sma_50,
+        'ema_12': snap['ema_12'],
+        'ema_26': snap['ema_26'],
+        'rsi': snap['rsi'],
+        'macd': snap['macd'],
+        'macd_signal': snap['macd_signal'],
+        'volume_ratio': volume_ratio,
+        'volatility': volatility,
+        'expected_return': expected_return,
+        'trend': trend
+    }
@@ -0,0 +1,173 @@
+# log_reader.py - trading.log 분석기 공용 스트리밍 읽기 (회전/gzip 조각 + 바이트 위치 체크포인트)
+#
+# - 조각: trading.log.N[.gz] (RotatingFileHandler, N이 클수록 오래됨),
+#         trading.log.YYYY-MM-DD[_HH-MM-SS][.gz] (TimedRotatingFileHandler) → 오래된 순, 마지막이 trading.log
+# - 청크(chunk_size) 단위로 읽고 줄 단위로 내보냄 (파일 전체를 메모리에 올리지 않음)
+# - 조각은 첫 줄 해시로 식별 → 회전으로 이름이 바뀌어도 (trading.log → trading.log.1) 이어서 읽음
+# - 체크포인트: 조각별로 처리한 바이트 위치 + 분석기 상태(결과/줄 사이 상태)를 함께 저장
+#   → 다음 실행은 새 줄만 파싱. 아직 줄바꿈이 없는 마지막 줄은 다음 실행에서 읽음
+# - 분석기 파싱 방식이 바뀌면 version을 올림 (저장된 체크포인트 무시)
+#
+# 사용 예:
+#   reader = LogReader('trading.log', checkpoint='trading.log.scores.ckpt', version=1)
+#   state = reader.load_state() or {...}
+#   for line in reader.lines():
+#       ...
+#   reader.save(state)
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+
+from config import LOG_READER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 로그 줄 앞의 시각 (logging 기본 asctime 형식, 밀리초 제외)
+TIMESTAMP_RE = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})')
+
+_SEGMENT_SUFFIX_RE = re.compile(r'^\.(?:(\d+)|(\d{4}-\d{2}-\d{2}(?:_\d{2}(?:-\d{2}){0,2})?))(\.gz)?$')
+
+
+def _json_default(value):
+    """datetime → ISO 문자열 (나머지는 str)"""
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def checkpoint_path_for(log_file, name):
+    """trading.log + scores → trading.log.scores.ckpt"""
+    return f"{log_file}.{name}.ckpt"
+
+
+def log_segments(path):
+    """회전된 조각 + 현재 로그 경로 (오래된 순)"""
+    directory = os.path.dirname(path) or '.'
+    base = os.path.basename(path)
+    rotated = []
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    for name in names:
+        if not name.startswith(base) or name == base:
+            continue
+        match = _SEGMENT_SUFFIX_RE.match(name[len(base):])
+        if not match:
+            continue
+        number, date, _ = match.groups()
+        # 날짜 조각 먼저 (날짜 오름차순), 번호 조각은 번호가 클수록 오래됨
+        key = (0, date, 0) if date else (1, '', -int(number))
+        rotated.append((key, os.path.join(directory, name)))
+    segments = [p for _, p in sorted(rotated)]
+    if os.path.exists(path):
+        segments.append(path)
+    return segments
+
+
+def _open(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def _segment_id(path):
+    """첫 줄 해시 (첫 줄이 아직 완성되지 않았으면 None)"""
+    with _open(path) as f:
+        head = f.readline(4096)
+    if not head.endswith(b'\n'):
+        return None
+    return hashlib.sha1(head).hexdigest()
+
+
+class LogReader:
+    """로그 조각을 이어서 줄 단위로 읽기 (체크포인트가 있으면 새 줄만)"""
+
+    def __init__(self, path, checkpoint=None, version=1, chunk_size=None):
+        self.path = path
+        self.checkpoint = checkpoint
+        self.version = version
+        self.chunk_size = chunk_size or LOG_READER_CONFIG['chunk_size']
+        self._segments = {}     # {조각 id: {'offset': 처리한 바이트, 'done': 회전 조각 끝까지 읽음}}
+        self._state = None
+        self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        if not self.checkpoint:
+            return
+        try:
+            with open(self.checkpoint, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (ValueError, OSError) as e:
+            logger.warning(f"로그 체크포인트 무시 (처음부터 읽음): {e}")
+            return
+        if data.get('version') != self.version:
+            logger.info(f"로그 체크포인트 버전 변경 → 처음부터 읽음: {self.checkpoint}")
+            return
+        self._segments = data.get('segments', {})
+        self._state = data.get('state')
+
+    def load_state(self):
+        """지난 실행에서 save()로 저장한 분석기 상태 (없으면 None)"""
+        return self._state
+
+    def lines(self):
+        """새 줄 (str, 줄바꿈 포함) - 소비한 만큼 위치가 갱신됨"""
+        seen = {}
+        for path in log_segments(self.path):
+            try:
+                segment_id = _segment_id(path)
+            except (OSError, EOFError) as e:
+                logger.warning(f"로그 조각 읽기 실패 (건너뜀): {path} ({e})")
+                continue
+            if segment_id is None:
+                continue
+            progress = self._segments.setdefault(segment_id, {'offset': 0, 'done': False})
+            seen[segment_id] = progress
+            if progress['done']:
+                continue
+            yield from self._read_segment(path, progress)
+            if path != self.path:
+                progress['done'] = True  # 회전된 조각은 더 이상 늘지 않음
+        # 사라진 조각(삭제된 오래된 로그)은 체크포인트에서 정리
+        self._segments = seen
+
+    def _read_segment(self, path, progress):
+        if not path.endswith('.gz') and progress['offset'] > os.path.getsize(path):
+            logger.info(f"로그가 잘려 처음부터 다시 읽음: {path}")
+            progress['offset'] = 0
+        with _open(path) as f:
+            if progress['offset']:
+                f.seek(progress['offset'])  # gzip은 앞부분을 풀어서 건너뜀
+            offset = progress['offset']
+            rest = b''
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                lines = (rest + chunk).split(b'\n')
+                rest = lines.pop()  # 줄바꿈이 없는 마지막 조각은 다음 청크와 합침
+                for line in lines:
+                    offset += len(line) + 1
+                    progress['offset'] = offset
+                    yield line.decode('utf-8', errors='replace') + '\n'
+            if rest and path != self.path:
+                # 회전된 조각의 마지막 줄은 더 이상 이어지지 않음
+                progress['offset'] = offset + len(rest)
+                yield rest.decode('utf-8', errors='replace')
+
+    def save(self, state=None):
+        """지금까지 읽은 위치 + 분석기 상태 저장 (임시 파일 → 교체)"""
+        if not self.checkpoint:
+            return
+        self._state = state
+        tmp_path = self.checkpoint + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.version, 'segments': self._segments, 'state': state},
+                          f, ensure_ascii=False, default=_json_default)
+            os.replace(tmp_path, self.checkpoint)
+        except OSError as e:
+            logger.error(f"로그 체크포인트 저장 실패: {e}")
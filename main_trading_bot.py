@@ -1,8 +1,15 @@
 # main_trading_bot.py - 수정 완료 버전
 
-import pyupbit
+import market_data
+import candle_archive
+import indicator_engine
+import request_scheduler
+import os
+import tempfile
 import time
+import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import sys
 import io
@@ -16,7 +23,19 @@ from pyramiding_manager import PyramidingManager
 from adaptive_preset_manager import AdaptivePresetManager
 from config import ADAPTIVE_PRESET_CONFIG
 from trade_history_manager import TradeHistoryManager
+from trade_store import get_store
+from position_journal import PositionJournal
 from averaging_down_manager import AveragingDownManager        
+from price_feed import TickerFeed
+from event_loop import EventScheduler
+from market_condition_check import MarketAnalyzer, get_market_analyzer
+from ml_signal_generator import MLSignalGenerator
+from exchange_client import UpbitExchange
+from clock import SYSTEM_CLOCK
+from request_scheduler import (
+    with_context, bind_context,
+    PRIORITY_EXIT, PRIORITY_ENTRY, PRIORITY_SCAN, PRIORITY_DASHBOARD
+)
 
 from config import (
     TRADING_PAIRS,
@@ -27,6 +46,11 @@ from config import (
     DYNAMIC_COIN_CONFIG,
     AVERAGING_DOWN_CONFIG,
     UPBIT_CONFIG,
+    WEBSOCKET_CONFIG,
+    EVENT_LOOP_CONFIG,
+    ML_CONFIG,
+    TRADE_STORE_CONFIG,
+    POSITION_JOURNAL_CONFIG,
     apply_preset,  # ✅ 함수 import
     ACTIVE_PRESET  # ✅ 활성 프리셋 import
 )
@@ -47,19 +71,64 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class TradingBot:
-    def __init__(self, access_key, secret_key):
+    def __init__(self, access_key=None, secret_key=None, exchange=None, clock=None, state_dir=None):
+        """exchange / clock을 넘기면 그 거래소와 시계로 실행 (기록 재생: ReplayExchange + SimulatedClock),
+        생략하면 업비트 실거래 + 시스템 시계
+
+        state_dir: 상태 파일(trading.db, 포지션 저널, 오늘 거래 저널) 디렉터리
+                   (기본: 실거래는 현재 디렉터리, 재생은 새 임시 디렉터리 - 실거래 상태를 읽거나 쓰지 않음)
+        """
         apply_preset(ACTIVE_PRESET)
         logger.info(f"🎯 프리셋 적용: {ACTIVE_PRESET}")
         
-        self.upbit = pyupbit.Upbit(access_key, secret_key)
+        self.clock = clock or SYSTEM_CLOCK
+        self.replaying = exchange is not None
+        if state_dir is None:
+            state_dir = tempfile.mkdtemp(prefix='replay_state_') if self.replaying else ''
+        self.state_dir = state_dir
+        if self.replaying:
+            logger.info(f"🎬 재생 상태 디렉터리: {os.path.abspath(state_dir)}")
+        
+        # 모든 계좌/주문/시세 요청은 거래소 클라이언트 경유 (실거래는 스케줄러 경유, 주문은 최우선)
+        self.upbit = exchange or UpbitExchange(access_key, secret_key)
+        if self.replaying:
+            # 전략/분석기/ML의 캔들 조회도 같은 거래소에서
+            market_data.set_source(self.upbit.get_ohlcv)
         self.balance = self.get_balance()
         
+        # 거래/포지션/일일 요약/물타기·추매 기록 저장소 (SQLite, 대시보드와 공유)
+        self.trade_store = get_store(os.path.join(state_dir, TRADE_STORE_CONFIG['path']))
+        
+        # 포지션 관리 상태 저널 (포지션/최고가/부분 매도/물타기/추매 - 변경마다 기록, 재시작 시 재생)
+        self.position_journal = PositionJournal(os.path.join(state_dir, POSITION_JOURNAL_CONFIG['path']))
+        
+        # ✅ 거래 기록 관리자 (롤링 1/7/30일 통계를 리스크/자동 프리셋이 함께 조회)
+        self.trade_history = TradeHistoryManager(os.path.join(state_dir, 'trade_history.json'),
+                                                 store=self.trade_store, clock=self.clock)
+        logger.info("✅ 거래 기록 시스템 초기화")
+        
         # 추매 매니저 초기화
-        self.pyramid_manager = PyramidingManager()
+        self.pyramid_manager = PyramidingManager(clock=self.clock, store=self.trade_store,
+                                                 journal=self.position_journal)
         
         # 전략 및 리스크 매니저 초기화
-        self.strategy = ImprovedStrategy()
-        self.risk_manager = RiskManager(self.balance)
+        # 시장 상황 판단은 공용 인스턴스 하나를 전략/리스크/봇이 함께 사용
+        if self.replaying:
+            # 재생은 모델 학습 없이 저장된 모델로 예측 (학습 프로세스는 재생 시세를 볼 수 없음)
+            self.market_analyzer = MarketAnalyzer(clock=self.clock)
+            ml_generator = MLSignalGenerator(model_type=ML_CONFIG['model_type'], clock=self.clock) \
+                if ML_CONFIG['enabled'] else None
+        else:
+            self.market_analyzer = get_market_analyzer()
+            ml_generator = None
+        self.strategy = ImprovedStrategy(market_analyzer=self.market_analyzer, clock=self.clock,
+                                         ml_generator=ml_generator)
+        # 재생은 실거래 initial_balance.txt를 읽거나 덮어쓰지 않음
+        self.risk_manager = RiskManager(self.balance, market_analyzer=self.market_analyzer,
+                                        clock=self.clock,
+                                        balance_file=None if self.replaying else "initial_balance.txt",
+                                        trade_stats=self.trade_history.stats,
+                                        position_journal=self.position_journal)
         
         if hasattr(self.risk_manager, 'need_total_balance_update') and \
            self.risk_manager.need_total_balance_update:
@@ -86,21 +155,18 @@ class TradingBot:
                 logger.error(f"⚠️ 파일 저장 실패: {e}")
             
         # 동적 모멘텀 스캐너 초기화
-        self.momentum_scanner = ImprovedMomentumScanner()
+        self.momentum_scanner = ImprovedMomentumScanner(exchange=self.upbit, clock=self.clock)
         self.dynamic_coins = []
         self.last_scan_time = 0
-        self.daily_summary = DailySummary()
+        self.daily_summary = DailySummary(store=self.trade_store, directory=state_dir)
         
         # 포지션 복구 시스템 추가
-        self.position_recovery = PositionRecovery(self.upbit)
-        self.recover_existing_positions()
-
-        # ✅ 거래 기록 관리자 추가
-        self.trade_history = TradeHistoryManager()
-        logger.info("✅ 거래 기록 시스템 초기화")
+        self.position_recovery = PositionRecovery(self.upbit, store=self.trade_store, directory=state_dir)
 
         # ✅ 물타기 매니저 추가 (여기에 추가!)
-        self.averaging_manager = AveragingDownManager(AVERAGING_DOWN_CONFIG)
+        self.averaging_manager = AveragingDownManager(AVERAGING_DOWN_CONFIG, clock=self.clock,
+                                                      store=self.trade_store,
+                                                      journal=self.position_journal)
         if AVERAGING_DOWN_CONFIG['enabled']:
             logger.info("💧 물타기 시스템 활성화")
             logger.info(f"   트리거: {AVERAGING_DOWN_CONFIG['trigger_loss_rate']:.1%}")
@@ -110,14 +176,43 @@ class TradingBot:
 
         # ✅ 자동 프리셋 매니저 추가
         if ADAPTIVE_PRESET_CONFIG['enabled']:
-            self.preset_manager = AdaptivePresetManager(ADAPTIVE_PRESET_CONFIG)
+            self.preset_manager = AdaptivePresetManager(ADAPTIVE_PRESET_CONFIG, store=self.trade_store,
+                                                        trade_stats=self.trade_history.stats)
             logger.info("🤖 자동 프리셋 전환 시스템 활성화")
         else:
             self.preset_manager = None
         
-        self.last_preset_check = time.time()
+        self.last_preset_check = self.clock.time()
         
-        self.partial_exit_manager = PartialExitManager()
+        self.partial_exit_manager = PartialExitManager(clock=self.clock, journal=self.position_journal)
+        
+        # 포지션 복구 (관리자들이 저널에서 상태를 읽은 뒤) - 재생은 빈 상태에서 시작
+        if not self.replaying:
+            self.recover_existing_positions()
+        
+        # 지표 스냅샷 캐시 {ticker: (마지막 캔들 키, indicators)}
+        self.indicator_cache = {}
+        
+        # 청산 판단 공유 상태 (청산 작업 + 실시간 시세 스레드 + 물타기) - 종목별 잠금
+        self.exit_locks = {}
+        self._exit_locks_guard = threading.Lock()
+        self.position_quantities = {}  # {symbol: (quantity, fetched_at)}
+        self.last_small_position_warning = {}  # 소액 포지션 경고 시간 추적
+        
+        # 진입 분석 워커 풀 + 매수 주문 단계 직렬화
+        self.analysis_executor = ThreadPoolExecutor(
+            max_workers=ADVANCED_CONFIG.get('analysis_workers', 8),
+            thread_name_prefix='analysis'
+        )
+        self.order_lock = threading.Lock()
+        
+        # 실시간 시세 수신 (웹소켓) - 재생 거래소는 현재가를 직접 제공
+        if WEBSOCKET_CONFIG['enabled'] and not self.replaying:
+            self.price_feed = TickerFeed()
+            self.price_feed.add_listener(self._on_price_update)
+            logger.info("📡 웹소켓 실시간 청산 감시 활성화")
+        else:
+            self.price_feed = None
         
         # ✅ iteration 카운터 초기화
         self.iteration = 0
@@ -125,31 +220,42 @@ class TradingBot:
         logger.info(f"봇 초기화 완료. 초기 자본: {self.balance:,.0f} KRW")
 
     def recover_existing_positions(self):
-        """기존 포지션 복구"""
+        """기존 포지션 복구 - 포지션 저널 재생 결과 + 거래소 잔고 1회 조회로 수량 확인"""
         logger.info("="*50)
         logger.info("기존 포지션 확인 중...")
         
-        # 1. 저장된 포지션 로드
-        saved_positions = self.position_recovery.load_positions()
+        # 1. 저장된 포지션 로드 (저널이 비었으면 저장소 - 저널 도입 전 기록)
+        saved_positions = self.position_journal.get('positions') or self.position_recovery.load_positions()
         
         # 2. 거래소와 동기화
         recovered = self.position_recovery.sync_with_exchange(saved_positions)
+        if recovered is None:
+            logger.warning("⚠️ 잔고 조회 실패 - 저장된 포지션 그대로 복구 (수량 미확인)")
+            recovered = saved_positions
         
-        if recovered:
-            # 3. 복구된 포지션을 리스크 매니저에 등록
-            for symbol, pos in recovered.items():
-                self.risk_manager.positions[symbol] = {
-                    'entry_price': pos['entry_price'],
-                    'quantity': pos['quantity'],
-                    'value': pos['entry_price'] * pos['quantity'],
-                    'entry_time': datetime.fromisoformat(pos['entry_time']) if isinstance(pos['entry_time'], str) else pos['entry_time'],
-                    'highest_price': pos['entry_price']
-                }
-                
-                # 전략에도 등록
-                self.strategy.position_entry_time[symbol] = time.time()
-                
-                logger.info(f"✅ 포지션 복구: {symbol} @ {pos['entry_price']:,.0f}")
+        # 3. 복구된 포지션을 리스크 매니저에 등록 (저널도 거래소 기준 상태로 다시 기록)
+        self.risk_manager.positions.clear()
+        for symbol, pos in recovered.items():
+            entry_time = pos['entry_time']
+            self.risk_manager.positions[symbol] = {
+                **pos,
+                'value': pos['entry_price'] * pos['quantity'],
+                'entry_time': datetime.fromisoformat(entry_time) if isinstance(entry_time, str) else entry_time,
+                'highest_price': pos.get('highest_price', pos['entry_price'])
+            }
+            
+            # 전략에도 등록
+            self.strategy.position_entry_time[symbol] = self.clock.time()
+            
+            logger.info(f"✅ 포지션 복구: {symbol} @ {pos['entry_price']:,.0f}")
+        
+        # 4. 보유하지 않은 종목의 부분 매도/물타기/추매 기록 정리
+        for symbol in set(self.partial_exit_manager.executed_exits) - set(recovered):
+            self.partial_exit_manager.reset_position(symbol)
+        for symbol in set(self.averaging_manager.averaging_history) - set(recovered):
+            self.averaging_manager.clear_history(symbol)
+        for symbol in set(self.pyramid_manager.pyramid_history) - set(recovered):
+            self.pyramid_manager.reset_pyramid(symbol)
         
         logger.info(f"복구 완료: {len(recovered)}개 포지션")
         logger.info("="*50)
@@ -205,10 +311,10 @@ class TradingBot:
                     'entry_price': actual_holdings[symbol]['avg_price'],
                     'quantity': actual_holdings[symbol]['quantity'],
                     'value': actual_holdings[symbol]['avg_price'] * actual_holdings[symbol]['quantity'],
-                    'entry_time': datetime.now(),
+                    'entry_time': self.clock.now(),
                     'highest_price': actual_holdings[symbol]['avg_price']
                 }
-                self.strategy.position_entry_time[symbol] = time.time()
+                self.strategy.position_entry_time[symbol] = self.clock.time()
             
             # 3. 수량 불일치 수정
             for symbol in bot_positions & actual_positions:
@@ -220,8 +326,9 @@ class TradingBot:
                     logger.warning(f"   봇 기록: {bot_qty:.8f}")
                     logger.warning(f"   실제: {actual_qty:.8f}")
                     logger.warning(f"   → 실제 수량으로 수정")
-                    self.risk_manager.positions[symbol]['quantity'] = actual_qty
-                    self.risk_manager.positions[symbol]['value'] =                         self.risk_manager.positions[symbol]['entry_price'] * actual_qty
+                    self.risk_manager.positions.update_fields(
+                        symbol, quantity=actual_qty,
+                        value=self.risk_manager.positions[symbol]['entry_price'] * actual_qty)
             
             # 포지션 파일 저장
             self.position_recovery.save_positions(self.risk_manager.positions)
@@ -248,90 +355,92 @@ class TradingBot:
         return 0
     
     def calculate_indicators(self, ticker):
-        """강화된 기술적 지표 계산"""
-        import pandas as pd
-        import numpy as np
-        
+        """강화된 기술적 지표 계산 - 마지막 캔들이 그대로면 이전 스냅샷 재사용"""
         try:
             # OHLCV 데이터 가져오기
-            df = pyupbit.get_ohlcv(ticker, interval="minute60", count=100)
+            df = market_data.get_ohlcv(ticker, interval="minute60", count=100)
             if df is None or len(df) < 50:
                 return None
             
-            # 현재가
-            current_price = df['close'].iloc[-1]
-            
-            # 이동평균선
-            df['sma_20'] = df['close'].rolling(window=20).mean()
-            df['sma_50'] = df['close'].rolling(window=50).mean()
-            
-            # RSI 계산
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['rsi'] = 100 - (100 / (1 + rs))
+            # 마지막 캔들 (시각 + 진행 중인 종가/거래량) 기준 메모이제이션
+            candle_key = (df.index[-1], df['close'].iloc[-1], df['volume'].iloc[-1])
+            cached = self.indicator_cache.get(ticker)
+            if cached and cached[0] == candle_key:
+                return cached[1]
             
-            # MACD
-            df['ema_12'] = df['close'].ewm(span=12, adjust=False).mean()
-            df['ema_26'] = df['close'].ewm(span=26, adjust=False).mean()
-            df['macd'] = df['ema_12'] - df['ema_26']
-            df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-            
-            # 볼륨 비율
-            avg_volume = df['volume'].rolling(window=20).mean().iloc[-1]
-            current_volume = df['volume'].iloc[-1]
-            volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
-            
-            # 변동성 (ATR)
-            high_low = df['high'] - df['low']
-            high_close = np.abs(df['high'] - df['close'].shift())
-            low_close = np.abs(df['low'] - df['close'].shift())
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = np.max(ranges, axis=1)
-            atr = true_range.rolling(14).mean().iloc[-1]
-            volatility = atr / current_price
-            
-            # 예상 수익률 계산 (단순 모멘텀 기반)
-            momentum = (current_price - df['close'].iloc[-20]) / df['close'].iloc[-20]
-            expected_return = momentum * 0.3  # 보수적 추정
-            
-            # 추세 판단
-            if df['sma_20'].iloc[-1] > df['sma_50'].iloc[-1] and current_price > df['sma_20'].iloc[-1]:
-                trend = 'strong_up'
-            elif df['sma_20'].iloc[-1] > df['sma_50'].iloc[-1]:
-                trend = 'up'
-            elif df['sma_20'].iloc[-1] < df['sma_50'].iloc[-1]:
-                trend = 'down'
-            else:
-                trend = 'sideways'
-            
-            return {
-                'price': current_price,
-                'sma_20': df['sma_20'].iloc[-1],
-                'sma_50': df['sma_50'].iloc[-1],                
-                'ema_12': df['ema_12'].iloc[-1],
-                'ema_26': df['ema_26'].iloc[-1],                
-                'rsi': df['rsi'].iloc[-1],
-                'macd': df['macd'].iloc[-1],
-                'macd_signal': df['macd_signal'].iloc[-1],
-                'volume_ratio': volume_ratio,
-                'volatility': volatility,
-                'expected_return': expected_return,
-                'trend': trend
-            }
+            snap = indicator_engine.snapshot(ticker, "minute60", df)
+            indicators = self._indicators_from_snapshot(snap)
+            indicators['candle_time'] = df.index[-1]
+            self.indicator_cache[ticker] = (candle_key, indicators)
+            return indicators
             
         except Exception as e:
             logger.error(f"지표 계산 실패 {ticker}: {e}")
             return None
+    
+    def calculate_indicators_batch(self, tickers):
+        """여러 종목 지표를 한 번에 계산 → {ticker: indicators}
 
+        캔들이 그대로인 종목은 이전 결과를 재사용하고, 나머지는 패널 하나로 묶어 벡터 계산
+        """
+        results = {}
+        frames = {}
+        keys = {}
+        
+        for ticker in tickers:
+            try:
+                df = market_data.get_ohlcv(ticker, interval="minute60", count=100)
+            except Exception as e:
+                logger.error(f"지표 계산 실패 {ticker}: {e}")
+                continue
+            if df is None or len(df) < 50:
+                continue
+            
+            candle_key = (df.index[-1], df['close'].iloc[-1], df['volume'].iloc[-1])
+            cached = self.indicator_cache.get(ticker)
+            if cached and cached[0] == candle_key:
+                results[ticker] = cached[1]
+            else:
+                frames[ticker] = df
+                keys[ticker] = candle_key
+        
+        if not frames:
+            return results
+        
+        try:
+            panel = indicator_engine.build_panel(frames)
+            snapshots = indicator_engine.panel_snapshots(panel, indicator_engine.compute_panel(panel))
+        except Exception as e:
+            logger.error(f"패널 지표 계산 실패: {e}")
+            return results
+        
+        for ticker in frames:
+            snap = snapshots.get(ticker)
+            # 마지막 캔들이 없는 종목(거래 없음)은 채워진 캔들 대신 종목 단독 계산
+            if snap is None or snap['time'] != frames[ticker].index[-1]:
+                indicators = self.calculate_indicators(ticker)
+                if indicators:
+                    results[ticker] = indicators
+                continue
+            indicators = self._indicators_from_snapshot(snap)
+            indicators['candle_time'] = snap['time']
+            self.indicator_cache[ticker] = (keys[ticker], indicators)
+            results[ticker] = indicators
+        
+        return results
+    
+    def _indicators_from_snapshot(self, snap):
+        """스트리밍 지표 스냅샷 → 전략용 지표 dict"""
+        return indicator_engine.strategy_indicators(snap)
+
+    @with_context('scanner', PRIORITY_SCAN)
     def update_trading_pairs(self):
         """거래 대상 동적 업데이트"""
         
         if not DYNAMIC_COIN_CONFIG['enabled']:
             return
         
-        now = time.time()
+        now = self.clock.time()
         
         # 갱신 시간 체크
         if now - self.last_scan_time < DYNAMIC_COIN_CONFIG['refresh_interval']:
@@ -349,9 +458,11 @@ class TradingBot:
         for coin in self.dynamic_coins:
             if coin not in momentum_coins and coin not in STABLE_PAIRS:
                 # 포지션 있으면 청산
-                if coin in self.risk_manager.positions:
-                    logger.info(f"모멘텀 상실: {coin} 청산")
-                    self.execute_trade(coin, 'sell')
+                # 청산 스레드/실시간 시세 청산과 겹치지 않도록 종목 잠금 후 다시 확인
+                with self._exit_lock(coin):
+                    if coin in self.risk_manager.positions:
+                        logger.info(f"모멘텀 상실: {coin} 청산")
+                        self.execute_trade(coin, 'sell')
         
         # 새로운 리스트 구성
         self.dynamic_coins = momentum_coins
@@ -363,26 +474,22 @@ class TradingBot:
         logger.info(f"거래 대상 업데이트: {', '.join(TRADING_PAIRS)}")
         self.last_scan_time = now
     
-    def execute_trade(self, symbol, trade_type, current_price=None, force_stop_loss=False):
-        """거래 실행 (개선된 로직) - ✅ 1번 수정: 실제 체결가 반영"""
+    def open_position(self, symbol, current_price, indicators):
+        """매수 주문 단계 - 한 번에 한 주문만 (리스크 한도/잔고 확인과 주문을 원자적으로)"""
         ticker = f"KRW-{symbol}"
         
-        if current_price is None:
-            current_price = pyupbit.get_current_price(ticker)
-            if not current_price:
-                return False
-        
-        if trade_type == 'buy':
-            # 지표 계산
-            indicators = self.calculate_indicators(ticker)
-            if not indicators:
-                logger.warning(f"{symbol}: 지표 계산 실패")
+        with self.order_lock:
+            # 대기 중 다른 주문으로 포지션이 생겼으면 중복 매수 방지
+            if symbol in self.risk_manager.positions:
+                logger.info(f"{symbol}: 이미 포지션 보유 - 매수 생략")
                 return False
             
-            # 진입 조건 체크
-            can_enter, reason = self.strategy.should_enter_position(symbol, indicators)
-            if not can_enter:
-                logger.info(f"{symbol}: {reason}")
+            # 같은 배치 후보는 평가 시점에만 확인했으므로 앞선 매수를 반영해 다시 확인
+            if not self.strategy.can_trade_today():
+                logger.info(f"{symbol}: 일일 거래 한도 도달 - 매수 생략")
+                return False
+            if self.strategy.is_in_cooldown(symbol):
+                logger.info(f"{symbol}: 쿨다운 중 - 매수 생략")
                 return False
             
             # 리스크 체크
@@ -415,7 +522,7 @@ class TradingBot:
                 if order:
                     # ✅ 실제 체결 정보 파싱
                     # 주문 상세 정보 조회
-                    time.sleep(0.5)  # 체결 대기
+                    self.clock.sleep(0.5)  # 체결 대기
                     order_detail = self.upbit.get_order(order['uuid'])
                     
                     if order_detail:
@@ -449,10 +556,42 @@ class TradingBot:
                     })
                     
                     logger.info(f"✅ 매수 완료: {symbol} @ {actual_price:,.0f} KRW (수량: {actual_quantity:.8f})")
+                    logger.info(f"   지표: RSI {indicators['rsi']:.1f} | 추세 {indicators['trend']} | "
+                                f"변동성 {indicators['volatility']:.3f} | 거래량 {indicators['volume_ratio']:.1f}x")
                     return True
                     
             except Exception as e:
                 logger.error(f"매수 실패: {e}")
+        
+        return False
+    
+    def execute_trade(self, symbol, trade_type, current_price=None, force_stop_loss=False, indicators=None):
+        """거래 실행 (개선된 로직) - ✅ 1번 수정: 실제 체결가 반영"""
+        ticker = f"KRW-{symbol}"
+        
+        # 보유 수량이 바뀌므로 실시간 청산용 수량 캐시 무효화
+        self.position_quantities.pop(symbol, None)
+        
+        if current_price is None:
+            current_price = self.upbit.get_current_price(ticker)
+            if not current_price:
+                return False
+        
+        if trade_type == 'buy':
+            # 지표 계산 (분석 단계에서 계산한 스냅샷이 있으면 재사용)
+            if indicators is None:
+                indicators = self.calculate_indicators(ticker)
+            if not indicators:
+                logger.warning(f"{symbol}: 지표 계산 실패")
+                return False
+            
+            # 진입 조건 체크
+            can_enter, reason = self.strategy.should_enter_position(symbol, indicators)
+            if not can_enter:
+                logger.info(f"{symbol}: {reason}")
+                return False
+            
+            return self.open_position(symbol, current_price, indicators)
                 
         elif trade_type == 'sell':
             # ✅ 손절 시 보유시간 무시
@@ -494,7 +633,7 @@ class TradingBot:
                     logger.info(f"주문 UUID: {order_uuid}")
                     
                     # 체결 대기
-                    time.sleep(1.0)  # 0.5초 → 1초로 증가
+                    self.clock.sleep(1.0)  # 0.5초 → 1초로 증가
                     
                     # 주문 상세 조회
                     order_detail = self.upbit.get_order(order_uuid)
@@ -502,11 +641,11 @@ class TradingBot:
                     if not order_detail:
                         logger.error("주문 상세 정보 조회 실패")
                         # 현재가로 추정
-                        actual_price = pyupbit.get_current_price(ticker)
+                        actual_price = self.upbit.get_current_price(ticker)
                         actual_quantity = quantity
                     elif order_detail.get('state') != 'done':
                         logger.warning(f"주문 미체결 상태: {order_detail.get('state')}")
-                        actual_price = pyupbit.get_current_price(ticker)
+                        actual_price = self.upbit.get_current_price(ticker)
                         actual_quantity = quantity
                     else:
                         # ✅ 체결 완료 - 정확한 정보 파싱
@@ -564,7 +703,7 @@ class TradingBot:
                     # 매수 시 지불한 금액 (실제 매도한 수량에 대한 원가만 계산!)
                     buy_cost = entry_price * actual_quantity  # ✅ 핵심 수정!
 
-                    hold_time = (datetime.now() - position['entry_time']).total_seconds() / 3600
+                    hold_time = (self.clock.now() - position['entry_time']).total_seconds() / 3600
 
                     # 매도 시 받은 금액 (수수료 차감 후)
                     if 'net_received' in locals():
@@ -577,7 +716,7 @@ class TradingBot:
                     pnl_rate = (real_pnl / buy_cost) if buy_cost > 0 else 0.0
 
                     self.trade_history.add_trade({
-                        'timestamp': datetime.now().isoformat(),  # ✅ ISO 문자열로
+                        'timestamp': self.clock.now().isoformat(),  # ✅ ISO 문자열로
                         'symbol': symbol,
                         'type': 'sell',
                         'entry_price': entry_price,
@@ -640,6 +779,7 @@ class TradingBot:
 
         return False
 
+    @with_context('averaging', PRIORITY_ENTRY)
     def check_averaging_down_opportunity(self):
         """물타기 기회 체크 - ✅ 시장 상황 체크 추가"""
         
@@ -647,9 +787,7 @@ class TradingBot:
             return
         
         # ✅ 시장 상황 조회 (최우선!)
-        from market_condition_check import MarketAnalyzer
-        market_analyzer = MarketAnalyzer()
-        market_condition = market_analyzer.analyze_market(TRADING_PAIRS)
+        market_condition = self.market_analyzer.analyze_market(TRADING_PAIRS)
         
         # ✅ 하락장이면 물타기 전체 건너뜀
         if AVERAGING_DOWN_CONFIG.get('disable_on_bear_market', True):
@@ -659,7 +797,9 @@ class TradingBot:
                 return
         
         for symbol in list(self.risk_manager.positions.keys()):
-            position = self.risk_manager.positions[symbol]
+            position = self.risk_manager.positions.get(symbol)
+            if position is None:
+                continue  # 청산 작업이 방금 정리한 포지션
             ticker = f"KRW-{symbol}"
             
             try:
@@ -669,7 +809,7 @@ class TradingBot:
                         continue
                 
                 # 현재가 조회
-                current_price = pyupbit.get_current_price(ticker)
+                current_price = self.upbit.get_current_price(ticker)
                 if not current_price:
                     continue
                 
@@ -680,7 +820,10 @@ class TradingBot:
                 
                 if should_avg:
                     logger.info(f"💧 {symbol} 물타기 신호 발생!")
-                    self.execute_averaging_down(symbol, current_price)
+                    # 같은 종목의 청산 판단과 겹치지 않게
+                    with self._exit_lock(symbol):
+                        if symbol in self.risk_manager.positions:
+                            self.execute_averaging_down(symbol, current_price)
                 
             except Exception as e:
                 logger.error(f"{symbol} 물타기 체크 실패: {e}")
@@ -688,6 +831,7 @@ class TradingBot:
     def execute_averaging_down(self, symbol, current_price):
             """물타기 실행"""
             ticker = f"KRW-{symbol}"
+            self.position_quantities.pop(symbol, None)
             position = self.risk_manager.positions[symbol]
             
             try:
@@ -771,7 +915,7 @@ class TradingBot:
                     logger.error(f"   Order response: {order}")
                     return False
                 
-                time.sleep(0.5)
+                self.clock.sleep(0.5)
                 order_detail = self.upbit.get_order(order['uuid'])
                 
                 if order_detail:
@@ -797,11 +941,12 @@ class TradingBot:
                         new_total_quantity = original_qty + executed_volume
                         
                         # 포지션 정보 갱신
-                        self.risk_manager.positions[symbol].update({
-                            'entry_price': new_avg_price,
-                            'quantity': new_total_quantity,
-                            'value': new_avg_price * new_total_quantity
-                        })
+                        self.risk_manager.positions.update_fields(
+                            symbol,
+                            entry_price=new_avg_price,
+                            quantity=new_total_quantity,
+                            value=new_avg_price * new_total_quantity
+                        )
                         
                         # 성공 로그
                         avg_count = len(self.averaging_manager.averaging_history.get(symbol, []))
@@ -845,7 +990,7 @@ class TradingBot:
         """매도 주문 처리 공통 로직"""
         try:
             # 체결 대기
-            time.sleep(0.5)
+            self.clock.sleep(0.5)
             
             # 주문 상세 조회
             order_detail = self.upbit.get_order(order_uuid)
@@ -889,11 +1034,11 @@ class TradingBot:
                 entry_dt = datetime.fromisoformat(entry_time)
             else:
                 entry_dt = entry_time
-            hold_time_hours = (datetime.now() - entry_dt).total_seconds() / 3600
+            hold_time_hours = (self.clock.now() - entry_dt).total_seconds() / 3600
             
             # 거래 기록 데이터 반환
             trade_data = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': self.clock.now().isoformat(),
                 'symbol': symbol,
                 'type': 'sell',
                 'entry_price': entry_price,
@@ -925,6 +1070,7 @@ class TradingBot:
         
         return avg_count >= max_count
 
+    @with_context('exit', PRIORITY_EXIT)
     def force_close_all_positions(self, reason=""):  # ✅ 여기부터 추가!
         """모든 포지션 강제 청산"""
         logger.warning(f"")
@@ -938,20 +1084,26 @@ class TradingBot:
         for symbol in list(self.risk_manager.positions.keys()):
             try:
                 ticker = f"KRW-{symbol}"
-                current_price = pyupbit.get_current_price(ticker)
+                current_price = self.upbit.get_current_price(ticker)
                 
                 if not current_price:
                     logger.warning(f"{symbol}: 현재가 조회 실패, 건너뜀")
                     continue
                 
-                position = self.risk_manager.positions[symbol]
-                entry_price = position['entry_price']
-                loss_rate = (current_price - entry_price) / entry_price
-                
-                logger.warning(f"🚨 {symbol} 강제 청산 시도 (손실률: {loss_rate:.2%})")
-                
-                # 강제 매도 실행
-                success = self.execute_trade(symbol, 'sell', current_price, force_stop_loss=True)
+                # 청산 스레드/실시간 시세 청산과 겹치지 않도록 종목 잠금 후 다시 확인
+                with self._exit_lock(symbol):
+                    position = self.risk_manager.positions.get(symbol)
+                    if position is None:
+                        logger.info(f"{symbol}: 이미 청산됨, 건너뜀")
+                        continue
+                    
+                    entry_price = position['entry_price']
+                    loss_rate = (current_price - entry_price) / entry_price
+                    
+                    logger.warning(f"🚨 {symbol} 강제 청산 시도 (손실률: {loss_rate:.2%})")
+                    
+                    # 강제 매도 실행
+                    success = self.execute_trade(symbol, 'sell', current_price, force_stop_loss=True)
                 
                 if success:
                     closed_count += 1
@@ -970,151 +1122,252 @@ class TradingBot:
         
         return closed_count
     
+    @with_context('exit', PRIORITY_EXIT)
     def check_exit_conditions(self):
-            """개선된 청산 조건 체크 - 배치 API 호출 최적화"""
-            
-            MIN_ORDER_VALUE = UPBIT_CONFIG['min_order_value']
-            
-            # 소액 포지션 경고 시간 추적
-            if not hasattr(self, 'last_small_position_warning'):
-                self.last_small_position_warning = {}
+            """개선된 청산 조건 체크 - 실시간 시세 우선, 없는 종목만 배치 REST 조회"""
             
-            # 배치 가격 조회 (최적화!)
+            # 보유 종목 가격 (최적화!)
             symbols = list(self.risk_manager.positions.keys())
             if not symbols:
                 return
             
             tickers = [f"KRW-{s}" for s in symbols]
-            current_prices = pyupbit.get_current_price(tickers)
+            current_prices = self.get_current_prices(tickers)
+            
+            for symbol in symbols:
+                current_price = current_prices.get(f"KRW-{symbol}")
+                
+                if not current_price:
+                    continue
+                
+                # 보유 수량 (주기적으로만 재조회 - 매초 잔고 API 호출 방지)
+                current_quantity = self._cached_quantity(symbol)
+                
+                self._evaluate_exit(symbol, current_price, current_quantity)
+
+    def sync_price_feed(self):
+        """웹소켓 구독 종목을 보유 종목 + 거래 대상 종목으로 맞춤"""
+        if not self.price_feed:
+            return
+        
+        symbols = set(self.risk_manager.positions.keys()) | set(TRADING_PAIRS)
+        self.price_feed.subscribe(f"KRW-{s}" for s in symbols)
+
+    def get_current_prices(self, tickers):
+        """현재가 조회 - 웹소켓 가격 장부에서 신선한 것만 쓰고 나머지는 REST 배치 조회"""
+        prices = {}
+        if self.price_feed:
+            prices = self.price_feed.price_book.get_many(
+                tickers, WEBSOCKET_CONFIG.get('max_price_age', 5)
+            )
+        
+        missing = [t for t in tickers if t not in prices]
+        if missing:
+            fetched = self.upbit.get_current_price(missing)
             
             # 단일 심볼인 경우 dict로 변환
-            if len(symbols) == 1 and not isinstance(current_prices, dict):
-                current_prices = {tickers[0]: current_prices}
+            if len(missing) == 1 and not isinstance(fetched, dict):
+                fetched = {missing[0]: fetched}
             
-            for symbol in symbols:
-                try:
-                    ticker = f"KRW-{symbol}"
-                    current_price = current_prices.get(ticker)
-                    
-                    if not current_price:
-                        continue
-                    
+            if fetched:
+                prices.update(fetched)
+        
+        return prices
+
+    @with_context('exit', PRIORITY_EXIT)
+    def _on_price_update(self, ticker, price):
+        """웹소켓 가격 수신 시 해당 보유 종목의 청산 조건 즉시 체크 (시세 스레드)"""
+        symbol = ticker.replace("KRW-", "")
+        if symbol not in self.risk_manager.positions:
+            return
+        
+        # 청산 작업이 이 종목을 판단 중이면 이번 틱은 건너뜀 (다음 틱에서 다시 체크)
+        lock = self._exit_lock(symbol)
+        if not lock.acquire(blocking=False):
+            return
+        try:
+            self._evaluate_exit(symbol, price, self._cached_quantity(symbol))
+        finally:
+            lock.release()
+    
+    def _exit_lock(self, symbol):
+        """종목별 청산 판단 잠금 (다른 종목의 주문이 청산을 막지 않도록)"""
+        with self._exit_locks_guard:
+            lock = self.exit_locks.get(symbol)
+            if lock is None:
+                lock = threading.RLock()
+                self.exit_locks[symbol] = lock
+            return lock
+    
+    def _cached_quantity(self, symbol):
+        """청산 판단용 보유 수량 - quantity_refresh_interval마다, 또는 거래 후에만 재조회"""
+        cached = self.position_quantities.get(symbol)
+        refresh = WEBSOCKET_CONFIG.get('quantity_refresh_interval', 30)
+        if cached is None or self.clock.time() - cached[1] > refresh:
+            cached = (self.get_position_quantity(symbol), self.clock.time())
+            self.position_quantities[symbol] = cached
+        return cached[0]
+
+    def _evaluate_exit(self, symbol, current_price, current_quantity):
+        """단일 종목 청산 조건 체크 - 메인 루프와 시세 스레드에서 공용"""
+        
+        MIN_ORDER_VALUE = UPBIT_CONFIG['min_order_value']
+        
+        with self._exit_lock(symbol):
+            if symbol not in self.risk_manager.positions:
+                return
+            
+            try:
+                position = self.risk_manager.positions[symbol]
+                entry_price = position['entry_price']
+                entry_time = position['entry_time']
+                
+                # ✅ 소액 포지션 체크 (최우선)
+                current_value = current_price * current_quantity
+                if current_value < MIN_ORDER_VALUE:
+                    # 10분마다 경고
+                    now = self.clock.time()
+                    last_warn = self.last_small_position_warning.get(symbol, 0)
+                
+                    if now - last_warn > 600:  # 10분(600초) 경과
+                        logger.warning(f"{symbol}: 소액 포지션 ({current_value:,.0f}원 < {MIN_ORDER_VALUE:,}원)")
+                        logger.warning(f"   → 매도 불가, 가격 상승 대기 중...")
+                        self.last_small_position_warning[symbol] = now
+                
+                    return  # ✅ 손절/익절 시도 안함
+                
+                # 현재 손실률 계산
+                loss_rate = (current_price - entry_price) / entry_price
+                
+                # 1. 부분 매도 체크 (최우선)
+                partial_exit, sold_quantity = self.partial_exit_manager.check_partial_exit(
+                    symbol, entry_price, entry_time, current_price, current_quantity, self.upbit
+                )
+                
+                if partial_exit:
+                    remaining = current_quantity - sold_quantity
+                
+                    if remaining < 0.0001:
+                        self.partial_exit_manager.reset_position(symbol)
+                        self.risk_manager.update_position(symbol, current_price, current_quantity, 'sell')
+                        logger.info(f"✅ {symbol} 전량 청산 완료")
+                    else:
+                        self.risk_manager.positions.update_fields(symbol, quantity=remaining)
+                        self.position_quantities[symbol] = (remaining, self.clock.time())
+                        logger.info(f"ℹ️ {symbol} 남은 수량: {remaining:.8f}")
+                
+                    return
+                
+                # 2. ✅ 손절 체크 (보유시간 무시) - force_stop_loss=True 전달
+                if self.risk_manager.check_stop_loss(symbol, current_price, self.averaging_manager):
+                    logger.warning(f"{symbol}: 🚨 손절 발동 (손실률: {loss_rate:.2%}) - 즉시 실행")
+                    self.execute_trade(symbol, 'sell', current_price, force_stop_loss=True)
+                    self.partial_exit_manager.reset_position(symbol)
+                    return
+                
+                # 3. 추적 손절 체크
+                if self.risk_manager.check_trailing_stop(symbol, current_price):
+                    # ✅ 현재 수익/손실 상태 확인
                     position = self.risk_manager.positions[symbol]
                     entry_price = position['entry_price']
-                    entry_time = position['entry_time']
-                    
-                    # ✅ 현재 보유 수량 먼저 조회
-                    current_quantity = self.get_position_quantity(symbol)
-                    
-                    # ✅ 소액 포지션 체크 (최우선)
-                    current_value = current_price * current_quantity
-                    if current_value < MIN_ORDER_VALUE:
-                        # 10분마다 경고
-                        now = time.time()
-                        last_warn = self.last_small_position_warning.get(symbol, 0)
-                        
-                        if now - last_warn > 600:  # 10분(600초) 경과
-                            logger.warning(f"{symbol}: 소액 포지션 ({current_value:,.0f}원 < {MIN_ORDER_VALUE:,}원)")
-                            logger.warning(f"   → 매도 불가, 가격 상승 대기 중...")
-                            self.last_small_position_warning[symbol] = now
-                        
-                        continue  # ✅ 손절/익절 시도 안함
-                    
-                    # 현재 손실률 계산
-                    loss_rate = (current_price - entry_price) / entry_price
-                    
-                    # 1. 부분 매도 체크 (최우선)
-                    partial_exit, sold_quantity = self.partial_exit_manager.check_partial_exit(
-                        symbol, entry_price, entry_time, current_price, current_quantity, self.upbit
-                    )
-                    
-                    if partial_exit:
-                        remaining = current_quantity - sold_quantity
-                        
-                        if remaining < 0.0001:
-                            self.partial_exit_manager.reset_position(symbol)
-                            self.risk_manager.update_position(symbol, current_price, current_quantity, 'sell')
-                            logger.info(f"✅ {symbol} 전량 청산 완료")
-                        else:
-                            self.risk_manager.positions[symbol]['quantity'] = remaining
-                            logger.info(f"ℹ️ {symbol} 남은 수량: {remaining:.8f}")
-                        
-                        continue
-                    
-                    # 2. ✅ 손절 체크 (보유시간 무시) - force_stop_loss=True 전달
-                    if self.risk_manager.check_stop_loss(symbol, current_price, self.averaging_manager):
-                        logger.warning(f"{symbol}: 🚨 손절 발동 (손실률: {loss_rate:.2%}) - 즉시 실행")
-                        self.execute_trade(symbol, 'sell', current_price, force_stop_loss=True)
+                    current_pnl_rate = (current_price - entry_price) / entry_price
+                
+                    # ✅ 물타기 완료 여부 확인
+                    if self.is_averaging_completed(symbol):
+                        # 물타기 완료 → 추적 손절 실행
+                        logger.warning(f"{symbol}: 🎯 추적 손절 실행 - 수익 보호")
+                        logger.info(f"   현재 수익률: {current_pnl_rate*100:+.2f}%")
+                        logger.info(f"   (물타기 완료 후 추적 손절)")
+                        self.execute_trade(symbol, 'sell', current_price)
                         self.partial_exit_manager.reset_position(symbol)
-                        continue
-                    
-                    # 3. 추적 손절 체크
-                    if self.risk_manager.check_trailing_stop(symbol, current_price):
-                        # ✅ 현재 수익/손실 상태 확인
-                        position = self.risk_manager.positions[symbol]
-                        entry_price = position['entry_price']
-                        current_pnl_rate = (current_price - entry_price) / entry_price
-                        
-                        # ✅ 물타기 완료 여부 확인
-                        if self.is_averaging_completed(symbol):
-                            # 물타기 완료 → 추적 손절 실행
-                            logger.warning(f"{symbol}: 🎯 추적 손절 실행 - 수익 보호")
-                            logger.info(f"   현재 수익률: {current_pnl_rate*100:+.2f}%")
-                            logger.info(f"   (물타기 완료 후 추적 손절)")
-                            self.execute_trade(symbol, 'sell', current_price)
-                            self.partial_exit_manager.reset_position(symbol)
-                            self.averaging_manager.clear_history(symbol)
-                            continue
+                        self.averaging_manager.clear_history(symbol)
+                        return
+                    else:
+                        # 물타기 진행 중 → 수익/손실 상태에 따라 다르게 처리
+                        avg_info = self.averaging_manager.get_averaging_info(symbol)
+                
+                        if current_pnl_rate > 0:
+                            # ✅ 수익 상태 - 추적 손절 보류, 계속 홀딩
+                            logger.info(f"{symbol}: 추적 손절 발동 (최고점 대비 하락)")
+                            logger.info(f"   💰 현재 수익률: +{current_pnl_rate*100:.2f}%")
+                            logger.info(f"   📊 물타기 진행: {avg_info['count']}/{AVERAGING_DOWN_CONFIG['max_averaging_count']}차")
+                            logger.info(f"   ✅ 수익 상태 유지 - 추적 손절 보류, 계속 홀딩")
                         else:
-                            # 물타기 진행 중 → 수익/손실 상태에 따라 다르게 처리
-                            avg_info = self.averaging_manager.get_averaging_info(symbol)
-                            
-                            if current_pnl_rate > 0:
-                                # ✅ 수익 상태 - 추적 손절 보류, 계속 홀딩
-                                logger.info(f"{symbol}: 추적 손절 발동 (최고점 대비 하락)")
-                                logger.info(f"   💰 현재 수익률: +{current_pnl_rate*100:.2f}%")
-                                logger.info(f"   📊 물타기 진행: {avg_info['count']}/{AVERAGING_DOWN_CONFIG['max_averaging_count']}차")
-                                logger.info(f"   ✅ 수익 상태 유지 - 추적 손절 보류, 계속 홀딩")
-                            else:
-                                # ✅ 손실 상태 - 물타기 우선 고려
-                                logger.info(f"{symbol}: 추적 손절 감지 - 물타기 우선")
-                                logger.info(f"   📉 현재 손실률: {current_pnl_rate*100:.2f}%")
-                                logger.info(f"   💧 물타기 진행: {avg_info['count']}/{AVERAGING_DOWN_CONFIG['max_averaging_count']}차")
-                                logger.info(f"   🎯 물타기로 평단가 낮추기 시도")
-                    
-                    # 4. 목표 수익 체크 (남은 수량 전량 매도)
-                    if self.strategy.check_profit_target(entry_price, current_price):
-                        if self.strategy.can_exit_position(symbol):
-                            logger.info(f"{symbol}: 최종 목표 수익 달성")
-                            self.execute_trade(symbol, 'sell', current_price)
-                            self.partial_exit_manager.reset_position(symbol)
+                            # ✅ 손실 상태 - 물타기 우선 고려
+                            logger.info(f"{symbol}: 추적 손절 감지 - 물타기 우선")
+                            logger.info(f"   📉 현재 손실률: {current_pnl_rate*100:.2f}%")
+                            logger.info(f"   💧 물타기 진행: {avg_info['count']}/{AVERAGING_DOWN_CONFIG['max_averaging_count']}차")
+                            logger.info(f"   🎯 물타기로 평단가 낮추기 시도")
                 
-                except Exception as e:
-                    logger.error(f"{symbol} 청산 조건 체크 오류: {e}")
-                    import traceback
-                    logger.error(traceback.format_exc())
+                # 4. 목표 수익 체크 (남은 수량 전량 매도)
+                if self.strategy.check_profit_target(entry_price, current_price):
+                    if self.strategy.can_exit_position(symbol):
+                        logger.info(f"{symbol}: 최종 목표 수익 달성")
+                        self.execute_trade(symbol, 'sell', current_price)
+                        self.partial_exit_manager.reset_position(symbol)
+            except Exception as e:
+                logger.error(f"{symbol} 청산 조건 체크 오류: {e}")
+                import traceback
+                logger.error(traceback.format_exc())
+            
+            finally:
+                # 전량 매도됐으면 다음 틱에서 수량 재조회
+                if symbol not in self.risk_manager.positions:
+                    self.position_quantities.pop(symbol, None)
     
+    @with_context('entry', PRIORITY_ENTRY)
     def analyze_and_trade(self):
-        """시장 분석 및 거래"""
-        for symbol in TRADING_PAIRS:
-            ticker = f"KRW-{symbol}"
-            
+        """시장 분석 및 거래
+        
+        1) 지표: 전 종목 패널 한 번에 계산
+        2) 진입 분석: 종목별로 워커 풀에서 동시 실행
+        3) 주문: 최종 점수 순으로 한 종목씩 (리스크 한도/잔고 확인 포함)
+        """
+        symbols = [s for s in TRADING_PAIRS if s not in self.risk_manager.positions]
+        all_indicators = self.calculate_indicators_batch([f"KRW-{s}" for s in symbols])
+        
+        # ML 예측은 전 종목 한 번에 (종목별 평가는 캐시 사용)
+        self.strategy.prefetch_signals([s for s in symbols if all_indicators.get(f"KRW-{s}")])
+        
+        futures = {
+            self.analysis_executor.submit(
+                bind_context(self._analyze_entry), symbol, all_indicators[f"KRW-{symbol}"]
+            ): symbol
+            for symbol in symbols if all_indicators.get(f"KRW-{symbol}")
+        }
+        
+        candidates = []
+        for future in as_completed(futures):
+            symbol = futures[future]
             try:
-                # 기존 포지션 확인
-                if symbol in self.risk_manager.positions:
-                    continue  # 이미 포지션이 있으면 스킵
-                
-                # 지표 계산
-                indicators = self.calculate_indicators(ticker)
-                if not indicators:
-                    continue
-                
-                # 매수 시도
-                self.execute_trade(symbol, 'buy', indicators['price'])
-                
+                candidate = future.result()
+                if candidate:
+                    candidates.append(candidate)
             except Exception as e:
                 logger.error(f"{symbol} 분석 실패: {e}")
-                continue
+        
+        if not candidates:
+            return
+        
+        candidates.sort(key=lambda c: c['score'], reverse=True)
+        logger.info("🏁 진입 후보: " + ", ".join(
+            f"{c['symbol']}({c['score']:.2f})" for c in candidates
+        ))
+        
+        for candidate in candidates:
+            try:
+                self.open_position(candidate['symbol'], candidate['indicators']['price'],
+                                   candidate['indicators'])
+            except Exception as e:
+                logger.error(f"{candidate['symbol']} 매수 실패: {e}")
+    
+    def _analyze_entry(self, symbol, indicators):
+        """종목 하나 진입 분석 (워커 스레드) → 후보 dict 또는 None"""
+        can_enter, reason, score = self.strategy.evaluate_entry(symbol, indicators)
+        if not can_enter:
+            logger.info(f"{symbol}: {reason}")
+            return None
+        return {'symbol': symbol, 'score': score, 'reason': reason, 'indicators': indicators}
 
     def get_accurate_balance(self):
         """업비트 실제 잔고 기반 정확한 자산 계산"""
@@ -1128,7 +1381,7 @@ class TradingBot:
                 else:
                     qty = float(b['balance']) + float(b['locked'])
                     if qty > 0:
-                        current_price = pyupbit.get_current_price(
+                        current_price = self.upbit.get_current_price(
                             f"KRW-{b['currency']}"
                         )
                         if current_price:
@@ -1139,16 +1392,16 @@ class TradingBot:
             logger.error(f"자산 계산 실패: {e}")
             return self.balance
     
+    @with_context('status', PRIORITY_DASHBOARD)
     def print_status(self):
         """현재 상태 출력"""
         print("\n" + "="*60)
-        print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"⏰ {self.clock.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("="*60)
         
         # 시장 상황 표시
-        from market_condition_check import MarketAnalyzer
-        analyzer = MarketAnalyzer()
-        market = analyzer.analyze_market(TRADING_PAIRS)
+        market = self.market_analyzer.analyze_market(TRADING_PAIRS)
+        market_status = self.market_analyzer.get_status(TRADING_PAIRS)
         
         market_emoji = {
             'bullish': '🐂',
@@ -1156,7 +1409,10 @@ class TradingBot:
             'neutral': '➡️'
         }
         
-        print(f"📈 시장 상황: {market_emoji.get(market, '')} {market.upper()}")
+        freshness = ""
+        if market_status:
+            freshness = f" ({market_status['age']/60:.0f}분 전 판단{', 갱신 필요' if market_status['stale'] else ''})"
+        print(f"📈 시장 상황: {market_emoji.get(market, '')} {market.upper()}{freshness}")
         
         # 프리셋 상태 표시
         if self.preset_manager:
@@ -1175,15 +1431,60 @@ class TradingBot:
         trade_stats = self.strategy.get_trade_statistics()
         print(f"🔄 오늘 거래: {trade_stats['trades_today']}/{self.strategy.max_trades_per_day}")
         print(f"📦 활성 포지션: {trade_stats['active_positions']}/{self.risk_manager.max_positions}")
+
+        # 시세 캐시 통계
+        cache_stats = market_data.get_cache_stats()
+        print(f"📡 OHLCV 캐시: 적중 {cache_stats['hits']} / 증분 {cache_stats['delta_fetches']} "
+              f"/ 미스 {cache_stats['misses']} ({cache_stats['hit_rate']:.0%})")
+        
+        # API 요청 사용량 (호출자별)
+        usage = request_scheduler.get_usage()
+        if usage:
+            print("🚦 API 요청:")
+            for caller, u in sorted(usage.items(), key=lambda x: -x[1]['calls']):
+                print(f"   {caller:10s} {u['calls']:5d}회 | 평균 대기 {u['avg_wait']*1000:.0f}ms "
+                      f"| 최대 대기 {u['max_wait']*1000:.0f}ms | 제한 {u['throttled']}회")
         
+        # 청산 점검 간격 (진입 분석 부하와 무관해야 함)
+        exit_scheduler = getattr(self, 'exit_scheduler', None)
+        if exit_scheduler:
+            job = exit_scheduler.get_status().get('exit')
+            if job:
+                print(f"🛡️ 청산 점검: {job['runs']}회 | 최대 간격 {job['max_interval']:.2f}s "
+                      f"| 최대 소요 {job['max_duration']*1000:.0f}ms")
+        
+        # ML 모델 상태 (첫 모델 전에는 중립 모드)
+        if self.strategy.ml_generator:
+            trainer = self.strategy.model_trainer.get_status() if self.strategy.model_trainer else {}
+            mode = "사용 중" if self.strategy.ml_generator.is_trained else "중립 (모델 준비 중)"
+            training = " | 백그라운드 학습 중" if trainer.get('running') else ""
+            last = ""
+            if trainer.get('last_outcome'):
+                accuracy = trainer.get('holdout_accuracy')
+                last = f" | 최근 학습: {trainer['last_outcome']}"
+                if accuracy is not None:
+                    last += f" (홀드아웃 {accuracy:.1%})"
+                if trainer.get('recent_success_rate') is not None:
+                    last += f" | 최근 신호 성공률 {trainer['recent_success_rate']:.1%}"
+            print(f"🤖 ML: {mode}{training}{last}")
+        
+        # 진입 신호별 지연
+        latency = self.strategy.get_signal_latency()
+        if latency:
+            print("⏱️ 신호 지연: " + " | ".join(
+                f"{source} 평균 {l['avg']*1000:.0f}ms/최대 {l['max']*1000:.0f}ms"
+                + (f" (초과 {l['timeouts']})" if l['timeouts'] else "")
+                for source, l in latency.items()
+            ))
+
         # 포지션 상태
         if self.risk_manager.positions:
             print("\n📌 보유 포지션:")
             for symbol, position in self.risk_manager.positions.items():
-                current_price = pyupbit.get_current_price(f"KRW-{symbol}")
+                current_price = self.upbit.get_current_price(f"KRW-{symbol}")
                 if current_price:
                     pnl = (current_price - position['entry_price']) / position['entry_price'] * 100
-                    holding_time = (datetime.now() - position['entry_time']).total_seconds() / 3600
+                    holding_time = (self.clock.now() - position['entry_time']).total_seconds() / 3600
                     print(f"  {symbol}: {pnl:+.2f}% (보유 {holding_time:.1f}시간)")
         
         # 경고 메시지
@@ -1195,161 +1496,211 @@ class TradingBot:
         
         print("="*60)
     
+    def run_preset_check(self):
+        """Adaptive Preset Manager - 자동 프리셋 조정 (주기 작업)"""
+        if not (self.preset_manager and ADAPTIVE_PRESET_CONFIG['enabled']):
+            return
+        
+        logger.info("\n" + "="*60)
+        logger.info("🔍 자동 프리셋 조정 체크")
+        logger.info("="*60)
+        
+        try:
+            # 시장 분석 및 프리셋 추천
+            with request_scheduler.context('preset', PRIORITY_SCAN):
+                recommendation = self.preset_manager.auto_adjust_preset(TRADING_PAIRS)
+            self.last_preset_check = self.clock.time()
+
+            # ✅ 강제 전환 조건 체크
+            force_config = ADAPTIVE_PRESET_CONFIG.get('force_conservative_on', {})
+
+            # 1. 연속 손실로 인한 강제 전환
+            consecutive = recommendation.get('consecutive_result', {})
+            if consecutive.get('type') == 'loss':
+                loss_count = consecutive.get('count', 0)
+                threshold = force_config.get('consecutive_losses', 4)
+
+                if loss_count >= threshold:
+                    logger.warning(f"\n{'='*60}")
+                    logger.warning(f"🚨 연속 {loss_count}회 손실 감지!")
+                    logger.warning(f"   임계값: {threshold}회")
+                    logger.warning(f"{'='*60}\n")
+
+                    # ✅ 추가: 기존 포지션 강제 청산
+                    if len(self.risk_manager.positions) > 0:
+                        logger.warning(f"🚨 기존 포지션 {len(self.risk_manager.positions)}개 강제 청산 시작")
+                        self.force_close_all_positions(f"연속 {loss_count}회 손실")
+
+                    logger.warning(f"   → 보수적 모드로 강제 전환")
+                    self.preset_manager.switch_preset('conservative', force=True)
+
+            # 2. 일일 손실률로 인한 강제 전환
+            risk_status = self.risk_manager.get_risk_status()
+            daily_loss_rate = abs(risk_status.get('daily_pnl_rate', 0))
+            loss_threshold = force_config.get('daily_loss_rate', 0.03)
+
+            if daily_loss_rate >= loss_threshold:
+                logger.warning(f"\n{'='*60}")
+                logger.warning(f"🚨 일일 손실률 {daily_loss_rate:.1%} 초과!")
+                logger.warning(f"   임계값: {loss_threshold:.1%}")
+                logger.warning(f"{'='*60}\n")
+
+                # ✅ 추가: 기존 포지션 강제 청산
+                if len(self.risk_manager.positions) > 0:
+                    logger.warning(f"🚨 기존 포지션 {len(self.risk_manager.positions)}개 강제 청산 시작")
+                    self.force_close_all_positions(f"일일 손실률 {daily_loss_rate:.1%}")
+
+                logger.warning(f"   → 보수적 모드로 강제 전환")
+                self.preset_manager.switch_preset('conservative', force=True)
+
+            # 3. 고변동성으로 인한 강제 전환
+            with request_scheduler.context('preset', PRIORITY_SCAN):
+                market_analysis = self.preset_manager.analyze_market_condition(TRADING_PAIRS)
+            volatility = market_analysis.get('volatility', 0)
+            vol_threshold = force_config.get('high_volatility', 0.05)
+
+            if volatility >= vol_threshold:
+                logger.warning(f"\n{'='*60}")
+                logger.warning(f"🚨 고변동성 감지: {volatility:.1%}")
+                logger.warning(f"   임계값: {vol_threshold:.1%}")
+                logger.warning(f"   → 즉시 보수적 모드로 강제 전환")
+                logger.warning(f"{'='*60}\n")
+
+                self.preset_manager.switch_preset('conservative', force=True)
+
+        except Exception as e:
+            logger.error(f"프리셋 조정 중 오류: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+    
+    def refresh_watchlist(self):
+        """동적 코인 업데이트 + 실시간 시세 구독 종목 갱신"""
+        self.update_trading_pairs()
+        self.sync_price_feed()
+    
+    def entry_cycle(self):
+        """신규 진입 탐색 - 캔들 마감마다"""
+        self.iteration += 1
+        
+        # 일일 손실 한도 체크 (청산은 계속)
+        if self.risk_manager.check_daily_loss_limit():
+            logger.warning("일일 손실 한도 도달. 신규 진입 중단, 청산은 계속")
+            return
+        
+        if self.strategy.can_trade_today():
+            self.analyze_and_trade()
+    
+    def daily_reset(self):
+        """매일 자정 - 전일 요약 확정 및 일일 통계 리셋"""
+        yesterday = (self.clock.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        self.daily_summary.finalize_day(yesterday)
+        self.risk_manager.reset_daily_stats()
+        logger.info("일일 통계 리셋 및 저장 완료")
+    
+    def build_schedulers(self):
+        """작업 등록 - 빠른 청산 작업과 느린 진입/관리 작업을 서로 다른 스레드로
+        
+        청산 (exit 스레드):
+        - 시세 이벤트마다 (웹소켓 리스너) + exit_check_interval(1초) 점검
+        - 진입 분석이 얼마나 걸리든 점검 간격이 유지됨
+        
+        진입/관리 (메인 스레드):
+        - 진입: entry_intervals 캔들 마감마다
+        - 물타기/동적 코인/프리셋/ML 재학습/저장/상태 출력: 각자 주기
+        - 일일 리셋: 매일 정해진 시각
+        """
+        exit_scheduler = EventScheduler(clock=self.clock.time)
+        exit_scheduler.every(EVENT_LOOP_CONFIG['exit_check_interval'], self.check_exit_conditions,
+                             'exit', run_now=True)
+        
+        scheduler = EventScheduler(clock=self.clock.time)
+        scheduler.every(EVENT_LOOP_CONFIG['pair_refresh_interval'], self.refresh_watchlist,
+                        'watchlist', run_now=True)
+        scheduler.every(EVENT_LOOP_CONFIG['averaging_check_interval'],
+                        self.check_averaging_down_opportunity, 'averaging')
+        scheduler.on_candle_close(EVENT_LOOP_CONFIG['entry_intervals'], self.entry_cycle, 'entry',
+                                  delay=EVENT_LOOP_CONFIG['candle_close_delay'], run_now=True)
+        
+        if self.preset_manager and ADAPTIVE_PRESET_CONFIG['enabled']:
+            scheduler.every(ADAPTIVE_PRESET_CONFIG.get('check_interval', 3600),  # 기본 1시간
+                            self.run_preset_check, 'preset')
+        
+        if self.strategy.model_trainer:
+            # ML 재학습 - 별도 프로세스, 끝나면 검증 후 자동 교체
+            scheduler.every(ML_CONFIG['training']['auto_retrain_days'] * 86400,
+                            self.strategy.retrain_ml_model, 'ml_retrain')
+        
+        scheduler.every(STRATEGY_CONFIG['position_save_interval'], self.save_current_positions, 'save')
+        scheduler.every(STRATEGY_CONFIG['status_print_interval'], self.print_status, 'status')
+        
+        hour, minute = EVENT_LOOP_CONFIG.get('daily_reset_time', (0, 0))
+        scheduler.daily(hour, minute, self.daily_reset, 'daily_reset')
+        return exit_scheduler, scheduler
+    
     def run(self):
-        """메인 실행 루프 - ✅ 2번 수정: Adaptive Preset Manager 통합"""
+        """메인 실행 루프 - 청산 작업(별도 스레드) + 진입/관리 작업(메인 스레드)"""
         logger.info("="*60)
         logger.info("트레이딩 봇 시작")
         logger.info(f"초기 자본: {self.balance:,.0f} KRW")
         logger.info(f"거래 대상: {', '.join(TRADING_PAIRS)}")
         logger.info("="*60)
         
-        last_status_time = time.time()
-        status_interval = STRATEGY_CONFIG['status_print_interval']
-        last_save_time = time.time()
-        save_interval = STRATEGY_CONFIG['position_save_interval']
-        preset_check_interval = ADAPTIVE_PRESET_CONFIG.get('check_interval', 3600)
-    
+        if self.price_feed:
+            self.sync_price_feed()
+            self.price_feed.start()
         
-        # ✅ 프리셋 자동 조정 간격
-        preset_check_interval = ADAPTIVE_PRESET_CONFIG.get('check_interval', 3600)  # 기본 1시간
-              
+        self.exit_scheduler, self.scheduler = self.build_schedulers()
+        exit_thread = threading.Thread(target=self.exit_scheduler.run, name='ExitLoop', daemon=True)
+        exit_thread.start()
         
-        while True:
-            try:
-                self.iteration += 1
-                current_time = datetime.now()    
-    
-                # 일일 손실 한도 체크
-                daily_loss_limit_reached = self.risk_manager.check_daily_loss_limit()
-                if daily_loss_limit_reached:
-                    logger.warning("일일 손실 한도 도달. 신규 진입 중단, 청산은 계속")
-                    # continue 제거! ← 중요!
-                
-                # ✅ Adaptive Preset Manager - 자동 프리셋 조정
-                if self.preset_manager and ADAPTIVE_PRESET_CONFIG['enabled']:
-                    current_time = time.time()
-                    
-                    # 주기적 체크 (기본 1시간)
-                    if current_time - self.last_preset_check >= preset_check_interval:
-                        logger.info("\n" + "="*60)
-                        logger.info("🔍 자동 프리셋 조정 체크")
-                        logger.info("="*60)
-                        
-                        try:
-                            # 시장 분석 및 프리셋 추천
-                            recommendation = self.preset_manager.auto_adjust_preset(TRADING_PAIRS)
-                            self.last_preset_check = current_time
-                            
-                            # ✅ 강제 전환 조건 체크
-                            force_config = ADAPTIVE_PRESET_CONFIG.get('force_conservative_on', {})
-                            
-                            # 1. 연속 손실로 인한 강제 전환
-                            consecutive = recommendation.get('consecutive_result', {})
-                            if consecutive.get('type') == 'loss':
-                                loss_count = consecutive.get('count', 0)
-                                threshold = force_config.get('consecutive_losses', 4)
-                                
-                                if loss_count >= threshold:
-                                    logger.warning(f"\n{'='*60}")
-                                    logger.warning(f"🚨 연속 {loss_count}회 손실 감지!")
-                                    logger.warning(f"   임계값: {threshold}회")
-                                    logger.warning(f"{'='*60}\n")
-                                    
-                                    # ✅ 추가: 기존 포지션 강제 청산
-                                    if len(self.risk_manager.positions) > 0:
-                                        logger.warning(f"🚨 기존 포지션 {len(self.risk_manager.positions)}개 강제 청산 시작")
-                                        self.force_close_all_positions(f"연속 {loss_count}회 손실")
-                                    
-                                    logger.warning(f"   → 보수적 모드로 강제 전환")
-                                    self.preset_manager.switch_preset('conservative', force=True)
-                            
-                            # 2. 일일 손실률로 인한 강제 전환
-                            risk_status = self.risk_manager.get_risk_status()
-                            daily_loss_rate = abs(risk_status.get('daily_pnl_rate', 0))
-                            loss_threshold = force_config.get('daily_loss_rate', 0.03)
-                            
-                            if daily_loss_rate >= loss_threshold:
-                                logger.warning(f"\n{'='*60}")
-                                logger.warning(f"🚨 일일 손실률 {daily_loss_rate:.1%} 초과!")
-                                logger.warning(f"   임계값: {loss_threshold:.1%}")
-                                logger.warning(f"{'='*60}\n")
-                                
-                                # ✅ 추가: 기존 포지션 강제 청산
-                                if len(self.risk_manager.positions) > 0:
-                                    logger.warning(f"🚨 기존 포지션 {len(self.risk_manager.positions)}개 강제 청산 시작")
-                                    self.force_close_all_positions(f"일일 손실률 {daily_loss_rate:.1%}")
-                                
-                                logger.warning(f"   → 보수적 모드로 강제 전환")
-                                self.preset_manager.switch_preset('conservative', force=True)
-                            
-                            # 3. 고변동성으로 인한 강제 전환
-                            market_analysis = self.preset_manager.analyze_market_condition(TRADING_PAIRS)
-                            volatility = market_analysis.get('volatility', 0)
-                            vol_threshold = force_config.get('high_volatility', 0.05)
-                            
-                            if volatility >= vol_threshold:
-                                logger.warning(f"\n{'='*60}")
-                                logger.warning(f"🚨 고변동성 감지: {volatility:.1%}")
-                                logger.warning(f"   임계값: {vol_threshold:.1%}")
-                                logger.warning(f"   → 즉시 보수적 모드로 강제 전환")
-                                logger.warning(f"{'='*60}\n")
-                                
-                                self.preset_manager.switch_preset('conservative', force=True)
-                            
-                        except Exception as e:
-                            logger.error(f"프리셋 조정 중 오류: {e}")
-                            import traceback
-                            logger.error(traceback.format_exc())
-                
-                # 동적 코인 업데이트 (6시간마다)
-                self.update_trading_pairs()                
-                
-                self.check_averaging_down_opportunity()
-                
-                # 청산 조건 체크
-                self.check_exit_conditions()
-                
-                # 새로운 거래 기회 탐색
-                if self.strategy.can_trade_today() and not daily_loss_limit_reached:
-                    self.analyze_and_trade()
-                else:
-                    if daily_loss_limit_reached:
-                        logger.info("신규 진입 차단 중 (일일 손실 한도)")
-                
-                # 주기적 상태 출력
-                if time.time() - last_status_time > status_interval:
-                    self.print_status()
-                    last_status_time = time.time()
-                
-                # 주기적으로 포지션 저장
-                if time.time() - last_save_time > save_interval:
-                    self.save_current_positions()
-                    last_save_time = time.time()
-                
-                # 대기
-                time.sleep(10)  # 10초 대기
-                
-                # 매일 자정 리셋
-                current_time = datetime.now()
-                if current_time.hour == 0 and current_time.minute == 0:
-                    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-                    self.daily_summary.finalize_day(yesterday)                    
-                    self.risk_manager.reset_daily_stats()
-                    logger.info("일일 통계 리셋 및 저장 완료")
-                
-            except KeyboardInterrupt:
-                logger.info("봇 종료 중... 포지션 저장")
-                self.save_current_positions()
-                break
-                
-            except Exception as e:
-                logger.error(f"예상치 못한 오류: {e}")
-                time.sleep(60)
+        try:
+            self.scheduler.run()
+        except KeyboardInterrupt:
+            logger.info("봇 종료 중... 포지션 저장")
+            self.save_current_positions()
+            self.position_journal.snapshot()
+        
+        self.exit_scheduler.stop()
+        exit_thread.join(5)
+        if self.price_feed:
+            self.price_feed.stop()
+        self.analysis_executor.shutdown(wait=False)
+        if self.strategy.model_trainer:
+            self.strategy.model_trainer.shutdown()
         
         # 종료 시 최종 상태 출력
         self.print_status()
         logger.info("트레이딩 봇 종료")
 
+    def replay(self, until):
+        """기록 재생 - run()과 같은 작업을 한 스레드에서 시계를 다음 예약 시각으로 건너뛰며 실행
+        
+        - until: 재생 종료 시각 (UTC epoch 또는 KST datetime/문자열)
+        - 잠들지 않으므로 실제 시간과 무관하게 결정적 (같은 기록 → 같은 결과)
+        - 시계는 set()/sleep()으로 앞으로 갈 수 있어야 함 (SimulatedClock)
+        """
+        until = candle_archive.to_epoch(until)
+        self.exit_scheduler, self.scheduler = self.build_schedulers()
+        schedulers = (self.exit_scheduler, self.scheduler)
+        
+        started = time.monotonic()
+        replay_start = self.clock.time()
+        while True:
+            for scheduler in schedulers:
+                scheduler.run_pending()
+            due = [d for d in (s.next_due() for s in schedulers) if d is not None]
+            if not due or min(due) > until:
+                break
+            self.clock.set(min(due))
+        self.clock.set(until)
+        
+        self.analysis_executor.shutdown(wait=False)
+        elapsed = time.monotonic() - started
+        speed = (until - replay_start) / elapsed if elapsed > 0 else float('inf')
+        logger.info(f"재생 완료: {(until - replay_start) / 3600:.1f}시간 → {elapsed:.1f}초 ({speed:,.0f}배속)")
+        return elapsed
+
+    @with_context('exit', PRIORITY_EXIT)
     def force_sell(self, symbol, current_price):
         """강제 매도 (보유시간 무시) - ✅ 거래 기록 추가"""
         ticker = f"KRW-{symbol}"
@@ -1364,12 +1715,12 @@ class TradingBot:
                     entry_time = position.get('entry_time')
                 else:
                     entry_price = current_price  # 진입가 정보 없으면 현재가로
-                    entry_time = datetime.now()
+                    entry_time = self.clock.now()
                 
                 order = self.upbit.sell_market_order(ticker, quantity)
                 if order:
                     # 체결 정보 대기 및 조회
-                    time.sleep(0.5)
+                    self.clock.sleep(0.5)
                     order_detail = self.upbit.get_order(order['uuid'])
                     
                     # 실제 매도가 계산
@@ -1397,11 +1748,11 @@ class TradingBot:
                         entry_dt = datetime.fromisoformat(entry_time)
                     else:
                         entry_dt = entry_time
-                    hold_time_hours = (datetime.now() - entry_dt).total_seconds() / 3600
+                    hold_time_hours = (self.clock.now() - entry_dt).total_seconds() / 3600
                     
                     # ✅ 거래 기록 추가
                     self.trade_history.add_trade({
-                        'timestamp': datetime.now().isoformat(),
+                        'timestamp': self.clock.now().isoformat(),
                         'symbol': symbol,
                         'type': 'sell',
                         'entry_price': entry_price,
@@ -1428,6 +1779,7 @@ class TradingBot:
         
         return False
 
+    @with_context('exit', PRIORITY_EXIT)
     def force_sell_all_positions(self):
         """강제로 모든 포지션 청산 (보유시간 무시) - ✅ 거래 기록 추가"""
         logger.info("강제 청산 모드 시작")
@@ -1449,7 +1801,7 @@ class TradingBot:
                 
                 if quantity > 0:
                     # 현재가 조회
-                    current_price = pyupbit.get_current_price(ticker)
+                    current_price = self.upbit.get_current_price(ticker)
                     if not current_price:
                         logger.warning(f"{symbol}: 현재가 조회 실패")
                         continue
@@ -1459,7 +1811,7 @@ class TradingBot:
                     
                     if order:
                         # 체결 정보 대기
-                        time.sleep(0.5)
+                        self.clock.sleep(0.5)
                         order_detail = self.upbit.get_order(order['uuid'])
                         
                         # 실제 매도가 계산
@@ -1487,11 +1839,11 @@ class TradingBot:
                             entry_dt = datetime.fromisoformat(entry_time)
                         else:
                             entry_dt = entry_time
-                        hold_time_hours = (datetime.now() - entry_dt).total_seconds() / 3600
+                        hold_time_hours = (self.clock.now() - entry_dt).total_seconds() / 3600
                         
                         # ✅ 거래 기록 추가
                         self.trade_history.add_trade({
-                            'timestamp': datetime.now().isoformat(),
+                            'timestamp': self.clock.now().isoformat(),
                             'symbol': symbol,
                             'type': 'sell',
                             'entry_price': entry_price,
@@ -1528,7 +1880,7 @@ def test_run(bot):
     
     while True:
         try:
-            print(f"\n⏰ {datetime.now().strftime('%H:%M:%S')}")
+            print(f"\n⏰ {bot.clock.now().strftime('%H:%M:%S')}")
             
             for symbol in TRADING_PAIRS:
                 ticker = f"KRW-{symbol}"
@@ -1552,18 +1904,17 @@ def test_run(bot):
                         print(f"   ⚪ {reason}")
             
             print("\n" + "-"*60)
-            time.sleep(60)  # 1분 대기
+            bot.clock.sleep(60)  # 1분 대기
             
         except KeyboardInterrupt:
             print("\n테스트 종료")
             break
         except Exception as e:
             print(f"오류: {e}")
-            time.sleep(60)
+            bot.clock.sleep(60)
 
 # 실행 스크립트
 if __name__ == "__main__":
-    import os
     from dotenv import load_dotenv
     
     # 환경변수 로드
@@ -1598,7 +1949,7 @@ if __name__ == "__main__":
         print("\n" + "="*50)
         print("📦 기존 포지션 발견:")
         for symbol, pos in bot.risk_manager.positions.items():
-            current_price = pyupbit.get_current_price(f"KRW-{symbol}")
+            current_price = bot.upbit.get_current_price(f"KRW-{symbol}")
             if current_price:
                 pnl = (current_price - pos['entry_price']) / pos['entry_price'] * 100
                 print(f"  {symbol}: {pnl:+.2f}% (진입가: {pos['entry_price']:,.0f})")
@@ -1638,14 +1989,14 @@ if __name__ == "__main__":
                     quantity = bot.get_position_quantity(symbol)
                     if quantity > 0:
                         # 현재가 조회
-                        current_price = pyupbit.get_current_price(ticker)
+                        current_price = bot.upbit.get_current_price(ticker)
                         
                         # 매도 실행
                         order = bot.upbit.sell_market_order(ticker, quantity)
                         
                         if order:
                             # 체결 정보 대기
-                            time.sleep(0.5)
+                            bot.clock.sleep(0.5)
                             order_detail = bot.upbit.get_order(order['uuid'])
                             
                             # 실제 매도가 계산
@@ -1673,11 +2024,11 @@ if __name__ == "__main__":
                                 entry_dt = datetime.fromisoformat(entry_time)
                             else:
                                 entry_dt = entry_time
-                            hold_time_hours = (datetime.now() - entry_dt).total_seconds() / 3600
+                            hold_time_hours = (bot.clock.now() - entry_dt).total_seconds() / 3600
                             
                             # ✅ 거래 기록 추가
                             bot.trade_history.add_trade({
-                                'timestamp': datetime.now().isoformat(),
+                                'timestamp': bot.clock.now().isoformat(),
                                 'symbol': symbol,
                                 'type': 'sell',
                                 'entry_price': entry_price,
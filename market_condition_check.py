@@ -1,60 +1,133 @@
 # market_condition_check.py - 전체 교체 추천
 
-import pyupbit
-from datetime import datetime
+import threading
+
+import market_data
+from clock import SYSTEM_CLOCK
 import logging
 
 logger = logging.getLogger(__name__)
 
+REGIME_INTERVAL = 'minute240'
+
+
+def regime_score(close):
+    """대장주 하나의 4시간봉 점수 (-2~+2) - 종가 배열은 오래된 순, 6개 이상
+
+    1. 단기 추세: 현재가 vs 24시간 전 (4시간봉 6개 전)
+    2. 초단기 모멘텀: 현재가 vs 4시간 전
+    """
+    price_change = (close[-1] - close[-6]) / close[-6] * 100
+    momentum = (close[-1] - close[-2]) / close[-2] * 100
+    
+    score = 0
+    # 추세 점수
+    if price_change > 1.0: score += 1
+    elif price_change < -1.0: score -= 1
+    
+    # 모멘텀 점수 (가중치 높음)
+    if momentum > 0.5: score += 1
+    elif momentum < -0.5: score -= 1
+    
+    return score
+
+
 class MarketAnalyzer:
-    def __init__(self):
+    """시장 상황(상승/하락/횡보) 판단 - 프로세스 공용 서비스 (get_market_analyzer)
+
+    - 4시간봉 마감 또는 캐시 시간(TTL) 경과 시에만 다시 계산
+    - 대장주 조합별로 결과를 따로 캐시 (TRADING_PAIRS / STABLE_PAIRS)
+    - get_status()로 마지막 계산 후 경과 시간(staleness) 확인
+    """
+    
+    def __init__(self, cache_duration=300, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
         self._market_condition = 'neutral'
         self._market_condition_time = None
         # ⚠️ 캐시 시간을 30분 -> 5분으로 대폭 단축
-        self._cache_duration = 300  
+        self._cache_duration = cache_duration
+        
+        self._results = {}  # {대장주 tuple: {'condition', 'score', 'computed_at', 'bucket'}}
+        self._lock = threading.Lock()       # _results 보호 (계산 중에는 잡지 않음)
+        self._key_locks = {}                # {대장주 tuple: Lock} - 같은 조합은 한 스레드만 계산
+        self.computations = 0
     
-    def analyze_market(self, trading_pairs):
-        """시장 상황 분석 (단기 추세 반영 버전)"""
+    def analyze_market(self, trading_pairs, allow_stale=False):
+        """시장 상황 분석 (단기 추세 반영 버전)
+
+        allow_stale: 다른 스레드가 갱신 중이면 기다리지 않고 지난 판단 반환 (청산 경로)
+        """
+        key = tuple(trading_pairs[:3])
         
-        now = datetime.now()
-        # 캐시 확인
-        if self._market_condition_time:
-            elapsed = (now - self._market_condition_time).total_seconds()
-            if elapsed < self._cache_duration:
-                return self._market_condition
+        with self._lock:
+            cached = self._results.get(key)
+            if cached and not self._is_stale(cached):
+                self._market_condition = cached['condition']
+                return cached['condition']
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
         
-        coins = trading_pairs[:3]  # BTC, ETH, SOL 등 대장주
+        # 같은 조합을 계산 중이면 끝날 때까지 기다렸다가 같은 결과 사용
+        if not key_lock.acquire(blocking=not (allow_stale and cached)):
+            return cached['condition']
+        try:
+            with self._lock:
+                cached = self._results.get(key)
+                if cached and not self._is_stale(cached):
+                    self._market_condition = cached['condition']
+                    return cached['condition']
+            
+            condition, total_score = self._compute(key)
+            now = self.clock.time()
+            with self._lock:
+                self._results[key] = {
+                    'condition': condition,
+                    'score': total_score,
+                    'computed_at': now,
+                    'bucket': market_data.candle_bucket(REGIME_INTERVAL, now),
+                }
+                self._market_condition = condition
+                self._market_condition_time = self.clock.now()
+                self.computations += 1
+            return condition
+        finally:
+            key_lock.release()
+    
+    def _is_stale(self, result, now=None):
+        now = self.clock.time() if now is None else now
+        return (now - result['computed_at'] >= self._cache_duration or
+                market_data.candle_bucket(REGIME_INTERVAL, now) != result['bucket'])
+    
+    def get_status(self, trading_pairs=None):
+        """마지막 판단 상태 {condition, score, age, stale} - 계산하지 않음 (없으면 None)"""
+        with self._lock:
+            if trading_pairs is not None:
+                result = self._results.get(tuple(trading_pairs[:3]))
+            else:
+                result = max(self._results.values(), key=lambda r: r['computed_at'], default=None)
+            if result is None:
+                return None
+            return {
+                'condition': result['condition'],
+                'score': result['score'],
+                'age': self.clock.time() - result['computed_at'],
+                'stale': self._is_stale(result),
+            }
+    
+    def invalidate(self):
+        """다음 호출에서 다시 계산"""
+        with self._lock:
+            self._results.clear()
+    
+    def _compute(self, coins):
+        """대장주 4시간봉으로 시장 점수 계산 → (condition, total_score)"""
+        # coins: BTC, ETH, SOL 등 대장주
         market_scores = []
         
         for coin in coins:
-            ticker = f"KRW-{coin}"
             try:
-                # ⚠️ 핵심 변경: 'day'(일봉) -> 'minute240'(4시간봉)으로 변경
-                # 최근 24시간(4시간봉 6개) 데이터를 봅니다.
-                df = pyupbit.get_ohlcv(ticker, interval="minute240", count=7)
-                
-                if df is not None and len(df) >= 6:
-                    # 1. 단기 추세 (현재가 vs 24시간 전 가격)
-                    price_change = ((df['close'].iloc[-1] - df['close'].iloc[-6]) 
-                                   / df['close'].iloc[-6] * 100)
-                    
-                    # 2. 초단기 모멘텀 (현재가 vs 4시간 전 가격)
-                    momentum = ((df['close'].iloc[-1] - df['close'].iloc[-2]) 
-                               / df['close'].iloc[-2] * 100)
-                    
-                    # 3. 변동성 확인 (박스권 감지용)
-                    high_low_diff = (df['high'].max() - df['low'].min()) / df['low'].min()
-                    
-                    score = 0
-                    # 추세 점수
-                    if price_change > 1.0: score += 1
-                    elif price_change < -1.0: score -= 1
-                    
-                    # 모멘텀 점수 (가중치 높음)
-                    if momentum > 0.5: score += 1
-                    elif momentum < -0.5: score -= 1
-                    
-                    market_scores.append(score)
+                close = self._load_closes(coin)
+                if close is not None:
+                    market_scores.append(regime_score(close))
                     
             except Exception as e:
                 logger.error(f"시장 분석 실패 ({coin}): {e}")
@@ -64,16 +137,24 @@ class MarketAnalyzer:
         total_score = sum(market_scores)
         
         if total_score >= 2:
-            self._market_condition = 'bullish' # 상승장
+            condition = 'bullish' # 상승장
         elif total_score <= -2:
-            self._market_condition = 'bearish' # 하락장
+            condition = 'bearish' # 하락장
         else:
-            self._market_condition = 'neutral' # 횡보/박스권
+            condition = 'neutral' # 횡보/박스권
             
-        self._market_condition_time = now
-        logger.info(f"⚡ 시장 상황 갱신 (4시간 기준): {self._market_condition} (점수: {total_score})")
+        logger.info(f"⚡ 시장 상황 갱신 (4시간 기준): {condition} (점수: {total_score})")
         
-        return self._market_condition
+        return condition, total_score
+
+    def _load_closes(self, coin):
+        """최근 4시간봉 종가 배열 (오래된 순) - 6개 미만이면 None"""
+        # ⚠️ 핵심 변경: 'day'(일봉) -> 'minute240'(4시간봉)으로 변경
+        # 최근 24시간(4시간봉 6개) 데이터를 봅니다.
+        df = market_data.get_ohlcv(f"KRW-{coin}", interval=REGIME_INTERVAL, count=7)
+        if df is None or len(df) < 6:
+            return None
+        return df['close'].to_numpy(dtype=float)
 
     def get_score_adjustment(self, base_score):
         if self._market_condition == 'bullish':
@@ -88,4 +169,13 @@ class MarketAnalyzer:
             return 0.5
         elif self._market_condition == 'bullish':
             return 1.2
-        return 1.0
\ No newline at end of file
+        return 1.0
+
+
+# 프로세스 공용 인스턴스 (전략/리스크/봇/대시보드가 함께 사용)
+_shared_analyzer = MarketAnalyzer()
+
+
+def get_market_analyzer():
+    """공용 시장 분석기"""
+    return _shared_analyzer
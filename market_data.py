@@ -0,0 +1,334 @@
+# market_data.py - 프로세스 공용 OHLCV 캐시 (증분 링 버퍼)
+
+import threading
+import time
+import calendar
+import logging
+import math
+import numpy as np
+import pandas as pd
+import pyupbit
+
+import request_scheduler
+from config import MARKET_DATA_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 업비트 캔들 경계는 UTC 기준 (일봉 = 09:00 KST = 00:00 UTC)
+_WEEK_ORIGIN = 4 * 86400  # 1970-01-05 00:00 UTC (월요일)
+
+_INTERVAL_ALIASES = {
+    'days': 'day',
+    'weeks': 'week',
+    'months': 'month',
+}
+
+
+def normalize_interval(interval):
+    """pyupbit interval 표기 통일 (minutes60 → minute60, days → day)"""
+    if interval.startswith('minutes'):
+        return 'minute' + interval[len('minutes'):]
+    return _INTERVAL_ALIASES.get(interval, interval)
+
+
+def interval_seconds(interval):
+    """캔들 한 개의 길이 (초) - 월봉은 길이가 일정하지 않아 None"""
+    interval = normalize_interval(interval)
+    if interval.startswith('minute'):
+        return int(interval[len('minute'):]) * 60
+    if interval == 'day':
+        return 86400
+    if interval == 'week':
+        return 7 * 86400
+    return None
+
+
+def candle_bucket(interval, now=None):
+    """현재 진행 중인 캔들 번호 - 새 캔들이 열리면 값이 바뀐다"""
+    if now is None:
+        now = time.time()
+    interval = normalize_interval(interval)
+
+    if interval == 'month':
+        t = time.gmtime(now)
+        return t.tm_year * 12 + t.tm_mon - 1
+
+    if interval == 'week':
+        return int((now - _WEEK_ORIGIN) // interval_seconds('week'))
+
+    return int(now // interval_seconds(interval))
+
+
+def candle_open_time(interval, now=None):
+    """현재 진행 중인 캔들의 시작 시각 (UTC epoch)"""
+    interval = normalize_interval(interval)
+    bucket = candle_bucket(interval, now)
+
+    if interval == 'month':
+        year, month = divmod(bucket, 12)
+        return calendar.timegm((year, month + 1, 1, 0, 0, 0))
+
+    if interval == 'week':
+        return _WEEK_ORIGIN + bucket * interval_seconds('week')
+
+    return bucket * interval_seconds(interval)
+
+
+CANDLES_PER_REQUEST = 200  # 업비트 캔들 API 1회 최대 개수
+
+
+def fetch_ohlcv(ticker, interval="day", count=200, to=None):
+    """스케줄러 경유 캔들 조회 (우선순위는 호출 문맥을 따름)
+
+    to: 이 시각 이전 캔들까지 (업비트 기준 - 시간대 없는 문자열은 UTC)
+    pyupbit는 200개씩 나눠 요청하므로 페이지마다 토큰 1개
+    """
+    cost = max(1, math.ceil(count / CANDLES_PER_REQUEST))
+    if to is None:
+        return request_scheduler.call(pyupbit.get_ohlcv, ticker, interval=interval, count=count,
+                                      group='candles', cost=cost)
+    return request_scheduler.call(pyupbit.get_ohlcv, ticker, interval=interval, count=count, to=to,
+                                  group='candles', cost=cost)
+
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'value']
+
+KST_OFFSET = 9 * 3600  # pyupbit 인덱스는 KST 기준
+
+
+class CandleStore:
+    """(ticker, interval) 단위 링 버퍼 캔들 저장소"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._times = np.zeros(capacity, dtype=np.int64)  # 캔들 시작 시각 (ns, KST)
+        self._bars = np.zeros((capacity, len(OHLCV_COLUMNS)))
+        self._start = 0
+        self._size = 0
+
+        self.requested = 0      # 전체 다운로드로 확보한 최대 캔들 수
+        self.bucket = None      # 마지막 동기화 시점의 캔들 번호
+        self.synced_at = 0      # 마지막 동기화 시각
+
+    def __len__(self):
+        return self._size
+
+    def last_time(self):
+        """마지막 캔들 시작 시각 (ns), 비어 있으면 None"""
+        if self._size == 0:
+            return None
+        return int(self._times[(self._start + self._size - 1) % self.capacity])
+
+    def last_open_epoch(self):
+        """마지막 캔들 시작 시각 (UTC epoch 초)"""
+        last = self.last_time()
+        if last is None:
+            return None
+        return last / 1e9 - KST_OFFSET
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+        self.requested = 0
+
+    def grow(self, capacity):
+        """버퍼 확장 (기존 캔들 유지)"""
+        if capacity <= self.capacity:
+            return
+        order = self._order(self._size)
+        times = np.zeros(capacity, dtype=np.int64)
+        bars = np.zeros((capacity, len(OHLCV_COLUMNS)))
+        times[:self._size] = self._times[order]
+        bars[:self._size] = self._bars[order]
+        self._times, self._bars = times, bars
+        self._start = 0
+        self.capacity = capacity
+
+    def merge(self, df):
+        """새 캔들은 뒤에 추가, 진행 중이던 마지막 캔들은 제자리 갱신"""
+        times = df.index.values.astype('datetime64[ns]').astype(np.int64)
+        bars = df[OHLCV_COLUMNS].to_numpy(dtype=float)
+        added = 0
+
+        for t, bar in zip(times, bars):
+            last = self.last_time()
+            if last is not None and t < last:
+                continue  # 이미 확정된 과거 캔들
+
+            if last is not None and t == last:
+                pos = (self._start + self._size - 1) % self.capacity
+            else:
+                pos = (self._start + self._size) % self.capacity
+                if self._size == self.capacity:
+                    self._start = (self._start + 1) % self.capacity
+                else:
+                    self._size += 1
+                added += 1
+
+            self._times[pos] = t
+            self._bars[pos] = bar
+
+        return added
+
+    def to_frame(self, count):
+        """최근 count개 캔들을 pyupbit와 같은 DataFrame으로 반환"""
+        n = min(count, self._size)
+        order = self._order(n)
+        index = pd.to_datetime(self._times[order])
+        return pd.DataFrame(self._bars[order], index=index, columns=OHLCV_COLUMNS)
+
+    def _order(self, n):
+        """최근 n개 캔들의 버퍼 위치 (오래된 순)"""
+        first = self._start + self._size - n
+        return (first + np.arange(n)) % self.capacity
+
+
+class OHLCVCache:
+    """(ticker, interval) 단위 증분 OHLCV 캐시
+
+    - 같은 캔들 안에서는 네트워크 호출 없이 반환 (적중)
+    - 진행 중인 캔들이 오래됐거나 새 캔들이 열리면 마지막 저장 시점 이후
+      1~2개 캔들만 받아서 링 버퍼에 반영 (증분)
+    - 저장된 캔들이 요청보다 적을 때만 전체 구간 다운로드 (미스)
+    """
+
+    def __init__(self, fetcher=None, forming_bar_ttl=None, max_bars=None):
+        self._fetch = fetcher or fetch_ohlcv
+        self.forming_bar_ttl = (MARKET_DATA_CONFIG.get('forming_bar_ttl', 10)
+                                if forming_bar_ttl is None else forming_bar_ttl)
+        self.max_bars = max_bars or MARKET_DATA_CONFIG.get('max_bars', 2000)
+
+        self._stores = {}  # {(ticker, interval): CandleStore}
+        self._lock = threading.Lock()
+
+        # 통계
+        self.hits = 0
+        self.delta_fetches = 0
+        self.misses = 0
+        self.rows_fetched = 0
+
+    def get_ohlcv(self, ticker, interval="day", count=200):
+        """pyupbit.get_ohlcv와 동일한 형태로 캐시된 데이터 반환"""
+        interval = normalize_interval(interval)
+        key = (ticker, interval)
+        now = time.time()
+        bucket = candle_bucket(interval, now)
+
+        with self._lock:
+            store = self._stores.get(key)
+            if store is None:
+                store = CandleStore(max(self.max_bars, count))
+                self._stores[key] = store
+            elif count > store.capacity:
+                store.grow(count)
+
+            if count > store.requested:
+                fetch_count = count
+            elif self._is_fresh(store, bucket, now):
+                self.hits += 1
+                return store.to_frame(count)
+            else:
+                fetch_count = self._delta_count(store, interval, bucket, count)
+
+        df = self._fetch(ticker, interval=interval, count=fetch_count)
+        if df is None or len(df) == 0:
+            return df
+
+        with self._lock:
+            full = fetch_count >= count
+            if full:
+                self.misses += 1
+                store.clear()
+                store.requested = count
+            else:
+                self.delta_fetches += 1
+            self.rows_fetched += len(df)
+
+            store.merge(df)
+            store.bucket = bucket
+            store.synced_at = now
+            return store.to_frame(count)
+
+    def _is_fresh(self, store, bucket, now):
+        """네트워크 호출 없이 반환해도 되는지"""
+        # 새 캔들이 열렸으면 갱신 필요
+        if store.bucket != bucket:
+            return False
+
+        # 진행 중인 캔들은 종가가 계속 바뀌므로 너무 오래되면 갱신
+        if self.forming_bar_ttl and now - store.synced_at >= self.forming_bar_ttl:
+            return False
+
+        return True
+
+    def _delta_count(self, store, interval, bucket, count):
+        """마지막 저장 캔들부터 지금까지 필요한 캔들 수 (저장된 마지막 캔들 포함)"""
+        last_open = store.last_open_epoch()
+        if last_open is None:
+            return count
+
+        missing = bucket - candle_bucket(interval, last_open) + 1
+        if missing < 1 or missing >= count:
+            return count  # 시계 역행 또는 공백이 너무 길면 전체 다운로드
+
+        return missing
+
+    def invalidate(self, ticker=None, interval=None):
+        """캐시 강제 삭제 (인자 생략 시 전체)"""
+        interval = normalize_interval(interval) if interval else None
+        with self._lock:
+            for key in list(self._stores.keys()):
+                if ticker and key[0] != ticker:
+                    continue
+                if interval and key[1] != interval:
+                    continue
+                del self._stores[key]
+
+    def get_stats(self):
+        """캐시 적중 통계"""
+        total = self.hits + self.delta_fetches + self.misses
+        return {
+            'hits': self.hits,
+            'delta_fetches': self.delta_fetches,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total > 0 else 0.0,
+            'rows_fetched': self.rows_fetched,
+            'entries': len(self._stores)
+        }
+
+
+# 프로세스 공용 인스턴스
+_cache = OHLCVCache()
+
+# 캔들 조회 대체 함수 (기록 재생용 거래소의 get_ohlcv) - None이면 거래소/공용 캐시
+_source = None
+
+
+def set_source(source):
+    """프로세스 전체 캔들 조회를 source(ticker, interval=, count=)로 교체 - None이면 원래대로"""
+    global _source
+    _source = source
+
+
+def get_ohlcv(ticker, interval="day", count=200):
+    """OHLCV 조회 - 교체된 캔들 소스가 있으면 그쪽, 아니면 공용 캐시"""
+    if _source is not None:
+        return _source(ticker, interval=interval, count=count)
+    return get_cached_ohlcv(ticker, interval=interval, count=count)
+
+
+def get_cached_ohlcv(ticker, interval="day", count=200):
+    """공용 캐시를 거치는 거래소 OHLCV 조회"""
+    if not MARKET_DATA_CONFIG.get('enabled', True):
+        return fetch_ohlcv(ticker, interval=interval, count=count)
+    return _cache.get_ohlcv(ticker, interval=interval, count=count)
+
+
+def get_cache():
+    """공용 캐시 인스턴스"""
+    return _cache
+
+
+def get_cache_stats():
+    """공용 캐시 적중 통계"""
+    return _cache.get_stats()
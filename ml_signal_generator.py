@@ -2,14 +2,21 @@
 
 import numpy as np
 import pandas as pd
-import pyupbit
+import market_data
+import indicator_engine
+import candle_archive
+import os
 import pickle
 import logging
-from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
 import warnings
+from compiled_forest import CompiledForest
+from clock import SYSTEM_CLOCK
+from request_scheduler import bind_context
+from config import ML_CONFIG
 
 warnings.filterwarnings('ignore')
 logger = logging.getLogger(__name__)
@@ -17,9 +24,11 @@ logger = logging.getLogger(__name__)
 class MLSignalGenerator:
     """머신러닝 기반 진입 신호 생성기"""
     
-    def __init__(self, model_type='random_forest'):
+    def __init__(self, model_type='random_forest', clock=None):
         self.model_type = model_type
+        self.clock = clock or SYSTEM_CLOCK
         self.model = None
+        self.compiled_model = None  # 랜덤 포레스트를 NumPy 배열로 펼친 추론기 (있으면 우선 사용)
         self.scaler = StandardScaler()
         self.feature_names = []
         self.is_trained = False
@@ -27,28 +36,59 @@ class MLSignalGenerator:
         # 모델 파일 경로
         self.model_file = f'ml_model_{model_type}.pkl'
         self.scaler_file = 'ml_scaler.pkl'
+        self.compiled_file = f'ml_model_{model_type}.npz'
         
         # 학습 파라미터
         self.lookback_hours = 168  # 1주일
         self.prediction_horizon = 6  # 6시간 후 예측
         self.min_profit_threshold = 0.015  # 1.5% 이상을 성공으로 간주
         
+        # 예측 캐시 {(symbol, 1시간봉 시작 시각): 결과} - 특성은 캔들마다 한 번만 바뀜
+        self.prediction_cache = {}
+        self._cache_lock = threading.Lock()
+        
+        # 모델 교체(install_model)와 예측이 섞이지 않도록 - 교체마다 버전 증가
+        self._model_lock = threading.RLock()
+        self.model_version = 0
+        
         # 모델 로드 시도
         self._load_model()
     
     def train_model(self, symbols, retrain=False):
-        """모델 학습"""
+        """모델 학습 (동기) - 학습 후 바로 교체 및 저장
+        
+        봇은 model_trainer.ModelTrainer로 별도 프로세스에서 학습한다
+        """
         
         if self.is_trained and not retrain:
             logger.info("이미 학습된 모델이 있습니다.")
             return
         
+        candidate = self.fit_candidate(symbols)
+        if candidate is None:
+            return False
+        
+        self.install_model(candidate['model'], candidate['scaler'], candidate['feature_names'])
+        
+        # 모델 저장
+        self._save_model()
+        
+        logger.info("="*60)
+        return True
+    
+    def fit_candidate(self, symbols, holdout_ratio=0.2):
+        """새 모델 학습 (현재 모델은 건드리지 않음)
+        
+        - 종목별로 시간순 마지막 holdout_ratio 구간을 홀드아웃으로 분리 (미래 데이터 누수 방지)
+        - 반환: {model, scaler, feature_names, train_accuracy, holdout_accuracy,
+                 holdout_precision, samples, X_holdout(원본 특성), y_holdout} 또는 None
+        """
         logger.info("="*60)
         logger.info("🤖 머신러닝 모델 학습 시작")
         logger.info("="*60)
         
-        all_features = []
-        all_labels = []
+        train_parts = []
+        holdout_parts = []
         
         # 각 심볼별 데이터 수집
         for symbol in symbols:
@@ -57,37 +97,40 @@ class MLSignalGenerator:
             features, labels = self._prepare_training_data(symbol)
             
             if features is not None and len(features) > 0:
-                all_features.append(features)
-                all_labels.append(labels)
+                split = int(len(features) * (1 - holdout_ratio))
+                train_parts.append((features.iloc[:split], labels.iloc[:split]))
+                holdout_parts.append((features.iloc[split:], labels.iloc[split:]))
                 logger.info(f"  ✅ {symbol}: {len(features)}개 샘플 수집")
             else:
                 logger.warning(f"  ⚠️ {symbol}: 데이터 부족")
         
-        if not all_features:
+        if not train_parts:
             logger.error("학습 데이터가 없습니다!")
-            return False
+            return None
         
         # 데이터 결합
-        X = pd.concat(all_features, ignore_index=True)
-        y = pd.concat(all_labels, ignore_index=True)
+        X_train = pd.concat([f for f, _ in train_parts], ignore_index=True)
+        y_train = pd.concat([l for _, l in train_parts], ignore_index=True)
+        X_holdout = pd.concat([f for f, _ in holdout_parts], ignore_index=True)
+        y_holdout = pd.concat([l for _, l in holdout_parts], ignore_index=True)
         
-        logger.info(f"\n총 학습 데이터: {len(X)}개")
-        logger.info(f"긍정 샘플: {y.sum()}개 ({y.mean():.1%})")
+        logger.info(f"\n총 학습 데이터: {len(X_train)}개 / 홀드아웃: {len(X_holdout)}개")
+        logger.info(f"긍정 샘플: {y_train.sum()}개 ({y_train.mean():.1%})")
         
-        # 학습/테스트 분할
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
+        if y_train.nunique() < 2 or len(X_holdout) == 0:
+            logger.error("학습/검증 데이터가 부족합니다 (한 클래스만 존재하거나 홀드아웃 없음)")
+            return None
         
         # 스케일링
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_holdout_scaled = scaler.transform(X_holdout)
         
         # 모델 학습
         logger.info("\n모델 학습 중...")
         
         if self.model_type == 'random_forest':
-            self.model = RandomForestClassifier(
+            model = RandomForestClassifier(
                 n_estimators=100,
                 max_depth=10,
                 min_samples_split=20,
@@ -96,50 +139,83 @@ class MLSignalGenerator:
                 n_jobs=-1
             )
         else:  # gradient_boosting
-            self.model = GradientBoostingClassifier(
+            model = GradientBoostingClassifier(
                 n_estimators=100,
                 max_depth=5,
                 learning_rate=0.1,
                 random_state=42
             )
         
-        self.model.fit(X_train_scaled, y_train)
+        model.fit(X_train_scaled, y_train)
         
-        # 평가
-        train_score = self.model.score(X_train_scaled, y_train)
-        test_score = self.model.score(X_test_scaled, y_test)
+        # 평가 (홀드아웃)
+        train_score = model.score(X_train_scaled, y_train)
+        predictions = model.predict(X_holdout_scaled)
+        holdout_score = float(np.mean(predictions == y_holdout.values))
+        signals = predictions == 1
+        holdout_precision = float(np.mean(y_holdout.values[signals] == 1)) if signals.any() else 0.0
         
         logger.info(f"\n✅ 학습 완료!")
         logger.info(f"  학습 정확도: {train_score:.1%}")
-        logger.info(f"  테스트 정확도: {test_score:.1%}")
+        logger.info(f"  홀드아웃 정확도: {holdout_score:.1%} (매수 신호 정밀도 {holdout_precision:.1%})")
         
         # 특성 중요도
-        if hasattr(self.model, 'feature_importances_'):
+        if hasattr(model, 'feature_importances_'):
             importance = pd.DataFrame({
-                'feature': X.columns,
-                'importance': self.model.feature_importances_
+                'feature': X_train.columns,
+                'importance': model.feature_importances_
             }).sort_values('importance', ascending=False)
             
             logger.info(f"\n주요 특성 (Top 5):")
             for idx, row in importance.head(5).iterrows():
                 logger.info(f"  {row['feature']}: {row['importance']:.3f}")
         
-        self.feature_names = list(X.columns)
-        self.is_trained = True
-        
-        # 모델 저장
-        self._save_model()
-        
-        logger.info("="*60)
-        return True
+        return {
+            'model': model,
+            'scaler': scaler,
+            'feature_names': list(X_train.columns),
+            'train_accuracy': float(train_score),
+            'holdout_accuracy': holdout_score,
+            'holdout_precision': holdout_precision,
+            'samples': len(X_train),
+            'X_holdout': X_holdout,
+            'y_holdout': y_holdout,
+        }
+    
+    def score_holdout(self, X_holdout, y_holdout):
+        """현재 모델의 홀드아웃 정확도 (원본 특성) - 특성 구성이 다르면 None"""
+        with self._model_lock:
+            if not self.is_trained or set(self.feature_names) - set(X_holdout.columns):
+                return None
+            probabilities, classes = self._predict_proba(X_holdout[self.feature_names])
+        predictions = classes[np.argmax(probabilities, axis=1)]
+        return float(np.mean(predictions == y_holdout.values))
+    
+    def install_model(self, model, scaler, feature_names, compiled_model=None):
+        """학습된 모델로 교체 (원자적 - 예측 중에 섞이지 않음)
+        
+        compiled_model만 주면 sklearn 모델 없이 컴파일된 모델로 예측
+        """
+        with self._model_lock:
+            self.model = model
+            self.scaler = scaler
+            self.feature_names = list(feature_names)
+            if compiled_model is not None:
+                self.compiled_model = compiled_model
+            else:
+                self._compile_model()
+            self.is_trained = True
+            self.model_version += 1
+        self.clear_prediction_cache()
     
     def _prepare_training_data(self, symbol):
         """학습 데이터 준비"""
         try:
             ticker = f"KRW-{symbol}"
             
-            # 과거 데이터 수집 (최대한 많이)
-            df = pyupbit.get_ohlcv(ticker, interval="minute60", count=2000)
+            # 과거 데이터 (로컬 아카이브 - 새 캔들만 받아 추가)
+            history = ML_CONFIG['training'].get('history_candles', 2000)
+            df = candle_archive.load_history(ticker, interval="minute60", count=history)
             
             if df is None or len(df) < 200:
                 return None, None
@@ -164,121 +240,213 @@ class MLSignalGenerator:
             return None, None
     
     def _create_features(self, df):
-        """특성 생성"""
-        features = pd.DataFrame(index=df.index)
+        """특성 생성 (배치 - 과거 구간 전체)"""
+        values = indicator_engine.compute_frame(df, adjust=True)
+        for col in ['open', 'high', 'low', 'close', 'volume']:
+            values[col] = df[col]
+        
+        return pd.DataFrame(self._build_features(values, df.index), index=df.index)
+    
+    def _latest_features(self, ticker, df):
+        """최신 캔들 특성 (스트리밍 엔진 - 새 캔들만 반영)"""
+        snap = indicator_engine.snapshot(ticker, "minute60", df, adjust=True)
+        return pd.DataFrame([self._build_features(snap, snap['time'])])
+    
+    @staticmethod
+    def _build_features(v, time):
+        """지표 값 → 모델 특성 (배치 컬럼/스냅샷 스칼라 공용)"""
+        close = v['close']
+        open_ = v['open']
+        features = {}
         
         # 1. 가격 특성
-        features['returns_1h'] = df['close'].pct_change(1)
-        features['returns_4h'] = df['close'].pct_change(4)
-        features['returns_24h'] = df['close'].pct_change(24)
+        features['returns_1h'] = v['change_1']
+        features['returns_4h'] = v['change_4']
+        features['returns_24h'] = v['change_24']
         
         # 2. 이동평균
         for period in [10, 20, 50]:
-            features[f'sma_{period}'] = df['close'].rolling(period).mean()
-            features[f'price_to_sma_{period}'] = df['close'] / features[f'sma_{period}']
+            features[f'sma_{period}'] = v[f'sma_{period}']
+            features[f'price_to_sma_{period}'] = close / v[f'sma_{period}']
         
         # 3. RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        features['rsi'] = 100 - (100 / (1 + rs))
+        features['rsi'] = v['rsi']
         
         # 4. MACD
-        ema_12 = df['close'].ewm(span=12).mean()
-        ema_26 = df['close'].ewm(span=26).mean()
-        features['macd'] = ema_12 - ema_26
-        features['macd_signal'] = features['macd'].ewm(span=9).mean()
-        features['macd_histogram'] = features['macd'] - features['macd_signal']
+        features['macd'] = v['macd']
+        features['macd_signal'] = v['macd_signal']
+        features['macd_histogram'] = v['macd_histogram']
         
         # 5. 볼린저 밴드
-        sma_20 = df['close'].rolling(20).mean()
-        std_20 = df['close'].rolling(20).std()
-        features['bb_upper'] = sma_20 + (std_20 * 2)
-        features['bb_lower'] = sma_20 - (std_20 * 2)
-        features['bb_position'] = (df['close'] - features['bb_lower']) / (features['bb_upper'] - features['bb_lower'])
+        features['bb_upper'] = v['bb_upper']
+        features['bb_lower'] = v['bb_lower']
+        features['bb_position'] = (close - v['bb_lower']) / (v['bb_upper'] - v['bb_lower'])
         
         # 6. 변동성
-        features['volatility'] = df['close'].pct_change().rolling(20).std()
-        features['atr'] = self._calculate_atr(df)
+        features['volatility'] = v['volatility']
+        features['atr'] = v['atr'] / close  # 정규화
         
         # 7. 볼륨 특성
-        features['volume_sma'] = df['volume'].rolling(20).mean()
-        features['volume_ratio'] = df['volume'] / features['volume_sma']
-        features['volume_change'] = df['volume'].pct_change(1)
+        features['volume_sma'] = v['volume_sma']
+        features['volume_ratio'] = v['volume'] / v['volume_sma']
+        features['volume_change'] = v['volume_change']
         
         # 8. 모멘텀
-        features['momentum_10'] = df['close'] / df['close'].shift(10) - 1
-        features['momentum_20'] = df['close'] / df['close'].shift(20) - 1
+        features['momentum_10'] = v['change_10']
+        features['momentum_20'] = v['change_20']
         
         # 9. 캔들 패턴 (간단한 버전)
-        features['candle_body'] = (df['close'] - df['open']).abs() / df['open']
-        features['candle_upper_shadow'] = (df['high'] - df[['open', 'close']].max(axis=1)) / df['open']
-        features['candle_lower_shadow'] = (df[['open', 'close']].min(axis=1) - df['low']) / df['open']
+        features['candle_body'] = abs(close - open_) / open_
+        features['candle_upper_shadow'] = (v['high'] - np.maximum(open_, close)) / open_
+        features['candle_lower_shadow'] = (np.minimum(open_, close) - v['low']) / open_
         
         # 10. 시간 특성
-        features['hour'] = df.index.hour
-        features['day_of_week'] = df.index.dayofweek
+        features['hour'] = time.hour
+        features['day_of_week'] = time.dayofweek
         
         return features
     
-    def _calculate_atr(self, df, period=14):
-        """ATR 계산"""
-        high_low = df['high'] - df['low']
-        high_close = np.abs(df['high'] - df['close'].shift())
-        low_close = np.abs(df['low'] - df['close'].shift())
-        
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = np.max(ranges, axis=1)
-        atr = true_range.rolling(period).mean()
-        
-        return atr / df['close']  # 정규화
-    
     def predict(self, symbol):
-        """예측 실행"""
+        """예측 실행 (단일 종목 - predict_batch 경유, 캐시 공유)"""
+        return self.predict_batch([symbol]).get(symbol)
+    
+    def predict_batch(self, symbols):
+        """여러 종목 예측 → {symbol: 결과 또는 None}
         
+        - 캐시에 없는 종목만 최신 특성 행을 만들어 predict_proba 한 번으로 계산
+        - 결과는 (symbol, 현재 1시간봉) 단위로 캐시
+        """
         if not self.is_trained:
-            logger.warning("모델이 학습되지 않았습니다.")
-            return None
+            logger.debug("모델이 학습되지 않았습니다. (ML 중립)")
+            return {}
+        
+        bucket = market_data.candle_bucket("minute60", self.clock.time())
+        version = self.model_version
+        results = {}
+        rows = []
+        pending = []
+        
+        with self._cache_lock:
+            for symbol in symbols:
+                key = (symbol, bucket)
+                if key in self.prediction_cache:
+                    results[symbol] = self.prediction_cache[key]
+                else:
+                    pending.append(symbol)
+        
+        for symbol in pending:
+            try:
+                ticker = f"KRW-{symbol}"
+                
+                # 최신 데이터 가져오기
+                df = market_data.get_ohlcv(ticker, interval="minute60", count=200)
+                
+                if df is None or len(df) < 100:
+                    results[symbol] = None
+                    continue
+                
+                # 최신 데이터 특성만 생성 (모델 특성 선택은 예측 직전에)
+                latest_features = self._latest_features(ticker, df)
+                
+                # NaN 체크
+                if latest_features.isna().any().any():
+                    logger.warning(f"{symbol}: 특성에 NaN 값 존재")
+                    results[symbol] = None
+                    continue
+                
+                rows.append((symbol, latest_features))
+                
+            except Exception as e:
+                logger.error(f"예측 실패 {symbol}: {e}")
+                results[symbol] = None
         
+        if rows:
+            try:
+                # 스케일링 + 예측 (한 번에)
+                features = pd.concat([f for _, f in rows], ignore_index=True)
+                with self._model_lock:
+                    version = self.model_version
+                    probabilities, classes = self._predict_proba(features[self.feature_names])
+                now = self.clock.now()
+                
+                for (symbol, _), probability in zip(rows, probabilities):
+                    # predict()는 확률이 가장 높은 클래스 - 확률에서 바로 계산
+                    prediction = classes[int(np.argmax(probability))]
+                    results[symbol] = {
+                        'symbol': symbol,
+                        'prediction': bool(prediction),
+                        'buy_probability': float(probability[list(classes).index(1)]),
+                        'confidence': float(max(probability)),
+                        'timestamp': now
+                    }
+                
+            except Exception as e:
+                logger.error(f"배치 예측 실패: {e}")
+                for symbol, _ in rows:
+                    results[symbol] = None
+        
+        # 실패(None)는 캐시하지 않음 - 다음 호출에서 다시 시도
+        # 예측 도중 모델이 교체됐으면 이전 모델 결과는 캐시하지 않음
+        with self._cache_lock:
+            if version != self.model_version:
+                return results
+            if len(self.prediction_cache) > 1000:
+                self.prediction_cache = {k: v for k, v in self.prediction_cache.items() if k[1] == bucket}
+            for symbol in pending:
+                if results.get(symbol) is not None:
+                    self.prediction_cache[(symbol, bucket)] = results[symbol]
+        
+        return results
+    
+    def predict_frame(self, df, min_candles=100):
+        """과거 구간 전체를 캔들마다 예측 (백테스트용) → DataFrame[buy_probability, confidence, prediction]
+
+        - 각 행은 그 캔들까지의 데이터로 만든 특성 (predict()와 같은 특성)
+        - 처음 min_candles개 캔들과 특성에 NaN이 있는 행은 NaN
+        """
+        out = pd.DataFrame(np.nan, index=df.index,
+                           columns=['buy_probability', 'confidence', 'prediction'])
+        if not self.is_trained or len(df) < min_candles:
+            return out
+
+        features = self._create_features(df)
+        with self._model_lock:
+            features = features[self.feature_names]
+            valid = ~features.isna().any(axis=1).to_numpy()
+            valid[:min_candles - 1] = False
+            if not valid.any():
+                return out
+            probabilities, classes = self._predict_proba(features[valid])
+
+        classes = list(classes)
+        out.loc[valid, 'buy_probability'] = probabilities[:, classes.index(1)]
+        out.loc[valid, 'confidence'] = probabilities.max(axis=1)
+        out.loc[valid, 'prediction'] = np.asarray(classes, dtype=float)[probabilities.argmax(axis=1)]
+        return out
+
+    def _predict_proba(self, features):
+        """원본 특성 → (확률, classes) - 컴파일된 모델이 있으면 sklearn 없이 계산"""
+        if self.compiled_model is not None:
+            values = np.asarray(features, dtype=np.float64)
+            return self.compiled_model.predict_proba_raw(values), self.compiled_model.classes_
+        return self.model.predict_proba(self.scaler.transform(features)), self.model.classes_
+    
+    def _compile_model(self):
+        """랜덤 포레스트 → CompiledForest (다른 모델은 sklearn 그대로 사용)"""
+        self.compiled_model = None
+        if not isinstance(self.model, RandomForestClassifier):
+            return
         try:
-            ticker = f"KRW-{symbol}"
-            
-            # 최신 데이터 가져오기
-            df = pyupbit.get_ohlcv(ticker, interval="minute60", count=200)
-            
-            if df is None or len(df) < 100:
-                return None
-            
-            # 특성 생성
-            features_df = self._create_features(df)
-            
-            # 최신 데이터만 사용
-            latest_features = features_df.iloc[-1:][self.feature_names]
-            
-            # NaN 체크
-            if latest_features.isna().any().any():
-                logger.warning(f"{symbol}: 특성에 NaN 값 존재")
-                return None
-            
-            # 스케일링
-            features_scaled = self.scaler.transform(latest_features)
-            
-            # 예측
-            probability = self.model.predict_proba(features_scaled)[0]
-            prediction = self.model.predict(features_scaled)[0]
-            
-            return {
-                'symbol': symbol,
-                'prediction': bool(prediction),
-                'buy_probability': float(probability[1]),
-                'confidence': float(max(probability)),
-                'timestamp': datetime.now()
-            }
-            
+            self.compiled_model = CompiledForest.from_sklearn(
+                self.model, self.scaler, self.feature_names, self.model_type
+            )
         except Exception as e:
-            logger.error(f"예측 실패 {symbol}: {e}")
-            return None
+            logger.warning(f"모델 컴파일 실패 - sklearn으로 예측: {e}")
+    
+    def clear_prediction_cache(self):
+        """모델이 바뀌면 예측 캐시 비우기"""
+        with self._cache_lock:
+            self.prediction_cache.clear()
     
     def get_signal(self, symbol, confidence_threshold=0.65):
         """거래 신호 생성"""
@@ -307,13 +475,26 @@ class MLSignalGenerator:
             with open(self.scaler_file, 'wb') as f:
                 pickle.dump(self.scaler, f)
             
+            if self.compiled_model is not None:
+                self.compiled_model.save(self.compiled_file)
+            
             logger.info(f"모델 저장 완료: {self.model_file}")
             
         except Exception as e:
             logger.error(f"모델 저장 실패: {e}")
     
     def _load_model(self):
-        """모델 로드"""
+        """모델 로드
+        
+        - pkl보다 최신인 컴파일 파일(.npz)이 있으면 그것만 로드 (sklearn 모델은 메모리에 올리지 않음)
+        - 없으면 pkl을 로드해서 컴파일 후 .npz 저장
+        """
+        if self._load_compiled_model():
+            self.is_trained = True
+            self.clear_prediction_cache()
+            logger.info(f"✅ 컴파일된 모델 로드 성공: {self.compiled_file}")
+            return
+        
         try:
             with open(self.model_file, 'rb') as f:
                 data = pickle.load(f)
@@ -324,7 +505,12 @@ class MLSignalGenerator:
             with open(self.scaler_file, 'rb') as f:
                 self.scaler = pickle.load(f)
             
+            self._compile_model()
+            if self.compiled_model is not None:
+                self.compiled_model.save(self.compiled_file)
+            
             self.is_trained = True
+            self.clear_prediction_cache()
             logger.info(f"✅ 저장된 모델 로드 성공: {self.model_file}")
             
         except FileNotFoundError:
@@ -332,65 +518,114 @@ class MLSignalGenerator:
         except Exception as e:
             logger.error(f"모델 로드 실패: {e}")
     
-    def evaluate_recent_performance(self, symbols, days=7):
-        """최근 성능 평가"""
+    def _load_compiled_model(self):
+        """.npz가 pkl/스케일러보다 최신이면 로드 → 성공 여부"""
+        try:
+            compiled_mtime = os.path.getmtime(self.compiled_file)
+            for source in (self.model_file, self.scaler_file):
+                if os.path.exists(source) and os.path.getmtime(source) > compiled_mtime:
+                    return False
+            
+            self.compiled_model = CompiledForest.load(self.compiled_file)
+            self.feature_names = self.compiled_model.feature_names
+            self.model_type = self.compiled_model.model_type
+            self.model = None
+            return True
+            
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"컴파일된 모델 로드 실패 - pkl 사용: {e}")
+            self.compiled_model = None
+            return False
+    
+    def evaluate_recent_performance(self, symbols, days=7, signal_threshold=0.65, max_workers=8):
+        """최근 성능 평가 - 전 종목 전 구간을 한 번의 변환/예측으로
+        
+        - 종목별 데이터 수집/특성 생성은 스레드 풀에서 병렬
+        - 미래 수익률은 종가 배열을 prediction_horizon만큼 밀어서 계산
+        - 반환: {total_signals, successful_signals, success_rate, per_symbol: {symbol: (신호, 성공)}}
+        """
         
         if not self.is_trained:
             logger.warning("모델이 학습되지 않았습니다.")
-            return
+            return None
         
         logger.info(f"\n{'='*60}")
         logger.info(f"📊 최근 {days}일 모델 성능 평가")
         logger.info(f"{'='*60}")
         
+        symbols = list(symbols)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols))),
+                                thread_name_prefix='ml-eval') as executor:
+            windows = list(executor.map(
+                bind_context(lambda symbol: self._evaluation_window(symbol, days)), symbols
+            ))
+        windows = [(symbol, w) for symbol, w in zip(symbols, windows) if w is not None]
+        
         total_signals = 0
         successful_signals = 0
+        per_symbol = {}
         
-        for symbol in symbols:
-            ticker = f"KRW-{symbol}"
+        if windows:
+            labels = np.concatenate([np.full(len(w[1]), symbol, dtype=object) for symbol, w in windows])
+            forward = np.concatenate([w[1] for _, w in windows])
             
-            try:
-                # 최근 데이터
-                df = pyupbit.get_ohlcv(ticker, interval="minute60", count=24*days)
-                
-                if df is None or len(df) < 100:
-                    continue
-                
-                # 특성 생성
-                features_df = self._create_features(df)
-                
-                # 각 시점에서 예측
-                for i in range(len(df) - self.prediction_horizon - 50):
-                    current_features = features_df.iloc[i:i+1][self.feature_names]
-                    
-                    if current_features.isna().any().any():
-                        continue
-                    
-                    # 예측
-                    features_scaled = self.scaler.transform(current_features)
-                    probability = self.model.predict_proba(features_scaled)[0][1]
-                    
-                    if probability >= 0.65:  # 신호 발생
-                        total_signals += 1
-                        
-                        # 실제 결과 확인
-                        future_price = df.iloc[i + self.prediction_horizon]['close']
-                        current_price = df.iloc[i]['close']
-                        actual_return = (future_price - current_price) / current_price
-                        
-                        if actual_return > self.min_profit_threshold:
-                            successful_signals += 1
-                
-            except Exception as e:
-                logger.error(f"{symbol} 평가 실패: {e}")
-                continue
+            # 예측 (한 번에) - NaN 특성 행은 제외
+            with self._model_lock:
+                features = pd.concat([w[0][self.feature_names] for _, w in windows], ignore_index=True)
+                valid = ~features.isna().any(axis=1).to_numpy()
+                if valid.any():
+                    probabilities, classes = self._predict_proba(features[valid])
+                    buy_probability = probabilities[:, list(classes).index(1)]
+                else:
+                    buy_probability = np.empty(0)
+            
+            signals = buy_probability >= signal_threshold
+            success = forward[valid][signals] > self.min_profit_threshold
+            signal_labels = labels[valid][signals]
+            
+            total_signals = int(signals.sum())
+            successful_signals = int(success.sum())
+            for symbol, _ in windows:
+                mask = signal_labels == symbol
+                per_symbol[symbol] = (int(mask.sum()), int(success[mask].sum()))
         
+        success_rate = successful_signals / total_signals if total_signals else None
         if total_signals > 0:
-            success_rate = successful_signals / total_signals
             logger.info(f"\n총 신호: {total_signals}개")
             logger.info(f"성공: {successful_signals}개")
             logger.info(f"성공률: {success_rate:.1%}")
         else:
             logger.info("\n평가 기간 동안 신호 없음")
         
-        logger.info(f"{'='*60}\n")
\ No newline at end of file
+        logger.info(f"{'='*60}\n")
+        
+        return {
+            'total_signals': total_signals,
+            'successful_signals': successful_signals,
+            'success_rate': success_rate,
+            'per_symbol': per_symbol,
+        }
+    
+    def _evaluation_window(self, symbol, days):
+        """평가 구간 (특성 DataFrame, 미래 수익률 배열) 또는 None"""
+        ticker = f"KRW-{symbol}"
+        try:
+            df = candle_archive.load_history(ticker, interval="minute60", count=24*days)
+            
+            if df is None or len(df) < 100:
+                return None
+            
+            # 마지막 prediction_horizon + 50개 캔들은 평가에서 제외 (기존 기준 유지)
+            n = len(df) - self.prediction_horizon - 50
+            if n <= 0:
+                return None
+            
+            close = df['close'].to_numpy(dtype=float)
+            forward = close[self.prediction_horizon:self.prediction_horizon + n] / close[:n] - 1
+            return self._create_features(df).iloc[:n], forward
+            
+        except Exception as e:
+            logger.error(f"{symbol} 평가 실패: {e}")
+            return None
\ No newline at end of file
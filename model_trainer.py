@@ -0,0 +1,222 @@
+# model_trainer.py - ML 모델 백그라운드 재학습 (별도 프로세스 학습 → 홀드아웃 검증 → 무중단 교체)
+#
+# - 학습은 별도 프로세스에서 실행 (2000캔들 다운로드 + 포레스트 학습이 매매 루프/GIL을 막지 않음)
+# - 자식 프로세스는 후보 모델을 *.candidate 파일로 저장하고 홀드아웃 지표만 돌려준다
+# - 부모는 지표를 검증한 뒤 통과하면 파일을 교체(os.replace)하고
+#   실행 중인 MLSignalGenerator에 install_model()로 한 번에 바꿔 넣는다
+# - 첫 모델이 준비되기 전에는 ML 신호가 중립(0.5)으로 동작한다
+
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from compiled_forest import CompiledForest
+from config import ML_CONFIG, REQUEST_SCHEDULER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_SUFFIX = '.candidate'
+
+
+def candidate_files(generator):
+    """라이브 모델 파일 → 후보 모델 파일 경로 {live: candidate}"""
+    return {
+        path: path + CANDIDATE_SUFFIX
+        for path in (generator.model_file, generator.scaler_file, generator.compiled_file)
+    }
+
+
+def train_candidate(model_type, symbols, holdout_ratio=0.2, candle_rate=None):
+    """자식 프로세스에서 실행 - 후보 모델 학습/저장 후 지표 반환 (실패 시 None)"""
+    import request_scheduler
+    from ml_signal_generator import MLSignalGenerator
+
+    if candle_rate:
+        # 부모 프로세스의 캔들 요청과 IP당 한도를 나눠 쓰므로 느리게
+        REQUEST_SCHEDULER_CONFIG['group_rates']['candles'] = candle_rate
+
+    generator = MLSignalGenerator(model_type=model_type)
+    with request_scheduler.context('trainer', request_scheduler.PRIORITY_SCAN):
+        candidate = generator.fit_candidate(symbols, holdout_ratio=holdout_ratio)
+    if candidate is None:
+        return None
+
+    # 같은 홀드아웃으로 현재 모델 점수 (비교용)
+    current_accuracy = generator.score_holdout(candidate['X_holdout'], candidate['y_holdout'])
+
+    generator.install_model(candidate['model'], candidate['scaler'], candidate['feature_names'])
+    files = candidate_files(generator)
+    generator.model_file = files[generator.model_file]
+    generator.scaler_file = files[generator.scaler_file]
+    generator.compiled_file = files[generator.compiled_file]
+    generator._save_model()
+
+    return {
+        'holdout_accuracy': candidate['holdout_accuracy'],
+        'holdout_precision': candidate['holdout_precision'],
+        'train_accuracy': candidate['train_accuracy'],
+        'current_accuracy': current_accuracy,
+        'samples': candidate['samples'],
+        'holdout_samples': len(candidate['y_holdout']),
+        'compiled': generator.compiled_model is not None,
+    }
+
+
+class ModelTrainer:
+    """MLSignalGenerator 백그라운드 재학습 관리자 (동시에 하나의 학습만)"""
+
+    def __init__(self, generator, symbols, config=None):
+        self.generator = generator
+        self.symbols = symbols
+        self.config = config or ML_CONFIG['training']
+
+        self._executor = None
+        self._future = None
+        self._lock = threading.Lock()
+
+        self.last_started = None
+        self.last_finished = None
+        self.last_result = None     # 마지막 학습 지표
+        self.last_outcome = None    # 'installed' / 'rejected' / 'failed'
+        self.last_evaluation = None # 적용 후 최근 구간 평가 (evaluate_recent_performance 결과)
+        self.installs = 0
+
+    @property
+    def running(self):
+        return self._future is not None and not self._future.done()
+
+    def start(self):
+        """백그라운드 학습 시작 - 이미 학습 중이면 False"""
+        with self._lock:
+            if self.running:
+                logger.info("ML 모델 학습이 이미 진행 중입니다.")
+                return False
+
+            if self._executor is None:
+                # 스레드가 많은 프로세스에서 fork는 위험 - spawn으로 깨끗한 인터프리터 사용
+                self._executor = ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context('spawn')
+                )
+
+            self.last_started = datetime.now()
+            logger.info("🔄 ML 모델 백그라운드 학습 시작")
+            self._future = self._executor.submit(
+                train_candidate,
+                self.generator.model_type,
+                list(self.symbols),
+                self.config.get('holdout_ratio', 0.2),
+                self.config.get('background_candle_rate'),
+            )
+            self._future.add_done_callback(self._on_done)
+            return True
+
+    def _on_done(self, future):
+        self.last_finished = datetime.now()
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"ML 모델 학습 실패: {e}")
+            self.last_outcome = 'failed'
+            return
+
+        self.last_result = result
+        if result is None:
+            logger.warning("ML 모델 학습 실패: 학습 데이터 부족")
+            self.last_outcome = 'failed'
+            return
+
+        accepted, reason = self.validate(result)
+        if not accepted:
+            logger.warning(f"❌ 새 ML 모델 거부: {reason}")
+            self.last_outcome = 'rejected'
+            self._discard_candidate()
+            return
+
+        try:
+            self.install_candidate()
+        except Exception as e:
+            logger.error(f"새 ML 모델 교체 실패: {e}")
+            self.last_outcome = 'failed'
+            return
+
+        self.installs += 1
+        self.last_outcome = 'installed'
+        logger.info(f"✅ 새 ML 모델 적용: {reason}")
+
+        if ML_CONFIG['performance'].get('evaluate_after_retrain', True):
+            threading.Thread(target=self.evaluate, name='ml-evaluate', daemon=True).start()
+
+    def evaluate(self):
+        """적용된 모델의 최근 구간 신호 성공률 평가"""
+        try:
+            self.last_evaluation = self.generator.evaluate_recent_performance(
+                self.symbols, days=ML_CONFIG['performance']['evaluation_days']
+            )
+        except Exception as e:
+            logger.error(f"ML 모델 평가 실패: {e}")
+
+    def validate(self, result):
+        """홀드아웃 지표 검증 → (통과 여부, 사유)"""
+        accuracy = result['holdout_accuracy']
+        min_accuracy = ML_CONFIG['performance']['min_accuracy']
+        if accuracy < min_accuracy:
+            return False, f"홀드아웃 정확도 {accuracy:.1%} < 최소 {min_accuracy:.1%}"
+
+        current = result.get('current_accuracy')
+        max_drop = self.config.get('max_accuracy_drop', 0.02)
+        if current is not None and accuracy < current - max_drop:
+            return False, f"홀드아웃 정확도 {accuracy:.1%} < 현재 모델 {current:.1%} - {max_drop:.0%}"
+
+        compared = f" (현재 모델 {current:.1%})" if current is not None else ""
+        return True, f"홀드아웃 정확도 {accuracy:.1%}{compared}, 샘플 {result['samples']}개"
+
+    def install_candidate(self):
+        """후보 파일 → 라이브 파일 교체 + 실행 중인 생성기에 적용"""
+        generator = self.generator
+        files = candidate_files(generator)
+
+        with open(files[generator.model_file], 'rb') as f:
+            data = pickle.load(f)
+        with open(files[generator.scaler_file], 'rb') as f:
+            scaler = pickle.load(f)
+
+        compiled = None
+        if os.path.exists(files[generator.compiled_file]):
+            compiled = CompiledForest.load(files[generator.compiled_file])
+
+        # 파일 교체 (.npz를 마지막에 - pkl보다 최신이어야 다음 시작 때 .npz를 사용)
+        for live in (generator.model_file, generator.scaler_file, generator.compiled_file):
+            if os.path.exists(files[live]):
+                os.replace(files[live], live)
+
+        # 컴파일된 모델이 있으면 sklearn 객체는 들고 있지 않음
+        model = None if compiled is not None else data['model']
+        generator.install_model(model, scaler, data['feature_names'], compiled_model=compiled)
+
+    def _discard_candidate(self):
+        for path in candidate_files(self.generator).values():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def get_status(self):
+        """{running, last_started, last_finished, last_outcome, holdout_accuracy,
+        recent_success_rate, installs}"""
+        return {
+            'running': self.running,
+            'last_started': self.last_started,
+            'last_finished': self.last_finished,
+            'last_outcome': self.last_outcome,
+            'holdout_accuracy': (self.last_result or {}).get('holdout_accuracy'),
+            'recent_success_rate': (self.last_evaluation or {}).get('success_rate'),
+            'installs': self.installs,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,8 +1,12 @@
 # momentum_scanner_improved.py - 횡보장 대응 버전
 
-import pyupbit
+import market_data
+from clock import SYSTEM_CLOCK
+from exchange_client import UpbitExchange
+from indicator_engine import build_panel
+from request_scheduler import with_context, PRIORITY_SCAN
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,24 +14,30 @@ logger = logging.getLogger(__name__)
 class ImprovedMomentumScanner:
     """개선된 모멘텀 스캐너 - 횡보장 대응"""
     
-    def __init__(self):
+    def __init__(self, exchange=None, clock=None):
+        # 원화 마켓 목록 조회용 (기본: 키 없는 업비트 시세 조회)
+        self.exchange = exchange or UpbitExchange()
+        self.clock = clock or SYSTEM_CLOCK
+        
         # 완화된 기준
         self.min_volume = 300_000_000   # 300억 (기존 500억)
         self.max_volatility = 0.07         # 7% (기존 5%)
         self.min_change_24h = 2.0          # 2% (기존 3%)
         self.min_score = 4.0               # 4점 (기존 5점)
+        self.scan_limit = 50               # 스캔할 원화 마켓 수 (패널 계산이라 200개도 가능)
         
         # 캐싱
         self.last_scan_result = []
         self.last_scan_time = None
         self.cache_duration = 1800  # 30분
         
+    @with_context('scanner', PRIORITY_SCAN)
     def scan_top_performers(self, top_n=3):
         """24시간 기준 상위 코인 검색 (완화된 기준)"""
         
         # 캐시 확인
         if self.last_scan_time:
-            elapsed = (datetime.now() - self.last_scan_time).total_seconds()
+            elapsed = (self.clock.now() - self.last_scan_time).total_seconds()
             if elapsed < self.cache_duration:
                 logger.info(f"캐시된 결과 사용 (스캔: {elapsed/60:.0f}분 전)")
                 return self.last_scan_result
@@ -38,7 +48,7 @@ class ImprovedMomentumScanner:
         
         try:
             # 원화 마켓 티커
-            tickers = pyupbit.get_tickers(fiat="KRW")
+            tickers = self.exchange.get_tickers(fiat="KRW")
             
             # 제외 리스트
             exclude_list = [
@@ -46,55 +56,19 @@ class ImprovedMomentumScanner:
                 'KRW-BTC', 'KRW-ETH', 'KRW-SOL',  # 이미 STABLE_PAIRS에 있음
             ]
             
-            candidates = []
-            total_checked = 0
-            
-            logger.info(f"총 {len(tickers[:50])}개 코인 스캔 중...")
+            scan_list = [t for t in tickers[:self.scan_limit] if t not in exclude_list]
+            logger.info(f"총 {len(tickers[:self.scan_limit])}개 코인 스캔 중...")
             
-            for ticker in tickers[:50]:  # 상위 50개
-                if ticker in exclude_list:
-                    continue
-                
-                total_checked += 1
-                
+            # 일봉 수집 (캐시 경유) 후 전 종목을 한 패널로 계산
+            frames = {}
+            for ticker in scan_list:
                 try:
-                    # 데이터 가져오기
-                    df = pyupbit.get_ohlcv(ticker, interval="day", count=3)
-                    
-                    if df is None or len(df) < 2:
-                        continue
-                    
-                    # 변동률
-                    change_24h = ((df['close'].iloc[-1] - df['close'].iloc[-2]) / 
-                                 df['close'].iloc[-2] * 100)
-                    
-                    # 거래량 (KRW)
-                    volume_krw = df['close'].iloc[-1] * df['volume'].iloc[-1]
-                    
-                    # 변동성
-                    volatility = (df['high'].iloc[-1] - df['low'].iloc[-1]) / df['close'].iloc[-1]
-                    
-                    # 모멘텀 점수
-                    score = self.calculate_momentum_score(df)
-                    
-                    # 필터링
-                    if (volume_krw > self.min_volume and 
-                        volatility < self.max_volatility and
-                        change_24h > self.min_change_24h and 
-                        score > self.min_score):
-                        
-                        candidates.append({
-                            'symbol': ticker.replace('KRW-', ''),
-                            'change_24h': change_24h,
-                            'volume': volume_krw,
-                            'volatility': volatility,
-                            'score': score,
-                            'final_score': change_24h + score  # 정렬용
-                        })
-                
+                    frames[ticker] = market_data.get_ohlcv(ticker, interval="day", count=3)
                 except Exception as e:
                     logger.debug(f"{ticker} 스캔 실패: {e}")
-                    continue
+            
+            total_checked = len(scan_list)
+            candidates = self.evaluate_panel(build_panel(frames))
             
             logger.info(f"검사 완료: {total_checked}개 중 {len(candidates)}개 후보")
             
@@ -121,7 +95,7 @@ class ImprovedMomentumScanner:
             
             # 캐시 업데이트
             self.last_scan_result = selected
-            self.last_scan_time = datetime.now()
+            self.last_scan_time = self.clock.now()
             
             logger.info("="*60)
             return selected
@@ -130,48 +104,84 @@ class ImprovedMomentumScanner:
             logger.error(f"모멘텀 스캔 실패: {e}")
             return []
     
-    def calculate_momentum_score(self, df):
-        """개선된 모멘텀 점수 계산"""
-        score = 0
+    def evaluate_panel(self, panel):
+        """일봉 패널 → 필터를 통과한 후보 목록 (전 종목 한 번에 계산)"""
+        if not len(panel):
+            return []
         
-        try:
+        c, h, l, v = panel.close, panel.high, panel.low, panel.volume
+        bars = np.sum(~np.isnan(c), axis=1)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_24h = (c[:, -1] - c[:, -2]) / c[:, -2] * 100 if c.shape[1] >= 2 else np.full(len(panel), np.nan)
+            volume_krw = c[:, -1] * v[:, -1]
+            volatility = (h[:, -1] - l[:, -1]) / c[:, -1]
+        scores = self.calculate_momentum_scores(panel)
+        
+        # 필터링 (NaN 비교는 모두 False)
+        passed = ((bars >= 2) &
+                  (volume_krw > self.min_volume) &
+                  (volatility < self.max_volatility) &
+                  (change_24h > self.min_change_24h) &
+                  (scores > self.min_score))
+        
+        candidates = []
+        for row in np.flatnonzero(passed):
+            candidates.append({
+                'symbol': panel.symbols[row].replace('KRW-', ''),
+                'change_24h': float(change_24h[row]),
+                'volume': float(volume_krw[row]),
+                'volatility': float(volatility[row]),
+                'score': float(scores[row]),
+                'final_score': float(change_24h[row] + scores[row])  # 정렬용
+            })
+        return candidates
+    
+    def calculate_momentum_scores(self, panel):
+        """개선된 모멘텀 점수 - 패널의 모든 종목을 한 번에 계산"""
+        c, o, h, v = panel.close, panel.open, panel.high, panel.volume
+        n, t = c.shape
+        bars = np.sum(~np.isnan(c), axis=1)
+        score = np.zeros(n)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
             # 1. 연속 상승 (최대 3점)
-            if len(df) >= 3:
-                if df['close'].iloc[-1] > df['close'].iloc[-2]:
-                    score += 1
-                    if df['close'].iloc[-2] > df['close'].iloc[-3]:
-                        score += 2  # 2일 연속 상승
+            if t >= 3:
+                up1 = (bars >= 3) & (c[:, -1] > c[:, -2])
+                up2 = up1 & (c[:, -2] > c[:, -3])
+                score += up1 * 1.0 + up2 * 2.0
             
             # 2. 거래량 증가 (최대 2점)
-            if len(df) >= 2:
-                vol_ratio = df['volume'].iloc[-1] / df['volume'].iloc[-2]
-                if vol_ratio > 1.5:
-                    score += 2
-                elif vol_ratio > 1.2:
-                    score += 1
+            if t >= 2:
+                vol_ratio = v[:, -1] / v[:, -2]
+                score += np.where(vol_ratio > 1.5, 2.0, np.where(vol_ratio > 1.2, 1.0, 0.0))
             
             # 3. 양봉 강도 (최대 3점)
-            if df['close'].iloc[-1] > df['open'].iloc[-1]:
-                body_ratio = (df['close'].iloc[-1] - df['open'].iloc[-1]) / df['open'].iloc[-1]
-                score += min(body_ratio * 100, 3)
+            body_ratio = (c[:, -1] - o[:, -1]) / o[:, -1]
+            score += np.where(c[:, -1] > o[:, -1], np.minimum(body_ratio * 100, 3), 0.0)
             
             # 4. 고점 갱신 (최대 2점)
-            if len(df) >= 5:
-                recent_high = df['high'].iloc[-5:].max()
-                if df['high'].iloc[-1] >= recent_high:
-                    score += 2
-            
-        except Exception as e:
-            logger.debug(f"점수 계산 오류: {e}")
+            if t >= 5:
+                recent_high = np.nanmax(h[:, -5:], axis=1)
+                score += np.where((bars >= 5) & (h[:, -1] >= recent_high), 2.0, 0.0)
         
         return score
     
+    def calculate_momentum_score(self, df):
+        """개선된 모멘텀 점수 계산 (단일 종목)"""
+        try:
+            return float(self.calculate_momentum_scores(build_panel({'_': df}))[0])
+        except Exception as e:
+            logger.debug(f"점수 계산 오류: {e}")
+            return 0
+    
+    @with_context('scanner', PRIORITY_SCAN)
     def get_detailed_analysis(self, symbol):
         """특정 코인의 상세 분석"""
         ticker = f"KRW-{symbol}"
         
         try:
-            df = pyupbit.get_ohlcv(ticker, interval="day", count=7)
+            df = market_data.get_ohlcv(ticker, interval="day", count=7)
             
             if df is None:
                 return None
@@ -1,6 +1,7 @@
 # multi_timeframe_analyzer.py
 
-import pyupbit
+import market_data
+import indicator_engine
 import pandas as pd
 import numpy as np
 import logging
@@ -51,13 +52,11 @@ class MultiTimeframeAnalyzer:
     def _analyze_timeframe(self, ticker, interval, count):
         """개별 타임프레임 분석"""
         try:
-            df = pyupbit.get_ohlcv(ticker, interval=interval, count=count)
-            
-            if df is None or len(df) < 50:
+            snap = self._load_snapshot(ticker, interval, count)
+            if snap is None:
                 return None
             
-            # 기술적 지표 계산
-            indicators = self._calculate_indicators(df)
+            indicators = self._calculate_indicators(snap)
             
             # 점수 계산
             score = self._calculate_timeframe_score(indicators)
@@ -75,62 +74,44 @@ class MultiTimeframeAnalyzer:
             logger.error(f"타임프레임 분석 실패 {ticker} {interval}: {e}")
             return None
     
-    def _calculate_indicators(self, df):
-        """기술적 지표 계산"""
-        # 이동평균선
-        df['sma_20'] = df['close'].rolling(window=20).mean()
-        df['sma_50'] = df['close'].rolling(window=50).mean()
-        df['ema_12'] = df['close'].ewm(span=12).mean()
-        df['ema_26'] = df['close'].ewm(span=26).mean()
-        
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        df['macd'] = df['ema_12'] - df['ema_26']
-        df['macd_signal'] = df['macd'].ewm(span=9).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
+    def _load_snapshot(self, ticker, interval, count):
+        """마지막 캔들 지표 스냅샷 - 캔들이 50개 미만이면 None"""
+        df = market_data.get_ohlcv(ticker, interval=interval, count=count)
         
-        # 볼륨 트렌드
-        df['volume_sma'] = df['volume'].rolling(window=20).mean()
+        if df is None or len(df) < 50:
+            return None
         
-        # 최신 값 추출
-        current = df.iloc[-1]
-        prev = df.iloc[-2]
+        # 기술적 지표 계산 (스트리밍 엔진 - 새 캔들만 반영)
+        return indicator_engine.snapshot(ticker, interval, df, adjust=True)
+    
+    def _calculate_indicators(self, snap):
+        """기술적 지표 정리 (스트리밍 엔진 스냅샷 기준)"""
+        indicators = {
+            'price': snap['close'],
+            'sma_20': snap['sma_20'],
+            'sma_50': snap['sma_50'],
+            'rsi': snap['rsi'],
+            'macd': snap['macd'],
+            'macd_signal': snap['macd_signal'],
+            'macd_histogram': snap['macd_histogram'],
+            'volume_ratio': snap['volume'] / snap['volume_sma']
+        }
         
         # 추세 판단
-        trend = self._determine_trend(df)
-        trend_strength = self._calculate_trend_strength(df)
+        indicators['trend'] = self._determine_trend(indicators)
+        indicators['trend_strength'] = self._calculate_trend_strength(snap)
         
         # 볼륨 트렌드
-        volume_trend = 'increasing' if current['volume'] > current['volume_sma'] else 'decreasing'
+        indicators['volume_trend'] = 'increasing' if snap['volume'] > snap['volume_sma'] else 'decreasing'
         
-        return {
-            'price': current['close'],
-            'sma_20': current['sma_20'],
-            'sma_50': current['sma_50'],
-            'rsi': current['rsi'],
-            'macd': current['macd'],
-            'macd_signal': current['macd_signal'],
-            'macd_histogram': current['macd_histogram'],
-            'trend': trend,
-            'trend_strength': trend_strength,
-            'volume_trend': volume_trend,
-            'volume_ratio': current['volume'] / current['volume_sma']
-        }
+        return indicators
     
-    def _determine_trend(self, df):
+    def _determine_trend(self, current):
         """추세 판단"""
-        current = df.iloc[-1]
-        
         # 단기/장기 이평선 관계
         sma_20 = current['sma_20']
         sma_50 = current['sma_50']
-        price = current['close']
+        price = current['price']
         
         # MACD 확인
         macd_bullish = current['macd'] > current['macd_signal']
@@ -146,24 +127,14 @@ class MultiTimeframeAnalyzer:
         else:
             return 'sideways'
     
-    def _calculate_trend_strength(self, df):
+    def _calculate_trend_strength(self, snap):
         """추세 강도 계산 (0~1)"""
-        # ADX 간이 버전 - 최근 20개 봉의 방향성
-        closes = df['close'].tail(20)
-        
-        # 상승/하락 일관성
-        price_changes = closes.diff().dropna()
+        # ADX 간이 버전 - 최근 20개 봉에서 같은 방향 변화 비율
+        consistency = snap['trend_consistency']
         
-        if len(price_changes) == 0:
+        if np.isnan(consistency):
             return 0.5
         
-        # 같은 방향 비율
-        positive_days = (price_changes > 0).sum()
-        negative_days = (price_changes < 0).sum()
-        
-        total_days = len(price_changes)
-        consistency = max(positive_days, negative_days) / total_days
-        
         return consistency
     
     def _calculate_timeframe_score(self, indicators):
@@ -1,13 +1,17 @@
 import logging
-from datetime import datetime
 import pyupbit
 
+from clock import SYSTEM_CLOCK
+
 logger = logging.getLogger(__name__)
 
 class PartialExitManager:
     """부분 매도 관리자"""
     
-    def __init__(self):
+    def __init__(self, clock=None, journal=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.journal = journal  # 있으면 실행 레벨을 포지션 저널에 기록/복원
+        
         # 부분 매도 설정
         self.partial_exit_levels = [
             {'profit': 0.008, 'exit_ratio': 0.25, 'min_hold_time': 0},   # +0.8% → 40% (15분)
@@ -17,6 +21,8 @@ class PartialExitManager:
         
         # 이미 실행한 레벨 추적
         self.executed_exits = {}  # {symbol: [level_indices]}
+        if self.journal:
+            self.executed_exits = self.journal.get('exits')
     
     def check_partial_exit(self, symbol, entry_price, entry_time, current_price, current_quantity, upbit):
         """부분 매도 조건 체크"""
@@ -25,7 +31,7 @@ class PartialExitManager:
             self.executed_exits[symbol] = []
         
         profit_rate = (current_price - entry_price) / entry_price
-        holding_time = (datetime.now() - entry_time).total_seconds()
+        holding_time = (self.clock.now() - entry_time).total_seconds()
         
         for i, level in enumerate(self.partial_exit_levels):
             # 이미 실행한 레벨은 스킵
@@ -56,6 +62,8 @@ class PartialExitManager:
             success = self._execute_partial_sell(symbol, sell_quantity, upbit)
             
             if success:
+                if self.journal:
+                    self.journal.append('exits', symbol, i)
                 self.executed_exits[symbol].append(i)
                 logger.info(f"✅ 부분 매도 완료: {symbol} (레벨 {i+1})")
                 return True, sell_quantity
@@ -79,6 +87,8 @@ class PartialExitManager:
     def reset_position(self, symbol):
         """포지션 완전 청산 시 초기화"""
         if symbol in self.executed_exits:
+            if self.journal:
+                self.journal.delete('exits', symbol)
             del self.executed_exits[symbol]
     
     def get_remaining_quantity(self, symbol, original_quantity):
@@ -0,0 +1,139 @@
+# position_journal.py - 포지션 관리 상태 선기록(write-ahead) 저널 + 주기적 스냅샷
+#
+# 상태 (섹션별 {symbol: 값}):
+#   positions - RiskManager.positions (진입가/수량/진입 시각/최고가 ...)
+#   exits     - PartialExitManager.executed_exits (실행한 부분 매도 레벨)
+#   averaging - AveragingDownManager.averaging_history (물타기 기록)
+#   pyramids  - PyramidingManager.pyramid_history (추매 기록)
+# - 상태를 바꾸기 전에 변경 이벤트 1줄을 저널에 추가 (trade_journal.TradeJournal)
+#   이벤트: set(값 교체) / update(필드 일부) / append(리스트에 추가) / delete / clear
+# - compact_every건마다 현재 상태 전체를 스냅샷으로 압축 ({'op': 'state'} 1건)
+# - 재시작: 스냅샷 + 저널 꼬리 재생 (파일 2개 읽기, 수 ms) → 거래소 잔고 1회 조회로 수량만 맞춤
+# - 값은 JSON으로 정규화해서 보관 (datetime → ISO 문자열, 복원하는 쪽에서 변환)
+
+import copy
+import json
+import logging
+import threading
+
+from config import POSITION_JOURNAL_CONFIG
+from trade_journal import TradeJournal
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ('positions', 'exits', 'averaging', 'pyramids')
+
+
+def _json_default(value):
+    """datetime → ISO 문자열 (나머지는 str)"""
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def _normalize(value):
+    """JSON으로 쓰고 다시 읽은 값 (재생 결과와 메모리 상태가 같도록)"""
+    return json.loads(json.dumps(value, ensure_ascii=False, default=_json_default))
+
+
+def _empty_state():
+    return {section: {} for section in SECTIONS}
+
+
+def apply_event(state, event):
+    """이벤트 1건을 상태에 반영 (재생/기록 공용)"""
+    op = event.get('op')
+    if op == 'state':
+        state.clear()
+        state.update(_empty_state())
+        for section, values in (event.get('value') or {}).items():
+            state[section] = values
+        return
+
+    section = state.setdefault(event.get('section'), {})
+    symbol = event.get('symbol')
+    value = event.get('value')
+    if op == 'set':
+        section[symbol] = value
+    elif op == 'update':
+        if isinstance(section.get(symbol), dict):
+            section[symbol].update(value)
+    elif op == 'append':
+        section.setdefault(symbol, []).append(value)
+    elif op == 'delete':
+        section.pop(symbol, None)
+    elif op == 'clear':
+        section.clear()
+    else:
+        logger.warning(f"알 수 없는 포지션 저널 이벤트 건너뜀: {event}")
+
+
+def replay(events):
+    """이벤트 목록 → 상태"""
+    state = _empty_state()
+    for event in events:
+        apply_event(state, event)
+    return state
+
+
+class _StateJournal(TradeJournal):
+    """압축 시 기록 목록 대신 현재 상태 1건을 스냅샷으로 씀
+
+    압축 시점은 PositionJournal이 정함 (이벤트를 상태에 반영한 뒤)
+    """
+
+    def __init__(self, owner, path, **kwargs):
+        super().__init__(path, compact_every=float('inf'), **kwargs)
+        self.owner = owner
+
+    def compact(self, records=None):
+        if records is None:
+            records = [{'op': 'state', 'value': self.owner.state}]
+        return super().compact(records)
+
+
+class PositionJournal:
+    """포지션 관리 상태 저널 - 봇 프로세스 1개가 쓰기, 스레드 안전"""
+
+    def __init__(self, path=None, compact_every=None, fsync=None):
+        self.path = path or POSITION_JOURNAL_CONFIG['path']
+        self.compact_every = compact_every or POSITION_JOURNAL_CONFIG['compact_every']
+        self._journal = _StateJournal(self, self.path, fsync=fsync)
+        self._lock = threading.RLock()
+        self.state = replay(self._journal.load())
+
+    def _log(self, event, durable=True):
+        """저널에 먼저 쓰고 (실패하면 예외) 메모리 상태에 반영"""
+        event = _normalize(event)
+        with self._lock:
+            self._journal.append(event, sync=durable)
+            apply_event(self.state, event)
+            if self._journal._pending >= self.compact_every:
+                self._journal.compact()
+
+    def set(self, section, symbol, value, durable=True):
+        self._log({'op': 'set', 'section': section, 'symbol': symbol, 'value': value}, durable)
+
+    def update(self, section, symbol, fields, durable=True):
+        self._log({'op': 'update', 'section': section, 'symbol': symbol, 'value': fields}, durable)
+
+    def append(self, section, symbol, item):
+        self._log({'op': 'append', 'section': section, 'symbol': symbol, 'value': item})
+
+    def delete(self, section, symbol):
+        with self._lock:
+            if symbol in self.state.get(section, {}):
+                self._log({'op': 'delete', 'section': section, 'symbol': symbol})
+
+    def clear(self, section):
+        with self._lock:
+            if self.state.get(section):
+                self._log({'op': 'clear', 'section': section})
+
+    def get(self, section):
+        """섹션 복사본 {symbol: 값}"""
+        with self._lock:
+            return copy.deepcopy(self.state.get(section, {}))
+
+    def snapshot(self):
+        """지금 상태로 스냅샷 압축 (정상 종료 시 - 다음 시작이 스냅샷 1개 읽기로 끝남)"""
+        with self._lock:
+            return self._journal.compact()
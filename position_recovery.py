@@ -1,34 +1,26 @@
-import json
+import os
 import pyupbit
 from datetime import datetime
 import logging
 
+from trade_store import get_store
+
 logger = logging.getLogger(__name__)
 
 class PositionRecovery:
-    """봇 재시작 시 포지션 복구"""
+    """봇 재시작 시 포지션 복구 (저장: SQLite 저장소 positions 테이블)"""
     
-    def __init__(self, upbit):
+    def __init__(self, upbit, store=None, directory=''):
+        """directory: 기존 active_positions.json이 있는 디렉터리 (기본: 현재 디렉터리)"""
         self.upbit = upbit
-        self.position_file = "active_positions.json"
+        self.position_file = os.path.join(directory, "active_positions.json")
+        self.store = store or get_store()
+        self.store.migrate('positions', self.position_file)
         
     def save_positions(self, positions):
-        """현재 포지션을 파일에 저장"""
+        """현재 포지션을 저장소에 저장 (한 트랜잭션으로 전체 교체)"""
         try:
-            data = {
-                'timestamp': datetime.now().isoformat(),
-                'positions': {}
-            }
-            
-            for symbol, pos in positions.items():
-                data['positions'][symbol] = {
-                    'entry_price': pos['entry_price'],
-                    'quantity': pos['quantity'],
-                    'entry_time': pos['entry_time'].isoformat() if hasattr(pos['entry_time'], 'isoformat') else str(pos['entry_time'])
-                }
-            
-            with open(self.position_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            self.store.save_positions(positions)
                 
             logger.info(f"포지션 저장 완료: {len(positions)}개")
             
@@ -38,21 +30,20 @@ class PositionRecovery:
     def load_positions(self):
         """저장된 포지션 로드"""
         try:
-            with open(self.position_file, 'r') as f:
-                data = json.load(f)
+            positions = self.store.load_positions()
+            if not positions:
+                logger.info("저장된 포지션 없음")
+                return {}
                 
-            logger.info(f"저장된 포지션 파일 발견: {data['timestamp']}")
-            return data['positions']
+            logger.info(f"저장된 포지션 발견: {len(positions)}개")
+            return positions
             
-        except FileNotFoundError:
-            logger.info("저장된 포지션 없음")
-            return {}
         except Exception as e:
             logger.error(f"포지션 로드 실패: {e}")
             return {}
     
     def sync_with_exchange(self, saved_positions):
-        """거래소 잔고와 동기화"""
+        """거래소 잔고와 동기화 (잔고 조회 실패 시 None)"""
         
         # 실제 보유 잔고 조회
         actual_balances = {}
@@ -67,7 +58,7 @@ class PositionRecovery:
                     }
         except Exception as e:
             logger.error(f"잔고 조회 실패: {e}")
-            return {}
+            return None
         
         # 저장된 포지션과 실제 잔고 비교
         recovered_positions = {}
@@ -75,11 +66,10 @@ class PositionRecovery:
         for symbol, actual in actual_balances.items():
             if actual['balance'] > 0:
                 if symbol in saved_positions:
-                    # 저장된 포지션 정보 사용
+                    # 저장된 포지션 정보 사용 (최고가 등 추가 필드 유지, 수량만 거래소 기준)
                     recovered_positions[symbol] = {
-                        'entry_price': saved_positions[symbol]['entry_price'],
+                        **saved_positions[symbol],
                         'quantity': actual['balance'],
-                        'entry_time': saved_positions[symbol]['entry_time']
                     }
                     logger.info(f"포지션 복구: {symbol} - 저장된 정보 사용")
                 else:
@@ -0,0 +1,260 @@
+# price_feed.py - 업비트 웹소켓 실시간 시세 수신 및 가격 장부
+
+import json
+import logging
+import threading
+import time
+import uuid
+
+from config import WEBSOCKET_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class PriceBook:
+    """종목별 최신 체결가 장부 (스레드 안전)"""
+
+    def __init__(self):
+        self._prices = {}  # {ticker: (price, received_at)}
+        self._lock = threading.Lock()
+
+    def update(self, ticker, price, received_at=None):
+        with self._lock:
+            self._prices[ticker] = (price, received_at or time.time())
+
+    def get(self, ticker, max_age=None):
+        """최신 가격 - 없거나 max_age(초)보다 오래됐으면 None"""
+        with self._lock:
+            entry = self._prices.get(ticker)
+        if entry is None:
+            return None
+
+        price, received_at = entry
+        if max_age is not None and time.time() - received_at > max_age:
+            return None
+        return price
+
+    def get_many(self, tickers, max_age=None):
+        """여러 종목 가격을 {ticker: price}로 반환 (신선한 것만)"""
+        prices = {}
+        for ticker in tickers:
+            price = self.get(ticker, max_age)
+            if price is not None:
+                prices[ticker] = price
+        return prices
+
+    def age(self, ticker):
+        """마지막 수신 후 경과 시간 (초), 없으면 None"""
+        with self._lock:
+            entry = self._prices.get(ticker)
+        return None if entry is None else time.time() - entry[1]
+
+    def __len__(self):
+        return len(self._prices)
+
+
+class WebSocketTransport:
+    """업비트 웹소켓 연결 (websockets 동기 클라이언트)"""
+
+    def __init__(self, url=None):
+        self.url = url or WEBSOCKET_CONFIG['url']
+        self._conn = None
+
+    def connect(self):
+        from websockets.sync.client import connect
+        # 최신 websockets는 컨텍스트 매니저 진입으로 연결을 연다
+        self._conn = connect(self.url, open_timeout=10, max_size=None).__enter__()
+
+    def send(self, message):
+        self._conn.send(message)
+
+    def recv(self, timeout=None):
+        """메시지 한 개 수신 - timeout 동안 없으면 None"""
+        try:
+            return self._conn.recv(timeout=timeout)
+        except TimeoutError:
+            return None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class ReplayTransport:
+    """기록된 메시지를 순서대로 재생하는 가짜 연결 (테스트/리플레이용)"""
+
+    def __init__(self, messages):
+        self._messages = list(messages)
+        self.sent = []
+        self.closed = False
+
+    def connect(self):
+        self.closed = False
+
+    def send(self, message):
+        self.sent.append(message)
+
+    def recv(self, timeout=None):
+        if self._messages:
+            message = self._messages.pop(0)
+            return message if isinstance(message, (str, bytes)) else json.dumps(message)
+
+        # 재생 끝 - 실제 연결처럼 대기
+        time.sleep(timeout or 0.01)
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+def parse_ticker_message(raw):
+    """웹소켓 메시지 → (ticker, price, timestamp_ms), 시세가 아니면 None
+
+    DEFAULT / SIMPLE 포맷 모두 지원
+    """
+    if isinstance(raw, bytes):
+        raw = raw.decode('utf-8')
+
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return None
+
+    if not isinstance(data, dict):
+        return None
+
+    ticker = data.get('code', data.get('cd'))
+    price = data.get('trade_price', data.get('tp'))
+    if ticker is None or price is None:
+        return None
+
+    timestamp = data.get('timestamp', data.get('tms'))
+    return ticker, float(price), timestamp
+
+
+class TickerFeed:
+    """업비트 시세 구독 스레드
+
+    - 구독 종목의 체결가를 PriceBook에 기록
+    - 가격이 들어올 때마다 등록된 리스너(ticker, price) 호출
+    - 연결이 끊기면 자동 재접속, 구독 종목이 바뀌면 재구독
+    """
+
+    def __init__(self, price_book=None, transport_factory=None, stream_type=None):
+        self.price_book = price_book or PriceBook()
+        self._transport_factory = transport_factory or WebSocketTransport
+        self.stream_type = stream_type or WEBSOCKET_CONFIG.get('stream_type', 'ticker')
+
+        self._tickers = set()
+        self._subscribed = None
+        self._listeners = []
+        self._lock = threading.Lock()
+
+        self._thread = None
+        self._running = False
+        self._transport = None
+
+        # 통계
+        self.messages = 0
+        self.reconnects = 0
+        self.last_message_at = 0
+
+    def subscribe(self, tickers):
+        """구독 종목 설정 (다음 수신 루프에서 재구독)"""
+        with self._lock:
+            self._tickers = set(tickers)
+
+    def add_listener(self, callback):
+        """가격 수신 콜백 등록 - callback(ticker, price)"""
+        self._listeners.append(callback)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='TickerFeed', daemon=True)
+        self._thread.start()
+        logger.info("📡 실시간 시세 수신 시작")
+
+    def stop(self, timeout=5):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_alive(self):
+        """최근 heartbeat_timeout 안에 메시지를 받았는지"""
+        timeout = WEBSOCKET_CONFIG.get('heartbeat_timeout', 30)
+        return self._running and time.time() - self.last_message_at < timeout
+
+    def _run(self):
+        backoff = 1
+        max_backoff = WEBSOCKET_CONFIG.get('max_reconnect_delay', 60)
+
+        while self._running:
+            try:
+                self._transport = self._transport_factory()
+                self._transport.connect()
+                self._subscribed = None
+                backoff = 1
+
+                self._receive_loop()
+
+            except Exception as e:
+                if not self._running:
+                    break
+                self.reconnects += 1
+                logger.warning(f"웹소켓 연결 오류: {e} - {backoff}초 후 재접속")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, max_backoff)
+
+            finally:
+                if self._transport is not None:
+                    try:
+                        self._transport.close()
+                    except Exception:
+                        pass
+                    self._transport = None
+
+    def _receive_loop(self):
+        while self._running:
+            self._sync_subscription()
+
+            raw = self._transport.recv(timeout=1)
+            if raw is None:
+                continue
+
+            parsed = parse_ticker_message(raw)
+            if parsed is None:
+                continue
+
+            ticker, price, _ = parsed
+            self.messages += 1
+            self.last_message_at = time.time()
+            self.price_book.update(ticker, price, self.last_message_at)
+
+            for callback in list(self._listeners):
+                try:
+                    callback(ticker, price)
+                except Exception as e:
+                    logger.error(f"{ticker} 시세 리스너 오류: {e}")
+
+    def _sync_subscription(self):
+        with self._lock:
+            tickers = sorted(self._tickers)
+
+        if tickers == self._subscribed:
+            return
+
+        self._subscribed = tickers
+        if not tickers:
+            return
+
+        request = [
+            {'ticket': str(uuid.uuid4())},
+            {'type': self.stream_type, 'codes': tickers},
+            {'format': 'DEFAULT'}
+        ]
+        self._transport.send(json.dumps(request))
+        logger.info(f"📡 시세 구독: {len(tickers)}개 종목")
@@ -4,13 +4,17 @@ import logging
 from datetime import datetime
 import pyupbit
 from config import PYRAMIDING_CONFIG
+from clock import SYSTEM_CLOCK
 
 logger = logging.getLogger(__name__)
 
 class PyramidingManager:
     """조건부 추매 관리자"""
     
-    def __init__(self):
+    def __init__(self, clock=None, store=None, journal=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.store = store  # 있으면 추매 기록을 저장소(position_events)에도 남김
+        self.journal = journal  # 있으면 포지션 저널에 기록/복원
         self.enabled = PYRAMIDING_CONFIG.get('enabled', False)
         self.max_pyramids = PYRAMIDING_CONFIG.get('max_pyramids', 1)
         self.min_score_increase = PYRAMIDING_CONFIG.get('min_score_increase', 1.0)
@@ -20,6 +24,11 @@ class PyramidingManager:
         
         # 추매 기록
         self.pyramid_history = {}  # {symbol: [entry_scores, entry_prices]}
+        if self.journal:
+            self.pyramid_history = self.journal.get('pyramids')
+            for history in self.pyramid_history.values():
+                history['timestamps'] = [datetime.fromisoformat(t) if isinstance(t, str) else t
+                                         for t in history.get('timestamps', [])]
         
     def can_pyramid(self, symbol, current_score, current_price, position, market_condition):
         """추매 가능 여부 판단"""
@@ -120,8 +129,17 @@ class PyramidingManager:
         self.pyramid_history[symbol]['count'] += 1
         self.pyramid_history[symbol]['prices'].append(entry_price)
         self.pyramid_history[symbol]['scores'].append(score)
-        self.pyramid_history[symbol]['timestamps'].append(datetime.now())
+        self.pyramid_history[symbol]['timestamps'].append(self.clock.now())
         self.pyramid_history[symbol]['last_score'] = score
+        if self.journal:
+            self.journal.set('pyramids', symbol, self.pyramid_history[symbol])
+        if self.store:
+            try:
+                self.store.add_position_event(symbol, 'pyramid', {
+                    'price': entry_price, 'score': score, 'timestamp': self.clock.now()
+                })
+            except Exception as e:
+                logger.error(f"추매 기록 저장 실패: {e}")
         
         logger.info(f"📝 {symbol} 추매 기록: {self.pyramid_history[symbol]['count']}회차")
     
@@ -159,8 +177,15 @@ class PyramidingManager:
     def reset_pyramid(self, symbol):
         """포지션 청산 시 추매 기록 초기화"""
         if symbol in self.pyramid_history:
+            if self.journal:
+                self.journal.delete('pyramids', symbol)
             del self.pyramid_history[symbol]
             logger.info(f"🔄 {symbol} 추매 기록 초기화")
+            if self.store:
+                try:
+                    self.store.close_position_events(symbol, 'pyramid')
+                except Exception as e:
+                    logger.error(f"추매 기록 저장 실패: {e}")
     
     def get_pyramid_info(self, symbol):
         """추매 정보 조회"""
@@ -0,0 +1,54 @@
+# replay_bot.py - 기록된 시세로 TradingBot 전체를 가속 재생 (실거래 루프 재현/벤치마크)
+#
+# - ReplayExchange: 캔들 아카이브의 기록을 시뮬레이션 시계 시각까지만 보여 주는 모의 거래소
+# - SimulatedClock: 잠들지 않고 다음 예약 시각으로 바로 넘어감 → 일주일 기록도 몇 분
+# - 봇의 청산/진입/물타기/프리셋/저장 작업이 실거래와 같은 주기로 실행됨
+#
+# - 봇의 상태 파일(trading.db, 오늘 거래 저널, position_state.json(l))은 state_dir에 쓰인다
+#   (기본: 새 임시 디렉터리) → 실거래 포지션을 복구하거나 대시보드 DB에 모의 거래를 쓰지 않음
+
+import argparse
+
+import candle_archive
+from clock import SimulatedClock
+from exchange_client import ReplayExchange
+from config import BACKTEST_CONFIG
+
+
+def replay(start, end, balance=None, price_interval='minute1', archive=None, state_dir=None):
+    """start~end (KST 시각/epoch) 기록 재생 → (bot, 실제 소요 초)
+
+    state_dir: 봇 상태 파일 디렉터리 (None이면 새 임시 디렉터리)
+    """
+    from main_trading_bot import TradingBot
+
+    clock = SimulatedClock(candle_archive.to_epoch(start))
+    exchange = ReplayExchange(balance or BACKTEST_CONFIG['initial_balance'], clock,
+                              archive=archive, price_interval=price_interval)
+    bot = TradingBot(exchange=exchange, clock=clock, state_dir=state_dir)
+    elapsed = bot.replay(end)
+    return bot, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="기록된 시세로 트레이딩 봇 가속 재생")
+    parser.add_argument('start', help="재생 시작 (KST, 예: '2024-06-01 09:00')")
+    parser.add_argument('end', help="재생 종료 (KST)")
+    parser.add_argument('--balance', type=float, default=None, help="시작 원화 잔고")
+    parser.add_argument('--price-interval', default='minute1', help="현재가로 쓸 캔들 주기")
+    parser.add_argument('--state-dir', default=None,
+                        help="봇 상태 파일 디렉터리 (기본: 새 임시 디렉터리, 실거래 파일과 분리)")
+    args = parser.parse_args()
+
+    bot, elapsed = replay(args.start, args.end, args.balance, args.price_interval,
+                          state_dir=args.state_dir)
+    exchange = bot.upbit
+    span = candle_archive.to_epoch(args.end) - candle_archive.to_epoch(args.start)
+
+    print("\n" + "=" * 60)
+    print("🎬 재생 결과")
+    print("=" * 60)
+    print(f"기간: {args.start} ~ {args.end} ({span / 3600:.1f}시간) → {elapsed:.1f}초 "
+          f"({span / elapsed if elapsed > 0 else float('inf'):,.0f}배속)")
+    print(f"최종 자산: {exchange.total_equity():,.0f}원 | 체결: {len(exchange.fills)}건 | "
+          f"거부: {exchange.rejected}건 | 미청산: {len(bot.risk_manager.positions)}개")
@@ -0,0 +1,372 @@
+# request_scheduler.py - 업비트 API 요청 스케줄러 (Remaining-Req 기반 토큰 버킷 + 우선순위)
+
+import functools
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import pyupbit
+import requests
+from pyupbit import request_api
+from pyupbit.errors import UpbitLimitError, error_handler
+
+from config import REQUEST_SCHEDULER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 (작을수록 먼저)
+PRIORITY_EXIT = 0        # 주문, 청산, 주문 상태 조회
+PRIORITY_ENTRY = 1       # 신규 진입 분석
+PRIORITY_SCAN = 2        # 모멘텀 스캔, 시장 분석
+PRIORITY_DASHBOARD = 3   # 대시보드 표시
+
+PRIORITY_NAMES = {
+    PRIORITY_EXIT: 'exit',
+    PRIORITY_ENTRY: 'entry',
+    PRIORITY_SCAN: 'scan',
+    PRIORITY_DASHBOARD: 'dashboard',
+}
+
+# 응답 헤더 그룹명 → 버킷 이름
+_GROUP_ALIASES = {
+    'candle': 'candles',
+    'trade': 'trades',
+}
+
+
+class TokenBucket:
+    """초당 요청 수 토큰 버킷 - 서버가 알려준 잔여 요청 수로 보정"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+        self.remaining_sec = None   # 마지막 Remaining-Req sec 값
+        self.remaining_min = None   # 마지막 Remaining-Req min 값
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, need=1):
+        """토큰 need개가 모일 때까지 남은 시간 (초) - 0이면 즉시 가능"""
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= need:
+            return 0.0
+        return (need - self.tokens) / self.rate
+
+    def take(self, cost=1):
+        self.tokens -= cost  # 버킷 용량보다 큰 요청은 빚(음수)으로 남아 다음 요청이 기다림
+
+    def observe(self, remaining_sec, remaining_min=None):
+        """서버 잔여 요청 수 반영 (우리 계산보다 적으면 서버 기준으로 낮춤)"""
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, float(remaining_sec))
+        self.remaining_sec = remaining_sec
+        self.remaining_min = remaining_min
+
+    def drain(self, penalty=1.0):
+        """429 응답 시 penalty초 동안 요청 중단"""
+        self._refill(time.monotonic())
+        self.tokens = -penalty * self.rate
+
+
+class RequestScheduler:
+    """그룹별 토큰 버킷 + 우선순위 대기열
+
+    - 같은 그룹에서는 우선순위가 높은(숫자가 작은) 요청이 먼저 나간다
+    - 청산 외 요청은 reserve_for_exit개 토큰을 남겨두어 손절 주문이 막히지 않게 한다
+    - 호출자(caller)별 사용량 통계를 기록한다
+    """
+
+    def __init__(self, config=None):
+        self.config = config or REQUEST_SCHEDULER_CONFIG
+        self._buckets = {}
+        self._waiting = {}  # {group: [(priority, seq)]}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._local = threading.local()
+
+        self._usage = {}  # {caller: {...}}
+        self._group_stats = {}  # {group: {'calls', 'throttled'}}
+
+    # ------------------------------------------------------------------
+    # 호출 문맥
+    # ------------------------------------------------------------------
+    @contextmanager
+    def context(self, caller, priority):
+        """이 스레드에서 나가는 요청의 기본 호출자/우선순위 지정"""
+        previous = getattr(self._local, 'context', None)
+        self._local.context = (caller, priority)
+        try:
+            yield
+        finally:
+            self._local.context = previous
+
+    def current_context(self):
+        return getattr(self._local, 'context', None) or ('default', PRIORITY_ENTRY)
+
+    # ------------------------------------------------------------------
+    # 요청 실행
+    # ------------------------------------------------------------------
+    def call(self, func, *args, group='default', priority=None, caller=None, cost=1, **kwargs):
+        """토큰 cost개를 받은 뒤 func(*args, **kwargs) 실행
+
+        cost: func가 보내는 HTTP 요청 수 (여러 페이지를 받는 캔들 조회 등)
+        """
+        ctx_caller, ctx_priority = self.current_context()
+        caller = caller or ctx_caller
+        priority = ctx_priority if priority is None else priority
+
+        if not self.config.get('enabled', True):
+            return func(*args, **kwargs)
+
+        retries = self.config.get('max_retries', 2)
+        for attempt in range(retries + 1):
+            waited = self._acquire(group, priority, cost)
+            _throttle.flag = False
+            start = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                # 텍스트 본문 429는 pyupbit가 응답을 읽다 다른 예외로 끝남 → HTTP 훅 표시도 확인
+                if not (_take_throttled() or isinstance(e, UpbitLimitError)):
+                    raise
+                error = e
+            else:
+                if not _take_throttled():
+                    self._record(caller, group, priority, waited, time.monotonic() - start)
+                    return result
+                # get_ohlcv 등은 예외를 삼키고 None 반환 → HTTP 훅 표시로 감지
+                error = None
+
+            self._record(caller, group, priority, waited, time.monotonic() - start, throttled=True)
+            with self._cond:
+                self._bucket(group).drain(self.config.get('throttle_penalty', 1.0))
+            if attempt >= retries:
+                if error is not None:
+                    raise error
+                return result
+            logger.warning(f"요청 제한 응답 ({group}, {caller}): {error or 'HTTP 429'} - "
+                           f"재시도 {attempt + 1}/{retries}")
+
+    def _bucket(self, group):
+        bucket = self._buckets.get(group)
+        if bucket is None:
+            rates = self.config.get('group_rates', {})
+            bucket = TokenBucket(rates.get(group, self.config.get('default_rate', 10)))
+            self._buckets[group] = bucket
+            self._waiting[group] = []
+        return bucket
+
+    def _acquire(self, group, priority, cost=1):
+        """대기열 순서가 오고 토큰 cost개가 생길 때까지 대기 - 대기 시간(초) 반환"""
+        start = time.monotonic()
+        reserve = 0 if priority <= PRIORITY_EXIT else self.config.get('reserve_for_exit', 1)
+
+        with self._cond:
+            bucket = self._bucket(group)
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiting[group], entry)
+
+            while True:
+                if self._waiting[group][0] == entry:
+                    wait = bucket.wait_time(min(cost + reserve, bucket.capacity))
+                    if wait <= 0:
+                        heapq.heappop(self._waiting[group])
+                        bucket.take(cost)
+                        self._cond.notify_all()
+                        return time.monotonic() - start
+                    self._cond.wait(wait)
+                else:
+                    # 더 급한 요청이 먼저 - 토큰이 나가거나 새 요청이 들어오면 다시 확인
+                    self._cond.wait(0.05)
+
+    def observe_remaining(self, limit):
+        """응답 헤더 Remaining-Req 반영 - {'group': 'market', 'min': 573, 'sec': 9}"""
+        group = _GROUP_ALIASES.get(limit.get('group'), limit.get('group'))
+        if not group:
+            return
+        with self._cond:
+            self._bucket(group).observe(limit.get('sec', 0), limit.get('min'))
+            self._cond.notify_all()
+
+    def _record(self, caller, group, priority, waited, elapsed, throttled=False):
+        with self._cond:
+            usage = self._usage.setdefault(caller, {
+                'calls': 0, 'wait_time': 0.0, 'max_wait': 0.0,
+                'call_time': 0.0, 'throttled': 0, 'groups': {},
+                'priority': PRIORITY_NAMES.get(priority, priority)
+            })
+            usage['calls'] += 1
+            usage['wait_time'] += waited
+            usage['max_wait'] = max(usage['max_wait'], waited)
+            usage['call_time'] += elapsed
+            usage['groups'][group] = usage['groups'].get(group, 0) + 1
+
+            stats = self._group_stats.setdefault(group, {'calls': 0, 'throttled': 0})
+            stats['calls'] += 1
+            if throttled:
+                usage['throttled'] += 1
+                stats['throttled'] += 1
+
+    # ------------------------------------------------------------------
+    # 통계
+    # ------------------------------------------------------------------
+    def get_usage(self):
+        """호출자별 사용량 {caller: {calls, avg_wait, max_wait, throttled, groups, priority}}"""
+        with self._cond:
+            report = {}
+            for caller, usage in self._usage.items():
+                calls = usage['calls']
+                report[caller] = {
+                    'calls': calls,
+                    'avg_wait': usage['wait_time'] / calls if calls else 0.0,
+                    'max_wait': usage['max_wait'],
+                    'avg_call_time': usage['call_time'] / calls if calls else 0.0,
+                    'throttled': usage['throttled'],
+                    'groups': dict(usage['groups']),
+                    'priority': usage['priority'],
+                }
+            return report
+
+    def get_group_status(self):
+        """그룹별 버킷 상태 (잔여 토큰, 마지막 Remaining-Req, 호출/제한 횟수)"""
+        with self._cond:
+            status = {}
+            for group, bucket in self._buckets.items():
+                bucket.wait_time()  # 토큰 갱신
+                stats = self._group_stats.get(group, {'calls': 0, 'throttled': 0})
+                status[group] = {
+                    'tokens': bucket.tokens,
+                    'rate': bucket.rate,
+                    'remaining_sec': bucket.remaining_sec,
+                    'remaining_min': bucket.remaining_min,
+                    'waiting': len(self._waiting[group]),
+                    'calls': stats['calls'],
+                    'throttled': stats['throttled'],
+                }
+            return status
+
+
+class ScheduledUpbit:
+    """pyupbit.Upbit 래퍼 - 모든 계좌/주문 API를 스케줄러 경유로 호출
+
+    주문 및 주문 조회는 항상 청산 우선순위, 나머지는 호출 문맥의 우선순위를 따른다
+    """
+
+    ORDER_METHODS = ('buy_', 'sell_', 'cancel_order', 'get_order')
+
+    def __init__(self, upbit, scheduler=None):
+        self._upbit = upbit
+        self._scheduler = scheduler or get_scheduler()
+
+    def __getattr__(self, name):
+        attr = getattr(self._upbit, name)
+        if not callable(attr):
+            return attr
+
+        is_order = name.startswith(self.ORDER_METHODS)
+        group = 'order' if name.startswith(('buy_', 'sell_', 'cancel_order')) else 'default'
+        priority = PRIORITY_EXIT if is_order else None
+
+        def scheduled(*args, **kwargs):
+            return self._scheduler.call(attr, *args, group=group, priority=priority, **kwargs)
+
+        return scheduled
+
+
+# 프로세스 공용 인스턴스
+_scheduler = RequestScheduler()
+_original_parse = request_api._parse
+
+
+def _parse_and_observe(remaining_req):
+    """pyupbit의 Remaining-Req 파서를 감싸서 모든 응답의 잔여 요청 수를 스케줄러에 전달"""
+    limit = _original_parse(remaining_req)
+    try:
+        _scheduler.observe_remaining(limit)
+    except Exception as e:
+        logger.debug(f"Remaining-Req 반영 실패: {e}")
+    return limit
+
+
+request_api._parse = _parse_and_observe
+
+# 이 스레드에서 나간 HTTP 요청이 429를 받았는지 (모든 스케줄러 공용)
+_throttle = threading.local()
+
+
+def _take_throttled():
+    """429 표시를 읽고 지움"""
+    throttled = getattr(_throttle, 'flag', False)
+    _throttle.flag = False
+    return throttled
+
+
+def _send_and_observe(method):
+    """pyupbit HTTP 호출 - 429 응답이면 표시 (get_ohlcv처럼 예외를 삼키는 함수도 재시도되도록)"""
+    def send(url, **kwargs):
+        resp = getattr(requests, method)(url, **kwargs)
+        if resp.status_code == 429:
+            _throttle.flag = True
+        return resp
+    return error_handler(send)
+
+
+request_api._call_get = _send_and_observe('get')
+request_api._call_post = _send_and_observe('post')
+request_api._call_delete = _send_and_observe('delete')
+
+
+def get_scheduler():
+    """공용 스케줄러 인스턴스"""
+    return _scheduler
+
+
+def call(func, *args, **kwargs):
+    """공용 스케줄러로 요청 실행"""
+    return _scheduler.call(func, *args, **kwargs)
+
+
+def context(caller, priority):
+    """공용 스케줄러 호출 문맥"""
+    return _scheduler.context(caller, priority)
+
+
+def get_current_price(tickers, **kwargs):
+    """스케줄러 경유 현재가 조회"""
+    return _scheduler.call(pyupbit.get_current_price, tickers, group='ticker', **kwargs)
+
+
+def get_usage():
+    """호출자별 사용량"""
+    return _scheduler.get_usage()
+
+
+def bind_context(func):
+    """현재 스레드의 호출 문맥을 다른 스레드(스레드 풀)에서도 쓰도록 func에 묶기"""
+    caller, priority = _scheduler.current_context()
+
+    @functools.wraps(func)
+    def bound(*args, **kwargs):
+        with _scheduler.context(caller, priority):
+            return func(*args, **kwargs)
+    return bound
+
+
+def with_context(caller, priority):
+    """메서드 데코레이터 - 실행 중 나가는 요청에 호출자/우선순위 지정"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _scheduler.context(caller, priority):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
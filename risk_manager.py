@@ -1,24 +1,117 @@
 # risk_manager.py - 중복 제거 및 최적화 완료 버전
 
 import os
-from datetime import datetime
+import threading
 import pyupbit
 from collections import defaultdict
 import logging
 import numpy as np
 
 # 설정 파일 로드
-from config import RISK_CONFIG, STABLE_PAIRS, ADVANCED_CONFIG
+from config import (RISK_CONFIG, STABLE_PAIRS, ADVANCED_CONFIG, TRADE_STATS_CONFIG,
+                    POSITION_JOURNAL_CONFIG)
+from clock import SYSTEM_CLOCK
 
 logger = logging.getLogger(__name__)
 
+
+class PositionBook(dict):
+    """스레드 안전 포지션 저장소 {symbol: position}
+
+    - 추가/삭제는 lock 안에서
+    - keys()/values()/items()/순회는 그 시점의 복사본 (순회 중 다른 스레드가 바꿔도 안전)
+    - 여러 단계를 묶어야 하면 `with book.lock:` 사용
+    - journal(PositionJournal)이 있으면 변경을 먼저 저널에 기록
+      → 포지션 필드 수정은 positions[symbol][...] = 대신 update_fields() 사용
+    """
+
+    def __init__(self, *args, journal=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+        self.journal = journal
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            if self.journal:
+                self.journal.set('positions', key, value)
+            super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        with self.lock:
+            if self.journal and key in self:
+                self.journal.delete('positions', key)
+            super().__delitem__(key)
+
+    def pop(self, key, *default):
+        with self.lock:
+            if self.journal and key in self:
+                self.journal.delete('positions', key)
+            return super().pop(key, *default)
+
+    def setdefault(self, key, default=None):
+        with self.lock:
+            if key not in self:
+                self[key] = default
+            return super().__getitem__(key)
+
+    def update(self, *args, **kwargs):
+        with self.lock:
+            for key, value in dict(*args, **kwargs).items():
+                self[key] = value
+
+    def update_fields(self, key, durable=True, **fields):
+        """포지션 필드 일부 수정 (없는 종목이면 False)
+
+        durable=False: 저널 fsync 생략 (최고가처럼 자주 바뀌는 값)
+        """
+        with self.lock:
+            position = self.get(key)
+            if position is None:
+                return False
+            if self.journal:
+                self.journal.update('positions', key, fields, durable=durable)
+            position.update(fields)
+            return True
+
+    def clear(self):
+        with self.lock:
+            if self.journal:
+                self.journal.clear('positions')
+            super().clear()
+
+    def keys(self):
+        with self.lock:
+            return list(super().keys())
+
+    def values(self):
+        with self.lock:
+            return list(super().values())
+
+    def items(self):
+        with self.lock:
+            return list(super().items())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def copy(self):
+        with self.lock:
+            return dict(super().items())
+
+
 class RiskManager:
-    def __init__(self, initial_balance):
+    def __init__(self, initial_balance, market_analyzer=None, clock=None,
+                 balance_file="initial_balance.txt", trade_stats=None, position_journal=None):
+        """balance_file=None이면 저장된 초기 자본을 읽지 않음 (백테스트)
+        trade_stats: 롤링 거래 통계 (있으면 켈리 비율을 최근 창 기준으로)
+        position_journal: 포지션 상태 저널 (있으면 포지션 변경을 모두 기록)"""
+        self.clock = clock or SYSTEM_CLOCK
+        self.trade_stats = trade_stats
+        
         # 1. 초기 자본 설정 로직 통합
-        balance_file = "initial_balance.txt"
         self.need_total_balance_update = False
         
-        if os.path.exists(balance_file):
+        if balance_file and os.path.exists(balance_file):
             try:
                 with open(balance_file, 'r') as f:
                     self.initial_balance = float(f.read().strip())
@@ -26,16 +119,19 @@ class RiskManager:
             except Exception as e:
                 logger.error(f"⚠️ 파일 읽기 실패: {e}")
                 self.initial_balance = initial_balance
-        else:
+        elif balance_file:
             self.initial_balance = initial_balance
             self.need_total_balance_update = True
             logger.info("🔄 초기 자본 설정 준비 중... (총 자산 계산 예정)")
+        else:
+            self.initial_balance = initial_balance
 
         # 2. 변수 초기화 (중복 제거됨)
         self.current_balance = self.initial_balance
         self.reset_to_current_balance = True  # 첫 실행 시 재설정 플래그
         
-        self.positions = {}  # 포지션 저장소
+        self.positions = PositionBook(journal=position_journal)  # 포지션 저장소 (청산/진입 스레드 공유)
+        self.lock = self.positions.lock
         self.daily_pnl = defaultdict(float)  # 일일 손익
         self.daily_trades = defaultdict(list)  # 일일 거래 기록
         
@@ -58,10 +154,10 @@ class RiskManager:
         self.win_rate = 0.5
         self.avg_win_loss_ratio = 1.5
         
-        # 5. 시장 분석기 로드 (선택적)
+        # 5. 시장 분석기 (공용 인스턴스, 선택적)
         try:
-            from market_condition_check import MarketAnalyzer
-            self.market_analyzer = MarketAnalyzer()
+            from market_condition_check import get_market_analyzer
+            self.market_analyzer = market_analyzer or get_market_analyzer()
         except ImportError:
             self.market_analyzer = None
             logger.warning("MarketAnalyzer를 로드할 수 없습니다 (기본 리스크 관리만 작동)")
@@ -95,7 +191,7 @@ class RiskManager:
 
     def check_daily_loss_limit(self):
         """일일 손실 한도 체크"""
-        today = datetime.now().strftime('%Y-%m-%d')
+        today = self.clock.now().strftime('%Y-%m-%d')
         
         if self.initial_balance <= 0:
             return False
@@ -146,14 +242,26 @@ class RiskManager:
         
         return final_position_value / current_price
     
+    def _kelly_inputs(self):
+        """(승률, 손익비) - 롤링 창에 거래가 충분하면 창 기준 (O(1)), 아니면 세션 누적"""
+        if self.trade_stats is not None:
+            count, wins, win_pnl, loss_pnl = self.trade_stats.counts(
+                TRADE_STATS_CONFIG['kelly_window_days'])
+            if count >= TRADE_STATS_CONFIG['kelly_min_trades']:
+                losses = count - wins
+                ratio = self.avg_win_loss_ratio
+                if wins > 0 and losses > 0 and loss_pnl < 0:
+                    ratio = (win_pnl / wins) / (abs(loss_pnl) / losses)
+                return wins / count, ratio
+        return self.win_rate, self.avg_win_loss_ratio
+    
     def _calculate_kelly_fraction(self):
         """Kelly Criterion 계산 (보수적 적용)"""
-        if self.win_rate <= 0 or self.avg_win_loss_ratio <= 0:
+        p, b = self._kelly_inputs()
+        if p <= 0 or b <= 0:
             return 0.02  # 데이터 없으면 기본 2%
         
-        p = self.win_rate
         q = 1 - p
-        b = self.avg_win_loss_ratio
         
         kelly = (p * b - q) / b
         conservative_kelly = kelly * 0.25  # 1/4 켈리 (안전 제일)
@@ -162,10 +270,10 @@ class RiskManager:
     
     def check_stop_loss(self, symbol, current_price, averaging_manager=None):
         """손절 체크 (물타기 횟수에 따라 유동적)"""
-        if symbol not in self.positions:
+        position = self.positions.get(symbol)
+        if position is None:
             return False
         
-        position = self.positions[symbol]
         entry_price = position['entry_price']
         
         # 기본 손절 기준
@@ -192,7 +300,9 @@ class RiskManager:
             return True
         
         # 하락장(bearish)일 경우 손절 기준을 20% 단축 (더 빨리 도망가기)
-        if self.market_analyzer and self.market_analyzer.analyze_market(STABLE_PAIRS) == 'bearish':
+        # 청산 스레드는 진입 쪽 시장 분석 갱신을 기다리지 않음 (갱신 중이면 지난 판단)
+        if self.market_analyzer and \
+                self.market_analyzer.analyze_market(STABLE_PAIRS, allow_stale=True) == 'bearish':
             adjusted_stop_loss *= 0.8 
             logger.info(f"🐻 하락장 감지: 손절 라인 단축 ({adjusted_stop_loss:.1%})")
         
@@ -201,16 +311,19 @@ class RiskManager:
     def check_trailing_stop(self, symbol, current_price):
         """추적 손절 (익절 보호) - ✅ 수수료 고려 버전"""
         
-        if symbol not in self.positions:
+        position = self.positions.get(symbol)
+        if position is None:
             return False
         
-        position = self.positions[symbol]
         entry_price = position['entry_price']
         highest_price = position.get('highest_price', entry_price)
         
         # 최고가 갱신
         if current_price > highest_price:
-            self.positions[symbol]['highest_price'] = current_price
+            with self.lock:
+                self.positions.update_fields(
+                    symbol, durable=POSITION_JOURNAL_CONFIG['fsync_highest_price'],
+                    highest_price=current_price)
             highest_price = current_price
         
         # 현재 수익률 (진입가 대비)
@@ -239,12 +352,16 @@ class RiskManager:
     
     def update_position(self, symbol, entry_price, quantity, trade_type):
         """포지션 업데이트 및 통계 갱신"""
+        with self.lock:
+            self._update_position(symbol, entry_price, quantity, trade_type)
+    
+    def _update_position(self, symbol, entry_price, quantity, trade_type):
         if trade_type == 'buy':
             self.positions[symbol] = {
                 'entry_price': entry_price,
                 'quantity': quantity,
                 'value': entry_price * quantity,
-                'entry_time': datetime.now(),
+                'entry_time': self.clock.now(),
                 'highest_price': entry_price
             }
             logger.info(f"➕ 포지션 등록: {symbol}")
@@ -254,7 +371,7 @@ class RiskManager:
             pnl = (entry_price - position['entry_price']) * quantity
             
             # 통계 즉시 업데이트 (O(1))
-            today = datetime.now().strftime('%Y-%m-%d')
+            today = self.clock.now().strftime('%Y-%m-%d')
             self.daily_pnl[today] += pnl
             
             if pnl > 0:
@@ -295,7 +412,7 @@ class RiskManager:
     
     def get_risk_status(self):
         """현재 리스크 상태 반환 (UI 표시용)"""
-        today = datetime.now().strftime('%Y-%m-%d')
+        today = self.clock.now().strftime('%Y-%m-%d')
         
         # 현재 보유 포지션 평가금액 합산 (API 호출 최소화: 저장된 value 사용)
         # 정확한 평가를 원하면 여기서 get_current_price를 호출해야 하지만 속도 저하 주의
@@ -315,7 +432,7 @@ class RiskManager:
     
     def reset_daily_stats(self):
         """자정에 일일 통계 초기화"""
-        today = datetime.now().strftime('%Y-%m-%d')
+        today = self.clock.now().strftime('%Y-%m-%d')
         self.daily_pnl[today] = 0
         self.daily_trades[today] = []
         logger.info("📅 일일 리스크 통계가 초기화되었습니다.")
\ No newline at end of file
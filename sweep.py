@@ -0,0 +1,237 @@
+# sweep.py - 프리셋/파라미터 조합 병렬 백테스트 (프로세스 풀)
+#
+# - 조합: STRATEGY_PRESETS × 파라미터 격자 (프리셋과 같은 키만: stop_loss, entry_score_threshold, ...)
+# - 재생 데이터(지표/ML 예측 포함)는 부모가 한 번 계산해 .npy로 저장하고
+#   워커는 메모리 맵으로 열어 같은 페이지 캐시를 공유 (워커마다 복사/재계산 없음)
+# - 프리셋 적용은 설정 모듈 전역을 바꾸므로 워커 프로세스 안에서만 (조합마다 전체 프리셋 값을 덮어씀)
+# - 결과는 설정 해시(프리셋 값 + 나머지 설정 + 데이터 + 재생 구간)별 JSON으로 캐시 → 다시 돌리면 새 조합만 계산
+# - 출력: 수익률/최대 낙폭/거래 수 순위표
+
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import config
+from backtest import Backtester, ReplayData, load_replay_data
+from config import STRATEGY_PRESETS, ACTIVE_PRESET, SWEEP_CONFIG, apply_preset_values
+
+logger = logging.getLogger(__name__)
+
+PRESET_KEYS = tuple(STRATEGY_PRESETS[ACTIVE_PRESET])
+RESULT_COLUMNS = ['total_return', 'max_drawdown', 'trades', 'win_rate', 'final_equity', 'fees']
+
+
+def expand_grid(presets=None, grid=None):
+    """프리셋 × 파라미터 격자 → [{name, preset, params, values}]
+
+    grid: {프리셋 키: [값, ...]} - 각 프리셋 값 위에 덮어씀
+    """
+    presets = presets or list(STRATEGY_PRESETS)
+    grid = grid or {}
+    unknown = sorted(set(grid) - set(PRESET_KEYS))
+    if unknown:
+        raise ValueError(f"프리셋에 없는 파라미터: {unknown}")
+    missing = [p for p in presets if p not in STRATEGY_PRESETS]
+    if missing:
+        raise ValueError(f"알 수 없는 프리셋: {missing}")
+
+    keys = list(grid)
+    combos = []
+    for preset in presets:
+        for values in itertools.product(*(grid[k] for k in keys)):
+            params = dict(zip(keys, values))
+            combos.append({
+                'name': preset + ''.join(f" {k}={v}" for k, v in params.items()),
+                'preset': preset,
+                'params': params,
+                'values': {**copy.deepcopy(STRATEGY_PRESETS[preset]), **params},
+            })
+    return combos
+
+
+def settings_snapshot():
+    """프리셋 밖의 설정 (*_CONFIG) - 바뀌면 캐시된 결과도 무효"""
+    return {
+        name: value for name, value in vars(config).items()
+        if name.endswith('_CONFIG') and isinstance(value, dict) and name != 'SWEEP_CONFIG'
+    }
+
+
+def config_hash(values, data_key, run, settings=None):
+    """조합 하나의 결과 캐시 키"""
+    payload = json.dumps({
+        'preset': values,
+        'settings': settings if settings is not None else settings_snapshot(),
+        'data': data_key,
+        'run': run,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+# ----------------------------------------------------------------------
+# 워커 프로세스
+# ----------------------------------------------------------------------
+_worker_data = None
+
+
+def _init_worker(data_dir):
+    """워커 시작 시 재생 데이터를 메모리 맵으로 한 번만 연다"""
+    global _worker_data
+    _worker_data = ReplayData.load(data_dir)
+
+
+def _run_combo(values, run):
+    """워커에서 실행 - 프리셋 값 적용 후 백테스트 → summary"""
+    apply_preset_values(values)
+    backtester = Backtester(_worker_data, initial_balance=run['initial_balance'],
+                            fee_rate=run['fee_rate'], slippage=run['slippage'])
+    return backtester.run(start=run['start'], end=run['end']).summary()
+
+
+# ----------------------------------------------------------------------
+# 부모 프로세스
+# ----------------------------------------------------------------------
+def _shared_data_dir(data, data_key, data_dir):
+    """재생 데이터를 data_dir/<데이터 키>에 저장 (이미 있으면 재사용)"""
+    directory = os.path.join(data_dir, data_key[:20])
+    if not os.path.exists(os.path.join(directory, 'meta.json')):
+        data.save(directory)
+    return directory
+
+
+def _load_cached(cache_dir, key):
+    path = os.path.join(cache_dir, f"{key}.json")
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['summary']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _save_cached(cache_dir, key, combo, summary):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{key}.json")
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'name': combo['name'], 'values': combo['values'], 'summary': summary},
+                  f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+def run_sweep(data, combos, start=None, end=None, initial_balance=None, fee_rate=None,
+              slippage=None, workers=None, cache_dir=None, data_dir=None, rank_by=None):
+    """조합들을 프로세스 풀에서 백테스트 → 순위표 DataFrame (1위부터)
+
+    캐시에 있는 조합은 다시 계산하지 않음 (cached 열로 표시)
+    """
+    workers = workers or SWEEP_CONFIG['workers'] or os.cpu_count() or 1
+    cache_dir = cache_dir or SWEEP_CONFIG['cache_dir']
+    data_dir = data_dir or SWEEP_CONFIG['data_dir']
+    rank_by = rank_by or SWEEP_CONFIG['rank_by']
+
+    run = {'start': start, 'end': end, 'initial_balance': initial_balance,
+           'fee_rate': fee_rate, 'slippage': slippage}
+    data_key = data.fingerprint()
+    settings = settings_snapshot()
+
+    summaries = {}
+    cached = set()
+    pending = []
+    for combo in combos:
+        key = config_hash(combo['values'], data_key, run, settings)
+        summary = _load_cached(cache_dir, key)
+        if summary is not None:
+            summaries[combo['name']] = summary
+            cached.add(combo['name'])
+        else:
+            pending.append((key, combo))
+
+    started = time.perf_counter()
+    if pending:
+        directory = _shared_data_dir(data, data_key, data_dir)
+        logger.info(f"스윕: {len(pending)}개 조합 계산 ({len(cached)}개 캐시) - 워커 {workers}개")
+
+        # 스레드가 많은 프로세스에서 fork는 위험 - spawn으로 깨끗한 인터프리터 사용
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(directory,)
+        ) as executor:
+            futures = {executor.submit(_run_combo, combo['values'], run): (key, combo)
+                       for key, combo in pending}
+            for future in as_completed(futures):
+                key, combo = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    logger.error(f"스윕 조합 실패 ({combo['name']}): {e}")
+                    continue
+                _save_cached(cache_dir, key, combo, summary)
+                summaries[combo['name']] = summary
+        logger.info(f"스윕 완료: {time.perf_counter() - started:.1f}초")
+
+    rows = []
+    for combo in combos:
+        summary = summaries.get(combo['name'])
+        if summary is None:
+            continue
+        row = {'name': combo['name'], 'preset': combo['preset'], **combo['params']}
+        row.update({column: summary.get(column) for column in RESULT_COLUMNS})
+        row['cached'] = combo['name'] in cached
+        rows.append(row)
+
+    table = pd.DataFrame(rows)
+    if len(table):
+        table = table.sort_values(rank_by, ascending=False, kind='stable').reset_index(drop=True)
+        table.index += 1
+        table.index.name = 'rank'
+    return table
+
+
+def parse_grid(items):
+    """['stop_loss=0.008,0.01', ...] → {'stop_loss': [0.008, 0.01]}"""
+    grid = {}
+    for item in items or []:
+        key, _, values = item.partition('=')
+        grid[key.strip()] = [json.loads(v) for v in values.split(',')]
+    return grid
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="프리셋/파라미터 조합 병렬 백테스트")
+    parser.add_argument('--presets', nargs='*', default=None, help="프리셋 (기본: 전부)")
+    parser.add_argument('--grid', action='append', default=[],
+                        help="파라미터 격자, 예: --grid stop_loss=0.008,0.01 (여러 번 가능)")
+    parser.add_argument('--symbols', nargs='*', default=None, help="종목 (기본: TRADING_PAIRS)")
+    parser.add_argument('--days', type=int, default=None, help="재생 기간 (일)")
+    parser.add_argument('--balance', type=float, default=None, help="시작 원화 잔고")
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수")
+    parser.add_argument('--no-ml', action='store_true', help="ML 예측 없이 (ML 중립)")
+    parser.add_argument('--top', type=int, default=20, help="출력할 순위 수")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    combos = expand_grid(args.presets, parse_grid(args.grid))
+    data, start = load_replay_data(args.symbols, args.days, use_ml=not args.no_ml)
+    table = run_sweep(data, combos, start=start, initial_balance=args.balance, workers=args.workers)
+
+    print("\n" + "=" * 80)
+    print(f"📊 스윕 결과 ({len(table)}개 조합, {SWEEP_CONFIG['rank_by']} 순)")
+    print("=" * 80)
+    if len(table):
+        shown = table.head(args.top).drop(columns=['preset']).copy()
+        for column in ('total_return', 'max_drawdown', 'win_rate'):
+            shown[column] = shown[column].map(lambda v: '-' if v is None or pd.isna(v) else f"{v:+.2%}")
+        shown['final_equity'] = shown['final_equity'].map(lambda v: f"{v:,.0f}")
+        shown['fees'] = shown['fees'].map(lambda v: f"{v:,.0f}")
+        print(shown.to_string())
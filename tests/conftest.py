@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+테스트 공용 도우미 - 합성 캔들 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+
+def make_ohlcv(n=200, seed=0, rng=None, base=1e6, start='2024-01-01', drift=0.0,
+               volatility=0.01, volume=(1, 100)):
+    """랜덤 워크 1시간봉 n개 - pyupbit get_ohlcv 형식 (open/high/low/close/volume/value)
+
+    - drift: 캔들별 평균 로그 수익률 (스칼라 또는 길이 n 배열)
+    - rng를 넘기면 seed 대신 사용 (여러 종목을 한 난수열로 만들 때)
+    """
+    rng = rng or np.random.default_rng(seed)
+    close = base * np.exp(np.cumsum(drift + rng.normal(0, volatility, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.003, n)) * close
+    traded = rng.uniform(*volume, n)
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': traded,
+        'value': close * traded,
+    }, index=pd.date_range(start, periods=n, freq='h'))
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+backtest.py 재생 엔진 테스트 - 합성 1시간봉으로 실전 전략 스택 재생 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+import market_data
+import pyupbit
+from tests.conftest import make_ohlcv
+from backtest import Backtester, ReplayData, resample_ohlcv
+from exchange_client import SimulatedExchange
+
+
+def synthetic_frames(hours=24 * 40, seed=7):
+    rng = np.random.default_rng(seed)
+    # 완만한 상승/하락 구간이 번갈아 나오는 랜덤 워크
+    drift = 0.002 * np.sin(np.arange(hours) / 60)
+    return {
+        symbol: make_ohlcv(hours, rng=rng, base=base, start='2024-01-01 09:00', drift=drift,
+                           volatility=0.008, volume=(50, 150))
+        for symbol, base in (('BTC', 50_000_000), ('ETH', 3_000_000), ('SOL', 150_000))
+    }
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("백테스트 중 네트워크 호출")
+    monkeypatch.setattr(market_data, 'get_ohlcv', fail)
+    monkeypatch.setattr(pyupbit, 'get_ohlcv', fail)
+    monkeypatch.setattr(pyupbit, 'get_current_price', fail)
+
+
+def test_resample_uses_upbit_candle_boundaries():
+    frames = synthetic_frames(hours=48)
+    four_hour = resample_ohlcv(frames['BTC'], 'minute240')
+    day = resample_ohlcv(frames['BTC'], 'day')
+
+    assert {t.hour for t in four_hour.index} <= {1, 5, 9, 13, 17, 21}
+    assert {t.hour for t in day.index} == {9}
+    first = frames['BTC'].iloc[:4]
+    assert four_hour['high'].iloc[0] == first['high'].max()
+    assert four_hour['close'].iloc[0] == first['close'].iloc[-1]
+
+
+def test_timeframe_uses_only_closed_candles():
+    data = ReplayData.from_frames(synthetic_frames(hours=24 * 10))
+    frame = data.timeframes['day']
+    first_close = frame.close_times[0]
+
+    assert frame.position(first_close - 1) == -1
+    assert frame.position(first_close) == 0
+    assert data.timeframe_snapshot('BTC', 'day', first_close) is None  # 일봉 50개 미만
+
+
+def test_simulated_exchange_accounting():
+    exchange = SimulatedExchange(100_000, fee_rate=0.001, slippage=0.0)
+    exchange.set_prices({'KRW-BTC': 1_000.0})
+
+    assert exchange.buy_market_order('KRW-BTC', 1_000) is None  # 최소 주문 미달
+    order = exchange.buy_market_order('KRW-BTC', 50_000)
+    assert order['state'] == 'done'
+    assert exchange.get_balance('KRW') == pytest.approx(100_000 - 50_050)
+    assert exchange.get_balance('KRW-BTC') == pytest.approx(50)
+    assert exchange.get_order(order['uuid'])['trades'][0]['funds'] == '50000.0'
+
+    exchange.set_prices({'KRW-BTC': 1_100.0})
+    assert exchange.total_equity() == pytest.approx(49_950 + 55_000)
+    exchange.sell_market_order('KRW-BTC', 1_000)  # 보유량까지만
+    assert exchange.get_balance('KRW-BTC') == 0
+    assert exchange.get_balance('KRW') == pytest.approx(49_950 + 55_000 * 0.999)
+
+
+def test_backtest_replays_strategy_stack(no_network):
+    data = ReplayData.from_frames(synthetic_frames())
+    result = Backtester(data, initial_balance=1_000_000).run(start=data.index[200])
+    summary = result.summary()
+
+    assert len(result.equity) == len(data) - 200
+    assert summary['candles'] == len(result.equity)
+    assert summary['final_equity'] == pytest.approx(result.equity.iloc[-1])
+    assert -1 < summary['max_drawdown'] <= 0
+    assert summary['fees'] >= 0
+
+    trades = result.trades
+    assert len(trades) > 0
+    assert set(trades['side']) <= {'buy', 'sell'}
+    assert trades['time'].is_monotonic_increasing
+    assert trades['time'].iloc[0] > data.index[200]
+
+    # 같은 데이터로 다시 돌리면 같은 결과 (실행마다 새 상태)
+    again = Backtester(data, initial_balance=1_000_000).run(start=data.index[200])
+    assert again.summary()['final_equity'] == pytest.approx(summary['final_equity'])
+    assert len(again.trades) == len(trades)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+candle_archive 로컬 캔들 아카이브 테스트
+가짜 fetcher/시계로 증분 동기화, 구간 읽기, 공백 검출/복구, 과거 보강 검증
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import candle_archive
+from candle_archive import CandleArchive
+from config import CANDLE_ARCHIVE_CONFIG
+
+HOUR = 3600
+START = 1_700_002_800  # 2023-11-14 23:00 UTC (정시)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeFetcher:
+    """pyupbit.get_ohlcv 대체 - to 이전 (없으면 진행 중 캔들까지) 시간봉, missing 시각은 빠짐"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+        self.missing = set()
+        self.listed = None  # 상장 시각 (이전 캔들 없음)
+
+    def __call__(self, ticker, interval="minute60", count=200, to=None):
+        self.calls.append((ticker, count, to))
+        if to is None:
+            end = self.clock() // HOUR * HOUR + HOUR  # 진행 중 캔들 포함
+        else:
+            end = int(pd.Timestamp(to, tz='UTC').timestamp())
+        start = end - count * HOUR if self.listed is None else max(end - count * HOUR, self.listed)
+        opens = [t for t in range(start, end, HOUR) if t not in self.missing]
+        close = np.array([float(t // HOUR % 1000) for t in opens])
+        index = pd.to_datetime((np.array(opens) + 9 * HOUR) * 10**9)
+        return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                             'close': close, 'volume': 1.0, 'value': close}, index=index)
+
+
+def make_archive(tmp_path, now=START + 30 * 60):
+    clock = Clock(now)
+    fetcher = FakeFetcher(clock)
+    return CandleArchive(root=str(tmp_path), fetcher=fetcher, clock=clock, initial_candles=48), fetcher, clock
+
+
+def test_incremental_sync_keeps_closed_candles_only(tmp_path):
+    archive, fetcher, clock = make_archive(tmp_path)
+
+    assert archive.sync('KRW-BTC', 'minute60') == 47  # 진행 중인 캔들 제외
+    assert archive.sync('KRW-BTC', 'minutes60') == 0
+    assert len(fetcher.calls) == 1
+
+    clock.now += 3 * HOUR
+    assert archive.sync('KRW-BTC', 'minute60') == 3
+    assert fetcher.calls[-1][1] == 4
+
+    df = archive.read('KRW-BTC', 'minute60')
+    assert len(df) == 50 and df.index.is_monotonic_increasing
+    last_open = START + 2 * HOUR
+    assert df.index[-1] == pd.Timestamp((last_open + 9 * HOUR) * 10**9)
+    assert df['close'].iloc[-1] == float(last_open // HOUR % 1000)
+
+
+def test_range_reads(tmp_path):
+    archive, _, _ = make_archive(tmp_path)
+    archive.sync('KRW-BTC', 'minute60')
+    times, _ = archive.read_arrays('KRW-BTC', 'minute60')
+
+    part = archive.read('KRW-BTC', 'minute60', start=int(times[10]), end=int(times[20]))
+    assert len(part) == 10
+
+    # 시간대 없는 시각은 KST (pyupbit 인덱스와 같음), end는 미포함
+    end_kst = archive.read('KRW-BTC', 'minute60').index[20]
+    tail = archive.read('KRW-BTC', 'minute60', end=end_kst, count=5)
+    assert list(tail.index) == list(archive.read('KRW-BTC', 'minute60').index[15:20])
+    assert archive.count('KRW-BTC', 'minute60', end=end_kst) == 20
+
+
+def test_gaps_are_detected_and_repaired(tmp_path):
+    archive, fetcher, _ = make_archive(tmp_path)
+    fetcher.missing = {START - 10 * HOUR, START - 9 * HOUR, START - 3 * HOUR}
+    archive.sync('KRW-BTC', 'minute60')
+
+    gaps = archive.gaps('KRW-BTC', 'minute60')
+    assert [g[2] for g in gaps] == [2, 1]
+    assert archive.info('KRW-BTC', 'minute60')['missing'] == 3
+
+    fetcher.missing = set()
+    assert archive.repair_gaps('KRW-BTC', 'minute60') == 3
+    assert archive.gaps('KRW-BTC', 'minute60') == []
+    assert np.all(np.diff(archive.read_arrays('KRW-BTC', 'minute60')[0]) == HOUR)
+
+
+def test_backfill_prepends_older_history(tmp_path):
+    archive, _, _ = make_archive(tmp_path)
+    archive.sync('KRW-BTC', 'minute60')
+    first, last = archive.bounds('KRW-BTC', 'minute60')
+
+    assert archive.backfill('KRW-BTC', 'minute60', 24) == 24
+    new_first, new_last = archive.bounds('KRW-BTC', 'minute60')
+    assert new_first == first - 24 * HOUR and new_last == last
+    assert archive.gaps('KRW-BTC', 'minute60') == []
+
+
+def test_ensure_stops_backfilling_at_listing_start(tmp_path):
+    archive, fetcher, _ = make_archive(tmp_path)
+    fetcher.listed = START - 60 * HOUR  # 상장 60시간 - 요청(100개)보다 짧음
+    archive.sync('KRW-NEW', 'minute60')  # 최근 48개
+    assert archive.listing_start('KRW-NEW', 'minute60') is None
+
+    archive.ensure('KRW-NEW', 'minute60', 100)  # 보강 52개 요청 → 12개만 옴
+    assert archive.count('KRW-NEW', 'minute60') == 60
+    assert archive.listing_start('KRW-NEW', 'minute60') == fetcher.listed
+    calls = len(fetcher.calls)
+
+    archive.ensure('KRW-NEW', 'minute60', 100)
+    assert len(fetcher.calls) == calls  # 다시 보강하지 않음 (마감된 새 캔들도 없음)
+
+
+def test_rewrite_replaces_times_and_bars_together(tmp_path):
+    archive, _, _ = make_archive(tmp_path)
+    archive.sync('KRW-BTC', 'minute60')
+    archive.backfill('KRW-BTC', 'minute60', 24)  # 과거 보강 → 다시 쓰기
+
+    directory = tmp_path / 'minute60'
+    assert sorted(os.listdir(directory)) == ['KRW-BTC.candles', 'KRW-BTC.candles.lock']
+    times, bars = archive.read_arrays('KRW-BTC', 'minute60')
+    assert len(times) == 71
+    assert np.array_equal(bars[:, 3], (times // HOUR % 1000).astype(float))
+
+
+def test_writer_waits_for_lock_held_by_another_process(tmp_path):
+    archive, fetcher, _ = make_archive(tmp_path)
+    archive.lock_timeout = 0.2
+    archive.sync('KRW-BTC', 'minute60')
+
+    # 다른 프로세스가 쓰는 중 - 오래 걸려도 잠금을 빼앗지 않음
+    holder = open(str(tmp_path / 'minute60' / 'KRW-BTC.candles.lock'), 'a+b')
+    assert archive._try_lock(holder)
+    with pytest.raises(TimeoutError):
+        archive.backfill('KRW-BTC', 'minute60', 24)
+    assert len(fetcher.calls) == 1
+
+    holder.close()  # 프로세스 종료 = 잠금 해제
+    assert archive.backfill('KRW-BTC', 'minute60', 24) == 24
+
+
+def test_load_history_offline_reads_archive_only(tmp_path, monkeypatch):
+    archive, fetcher, _ = make_archive(tmp_path)
+    archive.sync('KRW-BTC', 'minute60')
+    monkeypatch.setattr(candle_archive, '_archive', archive)
+    monkeypatch.setitem(CANDLE_ARCHIVE_CONFIG, 'offline', True)
+
+    df = candle_archive.load_history('KRW-BTC', 'minute60', count=100)
+
+    assert len(df) == 47
+    assert len(fetcher.calls) == 1
+    assert candle_archive.load_history('KRW-ETH', 'minute60', count=10) is None
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+CompiledForest - sklearn 랜덤 포레스트와 같은 확률/예측, 저장/로드 검증
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from compiled_forest import CompiledForest, benchmark
+
+
+def make_model(seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(2.0, 3.0, size=(500, 8))
+    y = ((X[:, 0] + X[:, 3] * X[:, 5] + rng.normal(0, 1, 500)) > 2).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=seed)
+    model.fit(scaler.transform(X), y)
+    return model, scaler, rng.normal(2.0, 3.0, size=(200, 8))
+
+
+def test_matches_sklearn_probabilities():
+    model, scaler, X = make_model()
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    scaled = scaler.transform(X)
+
+    np.testing.assert_allclose(compiled.predict_proba(scaled), model.predict_proba(scaled), atol=1e-12)
+    np.testing.assert_allclose(compiled.predict_proba_raw(X), model.predict_proba(scaled), atol=1e-12)
+    assert np.array_equal(compiled.predict(scaled), model.predict(scaled))
+
+    # 단일 행 (1차원 입력)
+    np.testing.assert_allclose(compiled.predict_proba(scaled[0]), model.predict_proba(scaled[:1]))
+
+
+def test_save_and_load_round_trip(tmp_path):
+    model, scaler, X = make_model(seed=1)
+    compiled = CompiledForest.from_sklearn(model, scaler, [f'f{i}' for i in range(8)])
+    path = str(tmp_path / 'model.npz')
+
+    compiled.save(path)
+    loaded = CompiledForest.load(path)
+
+    assert loaded.feature_names == compiled.feature_names
+    assert loaded.model_type == 'random_forest'
+    np.testing.assert_array_equal(loaded.predict_proba_raw(X), compiled.predict_proba_raw(X))
+
+
+def test_benchmark_reports_agreement():
+    model, scaler, X = make_model(seed=2)
+    compiled = CompiledForest.from_sklearn(model, scaler)
+
+    result = benchmark(model, compiled, scaler.transform(X), repeat=10)
+
+    assert result['max_abs_diff'] < 1e-12
+    assert result['same_predictions']
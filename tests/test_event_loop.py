@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+event_loop.EventScheduler 예약/이벤트 처리 테스트 (가짜 시계 사용)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+from datetime import datetime
+
+from event_loop import EventScheduler
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_timer_runs_on_interval():
+    clock = FakeClock(1000.0)
+    scheduler = EventScheduler(clock)
+    calls = []
+    scheduler.every(10, lambda: calls.append(clock.now), 'tick', run_now=True)
+
+    assert scheduler.run_pending() == 10
+    clock.now = 1005
+    scheduler.run_pending()
+    clock.now = 1010
+    scheduler.run_pending()
+
+    assert calls == [1000.0, 1010]
+
+
+def test_candle_close_coalesces_intervals():
+    # 2024-01-01 00:59:00 UTC
+    start = 1704070740.0
+    clock = FakeClock(start)
+    scheduler = EventScheduler(clock)
+    calls = []
+    scheduler.on_candle_close(['minute60', 'minute240'], lambda: calls.append(clock.now),
+                              'entry', delay=3)
+
+    # 01:00:03 에 한 번만 (60분/240분이 동시에 마감되어도)
+    assert scheduler.run_pending() == 63
+    clock.now = start + 63
+    scheduler.run_pending()
+    assert calls == [start + 63]
+    assert scheduler.jobs['entry'].due == start + 63 + 3600
+
+
+def test_daily_job_runs_at_local_midnight():
+    clock = FakeClock(datetime(2024, 1, 1, 23, 59, 30).timestamp())
+    scheduler = EventScheduler(clock)
+    calls = []
+    scheduler.daily(0, 0, lambda: calls.append(1), 'midnight')
+
+    assert scheduler.run_pending() == 30
+    clock.now = datetime(2024, 1, 2, 0, 0, 5).timestamp()  # 루프가 조금 늦게 깨도 실행
+    scheduler.run_pending()
+    assert calls == [1]
+    assert scheduler.jobs['midnight'].due == datetime(2024, 1, 3).timestamp()
+
+
+def test_failing_job_is_rescheduled():
+    clock = FakeClock(0.0)
+    scheduler = EventScheduler(clock)
+
+    def boom():
+        raise RuntimeError('boom')
+
+    scheduler.every(5, boom, 'boom', run_now=True)
+    scheduler.run_pending()
+
+    assert scheduler.get_status()['boom']['errors'] == 1
+    assert scheduler.jobs['boom'].due == 5
+
+
+def test_posted_event_wakes_idle_loop():
+    scheduler = EventScheduler()
+    scheduler.every(3600, lambda: None, 'idle')
+    done = threading.Event()
+
+    thread = threading.Thread(target=scheduler.run, daemon=True)
+    thread.start()
+    time.sleep(0.05)
+
+    start = time.monotonic()
+    scheduler.post(done.set)
+    assert done.wait(1)
+    assert time.monotonic() - start < 0.5
+
+    scheduler.stop()
+    thread.join(1)
+    assert not thread.is_alive()
+
+
+def test_exit_lane_keeps_interval_while_entry_lane_is_busy():
+    exit_scheduler = EventScheduler()
+    entry_scheduler = EventScheduler()
+    exit_scheduler.every(0.05, lambda: None, 'exit', run_now=True)
+    entry_scheduler.every(0.05, lambda: time.sleep(0.4), 'entry', run_now=True)
+
+    threads = [threading.Thread(target=s.run, daemon=True) for s in (exit_scheduler, entry_scheduler)]
+    for t in threads:
+        t.start()
+    time.sleep(0.5)
+    for s in (exit_scheduler, entry_scheduler):
+        s.stop()
+    for t in threads:
+        t.join(1)
+
+    status = exit_scheduler.get_status()['exit']
+    assert status['runs'] >= 5
+    assert status['max_interval'] < 0.2
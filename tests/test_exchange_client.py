@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+exchange_client 테스트 - 기록 재생 거래소가 시계 시각까지의 시세만 보여 주는지,
+캔들 소스 교체와 시뮬레이션 시계 기반 작업 루프 재생
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import market_data
+from candle_archive import CandleArchive, to_frame
+from clock import SimulatedClock
+from event_loop import EventScheduler
+from exchange_client import ReplayExchange
+
+MINUTE = 60
+HOUR = 3600
+START = 1_700_002_800  # 2023-11-14 23:00 UTC (정시)
+
+
+def minute_candles(start, count):
+    times = start + MINUTE * np.arange(count)
+    close = 1000.0 + np.arange(count)
+    bars = np.column_stack([close - 0.5, close + 2, close - 2, close, np.ones(count), close])
+    return to_frame(times, bars)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    minutes = minute_candles(START, 3 * 60)
+    hours = minutes.resample('1h').agg({'open': 'first', 'high': 'max', 'low': 'min',
+                                        'close': 'last', 'volume': 'sum', 'value': 'sum'})
+    frames = {'minute1': minutes, 'minute60': hours}
+
+    archive = CandleArchive(root=str(tmp_path), clock=lambda: START + 3 * HOUR,
+                            fetcher=lambda ticker, interval, count, **kw: frames[interval])
+    archive.sync('KRW-BTC', 'minute1', count=180)
+    archive.sync('KRW-BTC', 'minute60', count=3)
+    return archive
+
+
+def test_replay_prices_follow_the_clock(archive):
+    clock = SimulatedClock(START + 2 * HOUR + 30 * MINUTE + 10)
+    exchange = ReplayExchange(1_000_000, clock, archive=archive)
+
+    # 마지막으로 마감된 1분봉 (2시간 29분째) 종가
+    assert exchange.get_current_price('KRW-BTC') == 1000.0 + 149
+    assert exchange.get_current_price(['KRW-BTC', 'KRW-ETH']) == {'KRW-BTC': 1149.0}
+    assert exchange.get_tickers() == ['KRW-BTC']
+
+    clock.advance(5 * MINUTE)
+    assert exchange.get_current_price('KRW-BTC') == 1000.0 + 154
+
+
+def test_replay_ohlcv_has_forming_candle_but_no_future(archive):
+    clock = SimulatedClock(START + 2 * HOUR + 30 * MINUTE + 10)
+    exchange = ReplayExchange(1_000_000, clock, archive=archive)
+
+    df = exchange.get_ohlcv('KRW-BTC', 'minute60', count=3)
+    assert len(df) == 3
+    forming = df.iloc[-1]
+    assert df.index[-1] == pd.Timestamp((START + 2 * HOUR + 9 * HOUR) * 10**9)
+    assert forming['open'] == 1120 - 0.5
+    assert forming['close'] == 1149
+    assert forming['high'] == 1149 + 2
+    assert forming['volume'] == 30
+    assert df['close'].iloc[-2] == 1119  # 마감된 캔들 그대로
+
+
+def test_replay_orders_fill_at_replayed_price(archive):
+    clock = SimulatedClock(START + HOUR + 1)
+    exchange = ReplayExchange(100_000, clock, archive=archive, fee_rate=0.0)
+
+    exchange.buy_market_order('KRW-BTC', 59_000)
+    assert exchange.get_balance('KRW-BTC') == pytest.approx(59_000 / 1059)
+
+    clock.advance(HOUR)
+    order = exchange.sell_market_order('KRW-BTC', 10.0)
+    assert exchange.get_order(order['uuid'])['trades'][0]['price'] == str(1119.0)
+
+
+def test_market_data_source_replaces_candle_lookup():
+    frame = pd.DataFrame({'close': [1.0]})
+    calls = []
+    market_data.set_source(lambda ticker, **kw: calls.append((ticker, kw)) or frame)
+    try:
+        assert market_data.get_ohlcv('KRW-BTC', interval='minute60', count=5) is frame
+    finally:
+        market_data.set_source(None)
+    assert calls == [('KRW-BTC', {'interval': 'minute60', 'count': 5})]
+
+
+def test_scheduler_replays_on_simulated_clock():
+    clock = SimulatedClock(START)
+    scheduler = EventScheduler(clock=clock.time)
+    runs = []
+    scheduler.every(10, lambda: runs.append(clock.time()), 'timer', run_now=True)
+    scheduler.every(5, lambda: None, 'cancelled').cancel()
+
+    while scheduler.next_due() <= START + 60:
+        clock.set(scheduler.next_due())
+        scheduler.run_pending()
+
+    assert runs == [START + 10 * i for i in range(7)]
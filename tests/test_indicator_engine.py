@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+indicator_engine 스트리밍/배치 지표가 기존 pandas 공식과 같은 값을 내는지 검증
+(아래 reference_* 함수는 각 호출부에 있던 pandas 계산을 그대로 옮긴 것)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicator_engine
+from tests.conftest import make_ohlcv
+from indicator_engine import IndicatorEngine, compute_frame, build_panel, compute_panel, panel_snapshots
+from multi_timeframe_analyzer import MultiTimeframeAnalyzer
+from ml_signal_generator import MLSignalGenerator
+
+COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def assert_close(actual, expected, key=''):
+    if np.isnan(expected):
+        assert np.isnan(actual), key
+    else:
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-9), key
+
+
+# ----------------------------------------------------------------------
+# 기존 pandas 공식
+# ----------------------------------------------------------------------
+
+def reference_bot(df):
+    """TradingBot.calculate_indicators"""
+    df = df.copy()
+    current_price = df['close'].iloc[-1]
+    df['sma_20'] = df['close'].rolling(window=20).mean()
+    df['sma_50'] = df['close'].rolling(window=50).mean()
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    df['rsi'] = 100 - (100 / (1 + gain / loss))
+    df['ema_12'] = df['close'].ewm(span=12, adjust=False).mean()
+    df['ema_26'] = df['close'].ewm(span=26, adjust=False).mean()
+    df['macd'] = df['ema_12'] - df['ema_26']
+    df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
+    high_low = df['high'] - df['low']
+    high_close = np.abs(df['high'] - df['close'].shift())
+    low_close = np.abs(df['low'] - df['close'].shift())
+    true_range = np.max(pd.concat([high_low, high_close, low_close], axis=1), axis=1)
+    return {
+        'sma_20': df['sma_20'].iloc[-1],
+        'sma_50': df['sma_50'].iloc[-1],
+        'ema_12': df['ema_12'].iloc[-1],
+        'ema_26': df['ema_26'].iloc[-1],
+        'rsi': df['rsi'].iloc[-1],
+        'macd': df['macd'].iloc[-1],
+        'macd_signal': df['macd_signal'].iloc[-1],
+        'volume_sma': df['volume'].rolling(window=20).mean().iloc[-1],
+        'atr': true_range.rolling(14).mean().iloc[-1],
+        'change_19': (current_price - df['close'].iloc[-20]) / df['close'].iloc[-20],
+    }
+
+
+def reference_mtf(df):
+    """MultiTimeframeAnalyzer._calculate_indicators / _calculate_trend_strength"""
+    df = df.copy()
+    df['sma_20'] = df['close'].rolling(window=20).mean()
+    df['sma_50'] = df['close'].rolling(window=50).mean()
+    df['ema_12'] = df['close'].ewm(span=12).mean()
+    df['ema_26'] = df['close'].ewm(span=26).mean()
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    df['rsi'] = 100 - (100 / (1 + gain / loss))
+    df['macd'] = df['ema_12'] - df['ema_26']
+    df['macd_signal'] = df['macd'].ewm(span=9).mean()
+    df['macd_histogram'] = df['macd'] - df['macd_signal']
+    df['volume_sma'] = df['volume'].rolling(window=20).mean()
+    current = df.iloc[-1]
+
+    changes = df['close'].tail(20).diff().dropna()
+    consistency = max((changes > 0).sum(), (changes < 0).sum()) / len(changes)
+
+    return {
+        'price': current['close'],
+        'sma_20': current['sma_20'],
+        'sma_50': current['sma_50'],
+        'rsi': current['rsi'],
+        'macd': current['macd'],
+        'macd_signal': current['macd_signal'],
+        'macd_histogram': current['macd_histogram'],
+        'volume_ratio': current['volume'] / current['volume_sma'],
+        'trend_strength': consistency,
+    }
+
+
+def reference_ml_features(df):
+    """MLSignalGenerator._create_features"""
+    features = pd.DataFrame(index=df.index)
+    features['returns_1h'] = df['close'].pct_change(1)
+    features['returns_4h'] = df['close'].pct_change(4)
+    features['returns_24h'] = df['close'].pct_change(24)
+    for period in [10, 20, 50]:
+        features[f'sma_{period}'] = df['close'].rolling(period).mean()
+        features[f'price_to_sma_{period}'] = df['close'] / features[f'sma_{period}']
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    features['rsi'] = 100 - (100 / (1 + gain / loss))
+    ema_12 = df['close'].ewm(span=12).mean()
+    ema_26 = df['close'].ewm(span=26).mean()
+    features['macd'] = ema_12 - ema_26
+    features['macd_signal'] = features['macd'].ewm(span=9).mean()
+    features['macd_histogram'] = features['macd'] - features['macd_signal']
+    sma_20 = df['close'].rolling(20).mean()
+    std_20 = df['close'].rolling(20).std()
+    features['bb_upper'] = sma_20 + (std_20 * 2)
+    features['bb_lower'] = sma_20 - (std_20 * 2)
+    features['bb_position'] = (df['close'] - features['bb_lower']) / (features['bb_upper'] - features['bb_lower'])
+    features['volatility'] = df['close'].pct_change().rolling(20).std()
+    high_low = df['high'] - df['low']
+    high_close = np.abs(df['high'] - df['close'].shift())
+    low_close = np.abs(df['low'] - df['close'].shift())
+    true_range = np.max(pd.concat([high_low, high_close, low_close], axis=1), axis=1)
+    features['atr'] = true_range.rolling(14).mean() / df['close']
+    features['volume_sma'] = df['volume'].rolling(20).mean()
+    features['volume_ratio'] = df['volume'] / features['volume_sma']
+    features['volume_change'] = df['volume'].pct_change(1)
+    features['momentum_10'] = df['close'] / df['close'].shift(10) - 1
+    features['momentum_20'] = df['close'] / df['close'].shift(20) - 1
+    features['candle_body'] = (df['close'] - df['open']).abs() / df['open']
+    features['candle_upper_shadow'] = (df['high'] - df[['open', 'close']].max(axis=1)) / df['open']
+    features['candle_lower_shadow'] = (df[['open', 'close']].min(axis=1) - df['low']) / df['open']
+    features['hour'] = df.index.hour
+    features['day_of_week'] = df.index.dayofweek
+    return features
+
+
+# ----------------------------------------------------------------------
+# 테스트
+# ----------------------------------------------------------------------
+
+@pytest.mark.parametrize('adjust', [False, True])
+def test_streaming_matches_batch_on_every_bar(adjust):
+    df = make_ohlcv(300)
+    frame = compute_frame(df, adjust=adjust)
+    engine = IndicatorEngine(adjust=adjust)
+
+    for i in range(len(df)):
+        snap = engine.update(tuple(df[COLUMNS].iloc[i]), df.index[i])
+        for key in frame.columns:
+            assert_close(snap[key], frame[key].iloc[i], (key, i))
+
+
+def test_bot_indicators_match_previous_formulas():
+    df = make_ohlcv(300)
+    window = df.iloc[-100:]
+
+    snap = IndicatorEngine(adjust=False).sync(window)
+    for key, expected in reference_bot(window).items():
+        assert_close(snap[key], expected, key)
+
+
+def test_sync_only_applies_new_bars_and_peeks_forming_bar():
+    df = make_ohlcv(300)
+    engine = IndicatorEngine(adjust=True)
+    engine.sync(df.iloc[:100])
+    assert engine.count == 99  # 마지막 캔들은 진행 중
+
+    # 진행 중인 캔들 종가가 바뀌어도 상태는 그대로
+    forming = df.iloc[:101].copy()
+    forming.iloc[-1, forming.columns.get_loc('close')] *= 1.05
+    first = engine.sync(forming.iloc[-100:])
+    assert engine.count == 100
+    assert_close(first['rsi'], compute_frame(forming, adjust=True)['rsi'].iloc[-1])
+
+    # 캔들 마감 후 새 캔들 - 마감 값으로 반영
+    snap = engine.sync(df.iloc[2:102])
+    assert engine.count == 101
+    expected = compute_frame(df.iloc[:102], adjust=True).iloc[-1]
+    for key in ['sma_50', 'ema_26', 'macd_signal', 'rsi', 'atr', 'bb_upper', 'volatility']:
+        assert_close(snap[key], expected[key], key)
+
+
+def test_sync_restarts_on_gap():
+    df = make_ohlcv(300)
+    engine = IndicatorEngine()
+    engine.sync(df.iloc[:100])
+
+    snap = engine.sync(df.iloc[150:250])
+
+    fresh = IndicatorEngine().sync(df.iloc[150:250])
+    assert engine.count == 99
+    assert_close(snap['ema_26'], fresh['ema_26'])
+
+
+def test_mtf_indicators_match_previous_formulas():
+    df = make_ohlcv(300).iloc[:100]
+    snap = IndicatorEngine(adjust=True).sync(df)
+
+    indicators = MultiTimeframeAnalyzer()._calculate_indicators(snap)
+
+    for key, expected in reference_mtf(df).items():
+        assert_close(indicators[key], expected, key)
+
+
+def test_ml_features_match_previous_formulas():
+    df = make_ohlcv(200)
+    generator = MLSignalGenerator.__new__(MLSignalGenerator)
+    expected = reference_ml_features(df)
+
+    batch = generator._create_features(df)
+    assert list(batch.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(batch, expected, check_dtype=False, rtol=1e-9)
+
+    latest = generator._build_features(IndicatorEngine(adjust=True).sync(df), df.index[-1])
+    for key, value in latest.items():
+        assert_close(float(value), float(expected[key].iloc[-1]), key)
+
+
+def test_shared_engines_are_keyed_by_normalized_interval():
+    a = indicator_engine.get_engine('KRW-TEST', 'minutes60', adjust=True)
+    b = indicator_engine.get_engine('KRW-TEST', 'minute60', adjust=True)
+    c = indicator_engine.get_engine('KRW-TEST', 'minute60', adjust=False)
+
+    assert a is b
+    assert a is not c
+
+
+@pytest.mark.parametrize('adjust', [False, True])
+def test_panel_matches_per_symbol_batch(adjust):
+    frames = {f'KRW-T{i}': make_ohlcv(120, seed=i) for i in range(5)}
+    frames['KRW-T0'] *= 1e-6  # 가격대가 다른 종목
+    frames['KRW-NEW'] = make_ohlcv(120, seed=9).iloc[-40:]  # 최근 상장
+
+    panel = build_panel(frames)
+    values = compute_panel(panel, adjust=adjust)
+
+    assert panel.close.shape == (6, 120)
+    for row, symbol in enumerate(panel.symbols):
+        frame = compute_frame(frames[symbol], adjust=adjust).reindex(panel.index)
+        for key in frame.columns:
+            np.testing.assert_allclose(values[key][row], frame[key].to_numpy(),
+                                       rtol=1e-8, atol=1e-9, equal_nan=True, err_msg=key)
+
+
+def test_panel_snapshots_use_streaming_keys():
+    frames = {'KRW-A': make_ohlcv(100, seed=1), 'KRW-B': make_ohlcv(100, seed=2)}
+    panel = build_panel(frames)
+    snaps = panel_snapshots(panel, compute_panel(panel))
+
+    streaming = IndicatorEngine().sync(frames['KRW-A'])
+    assert set(snaps['KRW-A']) == set(streaming)
+    assert snaps['KRW-A']['bars'] == 100
+    assert_close(snaps['KRW-B']['sma_50'], frames['KRW-B']['close'].iloc[-50:].mean())
+
+
+def test_panel_fills_missing_candles_flat():
+    df = make_ohlcv(30, seed=3)
+    gappy = df.drop(df.index[10])
+    panel = build_panel({'KRW-A': df, 'KRW-B': gappy})
+
+    row = panel.symbols.index('KRW-B')
+    assert panel.close[row, 10] == gappy['close'].iloc[9]
+    assert panel.high[row, 10] == gappy['close'].iloc[9]
+    assert panel.volume[row, 10] == 0
+
+
+def test_panel_handles_200_markets_quickly():
+    import time
+    frames = {f'KRW-T{i}': make_ohlcv(100, seed=i) for i in range(200)}
+
+    start = time.perf_counter()
+    panel = build_panel(frames)
+    snaps = panel_snapshots(panel, compute_panel(panel))
+    elapsed = time.perf_counter() - start
+
+    assert len(snaps) == 200
+    assert elapsed < 2.0
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+log_reader 테스트 - 청크 경계, 회전/gzip 조각, 체크포인트 이후 새 줄만, 분석기 증분 파싱 = 전체 파싱
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gzip
+import shutil
+
+from entry_score_analyzer import EntryScoreAnalyzer
+from log_reader import LogReader, log_segments
+from utils.trading_log_analyzer import TradingLogAnalyzer
+
+
+def line(i, message, level=' - INFO - '):
+    return f"2025-12-18 10:{i // 60:02d}:{i % 60:02d},000{level}{message}\n"
+
+
+def sample_log(count=120):
+    lines = []
+    for i in range(0, count, 6):
+        symbol = ['BTC', 'ETH', 'XRP'][(i // 6) % 3]
+        lines += [
+            line(i, f"📊 {symbol} 종합 분석"),
+            line(i + 1, f"최종 점수: {4 + (i % 5) * 0.5:.2f}/10") if i % 18 != 6 else
+            line(i + 1, "지표 계산 중"),
+            line(i + 2, "진입 기준: 4.50 (시장: neutral)"),
+            line(i + 3, "✅ 진입 조건 충족 (점수: 5.10)") if i % 12 == 0 else
+            line(i + 3, f"{symbol} ❌ 진입 조건 미충족 (점수: 3.76/5.50)") if i % 18 != 6 else
+            # 점수 없는 분석 + 레벨 없는 줄: 미충족 기록 자체가 이어지는 매수와 매칭됨
+            line(i + 3, f"{symbol} ❌ 진입 조건 미충족 (점수: 3.76/5.50)", level=' '),
+            line(i + 4, f"✅ 매수 완료: {symbol} @ {1000 + i:,} KRW"),
+            line(i + 5, f"🔴 매도 완료: {symbol} @ {1010 + i:,} KRW, PnL +{i * 10:,} (+1.00%)"),
+        ]
+    return lines
+
+
+def write(path, lines, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        f.writelines(lines)
+
+
+def test_checkpoint_follows_rotation_and_gzip(tmp_path):
+    log = str(tmp_path / 'trading.log')
+    checkpoint = str(tmp_path / 'trading.log.test.ckpt')
+    lines = [line(i, f"메시지 {i} " + '가' * (i % 7)) for i in range(40)]
+
+    # 오래된 조각: .2.gz (가장 오래됨), .1, 현재 로그 (마지막 줄은 아직 쓰는 중)
+    with gzip.open(log + '.2.gz', 'wt', encoding='utf-8') as f:
+        f.writelines(lines[:10])
+    write(log + '.1', lines[10:20])
+    write(log, lines[20:30] + [lines[30].rstrip('\n')])
+    write(log + '.trades.ckpt', ['분석기 체크포인트는 조각이 아님'])
+    assert [os.path.basename(p) for p in log_segments(log)] == ['trading.log.2.gz', 'trading.log.1', 'trading.log']
+
+    reader = LogReader(log, checkpoint=checkpoint, chunk_size=64)  # 청크가 줄 중간에서 끊김
+    assert list(reader.lines()) == lines[:30]
+    reader.save({'count': 30})
+
+    # 마지막 줄 완성 + 회전 (trading.log → .1 → gzip, 새 trading.log)
+    write(log, [lines[30][len(lines[30].rstrip('\n')):]] + lines[31:33], mode='a')
+    os.remove(log + '.2.gz')
+    with open(log + '.1', 'rb') as src, gzip.open(log + '.2.gz', 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(log + '.1')
+    os.rename(log, log + '.1')
+    write(log, lines[33:40])
+
+    reader = LogReader(log, checkpoint=checkpoint, chunk_size=64)
+    assert reader.load_state() == {'count': 30}
+    assert list(reader.lines()) == lines[30:40]
+    reader.save({'count': 40})
+
+    assert list(LogReader(log, checkpoint=checkpoint).lines()) == []
+    assert list(LogReader(log, checkpoint=checkpoint, version=2).lines()) == lines[10:40]  # 버전 변경 → 전체
+
+
+def test_analyzers_incremental_parse_matches_full_parse(tmp_path, capsys):
+    lines = sample_log()
+    full_dir, inc_dir = tmp_path / 'full', tmp_path / 'inc'
+    full_dir.mkdir()
+    inc_dir.mkdir()
+    write(str(full_dir / 'trading.log'), lines)
+
+    full_scores = EntryScoreAnalyzer(str(full_dir / 'trading.log')).parse_log_for_scores()
+    full_trades = TradingLogAnalyzer(str(full_dir / 'trading.log')).parse_log()
+    assert any(s['action'] == 'buy' for s in full_scores)
+    assert len(full_trades) == len(lines) // 6
+
+    # 같은 로그를 세 번에 나눠 쓰면서 매번 새 줄만 파싱
+    log = str(inc_dir / 'trading.log')
+    for start, end in ((0, 45), (45, 82), (82, len(lines))):  # 분석 중간, 미충족 후 매수 전
+        write(log, lines[start:end], mode='a')
+        scores = EntryScoreAnalyzer(log).parse_log_for_scores()
+        trades = TradingLogAnalyzer(log).parse_log()
+
+    assert scores == full_scores
+    assert trades == full_trades
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+MarketAnalyzer 공용 캐시 테스트 - 4시간봉 마감/TTL 때만 다시 계산
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+import market_condition_check
+import market_data
+from market_condition_check import MarketAnalyzer, get_market_analyzer
+
+
+def rising_frame():
+    close = np.linspace(100, 110, 7)
+    return pd.DataFrame({'open': close, 'high': close, 'low': close,
+                         'close': close, 'volume': np.ones(7)})
+
+
+def test_repeated_calls_share_one_computation(monkeypatch):
+    fetches = []
+    monkeypatch.setattr(market_data, 'get_ohlcv',
+                        lambda ticker, **kw: fetches.append(ticker) or rising_frame())
+    analyzer = MarketAnalyzer()
+
+    for _ in range(20):
+        assert analyzer.analyze_market(['BTC', 'ETH', 'SOL', 'XRP']) == 'bullish'
+
+    assert analyzer.computations == 1
+    assert fetches == ['KRW-BTC', 'KRW-ETH', 'KRW-SOL']
+
+    status = analyzer.get_status(['BTC', 'ETH', 'SOL'])
+    assert status['condition'] == 'bullish'
+    assert not status['stale']
+
+
+def test_recomputes_on_new_4h_candle(monkeypatch):
+    monkeypatch.setattr(market_data, 'get_ohlcv', lambda ticker, **kw: rising_frame())
+    bucket = [100]
+    monkeypatch.setattr(market_data, 'candle_bucket', lambda interval, now=None: bucket[0])
+    analyzer = MarketAnalyzer(cache_duration=3600)
+
+    analyzer.analyze_market(['BTC'])
+    analyzer.analyze_market(['BTC'])
+    bucket[0] = 101  # 4시간봉 마감
+    assert analyzer.get_status(['BTC'])['stale']
+    analyzer.analyze_market(['BTC'])
+
+    assert analyzer.computations == 2
+
+
+def test_pair_sets_are_cached_separately(monkeypatch):
+    monkeypatch.setattr(market_data, 'get_ohlcv', lambda ticker, **kw: rising_frame())
+    analyzer = MarketAnalyzer()
+
+    analyzer.analyze_market(['BTC', 'ETH', 'SOL'])
+    analyzer.analyze_market(['XRP', 'ADA'])
+    analyzer.analyze_market(['BTC', 'ETH', 'SOL'])
+
+    assert analyzer.computations == 2
+
+
+def test_exit_caller_gets_stale_regime_during_refresh(monkeypatch):
+    bucket = [100]
+    monkeypatch.setattr(market_data, 'candle_bucket', lambda interval, now=None: bucket[0])
+    started, release = threading.Event(), threading.Event()
+
+    def slow_fetch(ticker, **kw):
+        if bucket[0] == 101 and ticker == 'KRW-BTC':
+            started.set()
+            release.wait(5)
+        return rising_frame()
+
+    monkeypatch.setattr(market_data, 'get_ohlcv', slow_fetch)
+    analyzer = MarketAnalyzer(cache_duration=3600)
+    analyzer.analyze_market(['BTC'])
+
+    bucket[0] = 101  # 4시간봉 마감 → 진입 쪽이 갱신 시작 (네트워크 대기)
+    refresh = threading.Thread(target=analyzer.analyze_market, args=(['BTC'],))
+    refresh.start()
+    assert started.wait(5)
+
+    # 청산 경로는 기다리지 않고 지난 판단, 다른 조합은 따로 계산
+    assert analyzer.analyze_market(['BTC'], allow_stale=True) == 'bullish'
+    assert analyzer.analyze_market(['XRP']) == 'bullish'
+    assert analyzer.computations == 2
+    release.set()
+    refresh.join(5)
+    assert analyzer.computations == 3
+    assert not analyzer.get_status(['BTC'])['stale']
+
+
+def test_shared_instance():
+    assert get_market_analyzer() is market_condition_check.get_market_analyzer()
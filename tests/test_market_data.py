@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+market_data 공용 OHLCV 캐시 테스트
+네트워크 없이 가짜 fetcher로 캐시 동작만 검증
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import market_data
+from market_data import OHLCVCache
+
+
+class FakeFetcher:
+    """pyupbit.get_ohlcv 대체 - 호출 횟수 기록
+
+    현재 시각까지의 시간봉을 돌려주고, 마지막(진행 중) 캔들 종가는 last_close로 바꿀 수 있다
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.last_close = None
+
+    def __call__(self, ticker, interval="day", count=200):
+        self.calls.append((ticker, interval, count))
+        now_kst = pd.Timestamp(market_data.candle_open_time('minute60'), unit='s') + pd.Timedelta(hours=9)
+        index = pd.date_range(end=now_kst, periods=count, freq='h')
+        close = (index.asi8 // 3_600_000_000_000 % 1000).astype(float) + 100
+        if self.last_close is not None:
+            close[-1] = self.last_close
+        return pd.DataFrame({
+            'open': close, 'high': close + 1, 'low': close - 1,
+            'close': close, 'volume': 1.0, 'value': close
+        }, index=index)
+
+
+def test_same_candle_is_served_from_cache():
+    fetcher = FakeFetcher()
+    cache = OHLCVCache(fetcher=fetcher, forming_bar_ttl=0)
+
+    first = cache.get_ohlcv('KRW-BTC', interval='minute60', count=100)
+    second = cache.get_ohlcv('KRW-BTC', interval='minutes60', count=50)
+
+    assert len(first) == 100
+    assert len(second) == 50
+    assert second['close'].iloc[-1] == first['close'].iloc[-1]
+    assert len(fetcher.calls) == 1
+    assert cache.get_stats()['hits'] == 1
+    assert cache.get_stats()['misses'] == 1
+
+
+def test_returned_frame_is_a_copy():
+    cache = OHLCVCache(fetcher=FakeFetcher(), forming_bar_ttl=0)
+
+    df = cache.get_ohlcv('KRW-ETH', interval='minute60', count=20)
+    df['sma'] = df['close'].rolling(5).mean()
+
+    assert 'sma' not in cache.get_ohlcv('KRW-ETH', interval='minute60', count=20)
+
+
+def test_new_candle_fetches_only_delta():
+    fetcher = FakeFetcher()
+    cache = OHLCVCache(fetcher=fetcher, forming_bar_ttl=0)
+
+    first = cache.get_ohlcv('KRW-BTC', interval='minute60', count=10)
+    store = cache._stores[('KRW-BTC', 'minute60')]
+    store.bucket -= 1  # 이전 캔들에서 받은 것처럼
+    store._times[(store._start + store._size - 1) % store.capacity] -= 3600 * 10**9
+
+    second = cache.get_ohlcv('KRW-BTC', interval='minute60', count=10)
+
+    assert [c[2] for c in fetcher.calls] == [10, 2]
+    assert cache.get_stats()['delta_fetches'] == 1
+    assert len(second) == 10
+    assert second.index[-1] == first.index[-1]
+    assert second.index.is_monotonic_increasing
+
+
+def test_forming_bar_is_updated_in_place():
+    fetcher = FakeFetcher()
+    cache = OHLCVCache(fetcher=fetcher, forming_bar_ttl=1)
+
+    first = cache.get_ohlcv('KRW-BTC', interval='minute60', count=50)
+    cache._stores[('KRW-BTC', 'minute60')].synced_at -= 5  # TTL 경과
+
+    fetcher.last_close = 12345.0
+    second = cache.get_ohlcv('KRW-BTC', interval='minute60', count=50)
+
+    assert fetcher.calls[-1][2] == 1
+    assert len(second) == 50
+    assert second['close'].iloc[-1] == 12345.0
+    assert second.index.equals(first.index)
+    assert second['close'].iloc[:-1].equals(first['close'].iloc[:-1])
+
+
+def test_ring_buffer_keeps_latest_bars():
+    store = market_data.CandleStore(capacity=5)
+    fetcher = FakeFetcher()
+
+    store.merge(fetcher('KRW-BTC', 'minute60', 8))
+
+    frame = store.to_frame(10)
+    assert len(frame) == 5
+    assert frame.index.equals(fetcher('KRW-BTC', 'minute60', 5).index)
+
+
+def test_larger_window_triggers_fetch():
+    fetcher = FakeFetcher()
+    cache = OHLCVCache(fetcher=fetcher, forming_bar_ttl=0)
+
+    cache.get_ohlcv('KRW-BTC', interval='minute60', count=100)
+    cache.get_ohlcv('KRW-BTC', interval='minute60', count=200)
+    cache.get_ohlcv('KRW-BTC', interval='minute60', count=150)
+
+    assert [c[2] for c in fetcher.calls] == [100, 200]
+
+
+def test_candle_boundaries_follow_upbit_utc_schedule():
+    ts = 1700000000  # 2023-11-14 22:13:20 UTC (화요일)
+
+    assert market_data.candle_open_time('minute60', ts) == 1699999200
+    assert market_data.candle_open_time('minute240', ts) == 1699992000
+    assert market_data.candle_open_time('day', ts) == 1699920000
+    assert market_data.candle_open_time('week', ts) == 1699833600   # 11-13 (월)
+    assert market_data.candle_open_time('month', ts) == 1698796800  # 11-01
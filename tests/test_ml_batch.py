@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+MLSignalGenerator.predict_batch - 한 번의 predict_proba, 캔들 단위 캐시 검증
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+import market_data
+from tests.conftest import make_ohlcv
+from config import CANDLE_ARCHIVE_CONFIG
+from clock import SYSTEM_CLOCK
+from ml_signal_generator import MLSignalGenerator
+
+
+class CountingModel:
+    """predict_proba 호출 횟수를 세는 래퍼"""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = model.classes_
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return self.model.predict_proba(X)
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+def make_generator(frames):
+    generator = MLSignalGenerator.__new__(MLSignalGenerator)
+    features = pd.concat([generator._create_features(df) for df in frames.values()]).dropna()
+    generator.feature_names = list(features.columns)
+    labels = (features['returns_4h'] > 0).astype(int)
+
+    generator.scaler = StandardScaler().fit(features)
+    model = RandomForestClassifier(n_estimators=10, random_state=0)
+    model.fit(generator.scaler.transform(features), labels)
+    generator.model = CountingModel(model)
+    generator.compiled_model = None
+    generator.is_trained = True
+    generator.prediction_cache = {}
+    generator._cache_lock = threading.Lock()
+    generator._model_lock = threading.RLock()
+    generator.model_version = 0
+    generator.clock = SYSTEM_CLOCK
+    generator.prediction_horizon = 6
+    generator.min_profit_threshold = 0.015
+    return generator
+
+
+def test_batch_scores_all_symbols_in_one_call(monkeypatch):
+    frames = {f'T{i}': make_ohlcv(seed=i) for i in range(5)}
+    monkeypatch.setattr(market_data, 'get_ohlcv', lambda ticker, **kw: frames[ticker[4:]])
+    generator = make_generator(frames)
+
+    results = generator.predict_batch(list(frames))
+
+    assert generator.model.calls == 1
+    for symbol, df in frames.items():
+        row = generator._create_features(df)[generator.feature_names].iloc[[-1]]
+        scaled = generator.scaler.transform(row)
+        expected = generator.model.model.predict_proba(scaled)[0]
+        assert results[symbol]['buy_probability'] == expected[1]
+        assert results[symbol]['prediction'] == bool(generator.model.predict(scaled)[0])
+
+
+def test_results_are_cached_per_candle(monkeypatch):
+    frames = {'A': make_ohlcv(seed=1), 'B': make_ohlcv(seed=2)}
+    fetches = []
+    monkeypatch.setattr(market_data, 'get_ohlcv',
+                        lambda ticker, **kw: fetches.append(ticker) or frames[ticker[4:]])
+    bucket = [10]
+    monkeypatch.setattr(market_data, 'candle_bucket', lambda interval, now=None: bucket[0])
+    generator = make_generator(frames)
+
+    generator.predict_batch(['A', 'B'])
+    assert generator.predict('A') is not None
+    assert generator.model.calls == 1
+    assert len(fetches) == 2
+
+    bucket[0] = 11  # 새 1시간봉
+    generator.predict('A')
+    assert generator.model.calls == 2
+
+
+def reference_evaluation(generator, frames, threshold):
+    """이전 구현 (행마다 transform + predict_proba)"""
+    total = successful = 0
+    for df in frames.values():
+        features_df = generator._create_features(df)
+        for i in range(len(df) - generator.prediction_horizon - 50):
+            current = features_df.iloc[i:i+1][generator.feature_names]
+            if current.isna().any().any():
+                continue
+            probability = generator.model.model.predict_proba(generator.scaler.transform(current))[0][1]
+            if probability >= threshold:
+                total += 1
+                future_price = df.iloc[i + generator.prediction_horizon]['close']
+                current_price = df.iloc[i]['close']
+                if (future_price - current_price) / current_price > generator.min_profit_threshold:
+                    successful += 1
+    return total, successful
+
+
+def test_recent_performance_is_evaluated_in_one_batch(monkeypatch):
+    frames = {f'T{i}': make_ohlcv(seed=i) for i in range(4)}
+    monkeypatch.setattr(market_data, 'get_ohlcv', lambda ticker, **kw: frames[ticker[4:]])
+    monkeypatch.setitem(CANDLE_ARCHIVE_CONFIG, 'enabled', False)
+    generator = make_generator(frames)
+
+    result = generator.evaluate_recent_performance(list(frames), days=7, signal_threshold=0.6)
+
+    assert generator.model.calls == 1
+    total, successful = reference_evaluation(generator, frames, 0.6)
+    assert total > 0
+    assert (result['total_signals'], result['successful_signals']) == (total, successful)
+    assert sum(s for s, _ in result['per_symbol'].values()) == total
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+ModelTrainer - 후보 모델 검증 / 파일 교체 / 실행 중인 생성기 무중단 교체 테스트
+(학습 함수는 프로세스 없이 직접 호출)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent.futures import Future
+
+import market_data
+from tests.conftest import make_ohlcv
+from config import CANDLE_ARCHIVE_CONFIG, ML_CONFIG
+from ml_signal_generator import MLSignalGenerator
+from model_trainer import ModelTrainer, candidate_files, train_candidate
+
+
+def setup_market(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(CANDLE_ARCHIVE_CONFIG, 'enabled', False)
+    frames = {'KRW-A': make_ohlcv(600, 1), 'KRW-B': make_ohlcv(600, 2)}
+    monkeypatch.setattr(market_data, 'get_ohlcv',
+                        lambda ticker, interval=None, count=200, **kw: frames[ticker].iloc[-count:])
+
+
+def finished(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def test_candidate_is_installed_into_running_generator(monkeypatch, tmp_path):
+    setup_market(monkeypatch, tmp_path)
+    generator = MLSignalGenerator()
+    assert not generator.is_trained  # ML 중립 모드
+    assert generator.predict('A') is None
+
+    result = train_candidate('random_forest', ['A', 'B'])
+    assert result['current_accuracy'] is None
+    assert 0 <= result['holdout_accuracy'] <= 1
+
+    trainer = ModelTrainer(generator, ['A', 'B'], {'max_accuracy_drop': 1.0})
+    monkeypatch.setitem(ML_CONFIG['performance'], 'min_accuracy', 0.0)
+    monkeypatch.setitem(ML_CONFIG['performance'], 'evaluate_after_retrain', False)
+    trainer._on_done(finished(result))
+
+    assert trainer.last_outcome == 'installed'
+    assert generator.is_trained and generator.model_version == 1
+    assert generator.model is None and generator.compiled_model is not None
+    for live, candidate in candidate_files(generator).items():
+        assert os.path.exists(live) and not os.path.exists(candidate)
+
+    prediction = generator.predict('A')
+    assert 0 <= prediction['buy_probability'] <= 1
+
+    # 다음 시작 때는 교체된 파일을 로드
+    reloaded = MLSignalGenerator()
+    assert reloaded.is_trained and reloaded.feature_names == generator.feature_names
+
+
+def test_worse_candidate_is_rejected(monkeypatch, tmp_path):
+    setup_market(monkeypatch, tmp_path)
+    generator = MLSignalGenerator()
+    result = train_candidate('random_forest', ['A', 'B'])
+    result['current_accuracy'] = result['holdout_accuracy'] + 0.1
+
+    trainer = ModelTrainer(generator, ['A', 'B'], {'max_accuracy_drop': 0.02})
+    monkeypatch.setitem(ML_CONFIG['performance'], 'min_accuracy', 0.0)
+    trainer._on_done(finished(result))
+
+    assert trainer.last_outcome == 'rejected'
+    assert not generator.is_trained
+    for live, candidate in candidate_files(generator).items():
+        assert not os.path.exists(live) and not os.path.exists(candidate)
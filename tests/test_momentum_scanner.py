@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+ImprovedMomentumScanner 패널 점수가 종목별 계산과 같은지 검증
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicator_engine import build_panel
+from momentum_scanner_improved import ImprovedMomentumScanner
+
+
+def reference_score(df):
+    """기존 calculate_momentum_score (종목별 DataFrame)"""
+    score = 0
+    if len(df) >= 3:
+        if df['close'].iloc[-1] > df['close'].iloc[-2]:
+            score += 1
+            if df['close'].iloc[-2] > df['close'].iloc[-3]:
+                score += 2
+    if len(df) >= 2:
+        vol_ratio = df['volume'].iloc[-1] / df['volume'].iloc[-2]
+        if vol_ratio > 1.5:
+            score += 2
+        elif vol_ratio > 1.2:
+            score += 1
+    if df['close'].iloc[-1] > df['open'].iloc[-1]:
+        body_ratio = (df['close'].iloc[-1] - df['open'].iloc[-1]) / df['open'].iloc[-1]
+        score += min(body_ratio * 100, 3)
+    if len(df) >= 5:
+        if df['high'].iloc[-1] >= df['high'].iloc[-5:].max():
+            score += 2
+    return score
+
+
+def make_daily(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0.01, 0.04, n)))
+    open_ = close * (1 + rng.normal(0, 0.02, n))
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * 1.01,
+        'low': np.minimum(open_, close) * 0.99,
+        'close': close,
+        'volume': rng.uniform(1e5, 1e6, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='D'))
+
+
+@pytest.mark.parametrize('length', [3, 7])
+def test_panel_scores_match_per_symbol(length):
+    frames = {f'KRW-T{i}': make_daily(length, i) for i in range(40)}
+    frames['KRW-NEW'] = make_daily(length, 99).iloc[-2:]  # 상장 2일차
+
+    scanner = ImprovedMomentumScanner()
+    panel = build_panel(frames)
+    scores = scanner.calculate_momentum_scores(panel)
+
+    for row, symbol in enumerate(panel.symbols):
+        assert scores[row] == pytest.approx(reference_score(frames[symbol])), symbol
+
+
+def test_evaluate_panel_applies_filters():
+    up = make_daily(3, 0)
+    up['close'] = [1000, 1050, 1120]
+    up['open'] = [990, 1000, 1060]
+    up['high'] = up['close'] * 1.01
+    up['low'] = up['open'] * 0.995
+    up['volume'] = [1e6, 1e6, 2e6]
+
+    flat = up.copy()
+    flat['close'] = [1000, 1000, 1000]
+
+    scanner = ImprovedMomentumScanner()
+    candidates = scanner.evaluate_panel(build_panel({'KRW-UP': up, 'KRW-FLAT': flat}))
+
+    assert [c['symbol'] for c in candidates] == ['UP']
+    assert candidates[0]['change_24h'] == pytest.approx((1120 / 1050 - 1) * 100)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+risk_manager.PositionBook - 청산/진입 스레드가 함께 쓰는 포지션 저장소 테스트
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import threading
+
+from risk_manager import PositionBook
+
+
+def test_iteration_is_safe_while_other_thread_mutates():
+    book = PositionBook({f'C{i}': {'quantity': i} for i in range(50)})
+    errors = []
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            book[f'N{i % 20}'] = {'quantity': i}
+            book.pop(f'N{(i + 10) % 20}', None)
+            i += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(2000):
+            for symbol, position in book.items():
+                position['quantity']
+            for symbol in book:
+                pass
+    except RuntimeError as e:  # dictionary changed size during iteration
+        errors.append(e)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert not errors
+
+
+def test_behaves_like_dict():
+    book = PositionBook()
+    book['BTC'] = {'entry_price': 100, 'quantity': 1}
+
+    assert 'BTC' in book
+    assert book.get('ETH') is None
+    assert json.loads(json.dumps(book)) == {'BTC': {'entry_price': 100, 'quantity': 1}}
+
+    with book.lock:
+        del book['BTC']
+    assert len(book) == 0
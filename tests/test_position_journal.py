@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+position_journal 테스트 - 포지션/최고가/부분 매도/물타기/추매 상태 기록, 스냅샷 압축, 재시작 재생,
+거래소 잔고 1회 조회 복구
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime
+
+from averaging_down_manager import AveragingDownManager
+from clock import SimulatedClock
+from config import AVERAGING_DOWN_CONFIG
+from partial_exit_manager import PartialExitManager
+from position_journal import PositionJournal
+from position_recovery import PositionRecovery
+from pyramiding_manager import PyramidingManager
+from risk_manager import PositionBook
+from trade_store import TradeStore
+
+START = 1_700_000_000
+
+
+class FakeUpbit:
+    def __init__(self, balances):
+        self.balances = balances
+        self.calls = 0
+
+    def get_balances(self):
+        self.calls += 1
+        return self.balances
+
+    def sell_market_order(self, ticker, quantity):
+        return {'uuid': 'x'}
+
+
+def managers(journal, clock):
+    return (PositionBook(journal=journal),
+            PartialExitManager(clock=clock, journal=journal),
+            AveragingDownManager(AVERAGING_DOWN_CONFIG, clock=clock, journal=journal),
+            PyramidingManager(clock=clock, journal=journal))
+
+
+def test_every_mutation_is_replayed_after_restart(tmp_path):
+    path = str(tmp_path / 'position_state.json')
+    clock = SimulatedClock(START)
+    journal = PositionJournal(path, compact_every=4, fsync=False)
+    book, exits, averaging, pyramids = managers(journal, clock)
+
+    entry_time = clock.now()
+    book['BTC'] = {'entry_price': 100.0, 'quantity': 2.0, 'value': 200.0, 'entry_time': entry_time}
+    book['ETH'] = {'entry_price': 10.0, 'quantity': 5.0, 'value': 50.0, 'entry_time': entry_time}
+    book.update_fields('BTC', durable=False, highest_price=120.0)
+    assert exits.check_partial_exit('BTC', 100.0, entry_time, 120.0, 2.0, FakeUpbit([])) == (True, 0.5)
+    book.update_fields('BTC', quantity=1.5)
+    averaging.record_averaging('ETH', 9.0, 1.0, 9.0)
+    pyramids.record_pyramid('BTC', 110.0, 7.5)
+    book.pop('SOL', None)  # 없는 종목은 기록 안 함
+    del book['ETH']
+    averaging.clear_history('ETH')
+    averaging.record_averaging('BTC', 95.0, 0.5, 47.5)
+
+    assert os.path.exists(path)  # compact_every마다 스냅샷
+
+    # 재시작: 스냅샷 + 저널 꼬리 재생
+    restarted = PositionJournal(path, fsync=False)
+    book2, exits2, averaging2, pyramids2 = managers(restarted, clock)
+    positions = restarted.get('positions')
+    assert list(positions) == ['BTC']
+    assert positions['BTC']['highest_price'] == 120.0
+    assert positions['BTC']['quantity'] == 1.5
+    assert positions['BTC']['entry_time'] == entry_time.isoformat()
+    assert exits2.executed_exits == {'BTC': [0]}
+    assert averaging2.averaging_history['BTC'][0]['price'] == 95.0
+    assert isinstance(averaging2.averaging_history['BTC'][0]['timestamp'], datetime)
+    assert pyramids2.pyramid_history['BTC']['count'] == 1
+    assert pyramids2.pyramid_history['BTC']['timestamps'] == [entry_time]
+
+    # 정상 종료 스냅샷 후에도 같은 상태
+    assert restarted.snapshot()
+    assert os.path.getsize(path + 'l') == 0
+    assert PositionJournal(path, fsync=False).state == restarted.state
+
+
+def test_torn_last_event_is_dropped(tmp_path):
+    path = str(tmp_path / 'position_state.json')
+    journal = PositionJournal(path, fsync=False)
+    journal.set('positions', 'BTC', {'entry_price': 100.0, 'quantity': 1.0})
+    with open(path + 'l', 'ab') as f:
+        f.write(b'{"seq": 2, "record": {"op": "upd')  # 쓰는 도중 종료
+
+    restarted = PositionJournal(path, fsync=False)
+    assert restarted.get('positions') == {'BTC': {'entry_price': 100.0, 'quantity': 1.0}}
+    restarted.update('positions', 'BTC', {'quantity': 0.5})
+    assert PositionJournal(path, fsync=False).get('positions')['BTC']['quantity'] == 0.5
+
+
+def test_recovery_keeps_journal_fields_with_one_balance_call(tmp_path):
+    saved = {
+        'BTC': {'entry_price': 100.0, 'quantity': 2.0, 'entry_time': '2025-12-18T23:35:43',
+                'highest_price': 130.0},
+        'XRP': {'entry_price': 1.0, 'quantity': 10.0, 'entry_time': '2025-12-18T23:35:43'},
+    }
+    upbit = FakeUpbit([
+        {'currency': 'KRW', 'balance': '1000', 'avg_buy_price': '0'},
+        {'currency': 'BTC', 'balance': '1.5', 'avg_buy_price': '100'},  # 수동 일부 매도
+        {'currency': 'ETH', 'balance': '3', 'avg_buy_price': '10'},      # 수동 매수
+    ])
+    recovery = PositionRecovery(upbit, store=TradeStore(str(tmp_path / 'trading.db')))
+
+    recovered = recovery.sync_with_exchange(saved)
+    assert upbit.calls == 1
+    assert recovered['BTC']['quantity'] == 1.5
+    assert recovered['BTC']['highest_price'] == 130.0
+    assert recovered['ETH']['entry_price'] == 10.0
+    assert 'XRP' not in recovered
+
+    upbit.get_balances = lambda: 1 / 0
+    assert recovery.sync_with_exchange(saved) is None  # 조회 실패는 "보유 없음"과 구분
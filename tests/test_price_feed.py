@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+price_feed 실시간 시세 수신 테스트
+업비트 대신 리플레이 연결 / 로컬 웹소켓 서버로 검증
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import threading
+import time
+
+import pytest
+
+from price_feed import PriceBook, ReplayTransport, TickerFeed, WebSocketTransport, parse_ticker_message
+
+
+def ticker_message(code, price):
+    return {'type': 'ticker', 'code': code, 'trade_price': price, 'timestamp': 1700000000000}
+
+
+def wait_until(condition, timeout=3):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_price_book_drops_stale_prices():
+    book = PriceBook()
+    book.update('KRW-BTC', 100.0, received_at=time.time() - 10)
+    book.update('KRW-ETH', 50.0)
+
+    assert book.get('KRW-BTC') == 100.0
+    assert book.get('KRW-BTC', max_age=5) is None
+    assert book.get_many(['KRW-BTC', 'KRW-ETH', 'KRW-XRP'], max_age=5) == {'KRW-ETH': 50.0}
+
+
+def test_parse_default_and_simple_formats():
+    assert parse_ticker_message(json.dumps(ticker_message('KRW-BTC', 1000))) == ('KRW-BTC', 1000.0, 1700000000000)
+    assert parse_ticker_message(b'{"ty":"ticker","cd":"KRW-ETH","tp":5.5,"tms":1}') == ('KRW-ETH', 5.5, 1)
+    assert parse_ticker_message('{"status":"UP"}') is None
+    assert parse_ticker_message('not json') is None
+
+
+def test_replay_feed_updates_book_and_notifies_listeners():
+    messages = [ticker_message('KRW-BTC', p) for p in (100, 101, 99)]
+    transport = ReplayTransport(messages)
+    feed = TickerFeed(transport_factory=lambda: transport)
+    received = []
+    feed.add_listener(lambda ticker, price: received.append((ticker, price)))
+
+    feed.subscribe(['KRW-BTC'])
+    feed.start()
+    try:
+        assert wait_until(lambda: len(received) == 3)
+    finally:
+        feed.stop()
+
+    assert received == [('KRW-BTC', 100.0), ('KRW-BTC', 101.0), ('KRW-BTC', 99.0)]
+    assert feed.price_book.get('KRW-BTC') == 99.0
+
+    request = json.loads(transport.sent[0])
+    assert request[1] == {'type': 'ticker', 'codes': ['KRW-BTC']}
+
+
+def test_listener_error_does_not_stop_feed():
+    transport = ReplayTransport([ticker_message('KRW-BTC', 1), ticker_message('KRW-BTC', 2)])
+    feed = TickerFeed(transport_factory=lambda: transport)
+    feed.add_listener(lambda ticker, price: 1 / 0)
+
+    feed.subscribe(['KRW-BTC'])
+    feed.start()
+    try:
+        assert wait_until(lambda: feed.messages == 2)
+    finally:
+        feed.stop()
+
+
+def test_websocket_transport_against_local_replay_server():
+    server_module = pytest.importorskip('websockets.sync.server')
+
+    def handler(conn):
+        request = json.loads(conn.recv())
+        for code in request[1]['codes']:
+            conn.send(json.dumps(ticker_message(code, 123.0)).encode('utf-8'))
+        time.sleep(1)
+
+    server = server_module.serve(handler, 'localhost', 0)
+    port = server.socket.getsockname()[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    feed = TickerFeed(transport_factory=lambda: WebSocketTransport(f'ws://localhost:{port}'))
+    feed.subscribe(['KRW-BTC', 'KRW-ETH'])
+    feed.start()
+    try:
+        assert wait_until(lambda: len(feed.price_book) == 2)
+    finally:
+        feed.stop()
+        server.shutdown()
+
+    assert feed.price_book.get('KRW-ETH') == 123.0
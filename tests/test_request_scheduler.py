@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+request_scheduler 우선순위/토큰 버킷 테스트
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import threading
+import time
+
+from pyupbit.errors import TooManyRequests
+
+import request_scheduler
+from request_scheduler import (
+    RequestScheduler, ScheduledUpbit,
+    PRIORITY_EXIT, PRIORITY_ENTRY, PRIORITY_SCAN, PRIORITY_DASHBOARD
+)
+
+
+def make_scheduler(rate=5, reserve=0):
+    return RequestScheduler({
+        'enabled': True,
+        'group_rates': {'test': rate},
+        'default_rate': rate,
+        'reserve_for_exit': reserve,
+        'max_retries': 2,
+        'throttle_penalty': 0.1,
+    })
+
+
+def test_exits_jump_the_queue():
+    scheduler = make_scheduler(rate=5)
+    for _ in range(5):
+        scheduler.call(lambda: None, group='test')  # 버킷 비우기
+
+    order = []
+    threads = []
+    for name, priority in [('dashboard', PRIORITY_DASHBOARD), ('scan', PRIORITY_SCAN),
+                           ('entry', PRIORITY_ENTRY), ('exit', PRIORITY_EXIT)]:
+        t = threading.Thread(target=scheduler.call, args=(order.append, name),
+                             kwargs={'group': 'test', 'priority': priority, 'caller': name})
+        t.start()
+        threads.append(t)
+        time.sleep(0.02)
+
+    for t in threads:
+        t.join(5)
+
+    assert order == ['exit', 'entry', 'scan', 'dashboard']
+
+
+def test_reserve_keeps_last_token_for_exits():
+    scheduler = make_scheduler(rate=2, reserve=1)
+    scheduler.call(lambda: None, group='test', priority=PRIORITY_SCAN)
+
+    # 토큰 1개 남음 - 청산은 즉시, 스캔은 대기
+    start = time.monotonic()
+    scheduler.call(lambda: None, group='test', priority=PRIORITY_EXIT)
+    assert time.monotonic() - start < 0.1
+
+    start = time.monotonic()
+    scheduler.call(lambda: None, group='test', priority=PRIORITY_SCAN)
+    assert time.monotonic() - start > 0.3
+
+
+def test_remaining_req_header_lowers_tokens():
+    scheduler = make_scheduler(rate=10)
+    scheduler.call(lambda: None, group='test')
+
+    scheduler.observe_remaining({'group': 'test', 'min': 500, 'sec': 0})
+
+    status = scheduler.get_group_status()['test']
+    assert status['remaining_sec'] == 0
+    assert status['tokens'] < 1
+
+    start = time.monotonic()
+    scheduler.call(lambda: None, group='test')
+    assert time.monotonic() - start > 0.05
+
+
+def test_usage_is_reported_per_caller():
+    scheduler = make_scheduler(rate=100)
+
+    with scheduler.context('scanner', PRIORITY_SCAN):
+        for _ in range(3):
+            scheduler.call(lambda: None, group='test')
+    scheduler.call(lambda: None, group='test', caller='bot')
+
+    usage = scheduler.get_usage()
+    assert usage['scanner']['calls'] == 3
+    assert usage['scanner']['priority'] == 'scan'
+    assert usage['bot']['calls'] == 1
+
+
+def test_throttled_request_is_retried():
+    scheduler = make_scheduler(rate=100)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise TooManyRequests
+        return 'ok'
+
+    assert scheduler.call(flaky, group='test', caller='bot') == 'ok'
+    assert scheduler.get_usage()['bot']['throttled'] == 1
+
+
+def test_scheduled_upbit_sends_orders_with_exit_priority():
+    scheduler = make_scheduler(rate=100)
+    seen = []
+
+    class FakeUpbit:
+        def sell_market_order(self, ticker, volume):
+            seen.append(scheduler.current_context())
+            return {'uuid': '1'}
+
+        def get_balances(self):
+            return []
+
+    upbit = ScheduledUpbit(FakeUpbit(), scheduler)
+    with scheduler.context('scanner', PRIORITY_SCAN):
+        upbit.sell_market_order('KRW-BTC', 1)
+        upbit.get_balances()
+
+    usage = scheduler.get_usage()['scanner']
+    assert usage['groups'] == {'order': 1, 'default': 1}
+    assert scheduler.get_group_status()['order']['calls'] == 1
+
+
+def test_pyupbit_parser_feeds_shared_scheduler():
+    from pyupbit import request_api
+
+    limit = request_api._parse("group=candles; min=1000; sec=3")
+
+    assert limit['sec'] == 3
+    assert request_scheduler.get_scheduler().get_group_status()['candles']['remaining_sec'] == 3
+
+
+def test_swallowed_429_is_detected_and_retried(monkeypatch):
+    from pyupbit import request_api
+
+    class FakeResponse:
+        def __init__(self, status_code, text):
+            self.status_code = status_code
+            self.ok = status_code < 400
+            self.text = text
+            self.headers = {}
+
+        def json(self):
+            return json.loads(self.text)
+
+    responses = [FakeResponse(429, 'Too many API requests.'), FakeResponse(200, '[1, 2]')]
+    monkeypatch.setattr(request_scheduler.requests, 'get', lambda url, **kwargs: responses.pop(0))
+
+    def get_ohlcv_like():
+        # pyupbit.get_ohlcv처럼 모든 예외를 삼키고 None 반환 (텍스트 본문 429는 json 파싱에서 실패)
+        try:
+            return request_api._call_get('https://api.upbit.com/v1/candles').json()
+        except Exception:
+            return None
+
+    scheduler = make_scheduler(rate=100)
+    assert scheduler.call(get_ohlcv_like, group='test', caller='candles') == [1, 2]
+    assert scheduler.get_usage()['candles']['throttled'] == 1
+    assert scheduler.get_usage()['candles']['calls'] == 2
+
+
+def test_multi_page_call_costs_one_token_per_page():
+    scheduler = make_scheduler(rate=5)
+    scheduler.call(lambda: None, group='test', cost=4)
+    assert scheduler.get_group_status()['test']['tokens'] < 1.5
+
+    # 버킷보다 큰 요청도 막히지 않고, 빚(음수 토큰)을 다음 요청이 기다림
+    scheduler.call(lambda: None, group='test', cost=8)
+    start = time.monotonic()
+    scheduler.call(lambda: None, group='test')
+    assert time.monotonic() - start > 0.8
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+ImprovedStrategy.evaluate_signals 병렬 평가 / 시간 초과 / 지연 기록 테스트
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import request_scheduler
+from improved_strategy import ImprovedStrategy
+from request_scheduler import PRIORITY_ENTRY
+
+
+class SlowMTF:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def analyze(self, symbol):
+        time.sleep(self.delay)
+        return {'final_score': 8.0, 'consensus_level': 0.9, 'dominant_trend': 'up'}
+
+
+class SlowML:
+    is_trained = True
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.context = None
+
+    def predict(self, symbol):
+        self.context = request_scheduler.get_scheduler().current_context()
+        time.sleep(self.delay)
+        return {'buy_probability': 0.7, 'confidence': 0.6}
+
+
+def make_strategy(mtf_delay=0.3, ml_delay=0.3, timeouts=None, workers=6):
+    strategy = ImprovedStrategy.__new__(ImprovedStrategy)
+    strategy.mtf_analyzer = SlowMTF(mtf_delay)
+    strategy.ml_generator = SlowML(ml_delay)
+    strategy.calculate_entry_score = lambda indicators: (6.0, ['tech'])
+    strategy.signal_executor = ThreadPoolExecutor(max_workers=workers)
+    strategy.signal_timeouts = timeouts or {'mtf': 2, 'ml': 2}
+    strategy.signal_latency = {}
+    strategy._latency_lock = threading.Lock()
+    return strategy
+
+
+def test_sources_run_concurrently():
+    strategy = make_strategy()
+
+    start = time.monotonic()
+    scores, details, latency = strategy.evaluate_signals('BTC', {})
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.5  # 순차면 0.6초 이상
+    assert scores == {'technical': 0.5, 'mtf': 0.8, 'ml': 0.7}
+    assert latency['mtf'] >= 0.3
+
+
+def test_timeout_falls_back_to_neutral():
+    strategy = make_strategy(ml_delay=1.0, timeouts={'mtf': 2, 'ml': 0.2})
+
+    start = time.monotonic()
+    scores, details, _ = strategy.evaluate_signals('BTC', {})
+
+    assert time.monotonic() - start < 0.6
+    assert scores['ml'] == 0.5
+    assert scores['mtf'] == 0.8
+    assert strategy.get_signal_latency()['ml']['timeouts'] == 1
+
+
+def test_workers_inherit_request_context():
+    strategy = make_strategy(mtf_delay=0, ml_delay=0)
+
+    with request_scheduler.context('entry', PRIORITY_ENTRY):
+        strategy.evaluate_signals('BTC', {})
+
+    assert strategy.ml_generator.context == ('entry', PRIORITY_ENTRY)
+
+
+def test_time_waiting_in_pool_does_not_count():
+    # 워커 1개: ML은 MTF(0.3초)가 끝날 때까지 대기열 → 실행 0.1초는 제한 0.2초 안
+    strategy = make_strategy(mtf_delay=0.3, ml_delay=0.1, timeouts={'mtf': 2, 'ml': 0.2}, workers=1)
+
+    scores, _, latency = strategy.evaluate_signals('BTC', {})
+
+    assert scores == {'technical': 0.5, 'mtf': 0.8, 'ml': 0.7}
+    assert latency['ml'] < 0.2
+    assert strategy.get_signal_latency()['ml']['timeouts'] == 0
+
+
+def test_timed_out_queued_signals_are_cancelled():
+    strategy = make_strategy(timeouts={'mtf': 0.2, 'ml': 0.2}, workers=1)
+    strategy.signal_executor.submit(time.sleep, 1.0)  # 풀이 다른 작업으로 막힘
+
+    start = time.monotonic()
+    scores, _, _ = strategy.evaluate_signals('BTC', {})
+
+    assert time.monotonic() - start < 0.6
+    assert scores == {'technical': 0.5, 'mtf': 0.5, 'ml': 0.5}
+    strategy.signal_executor.shutdown(wait=True)
+    assert strategy.ml_generator.context is None  # 취소되어 실행되지 않음
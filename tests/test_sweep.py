@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+sweep.py 테스트 - 격자 전개, 재생 데이터 메모리 맵 저장/로드, 프로세스 풀 스윕과 결과 캐시
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from backtest import Backtester, ReplayData
+from tests.conftest import make_ohlcv
+from sweep import expand_grid, parse_grid, run_sweep
+
+
+def synthetic_frames(hours=24 * 30, seed=3):
+    rng = np.random.default_rng(seed)
+    return {
+        symbol: make_ohlcv(hours, rng=rng, base=base, start='2024-03-01 09:00', drift=0.0003,
+                           volatility=0.008, volume=(50, 150))
+        for symbol, base in (('BTC', 60_000_000), ('ETH', 4_000_000))
+    }
+
+
+def test_expand_grid_overrides_preset_values():
+    combos = expand_grid(['balanced', 'aggressive'], parse_grid(['stop_loss=0.008,0.012']))
+
+    assert [c['name'] for c in combos] == [
+        'balanced stop_loss=0.008', 'balanced stop_loss=0.012',
+        'aggressive stop_loss=0.008', 'aggressive stop_loss=0.012',
+    ]
+    assert combos[1]['values']['stop_loss'] == 0.012
+    assert combos[1]['values']['max_positions'] == 5  # 나머지는 프리셋 값
+
+    with pytest.raises(ValueError):
+        expand_grid(['balanced'], {'no_such_key': [1]})
+
+
+def test_replay_data_round_trips_through_memory_map(tmp_path):
+    data = ReplayData.from_frames(synthetic_frames(hours=24 * 10))
+    data.save(str(tmp_path))
+    loaded = ReplayData.load(str(tmp_path))
+
+    assert isinstance(loaded.base.values['close'], np.memmap)
+    assert loaded.symbols == data.symbols
+    assert loaded.index.equals(data.index)
+    assert loaded.fingerprint() == data.fingerprint()
+    assert loaded.indicators('ETH', 150) == data.indicators('ETH', 150)
+
+    start = data.index[100]
+    original = Backtester(data).run(start=start).summary()
+    replayed = Backtester(loaded).run(start=start).summary()
+    assert replayed['final_equity'] == pytest.approx(original['final_equity'])
+
+
+def test_sweep_ranks_results_and_caches_by_config(tmp_path):
+    data = ReplayData.from_frames(synthetic_frames())
+    combos = expand_grid(['balanced', 'aggressive'])
+    kwargs = dict(start=data.index[200], workers=2,
+                  cache_dir=str(tmp_path / 'cache'), data_dir=str(tmp_path / 'data'))
+
+    table = run_sweep(data, combos, **kwargs)
+    assert table['total_return'].is_monotonic_decreasing
+    assert set(table['name']) == {'balanced', 'aggressive'}
+    assert {'total_return', 'max_drawdown', 'trades'} <= set(table.columns)
+    assert table.index[0] == 1
+    assert not table['cached'].any()
+
+    again = run_sweep(data, combos, **kwargs)
+    assert again['cached'].all()
+    assert list(again['total_return']) == list(table['total_return'])
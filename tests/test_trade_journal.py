@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+trade_journal 테스트 - 추가 전용 저널, 스냅샷 압축, 잘린 기록 복구, 오늘 거래 복원
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+from daily_summary import DailySummary
+from trade_journal import TradeJournal, load_records
+
+
+def trade(i, pnl=1000):
+    return {'timestamp': f'2099-01-01T00:00:{i:02d}', 'symbol': 'BTC', 'type': 'sell',
+            'pnl': pnl, 'fee': 10, 'hold_time_hours': 1}
+
+
+def test_appends_replay_and_compact(tmp_path):
+    path = str(tmp_path / 'trades.json')
+    journal = TradeJournal(path, compact_every=3, fsync=False)
+
+    journal.append(trade(0))
+    journal.append(trade(1))
+    assert not os.path.exists(path)  # 아직 저널만
+    assert [t['timestamp'] for t in load_records(path)] == [trade(0)['timestamp'], trade(1)['timestamp']]
+
+    journal.append(trade(2))  # 3건째 → 압축
+    assert os.path.getsize(journal.journal_path) == 0
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['seq'] == 3
+
+    journal.append(trade(3))
+    assert len(load_records(path)) == 4
+
+    # 새 인스턴스(재시작)도 번호를 이어서 씀
+    TradeJournal(path, compact_every=100, fsync=False).append(trade(4))
+    assert [t['timestamp'][-2:] for t in load_records(path)] == ['00', '01', '02', '03', '04']
+
+
+def test_torn_last_line_is_ignored_and_trimmed(tmp_path):
+    path = str(tmp_path / 'trades.json')
+    TradeJournal(path, fsync=False).append(trade(0))
+    with open(path + 'l', 'ab') as f:
+        f.write(b'{"seq": 2, "record": {"timest')  # 쓰는 도중 종료
+
+    assert len(load_records(path)) == 1
+
+    journal = TradeJournal(path, fsync=False)
+    journal.append(trade(1))
+    records = load_records(path)
+    assert [t['timestamp'][-2:] for t in records] == ['00', '01']
+
+
+def test_stale_journal_entries_after_interrupted_compaction(tmp_path):
+    path = str(tmp_path / 'trades.json')
+    journal = TradeJournal(path, fsync=False)
+    journal.append(trade(0))
+    journal.append(trade(1))
+    # 스냅샷 교체 직후, 저널 비우기 전에 종료된 상황
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'seq': 2, 'records': [trade(0), trade(1)]}, f)
+
+    assert len(load_records(path)) == 2
+    TradeJournal(path, fsync=False).append(trade(2))
+    assert len(load_records(path)) == 3
+
+
+def test_daily_summary_restores_today_trades(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    summary = DailySummary()
+    summary.record_trade({'symbol': 'BTC', 'type': 'buy', 'price': 100})
+    summary.record_trade({'symbol': 'BTC', 'type': 'sell', 'price': 110, 'pnl': 10})
+
+    restarted = DailySummary()
+    assert [t['type'] for t in restarted.today_trades] == ['buy', 'sell']
+
+    result = restarted.finalize_day('2099-01-01')
+    assert result['total_pnl'] == 10
+    assert DailySummary().today_trades == []
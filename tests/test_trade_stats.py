@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+trade_stats 테스트 - 롤링 1/7/30일 통계가 전체 재계산과 같은지, 버킷 만료, 다른 프로세스 거래 따라잡기, 켈리 비율
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from clock import SimulatedClock
+from risk_manager import RiskManager
+from trade_history_manager import TradeHistoryManager
+from trade_stats import RollingTradeStats
+from trade_store import TradeStore
+
+HOUR = 3600
+DAY = 24 * HOUR
+START = 1_700_000_000
+
+
+def make_trade(ts, pnl, symbol):
+    return {'timestamp': datetime.fromtimestamp(ts).isoformat(), 'symbol': symbol, 'type': 'sell',
+            'pnl': pnl, 'fee': abs(pnl) * 0.01, 'hold_time_hours': 2.0}
+
+
+def brute_force(trades, now, days):
+    period = [t for t in trades if datetime.fromisoformat(t['timestamp']).timestamp() > now - days * DAY]
+    wins = [t['pnl'] for t in period if t['pnl'] > 0]
+    losses = [t['pnl'] for t in period if t['pnl'] <= 0]
+    return {
+        'trade_count': len(period), 'win_count': len(wins),
+        'total_pnl': sum(wins) + sum(losses),
+        'max_win': max(wins) if wins else 0, 'max_loss': min(losses) if losses else 0,
+    }
+
+
+def test_rolling_windows_match_full_recompute():
+    rng = np.random.default_rng(1)
+    clock = SimulatedClock(START)
+    stats = RollingTradeStats(clock=clock)
+    trades = []
+
+    # 두 달 동안 1~3시간 간격 거래 (매 정시 + 30분)
+    ts = START
+    for _ in range(600):
+        ts += HOUR * int(rng.integers(1, 4))
+        clock.set(ts + 1800)
+        trade = make_trade(ts + 1800, float(rng.normal(0, 1000)), str(rng.choice(['BTC', 'ETH', 'SOL'])))
+        trades.append(trade)
+        stats.add(trade)
+
+        if len(trades) % 50 == 0:
+            clock.advance(900)  # 창 경계가 거래 시각에서 15분 떨어지게
+            for days in (1, 7, 30):
+                expected = brute_force(trades, clock.time(), days)
+                actual = stats.stats(days)
+                for key, value in expected.items():
+                    assert actual[key] == pytest.approx(value), (days, key)
+
+    # 거래 없이 시간이 지나면 창이 비워짐
+    clock.advance(2 * DAY)
+    assert stats.stats(1) is None
+    assert stats.stats(7)['trade_count'] == brute_force(trades, clock.time(), 7)['trade_count']
+    clock.advance(31 * DAY)
+    assert stats.stats(30) is None
+    assert stats.win_rate(30) is None
+
+
+def test_manager_catches_up_with_other_process_and_feeds_kelly(tmp_path):
+    db = str(tmp_path / 'trading.db')
+    clock = SimulatedClock(START + 40 * DAY)
+    history = str(tmp_path / 'trade_history.json')
+
+    bot = TradeHistoryManager(history, store=TradeStore(db), clock=clock)
+    dashboard = TradeHistoryManager(history, store=TradeStore(db), clock=clock)
+
+    now = clock.time()
+    bot.add_trade(make_trade(now - 35 * DAY, 9999, 'OLD'))  # 모든 창 밖
+    for i in range(12):
+        bot.add_trade(make_trade(now - (i + 1) * HOUR, 2000 if i % 3 else -1000, 'BTC'))
+
+    stats = dashboard.get_period_stats(1)
+    assert stats['trade_count'] == 12
+    assert stats['win_count'] == 8
+    assert stats['total_pnl'] == pytest.approx(8 * 2000 - 4 * 1000)
+    assert stats['best_symbol'] == 'BTC (+12,000)'
+    assert dashboard.get_period_stats(30)['trade_count'] == 12
+    assert dashboard.get_period_stats(60)['trade_count'] == 13  # 창 밖 기간은 범위 조회
+
+    risk = RiskManager(1_000_000, market_analyzer=object(), clock=clock, balance_file=None,
+                       trade_stats=bot.stats)
+    p, b = risk._kelly_inputs()
+    assert p == pytest.approx(8 / 12)
+    assert b == pytest.approx(2.0)
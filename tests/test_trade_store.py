@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+trade_store 테스트 - SQLite(WAL) 저장소, 기존 JSON 가져오기, 기간/최근 조회, 다른 연결의 동시 읽기
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+from datetime import datetime, timedelta
+
+from averaging_down_manager import AveragingDownManager
+from config import AVERAGING_DOWN_CONFIG
+from daily_summary import DailySummary
+from position_recovery import PositionRecovery
+from trade_history_manager import TradeHistoryManager
+from trade_journal import TradeJournal
+from trade_store import TradeStore
+
+
+def trade(hours_ago, pnl, symbol='BTC'):
+    return {'timestamp': (datetime.now() - timedelta(hours=hours_ago)).isoformat(),
+            'symbol': symbol, 'type': 'sell', 'pnl': pnl, 'fee': 10, 'hold_time_hours': 1}
+
+
+def test_history_manager_migrates_json_and_reads_ranges(tmp_path):
+    path = str(tmp_path / 'trade_history.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([trade(24 * 10, -500), trade(24 * 3, 300, 'ETH')], f)
+    TradeJournal(path, fsync=False).append(trade(2, 2000))  # 저널 꼬리도 가져옴
+
+    manager = TradeHistoryManager(path)
+    assert manager.store.path == str(tmp_path / 'trading.db')
+    assert len(manager.get_all_trades()) == 3
+
+    manager.add_trade({**trade(1, -100), 'timestamp': datetime.now() - timedelta(hours=1)})
+    stats = manager.get_period_stats(1)
+    assert stats['trade_count'] == 2
+    assert stats['total_pnl'] == 1900
+    assert manager.get_period_stats(7)['trade_count'] == 3
+    assert [t['pnl'] for t in manager.get_recent_trades(2)] == [-100, 2000]
+
+    # 다시 열어도 중복으로 가져오지 않음
+    assert len(TradeHistoryManager(path, store=TradeStore(manager.store.path)).get_all_trades()) == 4
+
+    manager.cleanup_old_trades(days=5)
+    assert len(manager.get_all_trades()) == 3
+
+
+def test_concurrent_reader_sees_committed_writes(tmp_path):
+    db = str(tmp_path / 'trading.db')
+    writer, reader = TradeStore(db), TradeStore(db)
+    assert writer.conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+    writer.add_trade(trade(1, 100))
+    assert reader.trade_count() == 1
+    assert reader.trades_since(datetime.now() - timedelta(hours=2), symbol='BTC')[0]['pnl'] == 100
+    assert reader.trades_since(datetime.now() - timedelta(hours=2), symbol='ETH') == []
+
+
+def test_positions_summaries_and_averaging_events(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open('active_positions.json', 'w') as f:
+        json.dump({'timestamp': '2025-12-19T00:07:19',
+                   'positions': {'BTC': {'entry_price': 100.0, 'quantity': 2.0,
+                                         'entry_time': '2025-12-18T23:35:43'}}}, f)
+    with open('daily_summaries.json', 'w') as f:
+        json.dump({'2025-12-18': {'date': '2025-12-18', 'total_pnl': 50, 'win_rate': 100,
+                                  'total_trades': 2}}, f)
+
+    recovery = PositionRecovery(upbit=None)
+    assert recovery.load_positions()['BTC']['quantity'] == 2.0
+    recovery.save_positions({'ETH': {'entry_price': 10.0, 'quantity': 1.0,
+                                     'entry_time': datetime(2025, 12, 20, 9)}})
+    assert recovery.load_positions() == {
+        'ETH': {'entry_price': 10.0, 'quantity': 1.0, 'entry_time': '2025-12-20T09:00:00'}}
+
+    summary = DailySummary()
+    assert summary.summaries['2025-12-18']['total_pnl'] == 50
+    summary.finalize_day('2025-12-19')
+    assert list(summary.store.daily_summaries('2025-12-19')) == ['2025-12-19']
+
+    manager = AveragingDownManager(AVERAGING_DOWN_CONFIG, store=summary.store)
+    manager.record_averaging('ETH', 9.0, 1.0, 9.0)
+    events = summary.store.position_events('ETH', 'averaging', active_only=True)
+    assert [e['price'] for e in events] == [9.0]
+    manager.clear_history('ETH')
+    assert summary.store.position_events('ETH', 'averaging', active_only=True) == []
+    assert len(summary.store.position_events('ETH')) == 1  # 이력은 남음
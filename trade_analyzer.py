@@ -1,15 +1,16 @@
 """
 Trade History Analyzer
-trade_history.json 파일을 분석하여 최적의 설정값을 제안합니다.
+거래 기록(trading.db, 기존 trade_history.json은 자동으로 가져옴)을 분석하여 최적의 설정값을 제안합니다.
 """
 
-import json
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from collections import defaultdict
 from typing import Dict, List
-import pyupbit
+
+import candle_archive
+from trade_history_manager import TradeHistoryManager
 
 
 class TradeHistoryAnalyzer:
@@ -18,11 +19,10 @@ class TradeHistoryAnalyzer:
         self.trades_df = None
         
     def load_data(self):
-        """JSON 파일 로드"""
+        """거래 기록 로드 (거래 저장소)"""
         print("📄 거래 기록 로드 중...")
         
-        with open(self.history_file, 'r', encoding='utf-8') as f:
-            trades = json.load(f)
+        trades = TradeHistoryManager(self.history_file).get_all_trades()
         
         if not trades:
             print("⚠️  거래 기록이 없습니다.")
@@ -347,9 +347,9 @@ class TradeHistoryAnalyzer:
             
             # 해당 시점의 BTC 데이터 (대략적인 시장 상황 파악)
             try:
-                # 거래 시점 기준 최근 24시간 데이터
-                btc_data = pyupbit.get_ohlcv("KRW-BTC", interval="minute60", count=24, 
-                                             to=timestamp.strftime('%Y-%m-%d %H:%M:%S'))
+                # 거래 시점 기준 최근 24시간 데이터 (로컬 캔들 아카이브)
+                btc_data = candle_archive.load_history("KRW-BTC", interval="minute60", count=24,
+                                                       end=timestamp)
                 
                 if btc_data is not None and len(btc_data) > 0:
                     # 추세 판단
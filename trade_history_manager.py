@@ -1,38 +1,70 @@
 # trade_history_manager.py
-import json
 import os
+import threading
 from datetime import datetime, timedelta
 from collections import defaultdict
 import logging
 
+from clock import SYSTEM_CLOCK
+from config import TRADE_STORE_CONFIG
+from trade_stats import RollingTradeStats
+from trade_store import get_store
+
 logger = logging.getLogger(__name__)
 
 class TradeHistoryManager:
-    """거래 기록 관리 - Dashboard용 데이터 제공"""
+    """거래 기록 관리 - Dashboard용 데이터 제공
+
+    저장: SQLite 저장소의 trades 테이블 (같은 디렉터리의 trading.db)
+    - 기존 trade_history.json(+ 저널)은 처음 열 때 가져옴
+    - 기간/최근 조회는 시각 인덱스 범위 읽기 (봇과 대시보드가 동시에 사용)
+    - 1/7/30일 통계는 롤링 집계(stats) - 새 거래만 id로 따라잡아 O(1) 갱신/조회
+    """
     
-    def __init__(self, filename='trade_history.json'):
+    def __init__(self, filename='trade_history.json', store=None, clock=None):
         self.filename = filename
-        # ✅ 초기화 시에는 빈 리스트로 시작 (매번 로드할 것이므로)
-        self.trades = []
+        self.clock = clock or SYSTEM_CLOCK
+        self.store = store or get_store(
+            os.path.join(os.path.dirname(filename), TRADE_STORE_CONFIG['path']))
+        self.store.migrate('trades', filename)
+        
+        # 롤링 통계 (켈리/자동 프리셋도 같은 인스턴스를 조회)
+        self.stats = RollingTradeStats(clock=self.clock)
+        self._stats_lock = threading.Lock()
+        self._last_id = None
+        self._sync_stats()
     
-    def _load_history(self):
-        """기존 거래 기록 로드"""
-        if os.path.exists(self.filename):
+    def _sync_stats(self):
+        """저장소에 새로 추가된 거래만 롤링 통계에 반영 (다른 프로세스가 쓴 거래 포함)"""
+        with self._stats_lock:
             try:
-                with open(self.filename, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                if self._last_id is None:
+                    # 처음: 가장 긴 창 안의 거래만
+                    longest = max(self.stats.windows)
+                    last_id = self.store.last_trade_id()
+                    rows = self.store.trades_after(0, since=self.clock.now() - timedelta(days=longest))
+                else:
+                    last_id = self._last_id
+                    rows = self.store.trades_after(last_id)
             except Exception as e:
                 logger.error(f"거래 기록 로드 실패: {e}")
-                return []
-        return []
+                return
+            for trade_id, trade in rows:
+                self.stats.add(trade)
+                last_id = max(last_id, trade_id)
+            self._last_id = last_id
     
-    def _save_history(self):
-        """거래 기록 저장"""
+    def _load_history(self, since=None):
+        """거래 기록 로드 (since 이후만, 시각 순)"""
         try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
-                json.dump(self.trades, f, ensure_ascii=False, indent=2)
+            return self.store.trades_since(since)
         except Exception as e:
-            logger.error(f"거래 기록 저장 실패: {e}")
+            logger.error(f"거래 기록 로드 실패: {e}")
+            return []
+    
+    def get_all_trades(self):
+        """전체 거래 기록 (분석기용)"""
+        return self._load_history()
     
     def add_trade(self, trade_data):
         """
@@ -55,10 +87,13 @@ class TradeHistoryManager:
         if isinstance(trade_data['timestamp'], datetime):
             trade_data['timestamp'] = trade_data['timestamp'].isoformat()
         
-        # ✅ 최신 데이터 로드 후 추가
-        self.trades = self._load_history()
-        self.trades.append(trade_data)
-        self._save_history()
+        # ✅ 한 행 추가 (전체 파일 재작성 없음)
+        try:
+            self.store.add_trade(trade_data)
+        except Exception as e:
+            logger.error(f"거래 기록 저장 실패: {e}")
+            return
+        self._sync_stats()
         
         logger.info(f"거래 기록 추가: {trade_data['symbol']} "
                    f"PnL: {trade_data['pnl']:+,.0f}")
@@ -73,17 +108,16 @@ class TradeHistoryManager:
         Returns:
             dict: 통계 정보
         """
-        # ✅ 매번 최신 데이터 로드
-        self.trades = self._load_history()
+        # ✅ 1/7/30일: 롤링 집계 (새 거래만 반영 후 바로 조회)
+        if self.stats.has_window(days):
+            self._sync_stats()
+            return self.stats.stats(days) or self._empty_stats()
         
-        now = datetime.now()
+        now = self.clock.now()
         cutoff = now - timedelta(days=days)
         
-        # 기간 내 거래 필터링
-        period_trades = [
-            t for t in self.trades
-            if datetime.fromisoformat(t['timestamp']) > cutoff
-        ]
+        # ✅ 기간 내 거래만 인덱스로 조회
+        period_trades = self._load_history(since=cutoff)
         
         if not period_trades:
             return self._empty_stats()
@@ -163,27 +197,15 @@ class TradeHistoryManager:
         return '-'
     
     def get_recent_trades(self, limit=10):
-        """최근 거래 내역 - ✅ 항상 최신 데이터"""
-        # ✅ 매번 파일에서 다시 로드
-        self.trades = self._load_history()
-        
-        return sorted(
-            self.trades,
-            key=lambda x: x['timestamp'],
-            reverse=True
-        )[:limit]
+        """최근 거래 내역 - ✅ 항상 최신 데이터 (최신순)"""
+        try:
+            return self.store.recent_trades(limit)
+        except Exception as e:
+            logger.error(f"거래 기록 로드 실패: {e}")
+            return []
     
     def cleanup_old_trades(self, days=90):
         """오래된 거래 기록 정리"""
-        # ✅ 최신 데이터 로드
-        self.trades = self._load_history()
-        
-        cutoff = datetime.now() - timedelta(days=days)
-        
-        self.trades = [
-            t for t in self.trades
-            if datetime.fromisoformat(t['timestamp']) > cutoff
-        ]
-        
-        self._save_history()
-        logger.info(f"90일 이전 거래 기록 정리 완료")
\ No newline at end of file
+        cutoff = self.clock.now() - timedelta(days=days)
+        removed = self.store.delete_trades_before(cutoff)
+        logger.info(f"{days}일 이전 거래 기록 정리 완료: {removed}건")
\ No newline at end of file
@@ -0,0 +1,160 @@
+# trade_journal.py - 추가 전용 거래 저널 + 스냅샷 압축
+#
+# 저장 형식:
+#   <name>.json  - 스냅샷 {"seq": 마지막 반영 번호, "records": [...]}
+#                  (예전 형식인 JSON 리스트도 그대로 읽음 → seq 0)
+#   <name>.jsonl - 저널, 한 줄에 {"seq": n, "record": {...}} (추가 + fsync)
+# - 기록 1건 = 저널 한 줄 추가 → 기록 수와 무관하게 O(1)
+# - compact_every건마다 스냅샷(임시 파일 → fsync → 교체) 후 저널 비움
+# - 로드: 저널 → 스냅샷 순서로 읽고 seq가 스냅샷보다 큰 저널 기록만 이어 붙임
+#   (다른 프로세스가 읽는 도중 압축해도 빠지거나 겹치는 기록 없음)
+# - 쓰다가 죽어 잘린 마지막 줄은 무시하고, 다음 기록 전에 잘라냄
+#
+# 쓰기는 한 프로세스(봇)만, 읽기는 여러 프로세스(대시보드/분석기)가 동시에 가능
+
+import json
+import logging
+import os
+import threading
+
+from config import JOURNAL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def journal_path_for(path):
+    """스냅샷 경로 → 저널 경로 (trade_history.json → trade_history.jsonl)"""
+    return os.path.splitext(path)[0] + '.jsonl'
+
+
+def _read_snapshot(path):
+    """(seq, records) - 파일이 없으면 (0, [])"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return 0, []
+    if isinstance(data, list):  # 저널 도입 전 형식
+        return 0, data
+    return int(data.get('seq', 0)), list(data.get('records', []))
+
+
+def _read_journal(path):
+    """[(seq, record)], 온전한 줄의 바이트 길이
+
+    줄바꿈으로 끝나지 않았거나 JSON이 깨진 마지막 줄(쓰다가 종료)은 버림
+    """
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return [], 0
+
+    entries = []
+    valid = 0
+    for line in raw.splitlines(keepends=True):
+        if not line.endswith(b'\n'):
+            break
+        try:
+            entry = json.loads(line)
+            entries.append((int(entry['seq']), entry['record']))
+        except (ValueError, KeyError, TypeError):
+            if valid + len(line) == len(raw):
+                break
+            logger.warning(f"저널 손상 줄 건너뜀: {path} (offset {valid})")
+        valid += len(line)
+    return entries, valid
+
+
+def load_records(path, journal_path=None):
+    """스냅샷 + 저널 꼬리 → 전체 기록 리스트 (읽기 전용, 다른 프로세스에서도 안전)"""
+    journal_path = journal_path or journal_path_for(path)
+    # 저널을 먼저 읽어야 함: 압축은 스냅샷 교체 → 저널 비우기 순서라서
+    # 저널을 읽은 뒤의 스냅샷은 그 저널 내용을 이미 포함한다
+    entries, _ = _read_journal(journal_path)
+    seq, records = _read_snapshot(path)
+    tail = [record for entry_seq, record in entries if entry_seq > seq]
+    if tail and entries[0][0] > seq + 1:
+        logger.warning(f"저널 번호 공백: 스냅샷 {seq}, 저널 시작 {entries[0][0]} ({journal_path})")
+    return records + tail
+
+
+class TradeJournal:
+    """추가 전용 저널 + 주기적 스냅샷 (단일 쓰기 프로세스)"""
+
+    def __init__(self, path, journal_path=None, compact_every=None, fsync=None):
+        self.path = path
+        self.journal_path = journal_path or journal_path_for(path)
+        self.compact_every = compact_every or JOURNAL_CONFIG['compact_every']
+        self.fsync = JOURNAL_CONFIG['fsync'] if fsync is None else fsync
+        self._lock = threading.RLock()
+        self._seq = None        # 마지막으로 쓴 번호 (첫 쓰기 때 복구)
+        self._pending = 0       # 스냅샷 이후 저널 기록 수
+
+    def load(self):
+        """전체 기록 (스냅샷 + 저널 꼬리)"""
+        return load_records(self.path, self.journal_path)
+
+    def _recover(self):
+        """첫 쓰기 전: 마지막 번호 확인 + 잘린 마지막 줄 제거"""
+        entries, valid = _read_journal(self.journal_path)
+        seq, _ = _read_snapshot(self.path)
+        if entries:
+            seq = max(seq, entries[-1][0])
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > valid:
+            logger.warning(f"저널 끝의 잘린 기록 제거: {self.journal_path}")
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(valid)
+        self._seq = seq
+        self._pending = len(entries)
+
+    def append(self, record, sync=True):
+        """기록 1건 추가 (한 줄 쓰기 + fsync, sync=False면 OS 버퍼까지만)"""
+        with self._lock:
+            if self._seq is None:
+                self._recover()
+            line = json.dumps({'seq': self._seq + 1, 'record': record},
+                              ensure_ascii=False, default=str) + '\n'
+            with open(self.journal_path, 'ab') as f:
+                f.write(line.encode('utf-8'))
+                f.flush()
+                if self.fsync and sync:
+                    os.fsync(f.fileno())
+            self._seq += 1
+            self._pending += 1
+
+            if self._pending >= self.compact_every:
+                self.compact()
+
+    def compact(self, records=None):
+        """스냅샷으로 압축 (records를 주면 그 내용으로 교체 - 정리/초기화용)"""
+        with self._lock:
+            if self._seq is None:
+                self._recover()
+            if records is None:
+                records = self.load()
+
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'seq': self._seq, 'records': records}, f,
+                          ensure_ascii=False, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.replace(tmp_path, self.path)
+            except PermissionError as e:
+                # Windows: 다른 프로세스가 스냅샷을 여는 중 → 저널 유지, 다음에 재시도
+                logger.warning(f"스냅샷 교체 실패 (다음에 재시도): {e}")
+                os.remove(tmp_path)
+                return False
+
+            # 스냅샷이 모든 번호를 포함하므로 이제 저널을 비워도 안전
+            with open(self.journal_path, 'wb') as f:
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._pending = 0
+            return True
+
+    def reset(self):
+        """모든 기록 삭제 (번호는 계속 증가)"""
+        return self.compact([])
@@ -0,0 +1,195 @@
+# trade_stats.py - 청산 거래 롤링 통계 (1/7/30일 창, 거래마다 O(1) 갱신)
+#
+# - 창마다 시간 버킷(bucket_seconds)별 합계와 창 전체 합계(건수/승패/손익/수수료/보유 시간,
+#   종목별 손익)를 누적 → 버킷이 창 밖으로 나가면 그 버킷 합계를 뺌 (버킷당 한 번, 분할 상환 O(1))
+# - 최대 수익/최대 손실은 창마다 단조 덱 (새 값보다 작은 값은 다시 최대가 될 수 없어 버림)
+# - 조회는 누적값으로 바로 계산 (최고/최악 종목만 창 안의 종목 수만큼)
+# - 만료 단위는 버킷: 창 경계에서 최대 bucket_seconds만큼 오래된 거래가 더 포함될 수 있음
+# - 거래는 시각 순으로 들어온다고 가정 (최신 버킷보다 이전 시각이면 최신 버킷에 넣음)
+#
+# 사용처: TradeHistoryManager.get_period_stats(대시보드), RiskManager 켈리 비율,
+#         AdaptivePresetManager 최근 승률
+
+import threading
+from collections import deque
+
+from clock import SYSTEM_CLOCK
+from config import TRADE_STATS_CONFIG
+from trade_store import to_epoch
+
+DAY = 86400
+
+
+class _Totals:
+    """더하고 뺄 수 있는 합계"""
+
+    __slots__ = ('count', 'wins', 'win_pnl', 'loss_pnl', 'fee', 'hold', 'by_symbol')
+
+    def __init__(self):
+        self.count = 0
+        self.wins = 0
+        self.win_pnl = 0.0
+        self.loss_pnl = 0.0
+        self.fee = 0.0
+        self.hold = 0.0
+        self.by_symbol = {}  # {symbol: [손익 합, 건수]}
+
+    def add(self, symbol, pnl, fee, hold):
+        self.count += 1
+        if pnl > 0:
+            self.wins += 1
+            self.win_pnl += pnl
+        else:
+            self.loss_pnl += pnl
+        self.fee += fee
+        self.hold += hold
+
+        entry = self.by_symbol.get(symbol)
+        if entry is None:
+            entry = self.by_symbol[symbol] = [0.0, 0]
+        entry[0] += pnl
+        entry[1] += 1
+
+    def subtract(self, other):
+        """버킷 합계를 창에서 뺌"""
+        self.count -= other.count
+        self.wins -= other.wins
+        self.win_pnl -= other.win_pnl
+        self.loss_pnl -= other.loss_pnl
+        self.fee -= other.fee
+        self.hold -= other.hold
+        for symbol, (pnl, count) in other.by_symbol.items():
+            entry = self.by_symbol[symbol]
+            entry[0] -= pnl
+            entry[1] -= count
+            if entry[1] <= 0:
+                del self.by_symbol[symbol]
+        if self.count <= 0:  # 부동소수 오차 정리
+            self.__init__()
+
+
+class _Window:
+    """한 기간 창 - 포함된 버킷, 합계, 최대 수익/손실 단조 덱"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.buckets = deque()      # (버킷 시작, _Totals)
+        self.totals = _Totals()
+        self.max_win = deque()      # (버킷 시작, pnl) - pnl 내림차순
+        self.max_loss = deque()     # (버킷 시작, pnl) - pnl 오름차순
+
+    def add(self, start, symbol, pnl, fee, hold):
+        if self.buckets and self.buckets[-1][0] >= start:
+            start, bucket = self.buckets[-1]  # 같은 버킷 (또는 늦게 들어온 거래)
+        else:
+            bucket = _Totals()
+            self.buckets.append((start, bucket))
+        bucket.add(symbol, pnl, fee, hold)
+        self.totals.add(symbol, pnl, fee, hold)
+        if pnl > 0:
+            while self.max_win and self.max_win[-1][1] <= pnl:
+                self.max_win.pop()
+            self.max_win.append((start, pnl))
+        else:
+            while self.max_loss and self.max_loss[-1][1] >= pnl:
+                self.max_loss.pop()
+            self.max_loss.append((start, pnl))
+
+    def expire(self, cutoff, bucket_seconds):
+        """모든 거래가 cutoff 이전인 버킷 제거"""
+        oldest = cutoff - bucket_seconds  # 버킷 시작이 이 시각 이하면 창 밖
+        while self.buckets and self.buckets[0][0] <= oldest:
+            _, bucket = self.buckets.popleft()
+            self.totals.subtract(bucket)
+        for extremes in (self.max_win, self.max_loss):
+            while extremes and extremes[0][0] <= oldest:
+                extremes.popleft()
+
+
+class RollingTradeStats:
+    """1/7/30일 (windows) 롤링 거래 통계 - 스레드 안전"""
+
+    def __init__(self, clock=None, windows=None, bucket_seconds=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.bucket_seconds = bucket_seconds or TRADE_STATS_CONFIG['bucket_seconds']
+        self.windows = {days: _Window(days * DAY)
+                        for days in (windows or TRADE_STATS_CONFIG['windows'])}
+        self._lock = threading.Lock()
+
+    def add(self, trade):
+        """청산 거래 1건 (get_period_stats와 같은 dict: timestamp, symbol, pnl, fee, hold_time_hours)"""
+        ts = to_epoch(trade.get('timestamp'))
+        symbol = trade.get('symbol', '')
+        pnl = trade.get('pnl', 0) or 0
+        fee = trade.get('fee', 0) or 0
+        hold = trade.get('hold_time_hours', 0) or 0
+
+        start = int(ts // self.bucket_seconds) * self.bucket_seconds
+        with self._lock:
+            now = self.clock.time()
+            for window in self.windows.values():
+                if ts > now - window.seconds:  # 이미 창 밖인 거래는 넣지 않음
+                    window.add(start, symbol, pnl, fee, hold)
+
+    def _window(self, days):
+        window = self.windows.get(days)
+        if window is None:
+            raise KeyError(f"롤링 통계 창 없음: {days}일 (설정: {sorted(self.windows)})")
+        window.expire(self.clock.time() - window.seconds, self.bucket_seconds)
+        return window
+
+    def has_window(self, days):
+        return days in self.windows
+
+    def counts(self, days):
+        """(거래 수, 승 수, 수익 합, 손실 합(음수)) - 켈리/승률용"""
+        with self._lock:
+            totals = self._window(days).totals
+            return totals.count, totals.wins, totals.win_pnl, totals.loss_pnl
+
+    def win_rate(self, days):
+        """승률 (0~1), 거래가 없으면 None"""
+        count, wins, _, _ = self.counts(days)
+        return wins / count if count else None
+
+    def stats(self, days):
+        """TradeHistoryManager.get_period_stats와 같은 형식의 통계 (거래가 없으면 None)"""
+        with self._lock:
+            window = self._window(days)
+            t = window.totals
+            if t.count <= 0:
+                return None
+            count, wins, win_pnl, loss_pnl = t.count, t.wins, t.win_pnl, t.loss_pnl
+            fee, hold = t.fee, t.hold
+            max_win = window.max_win[0][1] if window.max_win else 0
+            max_loss = window.max_loss[0][1] if window.max_loss else 0
+            by_symbol = {symbol: pnl for symbol, (pnl, _) in t.by_symbol.items()}
+
+        losses = count - wins
+        total_pnl = win_pnl + loss_pnl
+        stats = {
+            'total_pnl': total_pnl,
+            'net_pnl': total_pnl - fee,
+            'total_fee': fee,
+            'trade_count': count,
+            'win_count': wins,
+            'loss_count': losses,
+            'win_rate': wins / count * 100,
+            'avg_win': win_pnl / wins if wins else 0,
+            'avg_loss': abs(loss_pnl / losses) if losses else 0,
+            'max_win': max_win,
+            'max_loss': max_loss,
+            'avg_hold_time': hold / count,
+            'best_symbol': '-',
+            'worst_symbol': '-',
+        }
+        if by_symbol:
+            best = max(by_symbol.items(), key=lambda x: x[1])
+            stats['best_symbol'] = f"{best[0]} (+{best[1]:,.0f})"
+            worst = min(by_symbol.items(), key=lambda x: x[1])
+            if worst[1] < 0:
+                stats['worst_symbol'] = f"{worst[0]} ({worst[1]:,.0f})"
+
+        total_losses = abs(loss_pnl) if losses else 1
+        stats['profit_factor'] = win_pnl / total_losses if total_losses > 0 else 0
+        return stats
@@ -0,0 +1,326 @@
+# trade_store.py - 거래/포지션/일일 요약/물타기·추매 기록 SQLite 저장소 (WAL)
+#
+# 테이블:
+#   trades           - 청산 거래 (ts 인덱스, symbol+ts 인덱스)
+#   positions        - 보유 포지션 (종목당 한 행, 저장할 때마다 통째로 교체)
+#   daily_summaries  - 일일 요약 (date 기본 키 = 날짜 범위 조회)
+#   position_events  - 물타기/추매 기록 (ts, symbol+kind+ts 인덱스, 청산 시 active=0)
+#   meta             - 마이그레이션 완료 표시 등
+# - 원본 dict는 data 열(JSON)에 그대로, 조회 조건으로 쓰는 값만 열로 분리
+# - 시각 열(ts)은 epoch 초 (거래 기록의 시간대 없는 ISO 문자열 = 로컬 시각 기준)
+# - WAL 모드: 봇(쓰기)과 대시보드/분석기(읽기)가 다른 프로세스에서 동시에 사용
+# - 기존 JSON 파일(trade_history.json + 저널, daily_summaries.json, active_positions.json)은
+#   처음 열 때 한 번만 가져오고 그대로 둠 (백업)
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import TRADE_STORE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    type TEXT,
+    pnl REAL NOT NULL DEFAULT 0,
+    fee REAL NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades(ts);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol_ts ON trades(symbol, ts);
+
+CREATE TABLE IF NOT EXISTS positions (
+    symbol TEXT PRIMARY KEY,
+    entry_price REAL NOT NULL,
+    quantity REAL NOT NULL,
+    entry_time TEXT,
+    updated REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS daily_summaries (
+    date TEXT PRIMARY KEY,
+    total_pnl REAL NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS position_events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_position_events_ts ON position_events(ts);
+CREATE INDEX IF NOT EXISTS idx_position_events_symbol ON position_events(symbol, kind, ts);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def to_epoch(value):
+    """datetime / ISO 문자열 / 숫자 → epoch 초 (시간대 없으면 로컬 시각)"""
+    if value is None:
+        return datetime.now().timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def _iso(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TradeStore:
+    """SQLite(WAL) 저장소 - 연결 하나를 스레드들이 잠금으로 공유"""
+
+    def __init__(self, path=None):
+        self.path = path or TRADE_STORE_CONFIG['path']
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        # isolation_level=None: 자동 커밋, 여러 문장은 transaction()으로 묶음
+        self.conn = sqlite3.connect(self.path, timeout=TRADE_STORE_CONFIG['busy_timeout'],
+                                    check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={TRADE_STORE_CONFIG['synchronous']}")
+        with self._lock:
+            self.conn.executescript(SCHEMA)  # IF NOT EXISTS - 여러 프로세스가 열어도 안전
+
+    @contextmanager
+    def transaction(self):
+        """BEGIN IMMEDIATE ~ COMMIT (다른 프로세스의 쓰기와 직렬화)"""
+        with self._lock:
+            if self.conn.in_transaction:  # 중첩 - 바깥 트랜잭션에 포함
+                yield self.conn
+                return
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ------------------------------------------------------------------
+    # 거래
+    # ------------------------------------------------------------------
+    def add_trade(self, trade):
+        """청산 거래 1건 (timestamp는 ISO 문자열) → 행 id"""
+        with self.transaction() as conn:
+            return self._insert_trade(conn, trade)
+
+    def _insert_trade(self, conn, trade):
+        return conn.execute(
+            "INSERT INTO trades (ts, symbol, type, pnl, fee, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (to_epoch(trade.get('timestamp')), trade.get('symbol', ''), trade.get('type'),
+             trade.get('pnl', 0) or 0, trade.get('fee', 0) or 0, _dumps(trade))
+        ).lastrowid
+
+    def trades_since(self, since=None, until=None, symbol=None):
+        """(since, until) 구간 거래 - 시각 순 (ts 인덱스 범위 조회)"""
+        sql = "SELECT data FROM trades WHERE ts > ?"
+        params = [to_epoch(since) if since is not None else float('-inf')]
+        if until is not None:
+            sql += " AND ts < ?"
+            params.append(to_epoch(until))
+        if symbol is not None:
+            sql += " AND symbol = ?"
+            params.append(symbol)
+        rows = self._query(sql + " ORDER BY ts, id", params)
+        return [json.loads(row['data']) for row in rows]
+
+    def trades_after(self, last_id, since=None):
+        """[(id, 거래)] - last_id 이후에 추가된 거래 (다른 프로세스가 쓴 새 거래 따라잡기)"""
+        rows = self._query(
+            "SELECT id, data FROM trades WHERE id > ? AND ts > ? ORDER BY id",
+            (last_id, to_epoch(since) if since is not None else float('-inf'))
+        )
+        return [(row['id'], json.loads(row['data'])) for row in rows]
+
+    def last_trade_id(self):
+        return self._query("SELECT COALESCE(MAX(id), 0) FROM trades")[0][0]
+
+    def recent_trades(self, limit=10):
+        """최근 거래 limit건 - 최신순"""
+        rows = self._query("SELECT data FROM trades ORDER BY ts DESC, id DESC LIMIT ?", (limit,))
+        return [json.loads(row['data']) for row in rows]
+
+    def delete_trades_before(self, cutoff):
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM trades WHERE ts <= ?", (to_epoch(cutoff),)).rowcount
+
+    def trade_count(self):
+        return self._query("SELECT COUNT(*) FROM trades")[0][0]
+
+    # ------------------------------------------------------------------
+    # 포지션
+    # ------------------------------------------------------------------
+    def save_positions(self, positions):
+        """{symbol: {entry_price, quantity, entry_time}} 전체 교체 (한 트랜잭션)"""
+        now = datetime.now().timestamp()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM positions")
+            conn.executemany(
+                "INSERT INTO positions (symbol, entry_price, quantity, entry_time, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(symbol, pos['entry_price'], pos['quantity'], _iso(pos.get('entry_time')), now)
+                 for symbol, pos in positions.items()]
+            )
+            self._set_meta(conn, 'positions_saved_at', datetime.now().isoformat())
+
+    def load_positions(self):
+        rows = self._query("SELECT symbol, entry_price, quantity, entry_time FROM positions")
+        return {
+            row['symbol']: {'entry_price': row['entry_price'], 'quantity': row['quantity'],
+                            'entry_time': row['entry_time']}
+            for row in rows
+        }
+
+    # ------------------------------------------------------------------
+    # 일일 요약
+    # ------------------------------------------------------------------
+    def save_daily_summary(self, date, summary):
+        with self.transaction() as conn:
+            self._upsert_summary(conn, date, summary)
+
+    def _upsert_summary(self, conn, date, summary):
+        conn.execute(
+            "INSERT OR REPLACE INTO daily_summaries (date, total_pnl, data) VALUES (?, ?, ?)",
+            (date, summary.get('total_pnl', 0) or 0, _dumps(summary))
+        )
+
+    def daily_summaries(self, start=None, end=None):
+        """{날짜: 요약} - start~end ('YYYY-MM-DD', 양끝 포함), 날짜 순"""
+        rows = self._query(
+            "SELECT date, data FROM daily_summaries WHERE date >= ? AND date <= ? ORDER BY date",
+            (start or '', end or '9999-12-31')
+        )
+        return {row['date']: json.loads(row['data']) for row in rows}
+
+    # ------------------------------------------------------------------
+    # 물타기/추매 기록
+    # ------------------------------------------------------------------
+    def add_position_event(self, symbol, kind, record, timestamp=None):
+        """kind: 'averaging' / 'pyramid'"""
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO position_events (ts, symbol, kind, data) VALUES (?, ?, ?, ?)",
+                (to_epoch(timestamp if timestamp is not None else record.get('timestamp')),
+                 symbol, kind, _dumps(record))
+            )
+
+    def close_position_events(self, symbol, kind):
+        """포지션 청산 - 진행 중 기록을 이력으로"""
+        with self.transaction() as conn:
+            conn.execute("UPDATE position_events SET active = 0 "
+                         "WHERE symbol = ? AND kind = ? AND active = 1", (symbol, kind))
+
+    def position_events(self, symbol=None, kind=None, active_only=False, since=None):
+        sql = "SELECT symbol, kind, active, data FROM position_events WHERE ts > ?"
+        params = [to_epoch(since) if since is not None else float('-inf')]
+        for column, value in (('symbol', symbol), ('kind', kind)):
+            if value is not None:
+                sql += f" AND {column} = ?"
+                params.append(value)
+        if active_only:
+            sql += " AND active = 1"
+        rows = self._query(sql + " ORDER BY ts, id", params)
+        return [{'symbol': row['symbol'], 'kind': row['kind'], 'active': bool(row['active']),
+                 **json.loads(row['data'])} for row in rows]
+
+    # ------------------------------------------------------------------
+    # 기존 JSON 가져오기
+    # ------------------------------------------------------------------
+    def _get_meta(self, key):
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0]['value'] if rows else None
+
+    def _set_meta(self, conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def migrate(self, kind, path):
+        """기존 JSON 파일을 한 번만 가져옴 - kind: 'trades' / 'daily_summaries' / 'positions'
+
+        여러 프로세스가 동시에 열어도 트랜잭션 안에서 완료 표시를 확인하므로 한 번만 실행
+        """
+        key = f'migrated:{kind}'
+        if self._get_meta(key) is not None:
+            return 0
+
+        with self.transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+                return 0
+            count = 0
+            try:
+                if kind == 'trades':
+                    from trade_journal import load_records  # 저널 꼬리까지
+                    for trade in load_records(path):
+                        self._insert_trade(conn, trade)
+                        count += 1
+                elif os.path.exists(path):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    if kind == 'daily_summaries':
+                        for date, summary in data.items():
+                            self._upsert_summary(conn, date, summary)
+                            count += 1
+                    elif kind == 'positions':
+                        for symbol, pos in data.get('positions', {}).items():
+                            conn.execute(
+                                "INSERT OR REPLACE INTO positions "
+                                "(symbol, entry_price, quantity, entry_time, updated) "
+                                "VALUES (?, ?, ?, ?, ?)",
+                                (symbol, pos['entry_price'], pos['quantity'],
+                                 pos.get('entry_time'), to_epoch(data.get('timestamp')))
+                            )
+                            count += 1
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.error(f"JSON 가져오기 실패 ({kind}: {path}): {e}")
+                raise
+            self._set_meta(conn, key, f"{path} ({count})")
+
+        if count:
+            logger.info(f"📦 {path} → {self.path}: {count}건 가져옴")
+        return count
+
+
+_stores = {}
+_stores_guard = threading.Lock()
+
+
+def get_store(path=None):
+    """경로별 공유 저장소 (프로세스 안에서 연결 하나)"""
+    path = os.path.abspath(path or TRADE_STORE_CONFIG['path'])
+    with _stores_guard:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = TradeStore(path)
+        return store
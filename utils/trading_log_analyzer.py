@@ -1,13 +1,27 @@
 # trading_log_analyzer.py - trading.log 분석 및 설정 최적화 제안
 
 import re
-import pyupbit
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from collections import defaultdict
+from itertools import islice
 import json
 
+import candle_archive
+from config import LOG_READER_CONFIG
+from log_reader import LogReader, TIMESTAMP_RE, checkpoint_path_for, log_segments
+
+# 파싱 방식이 바뀌면 올림 (저장된 체크포인트를 버리고 처음부터 다시 파싱)
+_PARSER_VERSION = 1
+
+_BUY_SYMBOL_RE = re.compile(r'매수 완료: ([A-Z]+)')
+_SELL_SYMBOL_RE = re.compile(r'매도 완료: ([A-Z]+)')
+_PRICE_RE = re.compile(r'@ ([\d,]+)')
+_PNL_RE = re.compile(r'PnL ([+-]?[\d,]+)')
+_PNL_RATE_RE = re.compile(r'\(([+-]?\d+\.\d+)%\)')
+_ENTRY_SCORE_RE = re.compile(r'점수: ([\d.]+)')
+
 class TradingLogAnalyzer:
     """거래 로그 분석 및 최적 설정 제안"""
     
@@ -17,29 +31,31 @@ class TradingLogAnalyzer:
         self.market_conditions = {}
         
     def parse_log(self):
-        """로그 파일 파싱 - 개선된 버전"""
+        """로그 파일 파싱 - 회전/gzip 조각 포함, 체크포인트 이후 새 줄만"""
         print("\n" + "="*80)
         print("📊 Trading Log 분석 시작")
         print("="*80)
         
-        try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        except FileNotFoundError:
+        if not log_segments(self.log_file):
             print(f"❌ {self.log_file} 파일을 찾을 수 없습니다")
             return []
         
-        current_trade = {}
+        reader = LogReader(self.log_file, version=_PARSER_VERSION,
+                           checkpoint=checkpoint_path_for(self.log_file, 'trades')
+                           if LOG_READER_CONFIG['checkpoint'] else None)
+        state = reader.load_state() or {'trades': [], 'current_trade': {}}
+        self.trades = state['trades']
+        current_trade = state['current_trade']
         parsed_lines = 0
         skipped_lines = 0
         
-        for line in lines:
+        for line in reader.lines():
             try:
                 # 매수 기록
-                if '매수 완료' in line or '✅ 매수 완료' in line:
-                    match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
-                    symbol_match = re.search(r'매수 완료: ([A-Z]+)', line)
-                    price_match = re.search(r'@ ([\d,]+)', line)
+                if '매수 완료' in line:
+                    match = TIMESTAMP_RE.search(line)
+                    symbol_match = _BUY_SYMBOL_RE.search(line)
+                    price_match = _PRICE_RE.search(line)
                     
                     if match and symbol_match and price_match:
                         timestamp = match.group(1)
@@ -55,17 +71,18 @@ class TradingLogAnalyzer:
                         parsed_lines += 1
                 
                 # 매도 기록
-                elif '매도 완료' in line or '🔴 매도 완료' in line:
-                    match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
-                    symbol_match = re.search(r'매도 완료: ([A-Z]+)', line)
-                    price_match = re.search(r'@ ([\d,]+)', line)
-                    pnl_match = re.search(r'PnL ([+-]?[\d,]+)', line)
-                    pnl_rate_match = re.search(r'\(([+-]?\d+\.\d+)%\)', line)
+                elif '매도 완료' in line:
+                    match = TIMESTAMP_RE.search(line)
+                    symbol_match = _SELL_SYMBOL_RE.search(line)
+                    price_match = _PRICE_RE.search(line)
                     
                     if not all([match, symbol_match, price_match]):
                         skipped_lines += 1
                         continue
                     
+                    pnl_match = _PNL_RE.search(line)
+                    pnl_rate_match = _PNL_RATE_RE.search(line)
+                    
                     timestamp = match.group(1)
                     symbol = symbol_match.group(1)
                     exit_price = float(price_match.group(1).replace(',', ''))
@@ -100,8 +117,8 @@ class TradingLogAnalyzer:
                         current_trade = {}
                 
                 # 진입 조건 기록
-                elif '진입 조건 충족' in line or '✅ 진입 조건 충족' in line:
-                    score_match = re.search(r'점수: ([\d.]+)', line)
+                elif '진입 조건 충족' in line:
+                    score_match = _ENTRY_SCORE_RE.search(line)
                     if score_match and current_trade:
                         current_trade['entry_score'] = float(score_match.group(1))
             
@@ -109,6 +126,8 @@ class TradingLogAnalyzer:
                 skipped_lines += 1
                 continue
         
+        reader.save({'trades': self.trades, 'current_trade': current_trade})
+        
         print(f"✅ 총 {len(self.trades)}개 거래 파싱 완료")
         print(f"   파싱된 라인: {parsed_lines}개")
         if skipped_lines > 0:
@@ -117,9 +136,7 @@ class TradingLogAnalyzer:
         if len(self.trades) == 0:
             print("\n⚠️  파싱된 거래가 없습니다. 로그 형식 샘플:")
             print("-"*80)
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                sample = f.readlines()[:20]
-            for line in sample:
+            for line in islice(LogReader(self.log_file).lines(), 20):
                 if '매수' in line or '매도' in line:
                     print(line.strip())
         
@@ -188,11 +205,11 @@ class TradingLogAnalyzer:
                 end_date = entry_time
                 start_date = end_date - timedelta(days=10)
                 
-                df_ohlcv = pyupbit.get_ohlcv(
-                    ticker, 
+                df_ohlcv = candle_archive.load_history(
+                    ticker,
                     interval="day",
-                    to=end_date.strftime('%Y-%m-%d %H:%M:%S'),
-                    count=10
+                    count=10,
+                    end=end_date
                 )
                 
                 if df_ohlcv is not None and len(df_ohlcv) >= 5: